@@ -0,0 +1,136 @@
+"""
+Daily interview activity (user_daily_activity table).
+
+One row per (user, day) holding the number of interviews completed that
+day, bumped with a single upsert. The streak on UserProfile is advanced from
+last_active_date instead of walking the history back day by day, and
+heatmaps read only the requested date range through the primary key.
+
+UserProfile.daily_activity (the old ever-growing JSON history) is no longer
+written; run this module as a script to copy it into the table.
+
+Usage: python activity.py --backfill
+"""
+import argparse
+import os
+import sys
+from datetime import date, datetime, timedelta
+from typing import Dict, Optional, Tuple
+
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import Session
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from models import UserDailyActivity, UserProfile  # noqa: E402
+
+# What the profile page heatmap shows: 53 weeks ending today
+HEATMAP_DAYS = 53 * 7
+# Longest range GET /profile/activity serves in one request
+MAX_RANGE_DAYS = 2 * HEATMAP_DAYS
+
+
+def _bump_day(user_id: int, day: date, db: Session) -> None:
+    """count += 1 for (user_id, day), inserting the row if it's the first today."""
+    dialect = db.bind.dialect.name
+    if dialect in ("postgresql", "sqlite"):
+        insert = postgresql.insert if dialect == "postgresql" else sqlite.insert
+        stmt = insert(UserDailyActivity).values(user_id=user_id, day=day, count=1)
+        db.execute(stmt.on_conflict_do_update(
+            index_elements=["user_id", "day"],
+            set_={"count": UserDailyActivity.count + 1},
+        ))
+        return
+    row = db.get(UserDailyActivity, (user_id, day), with_for_update=True)
+    if row is None:
+        db.add(UserDailyActivity(user_id=user_id, day=day, count=1))
+    else:
+        row.count = (row.count or 0) + 1
+
+
+def record_activity(profile: UserProfile, db: Session, day: Optional[date] = None) -> None:
+    """Count one completed interview on `day` (default today) and advance the streak. Does not commit."""
+    day = day or date.today()
+    _bump_day(profile.user_id, day, db)
+    # The heatmap is part of the profile response, so its ETag has to move too
+    profile.updated_at = datetime.utcnow()
+
+    last = profile.last_active_date
+    if last == day:
+        return
+    if last is not None and last > day:
+        return  # late write for an earlier day; the streak already moved past it
+    profile.streak_days = (profile.streak_days or 0) + 1 if last == day - timedelta(days=1) else 1
+    profile.last_active_date = day
+
+
+def current_streak(profile: UserProfile, today: Optional[date] = None) -> int:
+    """Stored streak, or 0 once a full day has passed without activity."""
+    today = today or date.today()
+    last = profile.last_active_date
+    if last is None or last < today - timedelta(days=1):
+        return 0
+    return profile.streak_days or 0
+
+
+def activity_between(user_id: int, start: date, end: date, db: Session) -> Dict[str, int]:
+    """{ISO date: count} for active days in [start, end]; inactive days are omitted."""
+    rows = (
+        db.query(UserDailyActivity.day, UserDailyActivity.count)
+        .filter(
+            UserDailyActivity.user_id == user_id,
+            UserDailyActivity.day >= start,
+            UserDailyActivity.day <= end,
+        )
+        .order_by(UserDailyActivity.day)
+        .all()
+    )
+    return {d.isoformat(): c for d, c in rows if c}
+
+
+def recent_activity(user_id: int, db: Session) -> Dict[str, int]:
+    """The window the profile heatmap renders."""
+    today = date.today()
+    return activity_between(user_id, today - timedelta(days=HEATMAP_DAYS), today, db)
+
+
+def backfill(db: Session) -> Tuple[int, int]:
+    """Copy UserProfile.daily_activity JSON into user_daily_activity (existing rows win)."""
+    profiles = days = 0
+    query = (
+        db.query(UserProfile.user_id, UserProfile.daily_activity)
+        .filter(UserProfile.daily_activity.isnot(None))
+    )
+    for user_id, history in query.yield_per(1000):
+        if not history:
+            continue
+        existing = {d for (d,) in db.query(UserDailyActivity.day).filter(UserDailyActivity.user_id == user_id)}
+        for iso, count in history.items():
+            try:
+                day = date.fromisoformat(iso)
+            except (TypeError, ValueError):
+                continue
+            if day in existing or not count:
+                continue
+            db.add(UserDailyActivity(user_id=user_id, day=day, count=int(count)))
+            days += 1
+        profiles += 1
+    db.commit()
+    return profiles, days
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Daily activity tools")
+    parser.add_argument("--backfill", action="store_true", help="copy legacy daily_activity JSON into the table")
+    args = parser.parse_args()
+
+    if args.backfill:
+        from database import SessionLocal
+        db = SessionLocal()
+        try:
+            profiles, days = backfill(db)
+            print(f"✓ Copied {days} active days from {profiles} profiles")
+        finally:
+            db.close()
+    else:
+        parser.print_help()
@@ -1,13 +1,17 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+import asyncio
+import os
+from fastapi import APIRouter, Depends, HTTPException, Response, status
 from sqlalchemy.orm import Session
-from sqlalchemy import desc
-from datetime import timedelta
+from sqlalchemy import and_, case, func
+from datetime import datetime, timedelta
 from typing import List, Optional
 from pydantic import BaseModel
 
-from database import get_db
+import maintenance
+from database import ReadSessionLocal, get_db, get_read_db
 from models import InterviewSession, User, InterviewMode, ChatMessage
 from api.auth import create_access_token, ACCESS_TOKEN_EXPIRE_MINUTES
+from pagination import paginate_desc
 
 router = APIRouter(prefix="/admin", tags=["admin"])
 
@@ -60,16 +64,21 @@ async def admin_login(login_data: AdminLoginRequest):
 
 @router.get("/interviews")
 async def get_all_interviews(
-    skip: int = 0, 
-    limit: int = 100, 
-    db: Session = Depends(get_db)
+    response: Response,
+    cursor: Optional[str] = None,
+    limit: int = 100,
+    db: Session = Depends(get_read_db)
 ):
     # Depending on how strict we want to be, we could verify the token here.
     # For now, let's keep it open or assume the frontend handles the token.
     # ideally we want `current_user: User = Depends(get_current_active_admin)`
     
-    # Joining with User to get email
-    results = db.query(InterviewSession, User).outerjoin(User, InterviewSession.user_id == User.id).order_by(desc(InterviewSession.created_at)).offset(skip).limit(limit).all()
+    # Joining with User to get email. Keyset pagination: the next page cursor
+    # goes in a header so the body stays the plain list the dashboard expects.
+    query = db.query(InterviewSession, User).outerjoin(User, InterviewSession.user_id == User.id)
+    results, next_cursor = paginate_desc(query, InterviewSession, cursor, limit)
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
     
     output = []
     for session, user in results:
@@ -87,76 +96,116 @@ async def get_all_interviews(
         
     return output
 
-@router.get("/stats")
-async def get_admin_stats(db: Session = Depends(get_db)):
-    """
-    Get aggregated statistics for the admin dashboard
-    """
-    total_interviews = db.query(InterviewSession).count()
-    total_users = db.query(User).count()
-    
-    # Calculate average score (ignoring 0/None)
-    avg_score_query = db.query(InterviewSession).filter(InterviewSession.average_score > 0).all()
-    avg_score = sum([s.average_score for s in avg_score_query]) / len(avg_score_query) if avg_score_query else 0.0
-    
-    # Status distribution
-    status_counts = {}
-    for status_val in ["active", "completed", "terminated"]:
-        count = db.query(InterviewSession).filter(InterviewSession.status == status_val).count()
-        status_counts[status_val] = count
-        
-    # Mode distribution
-    mode_counts = {}
-    for mode in ["short", "detailed"]:
-        count = db.query(InterviewSession).filter(InterviewSession.interview_mode == mode).count()
-        mode_counts[mode] = count
-        
-    # Score distribution (buckets)
-    # 0-3, 3-5, 5-7, 7-8, 8-10
-    score_buckets = {
-        "Needs Improvement (0-4)": 0,
-        "Average (4-6)": 0,
-        "Good (6-8)": 0,
-        "Excellent (8-10)": 0
+# Seconds between background rebuilds; the dashboard tolerates a minute of staleness
+ADMIN_STATS_REFRESH_INTERVAL = float(os.getenv("ADMIN_STATS_REFRESH_INTERVAL", "60"))
+
+# Latest dashboard numbers, replaced wholesale by refresh_admin_stats()
+_stats_snapshot: Optional[dict] = None
+
+STATUS_VALUES = ["active", "completed", "terminated"]
+MODE_VALUES = ["short", "detailed"]
+# (label, lower bound inclusive, upper bound exclusive) over average_score
+SCORE_BUCKETS = [
+    ("Needs Improvement (0-4)", None, 4),
+    ("Average (4-6)", 4, 6),
+    ("Good (6-8)", 6, 8),
+    ("Excellent (8-10)", 8, None),
+]
+
+
+def _count_where(*conditions):
+    return func.coalesce(func.sum(case((and_(*conditions), 1), else_=0)), 0)
+
+
+def _compute_admin_stats(db: Session) -> dict:
+    """Build the dashboard numbers from three aggregate queries."""
+    completed = InterviewSession.status == "completed"
+    columns = [
+        func.count(InterviewSession.id),
+        func.avg(case((InterviewSession.average_score > 0, InterviewSession.average_score))),
+    ]
+    columns += [_count_where(InterviewSession.status == v) for v in STATUS_VALUES]
+    columns += [_count_where(InterviewSession.interview_mode == v) for v in MODE_VALUES]
+    for _, lo, hi in SCORE_BUCKETS:
+        conds = [completed]
+        if lo is not None:
+            conds.append(InterviewSession.average_score >= lo)
+        if hi is not None:
+            # A completed session with a NULL score counts as 0, in the lowest
+            # bucket; the per-row loop this replaced raised TypeError on one.
+            conds.append(func.coalesce(InterviewSession.average_score, 0) < hi)
+        columns.append(_count_where(*conds))
+
+    row = db.query(*columns).one()
+    total_interviews, avg_score = row[0], row[1] or 0.0
+    values = list(row[2:])
+    status_counts = dict(zip(STATUS_VALUES, values[:len(STATUS_VALUES)]))
+    values = values[len(STATUS_VALUES):]
+    mode_counts = dict(zip(MODE_VALUES, values[:len(MODE_VALUES)]))
+    values = values[len(MODE_VALUES):]
+    score_buckets = {label: count for (label, _, _), count in zip(SCORE_BUCKETS, values)}
+
+    total_users = db.query(func.count(User.id)).scalar()
+
+    # Daily activity (last 7 days) in one GROUP BY; days without rows are zero-filled
+    today = datetime.utcnow().date()
+    since = today - timedelta(days=6)
+    day = func.date(InterviewSession.created_at)
+    per_day = {
+        str(d)[:10]: c
+        for d, c in db.query(day, func.count(InterviewSession.id))
+        .filter(InterviewSession.created_at >= datetime.combine(since, datetime.min.time()))
+        .group_by(day)
+        .all()
     }
-    
-    all_scores = db.query(InterviewSession.average_score).filter(InterviewSession.status == "completed").all()
-    for (score,) in all_scores:
-        if score < 4:
-            score_buckets["Needs Improvement (0-4)"] += 1
-        elif score < 6:
-            score_buckets["Average (4-6)"] += 1
-        elif score < 8:
-            score_buckets["Good (6-8)"] += 1
-        else:
-            score_buckets["Excellent (8-10)"] += 1
-
-    # Daily activity (last 7 days)
-    from datetime import datetime, timedelta
-    from sqlalchemy import func
-    
     daily_activity = []
-    today = datetime.utcnow().date()
     for i in range(6, -1, -1):
-        date = today - timedelta(days=i)
-        count = db.query(InterviewSession).filter(func.date(InterviewSession.created_at) == date).count()
-        daily_activity.append({
-            "date": date.strftime("%Y-%m-%d"),
-            "count": count
-        })
+        date_str = (today - timedelta(days=i)).strftime("%Y-%m-%d")
+        daily_activity.append({"date": date_str, "count": per_day.get(date_str, 0)})
 
     return {
         "total_interviews": total_interviews,
         "total_users": total_users,
-        "average_score": round(avg_score, 2),
+        "average_score": round(float(avg_score), 2),
         "status_distribution": [{"name": k, "value": v} for k, v in status_counts.items() if v > 0],
         "mode_distribution": [{"name": k, "value": v} for k, v in mode_counts.items() if v > 0],
         "score_distribution": [{"name": k, "value": v} for k, v in score_buckets.items()],
-        "daily_activity": daily_activity
+        "daily_activity": daily_activity,
+        "generated_at": datetime.utcnow().isoformat(),
     }
 
+
+@maintenance.every(ADMIN_STATS_REFRESH_INTERVAL, "admin_stats")
+def refresh_admin_stats() -> None:
+    """Rebuild the dashboard snapshot off the request path."""
+    global _stats_snapshot
+    db = ReadSessionLocal()
+    try:
+        _stats_snapshot = _compute_admin_stats(db)
+    finally:
+        db.close()
+
+
+@router.get("/stats")
+async def get_admin_stats(refresh: bool = False):
+    """
+    Get aggregated statistics for the admin dashboard.
+    Served from the snapshot the maintenance thread rebuilds every
+    ADMIN_STATS_REFRESH_INTERVAL; refresh=true rebuilds it before answering.
+    """
+    if refresh:
+        # Off the event loop: the aggregates are blocking queries
+        await asyncio.to_thread(refresh_admin_stats)
+    if _stats_snapshot is None:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Statistics are still being computed",
+            headers={"Retry-After": "5"},
+        )
+    return _stats_snapshot
+
 @router.get("/interviews/{session_id}")
-async def get_interview_details(session_id: int, db: Session = Depends(get_db)):
+async def get_interview_details(session_id: int, db: Session = Depends(get_read_db)):
     """
     Get detailed information for a specific interview session, including chat history.
     """
@@ -1,20 +1,17 @@
-from fastapi import APIRouter, Depends, HTTPException, status, BackgroundTasks
+from fastapi import APIRouter, Depends, HTTPException, Request, status, BackgroundTasks
 from fastapi.security import OAuth2PasswordBearer, OAuth2PasswordRequestForm
 from datetime import datetime, timedelta
 from jose import JWTError, jwt
-from typing import Optional
+from typing import Optional, Union
+import asyncio
 import secrets
 import random
 import string
 from sqlalchemy.orm import Session
-from passlib.context import CryptContext
-from passlib.exc import UnknownHashError
 import os
 import sys
 from dotenv import load_dotenv
 import logging
-from google.auth.transport import requests
-from google.oauth2 import id_token
 from pydantic import BaseModel
 import httpx
 
@@ -25,10 +22,15 @@ sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 load_dotenv()
 
 # Import database and models
-from database import get_db, SessionLocal
-from models import User, InterviewSession, ChatMessage, OTP, ForgotPasswordRequest, VerifyOTPRequest, ResetPasswordRequest, MessageResponse
-from schemas.auth import UserCreate, UserInDB, Token, TokenData, UserResponse
-from email_utils import send_otp_email, send_password_reset_confirmation_email
+from database import caller_key, get_db, SessionLocal
+from models import User, UserProfile, InterviewSession, ChatMessage, OTP, ForgotPasswordRequest, VerifyOTPRequest, ResetPasswordRequest, MessageResponse
+from google_certs import verify_id_token
+import rate_limit
+import refresh_tokens
+from passwords import UNUSABLE_PASSWORD, hash_password, verify_password
+from user_snapshot import UserSnapshot, load_snapshot
+from schemas.auth import UserCreate, UserInDB, Token, TokenData, UserResponse, RefreshRequest
+from email_utils import queue_otp_email, queue_password_reset_confirmation_email
 from cache_warming import warm_user_cache
 
 # Security
@@ -39,8 +41,7 @@ GOOGLE_CLIENT_ID = os.getenv("GOOGLE_CLIENT_ID")
 GITHUB_CLIENT_ID = os.getenv("GITHUB_CLIENT_ID")
 GITHUB_CLIENT_SECRET = os.getenv("GITHUB_CLIENT_SECRET")
 
-# Password hashing
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+# Password hashing lives in passwords.py (thread pool, hash policy)
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="token")
 oauth2_scheme_optional = OAuth2PasswordBearer(tokenUrl="token", auto_error=False)
 
@@ -56,46 +57,11 @@ router = APIRouter()
 # Use uvicorn logger when available so logs appear with server output
 logger = logging.getLogger("uvicorn.error")
 
-def verify_password(plain_password: str, hashed_password: str) -> bool:
-    return pwd_context.verify(plain_password, hashed_password)
-
-def get_password_hash(password: str) -> str:
-    return pwd_context.hash(password)
-
-# Simple user cache for fast lookups (avoids slow Neon DB queries)
-_user_cache = {}
-_user_cache_ttl = 60  # seconds
-
 def get_user(db: Session, email: str) -> Optional[User]:
-    import time
-    
-    # Check cache first
-    cache_key = f"user:{email}"
-    if cache_key in _user_cache:
-        cached_user, expiry = _user_cache[cache_key]
-        if time.time() < expiry:
-            print(f"USER CACHE HIT: {email}")
-            # Merge cached user into current session to avoid DetachedInstanceError
-            return db.merge(cached_user, load=False)
-        else:
-            del _user_cache[cache_key]
-    
-    # Query database
-    user = db.query(User).filter(User.email == email).first()
-    
-    # Cache the result
-    if user:
-        _user_cache[cache_key] = (user, time.time() + _user_cache_ttl)
-    
-    return user
-
-def invalidate_user_cache(email: str):
-    """Call this when user data changes (password reset, etc.)"""
-    cache_key = f"user:{email}"
-    if cache_key in _user_cache:
-        del _user_cache[cache_key]
+    """The ORM user for an email (login, OAuth, password reset). Request auth uses snapshots instead."""
+    return db.query(User).filter(User.email == email).first()
 
-def create_user(db: Session, user_data: UserCreate) -> User:
+async def create_user(db: Session, user_data: UserCreate) -> User:
     """Create a new user in the database."""
     # Check if user already exists
     db_user = get_user(db, email=user_data.email)
@@ -106,7 +72,7 @@ def create_user(db: Session, user_data: UserCreate) -> User:
         )
     
     # Create new user with 20 free credits
-    hashed_password = get_password_hash(user_data.password)
+    hashed_password = await hash_password(user_data.password)
     db_user = User(
         email=user_data.email,
         full_name=user_data.full_name,
@@ -139,10 +105,6 @@ def create_user(db: Session, user_data: UserCreate) -> User:
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail="Failed to create user"
         )
-    user = get_user(db, email)
-    if not user or not verify_password(password, user.hashed_password):
-        return None
-    return user
 
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -> str:
     to_encode = data.copy()
@@ -154,91 +116,121 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -
     encoded_jwt = jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
     return encoded_jwt
 
-def authenticate_user(db: Session, email: str, password: str) -> Optional[User]:
+async def authenticate_user(db: Session, email: str, password: str) -> Optional[User]:
     user = get_user(db, email)
     if not user:
         return None
 
-    # Try normal verification first. If the stored hash is unknown to passlib
-    # (e.g., legacy/plaintext value), handle gracefully and attempt migration.
-    try:
-        if not verify_password(password, user.hashed_password):
-            return None
-    except UnknownHashError:
-        # Log and attempt a simple fallback: if the stored value equals the
-        # plaintext password (legacy insecure storage), re-hash and migrate it.
-        try:
-            logger.warning("Unknown password hash for user %s - attempting legacy fallback", email)
-        except Exception:
-            print(f"Unknown password hash for user {email} - attempting legacy fallback")
+    # Verification runs on the password thread pool. OAuth-only accounts
+    # (UNUSABLE_PASSWORD) never match; legacy plaintext rows are handled there.
+    valid, new_hash = await verify_password(password, user.hashed_password)
+    if not valid:
+        return None
 
-        # Fallback: if stored password equals provided plaintext, migrate it
+    if new_hash:
+        # Stored under an older hash policy (or as plaintext): upgrade it now
         try:
-            if user.hashed_password == password:
-                # Re-hash the plaintext and update the DB
-                user.hashed_password = get_password_hash(password)
-                db.add(user)
-                db.commit()
-                db.refresh(user)
-            else:
-                return None
+            user.hashed_password = new_hash
+            db.commit()
         except Exception as e:
+            db.rollback()
             try:
-                logger.exception("Failed to migrate legacy password for user %s: %s", email, str(e))
+                logger.exception("Failed to re-hash password for user %s: %s", email, str(e))
             except Exception:
-                print("Failed to migrate legacy password for user", email, str(e))
-            return None
+                print("Failed to re-hash password for user", email, str(e))
 
     return user
 
-async def get_current_user(
-    token: str = Depends(oauth2_scheme),
-    db: Session = Depends(get_db)
-) -> User:
-    credentials_exception = HTTPException(
-        status_code=status.HTTP_401_UNAUTHORIZED,
-        detail="Could not validate credentials",
-        headers={"WWW-Authenticate": "Bearer"},
+def create_user_token(user: Union[User, UserSnapshot]) -> str:
+    """Access token for a user; "uid" lets request auth skip the email lookup."""
+    return create_access_token(
+        data={"sub": user.email, "uid": user.id},
+        expires_delta=timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES),
     )
+
+def create_refresh_token(db: Session, user: User) -> str:
+    """Refresh token for a new sign-in, starting a rotation family (commits)."""
+    token = refresh_tokens.issue(db, user.id)
+    db.commit()
+    return token
+
+def _snapshot_for_token(token: str, db: Session) -> Optional[UserSnapshot]:
     try:
         payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
-        email: str = payload.get("sub")
-        if email is None:
-            raise credentials_exception
-        token_data = TokenData(email=email)
     except JWTError:
-        raise credentials_exception
-    
-    user = get_user(db, email=token_data.email)
+        return None
+    email: Optional[str] = payload.get("sub")
+    if email is None:
+        return None
+    uid = payload.get("uid")
+    if isinstance(uid, int):
+        snapshot = load_snapshot(db, user_id=uid)
+        # A stale uid (re-created account) must not authenticate someone else
+        return snapshot if snapshot is not None and snapshot.email == email else None
+    # Tokens issued before "uid" was added
+    return load_snapshot(db, email=email)
+
+async def get_current_identity(
+    token: str = Depends(oauth2_scheme),
+    db: Session = Depends(get_db)
+) -> UserSnapshot:
+    """
+    Who is calling, as a cached immutable snapshot: a JWT decode and a dict
+    lookup, no ORM. Use it for endpoints that only read the caller's
+    identity, credits or completion; get_current_user when the User row is
+    modified.
+    """
+    snapshot = _snapshot_for_token(token, db)
+    if snapshot is None:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Could not validate credentials",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+    # Lets commits on this session pin the caller's reads to the primary (see get_read_db)
+    db.info["rw_key"] = caller_key(token)
+    return snapshot
+
+async def get_current_identity_optional(
+    token: Optional[str] = Depends(oauth2_scheme_optional),
+    db: Session = Depends(get_db)
+) -> Optional[UserSnapshot]:
+    """get_current_identity for endpoints that also serve anonymous callers."""
+    if not token:
+        return None
+    snapshot = _snapshot_for_token(token, db)
+    if snapshot is not None:
+        db.info["rw_key"] = caller_key(token)
+    return snapshot
+
+async def get_current_user(
+    identity: UserSnapshot = Depends(get_current_identity),
+    db: Session = Depends(get_db)
+) -> User:
+    """The caller's User row, fresh by primary key, for endpoints that change it (credits, ...)."""
+    user = db.get(User, identity.id)
     if user is None:
-        raise credentials_exception
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Could not validate credentials",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
     return user
 
 async def get_current_user_optional(
-    token: Optional[str] = Depends(oauth2_scheme_optional),
+    identity: Optional[UserSnapshot] = Depends(get_current_identity_optional),
     db: Session = Depends(get_db)
 ) -> Optional[User]:
     """
     Get the current user if authenticated, otherwise return None.
     This allows endpoints to work with or without authentication.
     """
-    if not token:
-        return None
-    
-    try:
-        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
-        email: str = payload.get("sub")
-        if email is None:
-            return None
-        token_data = TokenData(email=email)
-    except JWTError:
+    if identity is None:
         return None
-    
-    user = get_user(db, email=token_data.email)
-    return user
+    return db.get(User, identity.id)
 
 @router.get("/me", response_model=UserResponse)
-async def read_users_me(current_user: User = Depends(get_current_user)):
+async def read_users_me(current_user: UserSnapshot = Depends(get_current_identity)):
     """
     Get the current user's profile
     """
@@ -251,16 +243,15 @@ async def signup(user_data: UserCreate, db: Session = Depends(get_db)):
     """
     try:
         # Create new user using the helper function
-        db_user = create_user(db, user_data)
+        db_user = await create_user(db, user_data)
         
-        # Create access token
-        access_token_expires = timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
-        access_token = create_access_token(
-            data={"sub": user_data.email}, expires_delta=access_token_expires
-        )
+        # Create access and refresh tokens
+        access_token = create_user_token(db_user)
+        refresh_token = create_refresh_token(db, db_user)
         
         return {
             "access_token": access_token,
+            "refresh_token": refresh_token,
             "token_type": "bearer",
             "user": {
                 "id": db_user.id,
@@ -281,6 +272,7 @@ async def signup(user_data: UserCreate, db: Session = Depends(get_db)):
 
 @router.post("/login", response_model=Token)
 async def login(
+    http_request: Request,
     form_data: OAuth2PasswordRequestForm = Depends(),
     background_tasks: BackgroundTasks = None,
     db: Session = Depends(get_db)
@@ -291,9 +283,12 @@ async def login(
     import time
     start_time = time.time()
     
+    # Before any bcrypt work
+    rate_limit.enforce(http_request, "login", form_data.username)
+    
     try:
         t1 = time.time()
-        user = authenticate_user(db, form_data.username, form_data.password)
+        user = await authenticate_user(db, form_data.username, form_data.password)
         t2 = time.time()
         print(f"TIMING AUTH: authenticate_user took {t2-t1:.3f}s")
         
@@ -311,10 +306,8 @@ async def login(
             )
         
         t3 = time.time()
-        access_token_expires = timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
-        access_token = create_access_token(
-            data={"sub": user.email}, expires_delta=access_token_expires
-        )
+        access_token = create_user_token(user)
+        refresh_token = create_refresh_token(db, user)
         t4 = time.time()
         print(f"TIMING AUTH: create_access_token took {t4-t3:.3f}s")
         
@@ -327,6 +320,7 @@ async def login(
         
         return {
             "access_token": access_token,
+            "refresh_token": refresh_token,
             "token_type": "bearer",
             "user": {
                 "id": user.id,
@@ -352,19 +346,61 @@ async def login(
             detail="An error occurred during login"
         )
 
+@router.post("/refresh", response_model=Token)
+async def refresh_access_token(request: RefreshRequest, db: Session = Depends(get_db)):
+    """
+    Exchange a refresh token for a new access token and a new refresh token.
+    The presented token is used up; presenting it again later revokes every
+    token from the same sign-in. No password check or cache warming.
+    """
+    try:
+        user_id, refresh_token = refresh_tokens.rotate(db, request.refresh_token)
+    except refresh_tokens.RefreshTokenError as e:
+        db.commit()  # keep a reuse revocation
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail=str(e),
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+
+    user = load_snapshot(db, user_id=user_id)
+    if user is None or not user.is_active:
+        db.rollback()
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Inactive or deleted user account",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+    db.commit()
+
+    return {
+        "access_token": create_user_token(user),
+        "refresh_token": refresh_token,
+        "token_type": "bearer",
+        "user": {
+            "id": user.id,
+            "email": user.email,
+            "full_name": user.full_name,
+            "is_active": user.is_active,
+            "credits": user.credits
+        }
+    }
+
+@router.post("/logout", response_model=MessageResponse)
+async def logout(request: RefreshRequest, db: Session = Depends(get_db)):
+    """
+    Revoke the refresh token (and the rest of its sign-in's chain). Access
+    tokens already issued stay valid until they expire.
+    """
+    refresh_tokens.revoke_token(db, request.refresh_token)
+    db.commit()
+    return {"message": "Signed out."}
+
 def verify_google_token(credential: str) -> dict:
     """Verify Google ID token and return user info"""
     try:
-        # Verify the token
-        idinfo = id_token.verify_oauth2_token(
-            credential, requests.Request(), GOOGLE_CLIENT_ID
-        )
-        
-        # Verify the issuer
-        if idinfo['iss'] not in ['accounts.google.com', 'https://accounts.google.com']:
-            raise ValueError('Wrong issuer.')
-            
-        return idinfo
+        # Signature, expiry, audience and issuer, against cached certificates
+        return verify_id_token(credential, GOOGLE_CLIENT_ID)
     except ValueError as e:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
@@ -458,7 +494,9 @@ async def google_auth(
     try:
         # Verify the Google token
         t1 = time.time()
-        user_info = verify_google_token(google_data.credential)
+        # Usually a local signature check, but an expired certificate cache
+        # means a blocking fetch from Google; keep that off the event loop
+        user_info = await asyncio.to_thread(verify_google_token, google_data.credential)
         t2 = time.time()
         print(f"TIMING GOOGLE: verify_google_token took {t2-t1:.3f}s")
         
@@ -478,16 +516,11 @@ async def google_auth(
         print(f"TIMING GOOGLE: get_user took {t4-t3:.3f}s")
         
         if not user:
-            # Create new user for Google OAuth
-            t5 = time.time()
-            hashed_password = get_password_hash(secrets.token_hex(32))  # Random password for OAuth users
-            t6 = time.time()
-            print(f"TIMING GOOGLE: get_password_hash took {t6-t5:.3f}s")
-            
+            # Create new user for Google OAuth (no password until they set one via reset)
             user = User(
                 email=email,
                 full_name=full_name,
-                hashed_password=hashed_password,
+                hashed_password=UNUSABLE_PASSWORD,
                 is_active=True,
                 credits=20,
             )
@@ -521,10 +554,8 @@ async def google_auth(
 
         # Create access token
         t7 = time.time()
-        access_token_expires = timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
-        access_token = create_access_token(
-            data={"sub": user.email}, expires_delta=access_token_expires
-        )
+        access_token = create_user_token(user)
+        refresh_token = create_refresh_token(db, user)
         t8 = time.time()
         print(f"TIMING GOOGLE: create_access_token took {t8-t7:.3f}s")
         
@@ -537,6 +568,7 @@ async def google_auth(
         
         return {
             "access_token": access_token,
+            "refresh_token": refresh_token,
             "token_type": "bearer",
             "user": {
                 "id": user.id,
@@ -573,12 +605,11 @@ async def github_auth(
         user = get_user(db, email)
         
         if not user:
-            # Create new user for GitHub OAuth
-            hashed_password = get_password_hash(secrets.token_hex(32))  # Random password for OAuth users
+            # Create new user for GitHub OAuth (no password until they set one via reset)
             user = User(
                 email=email,
                 full_name=full_name,
-                hashed_password=hashed_password,
+                hashed_password=UNUSABLE_PASSWORD,
                 is_active=True
             )
             
@@ -599,11 +630,9 @@ async def github_auth(
                 detail="Inactive user account"
             )
         
-        # Create access token
-        access_token_expires = timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
-        access_token = create_access_token(
-            data={"sub": user.email}, expires_delta=access_token_expires
-        )
+        # Create access and refresh tokens
+        access_token = create_user_token(user)
+        refresh_token = create_refresh_token(db, user)
         
         # Warm cache in background (non-blocking)
         if background_tasks:
@@ -611,6 +640,7 @@ async def github_auth(
         
         return {
             "access_token": access_token,
+            "refresh_token": refresh_token,
             "token_type": "bearer",
             "user": {
                 "id": user.id,
@@ -631,7 +661,7 @@ def generate_otp() -> str:
     return ''.join(random.choices(string.digits, k=6))
 
 def create_otp(db: Session, email: str, purpose: str = "password_reset") -> Optional[OTP]:
-    """Create a new OTP for the given email"""
+    """Create a new OTP for the given email (flushed; the caller commits)"""
     # Find user by email
     user = get_user(db, email)
     if not user:
@@ -659,8 +689,7 @@ def create_otp(db: Session, email: str, purpose: str = "password_reset") -> Opti
     
     try:
         db.add(otp)
-        db.commit()
-        db.refresh(otp)
+        db.flush()
         return otp
     except Exception as e:
         db.rollback()
@@ -680,23 +709,24 @@ def verify_otp(db: Session, email: str, otp_code: str, purpose: str = "password_
     return otp is not None
 
 def mark_otp_used(db: Session, email: str, otp_code: str, purpose: str = "password_reset"):
-    """Mark OTP as used"""
+    """Mark OTP as used (the caller commits)"""
     db.query(OTP).filter(
         OTP.email == email,
         OTP.otp_code == otp_code,
         OTP.purpose == purpose,
         OTP.is_used == False
     ).update({"is_used": True})
-    db.commit()
 
 @router.post("/forgot-password", response_model=MessageResponse)
 async def forgot_password(
     request: ForgotPasswordRequest,
+    http_request: Request,
     db: Session = Depends(get_db)
 ):
     """
     Send OTP to user's email for password reset
     """
+    rate_limit.enforce(http_request, "forgot_password", request.email)
     try:
         # Check if user exists
         user = get_user(db, request.email)
@@ -712,23 +742,17 @@ async def forgot_password(
                 detail="Failed to generate OTP"
             )
         
-        # Send OTP email
-        email_sent = send_otp_email(request.email, otp.otp_code, user.full_name)
-        
-        if not email_sent:
-            # If email fails, remove the OTP
-            db.delete(otp)
-            db.commit()
-            raise HTTPException(
-                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-                detail="Failed to send OTP email"
-            )
+        # Queue the OTP email and commit it together with the OTP, so neither
+        # exists without the other; the outbox sender delivers (and retries) it
+        queue_otp_email(db, request.email, otp.otp_code, user.full_name)
+        db.commit()
         
         return {"message": "OTP has been sent to your email address."}
         
     except HTTPException:
         raise
     except Exception as e:
+        db.rollback()
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail="An error occurred while processing your request"
@@ -737,11 +761,13 @@ async def forgot_password(
 @router.post("/verify-otp", response_model=MessageResponse)
 async def verify_otp_code(
     request: VerifyOTPRequest,
+    http_request: Request,
     db: Session = Depends(get_db)
 ):
     """
     Verify OTP code
     """
+    rate_limit.enforce(http_request, "verify_otp", request.email)
     try:
         # Verify OTP
         is_valid = verify_otp(db, request.email, request.otp_code, "password_reset")
@@ -765,11 +791,14 @@ async def verify_otp_code(
 @router.post("/reset-password", response_model=MessageResponse)
 async def reset_password(
     request: ResetPasswordRequest,
+    http_request: Request,
     db: Session = Depends(get_db)
 ):
     """
     Reset password using OTP
     """
+    # Also checks the OTP, so it shares verify-otp's guess budget
+    rate_limit.enforce(http_request, "verify_otp", request.email)
     try:
         # Verify OTP again for security
         is_valid = verify_otp(db, request.email, request.otp_code, "password_reset")
@@ -789,17 +818,21 @@ async def reset_password(
             )
         
         # Update password
-        hashed_password = get_password_hash(request.new_password)
+        hashed_password = await hash_password(request.new_password)
         user.hashed_password = hashed_password
         
         # Mark OTP as used
         mark_otp_used(db, request.email, request.otp_code, "password_reset")
         
-        # Commit changes
-        db.commit()
+        # Sessions signed in with the old password have to sign in again
+        refresh_tokens.revoke_user(db, user.id)
+        
+        # Queue the confirmation email
+        queue_password_reset_confirmation_email(db, request.email, user.full_name)
         
-        # Send confirmation email
-        send_password_reset_confirmation_email(request.email, user.full_name)
+        # One commit: the new password, the used OTP, the revoked sessions and
+        # the email land together or not at all
+        db.commit()
         
         return {"message": "Password has been reset successfully."}
         
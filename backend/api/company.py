@@ -2,21 +2,29 @@
 Company / Recruiter Portal API
 Manual onboarding by admin; approved companies can search talent.
 """
+import csv
+import io
+import json
 from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
 from datetime import datetime
 from typing import Optional, List, Dict, Any
 from pydantic import BaseModel
-from passlib.context import CryptContext
 
-from database import get_db
-from models import Company, JobPosting, UserProfile, User
+from database import ReadSessionLocal, caller_key, get_db, get_read_db
+from passwords import hash_password, verify_password
+from models import CandidatePerformance, Company, JobPosting, UserProfile, User
 from api.auth import create_access_token, SECRET_KEY, ALGORITHM
+from fulltext import highlight_snippets, match_condition, match_user_ids
+from job_matching import DEFAULT_TOP_K, match_candidates
+from performance import summary_to_dict
+from search_index import PROFILE_FIELDS, CandidateDoc, CandidateFilter, get_candidate_index
+from skill_vocabulary import canonicalize_skills
 from jose import JWTError, jwt
 from fastapi.security import OAuth2PasswordBearer
 
 router = APIRouter(prefix="/company", tags=["company"])
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 company_oauth = OAuth2PasswordBearer(tokenUrl="/company/login", auto_error=False)
 
 
@@ -37,6 +45,7 @@ def get_current_company(
     company = db.query(Company).filter(Company.id == company_id).first()
     if not company or not company.is_approved:
         raise HTTPException(status_code=403, detail="Company not approved")
+    db.info["rw_key"] = caller_key(token)
     return company
 
 
@@ -86,7 +95,7 @@ async def register_company(data: CompanyRegisterRequest, db: Session = Depends(g
         description=data.description,
         contact_name=data.contact_name,
         contact_email=data.contact_email,
-        hashed_password=pwd_context.hash(data.password),
+        hashed_password=await hash_password(data.password),
         is_approved=False,
     )
     db.add(company)
@@ -100,8 +109,12 @@ async def register_company(data: CompanyRegisterRequest, db: Session = Depends(g
 @router.post("/login")
 async def company_login(data: CompanyLoginRequest, db: Session = Depends(get_db)):
     company = db.query(Company).filter(Company.contact_email == data.email).first()
-    if not company or not pwd_context.verify(data.password, company.hashed_password):
+    valid, new_hash = await verify_password(data.password, company.hashed_password) if company else (False, None)
+    if not valid:
         raise HTTPException(status_code=401, detail="Invalid credentials")
+    if new_hash:
+        company.hashed_password = new_hash
+        db.commit()
     if not company.is_approved:
         raise HTTPException(status_code=403, detail="Your account is pending approval. We'll notify you via email.")
 
@@ -131,107 +144,176 @@ async def get_company_profile(current_company: Company = Depends(get_current_com
 
 @router.get("/search/candidates")
 async def search_candidates(
+    q: Optional[str] = None,
     role: Optional[str] = None,
     skills: Optional[str] = None,
+    skills_mode: str = "any",
     min_experience: Optional[float] = None,
     max_experience: Optional[float] = None,
     location: Optional[str] = None,
     limit: int = 20,
     offset: int = 0,
     current_company: Company = Depends(get_current_company),
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
 ):
-    """Search visible candidate profiles."""
-    query = db.query(UserProfile).filter(UserProfile.is_visible_to_recruiters == True)
-
-    if min_experience is not None:
-        query = query.filter(UserProfile.experience_years >= min_experience)
-    if max_experience is not None:
-        query = query.filter(UserProfile.experience_years <= max_experience)
-
-    profiles = query.offset(offset).limit(100).all()  # fetch more then filter in-app
-
-    results = []
-    for p in profiles:
-        user = db.query(User).filter(User.id == p.user_id).first()
-        if not user:
-            continue
-        if role:
-            role_lower = role.lower()
-            if not any(role_lower in r.lower() for r in (p.target_roles or [])):
-                if not (p.headline and role_lower in p.headline.lower()):
-                    continue
-        if skills:
-            wanted = {s.strip().lower() for s in skills.split(",")}
-            candidate_skills = {s.lower() for s in (p.skills or [])}
-            if not wanted.intersection(candidate_skills):
-                continue
-        if location and p.location:
-            if location.lower() not in p.location.lower():
-                continue
+    """
+    Search visible candidate profiles. `skills` is comma-separated and
+    matches any of them, or all of them with skills_mode=all. `q` is a
+    free-text query over headline, bio, work experience and resume; with it,
+    results are ordered by relevance and carry a highlighted snippet, and
+    only the best MAX_FULLTEXT_MATCHES text matches are considered:
+    `truncated` is true when more matched, making `total` a lower bound.
+    """
+    if skills_mode not in ("any", "all"):
+        raise HTTPException(status_code=400, detail="skills_mode must be 'any' or 'all'")
+
+    relevance, truncated = match_user_ids(db, q) if q and q.strip() else (None, False)
+    docs, total = get_candidate_index().search(
+        role=role,
+        skills=skills.split(",") if skills else None,
+        skills_mode=skills_mode,
+        location=location,
+        min_experience=min_experience,
+        max_experience=max_experience,
+        offset=offset,
+        limit=min(max(limit, 1), 100),
+        within=relevance,
+    )
+    snippets = highlight_snippets(db, q, [d.user_id for d in docs]) if relevance else {}
+    return {
+        "candidates": [
+            {
+                "user_id": d.user_id,
+                "full_name": d.full_name,
+                "headline": d.headline,
+                "location": d.location,
+                "experience_years": d.experience_years,
+                "skills": d.skills[:10],
+                "target_roles": d.target_roles,
+                "github_url": d.github_url,
+                "linkedin_url": d.linkedin_url,
+                "portfolio_url": d.portfolio_url,
+                **({"relevance": relevance[d.user_id], "snippet": snippets.get(d.user_id)} if relevance else {}),
+            }
+            for d in docs
+        ],
+        "total": total,
+        "truncated": truncated,
+    }
+
+
+EXPORT_FIELDS = [
+    "user_id", "full_name", "headline", "location", "experience_years", "skills",
+    "target_roles", "github_url", "linkedin_url", "portfolio_url", "profile_score",
+]
+EXPORT_BATCH_SIZE = 1000
 
-        results.append({
-            "user_id": p.user_id,
-            "full_name": user.full_name,
-            "headline": p.headline,
-            "location": p.location,
-            "experience_years": p.experience_years,
-            "skills": (p.skills or [])[:10],
-            "target_roles": p.target_roles or [],
-            "github_url": p.github_url,
-            "linkedin_url": p.linkedin_url,
-            "portfolio_url": p.portfolio_url,
-        })
-
-    # Paginate results
-    total = len(results)
-    paginated = results[offset: offset + limit]
-    return {"candidates": paginated, "total": total}
+
+def _export_candidates(match: CandidateFilter, q: Optional[str], fmt: str):
+    """
+    Stream every matching visible candidate. Opens its own session because
+    the request's session is closed before the body finishes streaming, and
+    reads through a server-side cursor so memory stays flat. A full-text `q`
+    is applied in the same query, uncapped, unlike the ranked search.
+    """
+    db = ReadSessionLocal()
+    try:
+        query = (
+            db.query(*[getattr(UserProfile, f) for f in PROFILE_FIELDS], User.full_name)
+            .join(User, User.id == UserProfile.user_id)
+            .filter(UserProfile.is_visible_to_recruiters == True)
+        )
+        if match.min_experience != float("-inf"):
+            query = query.filter(UserProfile.experience_years >= match.min_experience)
+        if match.max_experience != float("inf"):
+            query = query.filter(UserProfile.experience_years <= match.max_experience)
+        if q:
+            query = query.filter(match_condition(db, q))
+
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        if fmt == "csv":
+            writer.writerow(EXPORT_FIELDS)
+
+        for row in query.order_by(UserProfile.user_id).yield_per(EXPORT_BATCH_SIZE):
+            doc = CandidateDoc(dict(zip(PROFILE_FIELDS, row)), row[-1])
+            if not match(doc):
+                continue
+            record = {field: getattr(doc, field) for field in EXPORT_FIELDS}
+            if fmt == "csv":
+                writer.writerow([
+                    "; ".join(v) if isinstance(v, list) else ("" if v is None else v)
+                    for v in record.values()
+                ])
+            else:
+                buffer.write(json.dumps(record) + "\n")
+            if buffer.tell() >= 64 * 1024:
+                yield buffer.getvalue()
+                buffer.seek(0)
+                buffer.truncate()
+        yield buffer.getvalue()
+    finally:
+        db.close()
+
+
+@router.get("/search/candidates/export")
+async def export_candidates(
+    format: str = "ndjson",
+    q: Optional[str] = None,
+    role: Optional[str] = None,
+    skills: Optional[str] = None,
+    skills_mode: str = "any",
+    min_experience: Optional[float] = None,
+    max_experience: Optional[float] = None,
+    location: Optional[str] = None,
+    current_company: Company = Depends(get_current_company),
+):
+    """Download every candidate matching the search filters as NDJSON or CSV."""
+    if format not in ("ndjson", "csv"):
+        raise HTTPException(status_code=400, detail="format must be 'ndjson' or 'csv'")
+    if skills_mode not in ("any", "all"):
+        raise HTTPException(status_code=400, detail="skills_mode must be 'any' or 'all'")
+
+    match = CandidateFilter(
+        role=role,
+        skills=skills.split(",") if skills else None,
+        skills_mode=skills_mode,
+        location=location,
+        min_experience=min_experience,
+        max_experience=max_experience,
+    )
+    media_type = "text/csv" if format == "csv" else "application/x-ndjson"
+    return StreamingResponse(
+        _export_candidates(match, q if q and q.strip() else None, format),
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="candidates.{format}"'},
+    )
 
 
 @router.get("/candidate/{user_id}")
 async def get_candidate_detail(
     user_id: int,
     current_company: Company = Depends(get_current_company),
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
 ):
-    profile = db.query(UserProfile).filter(
-        UserProfile.user_id == user_id,
-        UserProfile.is_visible_to_recruiters == True,
-    ).first()
-    if not profile:
-        raise HTTPException(status_code=404, detail="Candidate not found or profile is private")
-
-    user = db.query(User).filter(User.id == user_id).first()
-
-    # Fetch recent interview performance (aggregate scores)
-    from models import InterviewSession
-    sessions = (
-        db.query(InterviewSession)
-        .filter(InterviewSession.user_id == user_id, InterviewSession.status == "completed")
-        .order_by(InterviewSession.completed_at.desc())
-        .limit(10)
-        .all()
+    # Profile, name and performance summary in one primary-key/unique-index read
+    row = (
+        db.query(UserProfile, User.full_name, CandidatePerformance)
+        .join(User, User.id == UserProfile.user_id)
+        .outerjoin(CandidatePerformance, CandidatePerformance.user_id == UserProfile.user_id)
+        .filter(
+            UserProfile.user_id == user_id,
+            UserProfile.is_visible_to_recruiters == True,
+        )
+        .first()
     )
-
-    interview_summary = []
-    for s in sessions:
-        interview_summary.append({
-            "role": s.role,
-            "plan_type": s.plan_type,
-            "average_score": s.average_score,
-            "score_technical": s.score_technical,
-            "score_communication": s.score_communication,
-            "score_leadership": s.score_leadership,
-            "score_critical_thinking": s.score_critical_thinking,
-            "score_decision_making": s.score_decision_making,
-            "score_project_knowledge": s.score_project_knowledge,
-            "completed_at": s.completed_at.isoformat() if s.completed_at else None,
-        })
+    if not row:
+        raise HTTPException(status_code=404, detail="Candidate not found or profile is private")
+    profile, full_name, performance = row
 
     return {
         "user_id": user_id,
-        "full_name": user.full_name,
+        "full_name": full_name,
         "headline": profile.headline,
         "bio": profile.bio,
         "location": profile.location,
@@ -244,7 +326,9 @@ async def get_candidate_detail(
         "linkedin_url": profile.linkedin_url,
         "github_url": profile.github_url,
         "portfolio_url": profile.portfolio_url,
-        "interview_performance": interview_summary,
+        # Most recent completed interviews, newest first
+        "interview_performance": performance.recent_sessions if performance else [],
+        "performance_summary": summary_to_dict(performance),
     }
 
 
@@ -256,11 +340,13 @@ async def create_job(
     current_company: Company = Depends(get_current_company),
     db: Session = Depends(get_db),
 ):
+    required_skills, required_skill_ids = canonicalize_skills(data.required_skills or [])
     job = JobPosting(
         company_id=current_company.id,
         title=data.title,
         description=data.description,
-        required_skills=data.required_skills or [],
+        required_skills=required_skills,
+        required_skill_ids=required_skill_ids,
         experience_min=data.experience_min,
         experience_max=data.experience_max,
         location=data.location,
@@ -275,7 +361,7 @@ async def create_job(
 @router.get("/jobs")
 async def list_jobs(
     current_company: Company = Depends(get_current_company),
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
 ):
     jobs = db.query(JobPosting).filter(JobPosting.company_id == current_company.id).all()
     return {"jobs": [
@@ -292,3 +378,25 @@ async def list_jobs(
         }
         for j in jobs
     ]}
+
+
+@router.get("/jobs/{job_id}/matches")
+async def get_job_matches(
+    job_id: int,
+    limit: int = DEFAULT_TOP_K,
+    current_company: Company = Depends(get_current_company),
+    db: Session = Depends(get_read_db),
+):
+    """Best-matching visible candidates for one of the company's postings."""
+    job = db.query(JobPosting).filter(
+        JobPosting.id == job_id,
+        JobPosting.company_id == current_company.id,
+    ).first()
+    if not job:
+        raise HTTPException(status_code=404, detail="Job posting not found")
+
+    return {
+        "job_id": job.id,
+        "title": job.title,
+        "matches": match_candidates(job, db, top_k=limit),
+    }
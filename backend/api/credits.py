@@ -4,7 +4,7 @@ Manage user credits: view balance, purchase packages, view transaction history.
 """
 from fastapi import APIRouter, Depends, HTTPException
 from sqlalchemy.orm import Session
-from typing import Dict, Any, List
+from typing import Dict, Any, List, Optional
 from datetime import datetime
 
 import os
@@ -12,9 +12,11 @@ import razorpay
 import hmac
 import hashlib
 
-from database import get_db
+from database import get_db, get_read_db
 from models import User, CreditTransaction, Payment
-from api.auth import get_current_user
+from api.auth import get_current_user, get_current_identity
+from user_snapshot import UserSnapshot
+from pagination import paginate_desc
 
 _rz_key = os.getenv("RAZORPAY_KEY_ID")
 _rz_secret = os.getenv("RAZORPAY_KEY_SECRET")
@@ -75,7 +77,7 @@ CREDIT_PACKAGES = {
 
 
 @router.get("/balance")
-async def get_balance(current_user: User = Depends(get_current_user)):
+async def get_balance(current_user: UserSnapshot = Depends(get_current_identity)):
     return {
         "credits": current_user.credits,
         "user_id": current_user.id,
@@ -90,7 +92,7 @@ async def get_packages():
 @router.post("/create-order")
 async def create_credit_order(
     data: Dict[str, str],
-    current_user: User = Depends(get_current_user),
+    current_user: UserSnapshot = Depends(get_current_identity),
     db: Session = Depends(get_db),
 ):
     package_type = data.get("package_type")
@@ -178,16 +180,13 @@ async def verify_credit_payment(
 
 @router.get("/transactions")
 async def get_transactions(
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db),
+    cursor: Optional[str] = None,
+    limit: int = 50,
+    current_user: UserSnapshot = Depends(get_current_identity),
+    db: Session = Depends(get_read_db),
 ):
-    txns = (
-        db.query(CreditTransaction)
-        .filter(CreditTransaction.user_id == current_user.id)
-        .order_by(CreditTransaction.created_at.desc())
-        .limit(50)
-        .all()
-    )
+    query = db.query(CreditTransaction).filter(CreditTransaction.user_id == current_user.id)
+    txns, next_cursor = paginate_desc(query, CreditTransaction, cursor, limit)
     return {
         "transactions": [
             {
@@ -199,5 +198,6 @@ async def get_transactions(
                 "created_at": t.created_at.isoformat(),
             }
             for t in txns
-        ]
+        ],
+        "next_cursor": next_cursor,
     }
@@ -2,23 +2,28 @@
 Interview API - Adaptive, conversational interview sessions.
 """
 import uuid
-from fastapi import APIRouter, File, UploadFile, HTTPException, Depends
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, File, UploadFile, HTTPException, Depends, Request, Response
+from sqlalchemy import func
+from sqlalchemy.orm import Session, load_only
 from datetime import datetime
-from typing import Dict, Any, Optional
+from typing import Dict, Any, Optional, Set
 from pydantic import BaseModel
 
 from models import (
     InterviewSession, ChatMessage, User, CreditTransaction, BestAnswer,
     InterviewStartRequest, AnswerSubmissionRequest,
 )
-from database import get_db
+from database import get_db, get_read_db, release_connection
 from common import extract_resume_text
+from http_cache import not_modified, parse_fields, set_validators, weak_etag
+from pagination import paginate_desc, DEFAULT_PAGE_SIZE
+from performance import record_completed_session
 from adaptive_interview import (
     get_next_interviewer_action, evaluate_interview,
     get_interview_cost, PLAN_MODELS, get_llm,
 )
-from api.auth import get_current_user, get_current_user_optional
+from api.auth import get_current_user, get_current_identity, get_current_identity_optional
+from user_snapshot import UserSnapshot
 from api.profile import get_completion_pct, record_interview_activity
 
 MAX_UPLOAD_BYTES = 10 * 1024 * 1024  # 10 MB
@@ -45,25 +50,34 @@ def _deduct_credits(user: User, cost: int, db: Session, description: str):
     db.add(txn)
 
 
-def _session_to_dict(session: InterviewSession) -> dict:
+# Response field -> (InterviewSession columns it reads, getter); also drives
+# load_only() for ?fields= on GET /session/{thread_id}.
+SESSION_FIELDS = {
+    "thread_id": (("thread_id",), lambda s: s.thread_id),
+    "session_id": (("id",), lambda s: s.id),
+    "role": (("role",), lambda s: s.role),
+    "status": (("status",), lambda s: s.status),
+    "plan_type": (("plan_type",), lambda s: s.plan_type),
+    "credits_used": (("credits_used",), lambda s: s.credits_used or 0),
+    "total_score": (("total_score",), lambda s: s.total_score),
+    "average_score": (("average_score",), lambda s: s.average_score),
+    "is_pinned": (("is_pinned",), lambda s: s.is_pinned),
+    "created_at": (("created_at",), lambda s: s.created_at.isoformat()),
+    "completed_at": (("completed_at",), lambda s: s.completed_at.isoformat() if s.completed_at else None),
+    "score_technical": (("score_technical",), lambda s: s.score_technical),
+    "score_communication": (("score_communication",), lambda s: s.score_communication),
+    "score_leadership": (("score_leadership",), lambda s: s.score_leadership),
+    "score_critical_thinking": (("score_critical_thinking",), lambda s: s.score_critical_thinking),
+    "score_decision_making": (("score_decision_making",), lambda s: s.score_decision_making),
+    "score_project_knowledge": (("score_project_knowledge",), lambda s: s.score_project_knowledge),
+}
+
+
+def _session_to_dict(session: InterviewSession, fields: Optional[Set[str]] = None) -> dict:
     return {
-        "thread_id": session.thread_id,
-        "session_id": session.id,
-        "role": session.role,
-        "status": session.status,
-        "plan_type": session.plan_type,
-        "credits_used": session.credits_used or 0,
-        "total_score": session.total_score,
-        "average_score": session.average_score,
-        "is_pinned": session.is_pinned,
-        "created_at": session.created_at.isoformat(),
-        "completed_at": session.completed_at.isoformat() if session.completed_at else None,
-        "score_technical": session.score_technical,
-        "score_communication": session.score_communication,
-        "score_leadership": session.score_leadership,
-        "score_critical_thinking": session.score_critical_thinking,
-        "score_decision_making": session.score_decision_making,
-        "score_project_knowledge": session.score_project_knowledge,
+        name: get(session)
+        for name, (_, get) in SESSION_FIELDS.items()
+        if fields is None or name in fields
     }
 
 
@@ -91,7 +105,7 @@ async def upload_resume(file: UploadFile = File(...)):
 async def start_interview(
     data: InterviewStartRequest,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user_optional),
+    current_user: Optional[UserSnapshot] = Depends(get_current_identity_optional),
 ):
     plan_type = data.plan_type or "normal"
     if plan_type not in PLAN_MODELS:
@@ -99,7 +113,7 @@ async def start_interview(
 
     # Gate on profile completion (60% threshold) — only enforced for logged-in users
     if current_user:
-        completion = get_completion_pct(current_user, db)
+        completion = get_completion_pct(current_user)
         if completion < 60:
             raise HTTPException(
                 status_code=403,
@@ -119,20 +133,10 @@ async def start_interview(
             detail=f"Insufficient credits. Need at least {lo} for a {plan_type} interview. Top up your credits.",
         )
 
-    thread_id = str(uuid.uuid4())
+    user_id = current_user.id if current_user else None
 
-    session = InterviewSession(
-        user_id=current_user.id if current_user else None,
-        thread_id=thread_id,
-        role=data.role,
-        resume_text=data.resume_text,
-        job_description=data.job_description,
-        plan_type=plan_type,
-        status="active",
-    )
-    db.add(session)
-    db.commit()
-    db.refresh(session)
+    # Don't pin a pooled connection while waiting on the model
+    release_connection(db)
 
     # Get the first interviewer message
     action = get_next_interviewer_action(
@@ -145,8 +149,23 @@ async def start_interview(
         follow_up_count=0,
     )
 
+    thread_id = str(uuid.uuid4())
+
+    session = InterviewSession(
+        user_id=user_id,
+        thread_id=thread_id,
+        role=data.role,
+        resume_text=data.resume_text,
+        job_description=data.job_description,
+        plan_type=plan_type,
+        status="active",
+    )
+    db.add(session)
+    db.flush()
+    session_id = session.id
+
     msg = ChatMessage(
-        session_id=session.id,
+        session_id=session_id,
         thread_id=thread_id,
         message_type="question",
         role="assistant",
@@ -158,7 +177,7 @@ async def start_interview(
 
     return {
         "thread_id": thread_id,
-        "session_id": session.id,
+        "session_id": session_id,
         "message": action.message,
         "status": "active",
         "plan_type": plan_type,
@@ -171,7 +190,7 @@ async def start_interview(
 async def submit_answer(
     data: AnswerSubmissionRequest,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user_optional),
+    current_user: Optional[UserSnapshot] = Depends(get_current_identity_optional),
 ):
     session = db.query(InterviewSession).filter(
         InterviewSession.thread_id == data.thread_id
@@ -189,6 +208,7 @@ async def submit_answer(
         .all()
     )
     conversation = [{"role": m.role, "content": m.content} for m in messages_db]
+    last_message_id = messages_db[-1].id if messages_db else None
 
     # Count questions and recent follow-ups
     question_count = sum(1 for m in messages_db if m.message_type == "question")
@@ -199,35 +219,76 @@ async def submit_answer(
         if m.message_type == "follow_up":
             recent_follow_ups += 1
 
-    # Save candidate answer
-    answer_msg = ChatMessage(
-        session_id=session.id,
-        thread_id=data.thread_id,
-        message_type="answer",
-        role="user",
-        content=data.answer,
-    )
-    db.add(answer_msg)
-    db.flush()
+    # Everything the model calls need, copied out so the connection can go
+    session_id = session.id
+    role = session.role
+    resume_text = session.resume_text or ""
+    job_description = session.job_description
+    plan_type = session.plan_type
+    user_id = current_user.id if current_user else None
+    release_connection(db)
 
     conversation.append({"role": "user", "content": data.answer})
 
     # Decide next action
     action = get_next_interviewer_action(
-        role=session.role,
-        resume_text=session.resume_text or "",
-        job_description=session.job_description,
+        role=role,
+        resume_text=resume_text,
+        job_description=job_description,
         conversation=conversation,
-        plan_type=session.plan_type,
+        plan_type=plan_type,
         question_count=question_count,
         follow_up_count=recent_follow_ups,
     )
 
+    scores = None
     if action.action == "wrap_up":
         conversation.append({"role": "assistant", "content": action.message})
 
+        # Evaluate the full interview
+        scores = evaluate_interview(
+            role=role,
+            resume_text=resume_text,
+            conversation=conversation,
+            plan_type=plan_type,
+        )
+
+    # Back on the database: re-load and write everything in one transaction.
+    # The row lock serializes concurrent submits for this interview, whatever
+    # the action: the later one waits here, then finds the interview completed
+    # or the conversation moved past the question it answered, and is refused
+    # instead of appending a second answer (or charging twice).
+    session = (
+        db.query(InterviewSession)
+        .filter(InterviewSession.id == session_id)
+        .with_for_update()
+        .first()
+    )
+    if session is None:
+        raise HTTPException(status_code=404, detail="Session not found")
+    if session.status != "active":
+        raise HTTPException(status_code=409, detail="Interview was completed by another request")
+    latest_message_id = (
+        db.query(func.max(ChatMessage.id))
+        .filter(ChatMessage.thread_id == data.thread_id)
+        .scalar()
+    )
+    if latest_message_id != last_message_id:
+        raise HTTPException(status_code=409, detail="This question was already answered by another request")
+
+    # Save candidate answer
+    answer_msg = ChatMessage(
+        session_id=session_id,
+        thread_id=data.thread_id,
+        message_type="answer",
+        role="user",
+        content=data.answer,
+    )
+    db.add(answer_msg)
+
+    if action.action == "wrap_up":
         closing_msg = ChatMessage(
-            session_id=session.id,
+            session_id=session_id,
             thread_id=data.thread_id,
             message_type="system",
             role="assistant",
@@ -235,25 +296,18 @@ async def submit_answer(
         )
         db.add(closing_msg)
 
-        # Evaluate the full interview
-        scores = evaluate_interview(
-            role=session.role,
-            resume_text=session.resume_text or "",
-            conversation=conversation,
-            plan_type=session.plan_type,
-        )
-
         overall = scores.overall
-        cost = get_interview_cost(session.plan_type)
+        cost = get_interview_cost(plan_type)
 
-        if current_user:
+        user = db.get(User, user_id) if user_id else None
+        if user:
             _deduct_credits(
-                current_user, cost, db,
-                f"{session.plan_type.title()} interview – {session.role}",
+                user, cost, db,
+                f"{plan_type.title()} interview – {role}",
             )
 
         roadmap_msg = ChatMessage(
-            session_id=session.id,
+            session_id=session_id,
             thread_id=data.thread_id,
             message_type="roadmap",
             role="assistant",
@@ -273,12 +327,19 @@ async def submit_answer(
         session.score_decision_making = scores.decision_making
         session.score_project_knowledge = scores.project_knowledge
 
+        # Recruiter-facing summary; a failure here must not lose the interview
+        try:
+            with db.begin_nested():
+                record_completed_session(session, db)
+        except Exception as e:
+            print(f"Performance summary update failed for session {session_id}: {e}")
+
         db.commit()
 
         # Update daily activity + streak
-        if current_user:
+        if user:
             try:
-                record_interview_activity(current_user, db)
+                record_interview_activity(user, db)
             except Exception:
                 # Never fail interview completion on activity tracking errors
                 db.rollback()
@@ -286,7 +347,7 @@ async def submit_answer(
         return {
             "action": "completed",
             "message": action.message,
-            "session_id": session.id,
+            "session_id": session_id,
             "scores": {
                 "technical": scores.technical,
                 "communication": scores.communication,
@@ -301,13 +362,13 @@ async def submit_answer(
             "feedback": scores.detailed_feedback,
             "roadmap": scores.roadmap,
             "credits_used": cost,
-            "credits_remaining": current_user.credits if current_user else None,
+            "credits_remaining": user.credits if user else None,
         }
 
     # Interview continues
     msg_type = "follow_up" if action.action == "ask_followup" else "question"
     next_msg = ChatMessage(
-        session_id=session.id,
+        session_id=session_id,
         thread_id=data.thread_id,
         message_type=msg_type,
         role="assistant",
@@ -330,29 +391,58 @@ async def submit_answer(
 @router.get("/session/{thread_id}")
 async def get_session(
     thread_id: str,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user_optional),
+    request: Request,
+    response: Response,
+    fields: Optional[str] = None,
+    db: Session = Depends(get_read_db),
+    current_user: Optional[UserSnapshot] = Depends(get_current_identity_optional),
 ):
-    session = db.query(InterviewSession).filter(
-        InterviewSession.thread_id == thread_id
-    ).first()
-    if not session:
+    """`fields=a,b` returns only those keys ("messages" included); supports If-None-Match."""
+    fields = parse_fields(fields, [*SESSION_FIELDS, "messages"])
+    with_messages = fields is None or "messages" in fields
+
+    # Validators: messages are appended without touching the session row, so
+    # their count and last id go into the ETag next to updated_at.
+    head = (
+        db.query(InterviewSession.updated_at)
+        .filter(InterviewSession.thread_id == thread_id)
+        .first()
+    )
+    if not head:
         raise HTTPException(status_code=404, detail="Session not found")
-
-    messages = (
-        db.query(ChatMessage)
+    message_state = (
+        db.query(func.count(ChatMessage.id), func.max(ChatMessage.id))
         .filter(ChatMessage.thread_id == thread_id)
-        .order_by(ChatMessage.id)
-        .all()
+        .one()
+        if with_messages else None
     )
-
-    return {
-        **_session_to_dict(session),
-        "messages": [
+    etag = weak_etag(thread_id, head.updated_at, message_state, fields=fields)
+    cached = not_modified(request, etag)
+    if cached:
+        return cached
+    set_validators(response, etag)
+
+    result = {}
+    session_fields = None if fields is None else fields - {"messages"}
+    if session_fields is None or session_fields:
+        query = db.query(InterviewSession).filter(InterviewSession.thread_id == thread_id)
+        if session_fields is not None:
+            columns = {c for name in session_fields for c in SESSION_FIELDS[name][0]}
+            query = query.options(load_only(*(getattr(InterviewSession, c) for c in sorted(columns))))
+        result.update(_session_to_dict(query.first(), session_fields))
+
+    if with_messages:
+        messages = (
+            db.query(ChatMessage.role, ChatMessage.content, ChatMessage.message_type, ChatMessage.question_number)
+            .filter(ChatMessage.thread_id == thread_id)
+            .order_by(ChatMessage.id)
+            .all()
+        )
+        result["messages"] = [
             {"role": m.role, "content": m.content, "type": m.message_type, "question_number": m.question_number}
             for m in messages
-        ],
-    }
+        ]
+    return result
 
 
 BEST_ANSWER_COST = 2  # credits per generation
@@ -422,8 +512,8 @@ async def get_best_answer(
 @router.get("/session/{session_id}/best-answers")
 async def get_session_best_answers(
     session_id: int,
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db),
+    current_user: UserSnapshot = Depends(get_current_identity),
+    db: Session = Depends(get_read_db),
 ):
     rows = db.query(BestAnswer).filter(BestAnswer.session_id == session_id).all()
     return {str(r.question_number): r.best_answer_text for r in rows}
@@ -432,8 +522,8 @@ async def get_session_best_answers(
 @router.get("/session/{session_id}/chat")
 async def get_session_chat(
     session_id: int,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user_optional),
+    db: Session = Depends(get_read_db),
+    current_user: Optional[UserSnapshot] = Depends(get_current_identity_optional),
 ):
     session = db.query(InterviewSession).filter(InterviewSession.id == session_id).first()
     if not session:
@@ -458,22 +548,23 @@ async def get_session_chat(
 
 @router.get("/sessions")
 async def get_sessions(
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db),
+    cursor: Optional[str] = None,
+    limit: int = DEFAULT_PAGE_SIZE,
+    current_user: UserSnapshot = Depends(get_current_identity),
+    db: Session = Depends(get_read_db),
 ):
-    sessions = (
-        db.query(InterviewSession)
-        .filter(InterviewSession.user_id == current_user.id)
-        .order_by(InterviewSession.created_at.desc())
-        .all()
-    )
-    return {"sessions": [_session_to_dict(s) for s in sessions]}
+    query = db.query(InterviewSession).filter(InterviewSession.user_id == current_user.id)
+    sessions, next_cursor = paginate_desc(query, InterviewSession, cursor, limit)
+    return {
+        "sessions": [_session_to_dict(s) for s in sessions],
+        "next_cursor": next_cursor,
+    }
 
 
 @router.get("/analytics")
 async def get_analytics(
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db),
+    current_user: UserSnapshot = Depends(get_current_identity),
+    db: Session = Depends(get_read_db),
 ):
     sessions = (
         db.query(InterviewSession)
@@ -500,10 +591,78 @@ async def get_analytics(
     }
 
 
+SCORE_DIMENSIONS = (
+    "score_technical", "score_communication", "score_leadership",
+    "score_critical_thinking", "score_decision_making", "score_project_knowledge",
+)
+SUMMARY_RECENT = 12     # trend line, sparklines and last-3-vs-previous-3 deltas
+SUMMARY_BASELINE = 3    # "vs start" compares the first 3 scored sessions to the last 3
+
+
+@router.get("/summary")
+async def get_summary(
+    current_user: UserSnapshot = Depends(get_current_identity),
+    db: Session = Depends(get_read_db),
+):
+    """
+    Dashboard aggregates over the whole history, computed in SQL so the
+    client never has to page through every session to draw the dashboard.
+    """
+    mine = InterviewSession.user_id == current_user.id
+    scored = (mine, InterviewSession.status == "completed", InterviewSession.average_score > 0)
+
+    total, completed = db.query(
+        func.count(InterviewSession.id),
+        func.count(InterviewSession.id).filter(InterviewSession.status == "completed"),
+    ).filter(mine).one()
+
+    # AVG skips NULLs, so a dimension averages only the sessions that scored it.
+    row = db.query(
+        func.count(InterviewSession.id),
+        func.avg(InterviewSession.average_score),
+        func.max(InterviewSession.average_score),
+        *(func.avg(getattr(InterviewSession, key)) for key in SCORE_DIMENSIONS),
+    ).filter(*scored).one()
+    scored_count, average, best, *dimension_avgs = row
+
+    baseline = (
+        db.query(InterviewSession.average_score)
+        .filter(*scored)
+        .order_by(InterviewSession.created_at, InterviewSession.id)
+        .limit(SUMMARY_BASELINE)
+        .all()
+    )
+    recent = (
+        db.query(InterviewSession)
+        .filter(*scored)
+        .order_by(InterviewSession.created_at.desc(), InterviewSession.id.desc())
+        .limit(SUMMARY_RECENT)
+        .all()
+    )
+
+    return {
+        "total_sessions": total,
+        "completed_sessions": completed,
+        "scored_sessions": scored_count,
+        "average_score": round(average, 2) if average is not None else 0,
+        "best_score": best or 0,
+        "dimension_averages": {
+            key: round(value, 2) if value is not None else None
+            for key, value in zip(SCORE_DIMENSIONS, dimension_avgs)
+        },
+        "baseline_score": (
+            sum(score for (score,) in baseline) / len(baseline)
+            if len(baseline) == SUMMARY_BASELINE else None
+        ),
+        # Oldest first, as the trend line draws them
+        "recent": [_session_to_dict(s) for s in reversed(recent)],
+    }
+
+
 @router.post("/pin/{session_id}")
 async def toggle_pin(
     session_id: int,
-    current_user: User = Depends(get_current_user),
+    current_user: UserSnapshot = Depends(get_current_identity),
     db: Session = Depends(get_db),
 ):
     session = db.query(InterviewSession).filter(
@@ -520,7 +679,7 @@ async def toggle_pin(
 @router.delete("/session/{session_id}")
 async def delete_session(
     session_id: int,
-    current_user: User = Depends(get_current_user),
+    current_user: UserSnapshot = Depends(get_current_identity),
     db: Session = Depends(get_db),
 ):
     session = db.query(InterviewSession).filter(
@@ -537,7 +696,7 @@ async def delete_session(
 
 
 @router.get("/leaderboard")
-async def get_leaderboard(db: Session = Depends(get_db)):
+async def get_leaderboard(db: Session = Depends(get_read_db)):
     sessions = (
         db.query(InterviewSession)
         .filter(InterviewSession.status == "completed")
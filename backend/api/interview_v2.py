@@ -13,7 +13,8 @@ from models import (
     InterviewStartRequest, AnswerSubmissionRequest,
     ChatHistoryResponse, InterviewSessionResponse
 )
-from api.auth import get_current_user
+from api.auth import get_current_identity
+from user_snapshot import UserSnapshot
 from state_manager import interview_manager
 
 router = APIRouter(prefix="/interview/v2", tags=["interview-v2"])
@@ -21,7 +22,7 @@ router = APIRouter(prefix="/interview/v2", tags=["interview-v2"])
 @router.post("/start", response_model=Dict[str, Any])
 async def start_interview_session(
     request: InterviewStartRequest,
-    current_user: User = Depends(get_current_user),
+    current_user: UserSnapshot = Depends(get_current_identity),
     db: Session = Depends(get_db)
 ):
     """
@@ -55,7 +56,7 @@ async def start_interview_session(
 @router.post("/submit-answer", response_model=Dict[str, Any])
 async def submit_answer(
     request: AnswerSubmissionRequest,
-    current_user: User = Depends(get_current_user),
+    current_user: UserSnapshot = Depends(get_current_identity),
     db: Session = Depends(get_db)
 ):
     """
@@ -106,7 +107,7 @@ async def submit_answer(
 @router.get("/chat-history/{thread_id}")
 async def get_chat_history(
     thread_id: str,
-    current_user: User = Depends(get_current_user),
+    current_user: UserSnapshot = Depends(get_current_identity),
     db: Session = Depends(get_db)
 ):
     """
@@ -143,7 +144,7 @@ async def get_chat_history(
 
 @router.get("/sessions")
 async def get_user_interview_sessions(
-    current_user: User = Depends(get_current_user),
+    current_user: UserSnapshot = Depends(get_current_identity),
     db: Session = Depends(get_db)
 ):
     """
@@ -168,7 +169,7 @@ async def get_user_interview_sessions(
 @router.get("/session/{thread_id}/status")
 async def get_session_status(
     thread_id: str,
-    current_user: User = Depends(get_current_user),
+    current_user: UserSnapshot = Depends(get_current_identity),
     db: Session = Depends(get_db)
 ):
     """
@@ -228,7 +229,7 @@ async def get_session_status(
 @router.delete("/session/{thread_id}")
 async def delete_interview_session(
     thread_id: str,
-    current_user: User = Depends(get_current_user),
+    current_user: UserSnapshot = Depends(get_current_identity),
     db: Session = Depends(get_db)
 ):
     """
@@ -272,7 +273,7 @@ async def delete_interview_session(
 
 @router.get("/analytics")
 async def get_user_analytics(
-    current_user: User = Depends(get_current_user),
+    current_user: UserSnapshot = Depends(get_current_identity),
     db: Session = Depends(get_db)
 ):
     """
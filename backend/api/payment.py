@@ -7,7 +7,8 @@ from typing import Dict, Any
 
 from database import get_db
 from models import User, Payment
-from api.auth import get_current_user
+from api.auth import get_current_identity
+from user_snapshot import UserSnapshot
 from api.credits import CREDIT_PACKAGES
 
 router = APIRouter(prefix="/payment", tags=["payment"])
@@ -49,7 +50,7 @@ async def get_pricing_plans():
 
 @router.get("/history")
 async def get_payment_history(
-    current_user: User = Depends(get_current_user),
+    current_user: UserSnapshot = Depends(get_current_identity),
     db: Session = Depends(get_db),
 ):
     payments = (
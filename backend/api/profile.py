@@ -2,20 +2,31 @@
 Profile API
 Candidate LinkedIn-style profile CRUD plus AI-driven profile scoring.
 """
+import asyncio
+import hashlib
 import json
 import re
 from datetime import datetime, date, timedelta
-from typing import Optional, List, Dict, Any
+from typing import Optional, List, Dict, Any, Set
 
-import requests
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, HTTPException, Request, Response
+from fastapi.responses import StreamingResponse
+from sqlalchemy import update
+from sqlalchemy.orm import Session, load_only
 from pydantic import BaseModel
 
-from database import get_db
+import github_client
+import resume_heuristics
+from database import SessionLocal, get_db, get_read_db, release_connection
+from activity import HEATMAP_DAYS, MAX_RANGE_DAYS, activity_between, current_streak, record_activity, recent_activity
 from models import User, UserProfile, CreditTransaction
-from api.auth import get_current_user, get_current_user_optional
+from api.auth import get_current_user, get_current_identity, get_current_identity_optional
+from user_snapshot import UserSnapshot, user_changed
 from adaptive_interview import get_llm
+from http_cache import not_modified, parse_fields, select_fields, set_validators, weak_etag
+from profile_completion import compute_completion
+from search_index import get_candidate_index
+from skill_vocabulary import canonicalize_skills, profile_skill_ids
 
 router = APIRouter(prefix="/profile", tags=["profile"])
 
@@ -43,81 +54,97 @@ class ProfileUpdateRequest(BaseModel):
 
 # ── Helpers ───────────────────────────────────────────────────────────────
 
-def _profile_to_dict(profile: UserProfile, user: User) -> dict:
+def _column(name: str, default: Any = None):
+    return (name,), lambda p, u, a: default if getattr(p, name) is None else getattr(p, name)
+
+
+def _list_column(name: str):
+    return (name,), lambda p, u, a: getattr(p, name) or []
+
+
+def _iso_column(name: str):
+    return (name,), lambda p, u, a: getattr(p, name).isoformat() if getattr(p, name) else None
+
+
+# Response field -> (UserProfile columns it reads, getter(profile, user, activity)).
+# Drives both the response shape and load_only() for ?fields= projections.
+PROFILE_FIELDS = {
+    "user_id": ((), lambda p, u, a: p.user_id),
+    "full_name": ((), lambda p, u, a: u.full_name),
+    "email": ((), lambda p, u, a: u.email),
+    "credits": ((), lambda p, u, a: u.credits or 0),
+    "headline": _column("headline"),
+    "bio": _column("bio"),
+    "location": _column("location"),
+    "avatar_url": _column("avatar_url"),
+    "target_roles": _list_column("target_roles"),
+    "experience_years": _column("experience_years"),
+    "skills": _list_column("skills"),
+    "work_experience": _list_column("work_experience"),
+    "education": _list_column("education"),
+    "projects": _list_column("projects"),
+    "linkedin_url": _column("linkedin_url"),
+    "github_url": _column("github_url"),
+    "portfolio_url": _column("portfolio_url"),
+    "resume_text": _column("resume_text"),
+    "resume_filename": _column("resume_filename"),
+    "resume_uploaded_at": _iso_column("resume_uploaded_at"),
+    "is_visible_to_recruiters": _column("is_visible_to_recruiters"),
+    "resume_score": _column("resume_score"),
+    "linkedin_score": _column("linkedin_score"),
+    "github_score": _column("github_score"),
+    "profile_score": _column("profile_score"),
+    "profile_completion": _column("profile_completion", 0),
+    "resume_score_breakdown": _column("resume_score_breakdown"),
+    "github_score_breakdown": _column("github_score_breakdown"),
+    "linkedin_score_breakdown": _column("linkedin_score_breakdown"),
+    "resume_feedback": _column("resume_feedback"),
+    "github_feedback": _column("github_feedback"),
+    "linkedin_feedback": _column("linkedin_feedback"),
+    "streak_days": (("streak_days", "last_active_date"), lambda p, u, a: current_streak(p)),
+    "last_active_date": _iso_column("last_active_date"),
+    "daily_activity": ((), lambda p, u, a: a or {}),
+    "updated_at": _iso_column("updated_at"),
+}
+
+
+def _profile_to_dict(profile: UserProfile, user: User, activity: Optional[Dict[str, int]] = None,
+                     fields: Optional[Set[str]] = None) -> dict:
+    """`activity` is the heatmap window ({ISO date: count}), see activity.recent_activity."""
     return {
-        "user_id": profile.user_id,
-        "full_name": user.full_name,
-        "email": user.email,
-        "credits": user.credits or 0,
-        "headline": profile.headline,
-        "bio": profile.bio,
-        "location": profile.location,
-        "avatar_url": profile.avatar_url,
-        "target_roles": profile.target_roles or [],
-        "experience_years": profile.experience_years,
-        "skills": profile.skills or [],
-        "work_experience": profile.work_experience or [],
-        "education": profile.education or [],
-        "projects": profile.projects or [],
-        "linkedin_url": profile.linkedin_url,
-        "github_url": profile.github_url,
-        "portfolio_url": profile.portfolio_url,
-        "resume_text": profile.resume_text,
-        "resume_filename": profile.resume_filename,
-        "resume_uploaded_at": profile.resume_uploaded_at.isoformat() if profile.resume_uploaded_at else None,
-        "is_visible_to_recruiters": profile.is_visible_to_recruiters,
-        "resume_score": profile.resume_score,
-        "linkedin_score": profile.linkedin_score,
-        "github_score": profile.github_score,
-        "profile_score": profile.profile_score,
-        "profile_completion": profile.profile_completion or 0,
-        "resume_score_breakdown": profile.resume_score_breakdown,
-        "github_score_breakdown": profile.github_score_breakdown,
-        "linkedin_score_breakdown": profile.linkedin_score_breakdown,
-        "resume_feedback": profile.resume_feedback,
-        "github_feedback": profile.github_feedback,
-        "linkedin_feedback": profile.linkedin_feedback,
-        "streak_days": profile.streak_days or 0,
-        "last_active_date": profile.last_active_date.isoformat() if profile.last_active_date else None,
-        "daily_activity": profile.daily_activity or {},
-        "updated_at": profile.updated_at.isoformat() if profile.updated_at else None,
+        name: get(profile, user, activity)
+        for name, (_, get) in PROFILE_FIELDS.items()
+        if fields is None or name in fields
     }
 
 
-def _get_or_create_profile(user: User, db: Session) -> UserProfile:
-    profile = db.query(UserProfile).filter(UserProfile.user_id == user.id).first()
-    if not profile:
-        profile = UserProfile(user_id=user.id, daily_activity={})
-        db.add(profile)
-        db.commit()
-        db.refresh(profile)
-    return profile
+def _profile_load_only(fields: Optional[Set[str]]):
+    """Loader option reading just the columns `fields` need (plus what the endpoints check)."""
+    columns = {"id", "user_id", "updated_at", "is_visible_to_recruiters"}
+    for name in fields:
+        columns.update(PROFILE_FIELDS[name][0])
+    return load_only(*(getattr(UserProfile, c) for c in sorted(columns)))
 
 
-def _compute_completion(profile: UserProfile, user: User) -> Dict[str, Any]:
-    """Returns dict {completion_pct, missing[]}."""
-    checks = [
-        ("Full name",     bool(user.full_name and user.full_name.strip()), 10),
-        ("Bio",           bool(profile.bio and profile.bio.strip()), 10),
-        ("Target roles",  bool(profile.target_roles), 10),
-        ("Skills",        bool(profile.skills), 10),
-        ("Experience years", (profile.experience_years or 0) > 0, 10),
-        ("Resume",        bool(profile.resume_text and profile.resume_text.strip()), 15),
-        ("LinkedIn URL",  bool(profile.linkedin_url), 10),
-        ("GitHub URL",    bool(profile.github_url), 10),
-        ("Resume scored", profile.resume_score is not None, 10),
-        ("Overall score", profile.profile_score is not None, 5),
-    ]
-    pct = sum(weight for _, ok, weight in checks if ok)
-    missing = [label for label, ok, _ in checks if not ok]
-    return {"completion_pct": float(pct), "missing": missing}
+def _profile_etag(updated_at, user: Optional[User], fields: Optional[Set[str]]) -> str:
+    # The user's name/credits are part of the response; today's date rolls the
+    # streak and the heatmap window over at midnight.
+    return weak_etag(
+        updated_at, user.full_name if user else None, user.email if user else None,
+        user.credits if user else None, date.today(), fields=fields,
+    )
 
 
-def _save_completion(profile: UserProfile, user: User, db: Session) -> Dict[str, Any]:
-    info = _compute_completion(profile, user)
-    profile.profile_completion = info["completion_pct"]
-    db.commit()
-    return info
+def _get_or_create_profile(user: User, db: Session, commit: bool = True) -> UserProfile:
+    """With commit=False a new profile is only added; the caller's commit saves it."""
+    profile = db.query(UserProfile).filter(UserProfile.user_id == user.id).first()
+    if not profile:
+        profile = UserProfile(user_id=user.id)
+        db.add(profile)
+        if commit:
+            db.commit()
+            db.refresh(profile)
+    return profile
 
 
 def _deduct_credits(user: User, cost: int, db: Session, description: str, txn_type: str):
@@ -136,6 +163,42 @@ def _deduct_credits(user: User, cost: int, db: Session, description: str, txn_ty
     ))
 
 
+def _refund_credits(user: User, cost: int, db: Session, description: str):
+    user.credits = (user.credits or 0) + cost
+    db.add(CreditTransaction(
+        user_id=user.id,
+        amount=cost,
+        balance_after=user.credits,
+        transaction_type="refund",
+        description=description,
+    ))
+
+
+def _charge_credits_atomic(user_id: int, cost: int, db: Session, description: str, txn_type: str) -> int:
+    """
+    Deduct `cost` in a single conditional UPDATE, so concurrent requests can't
+    both spend the same balance. Returns the new balance; the caller commits.
+    """
+    balance = db.execute(
+        update(User)
+        .where(User.id == user_id, User.credits >= cost)
+        .values(credits=User.credits - cost)
+        .returning(User.credits)
+    ).scalar()
+    if balance is None:
+        have = db.query(User.credits).filter(User.id == user_id).scalar() or 0
+        raise HTTPException(status_code=402, detail=f"Insufficient credits. Need {cost}, have {have}.")
+    user_changed(db, user_id)  # Core UPDATE: the ORM hook can't see it
+    db.add(CreditTransaction(
+        user_id=user_id,
+        amount=-cost,
+        balance_after=balance,
+        transaction_type=txn_type,
+        description=description,
+    ))
+    return balance
+
+
 def _extract_json(text: str) -> Dict[str, Any]:
     """Best-effort extraction of a JSON object from an LLM response."""
     if not text:
@@ -170,16 +233,41 @@ def _clamp_score(v: Any, default: float = 0.0) -> float:
     return max(0.0, min(10.0, f))
 
 
+def _parse_scorer_result(result: Dict[str, Any], score_key: str, dimensions: tuple):
+    """(score, breakdown, feedback) from a scorer's JSON response."""
+    breakdown_raw = result.get("breakdown") or {}
+    return (
+        _clamp_score(result.get(score_key)),
+        {k: _clamp_score(breakdown_raw.get(k)) for k in dimensions},
+        str(result.get("feedback") or "").strip(),
+    )
+
+
 # ── Basic CRUD ────────────────────────────────────────────────────────────
 
 @router.get("/me")
 async def get_my_profile(
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db),
+    request: Request,
+    response: Response,
+    fields: Optional[str] = None,
+    current_user: UserSnapshot = Depends(get_current_identity),
+    db: Session = Depends(get_read_db),
 ):
-    profile = db.query(UserProfile).filter(UserProfile.user_id == current_user.id).first()
+    """`fields=a,b` returns only those keys; supports If-None-Match."""
+    fields = parse_fields(fields, PROFILE_FIELDS)
+    updated_at = db.query(UserProfile.updated_at).filter(UserProfile.user_id == current_user.id).first()
+    etag = _profile_etag(updated_at[0] if updated_at else "none", current_user, fields)
+    cached = not_modified(request, etag)
+    if cached:
+        return cached
+    set_validators(response, etag)
+
+    query = db.query(UserProfile).filter(UserProfile.user_id == current_user.id)
+    if fields is not None:
+        query = query.options(_profile_load_only(fields))
+    profile = query.first() if updated_at else None
     if not profile:
-        return {
+        return select_fields({
             "user_id": current_user.id,
             "full_name": current_user.full_name,
             "email": current_user.email,
@@ -196,8 +284,9 @@ async def get_my_profile(
             "resume_feedback": None, "github_feedback": None, "linkedin_feedback": None,
             "streak_days": 0, "last_active_date": None, "daily_activity": {},
             "updated_at": None,
-        }
-    return _profile_to_dict(profile, current_user)
+        }, fields)
+    activity = recent_activity(current_user.id, db) if fields is None or "daily_activity" in fields else None
+    return _profile_to_dict(profile, current_user, activity, fields)
 
 
 @router.put("/me")
@@ -206,37 +295,44 @@ async def update_my_profile(
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db),
 ):
-    profile = _get_or_create_profile(current_user, db)
+    profile = _get_or_create_profile(current_user, db, commit=False)
 
     payload = data.dict(exclude_none=True)
+    if "skills" in payload:
+        payload["skills"], _ = canonicalize_skills(payload["skills"])
 
     # If resume_text is replaced, invalidate cached resume score
     if "resume_text" in payload and payload["resume_text"] != profile.resume_text:
         profile.resume_score = None
         profile.resume_score_breakdown = None
         profile.resume_feedback = None
+        profile.resume_score_hash = None
         profile.resume_uploaded_at = datetime.utcnow()
 
     for field, value in payload.items():
         setattr(profile, field, value)
+    if "skills" in payload or "resume_text" in payload:
+        profile.skill_ids = profile_skill_ids(profile.skills or [], profile.resume_text)
 
+    # One transaction: the flush fills in completion and updated_at, the
+    # response is built before commit so nothing has to be re-read.
+    db.flush()
+    result = _profile_to_dict(profile, current_user, recent_activity(current_user.id, db))
     db.commit()
-    db.refresh(profile)
-    _save_completion(profile, current_user, db)
-    db.refresh(profile)
-    return _profile_to_dict(profile, current_user)
+    return result
 
 
 # ── Completion ────────────────────────────────────────────────────────────
 
 @router.get("/completion")
 async def get_profile_completion(
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db),
+    current_user: UserSnapshot = Depends(get_current_identity),
+    db: Session = Depends(get_read_db),
 ):
-    profile = _get_or_create_profile(current_user, db)
-    info = _save_completion(profile, current_user, db)
-    db.refresh(profile)
+    profile = db.query(UserProfile).filter(UserProfile.user_id == current_user.id).first()
+    if not profile:
+        profile = UserProfile(user_id=current_user.id)   # transient, never saved
+    info = compute_completion(profile, current_user)
     return {
         "completion_pct": info["completion_pct"],
         "missing": info["missing"],
@@ -289,6 +385,49 @@ Return ONLY a JSON object exactly in this shape:
 }}
 No markdown, no commentary.
 """
+RESUME_DIMENSIONS = resume_heuristics.DIMENSIONS
+
+
+def _resume_prompt(profile: UserProfile) -> str:
+    return RESUME_PROMPT.format(
+        target_roles=", ".join(profile.target_roles or []) or "(not specified)",
+        experience_years=profile.experience_years or 0,
+        skills=", ".join(profile.skills or []) or "(not specified)",
+        resume_text=(profile.resume_text or "")[:15000],
+    )
+
+
+def _prompt_hash(prompt: str) -> str:
+    # The prompt holds every scoring input (and the template), so equal
+    # hashes mean the model would be asked exactly the same question.
+    return hashlib.sha256(prompt.encode("utf-8")).hexdigest()
+
+
+def _stored_resume_score(profile: UserProfile, prompt_hash: str) -> Optional[tuple]:
+    """(score, breakdown, feedback) from the last scoring if its inputs were identical."""
+    if profile.resume_score is None or profile.resume_score_hash != prompt_hash:
+        return None
+    return profile.resume_score, profile.resume_score_breakdown or {}, profile.resume_feedback or ""
+
+
+@router.get("/score/resume/preview")
+async def preview_resume_score(
+    current_user: UserSnapshot = Depends(get_current_identity),
+    db: Session = Depends(get_read_db),
+):
+    """
+    Instant, free rubric scores for the resume on file; no feedback, nothing saved.
+
+    These come from resume_heuristics, whose CALIBRATION has not been fitted
+    to the model's scale yet, so they are an estimate only and never stored
+    as resume_score (POST /score/resume keeps the model's score).
+    """
+    profile = db.query(UserProfile).filter(UserProfile.user_id == current_user.id).first()
+    if not profile or not (profile.resume_text or "").strip():
+        raise HTTPException(status_code=400, detail="No resume on file. Upload your resume first.")
+    return resume_heuristics.assess_resume(
+        profile.resume_text, profile.target_roles or [], profile.skills or [], profile.experience_years,
+    )
 
 
 @router.post("/score/resume")
@@ -300,47 +439,52 @@ async def score_resume(
     if not profile.resume_text or not profile.resume_text.strip():
         raise HTTPException(status_code=400, detail="No resume on file. Upload your resume first.")
 
+    prompt = _resume_prompt(profile)
+    prompt_hash = _prompt_hash(prompt)
+    stored = _stored_resume_score(profile, prompt_hash)
+    if stored:
+        # Nothing the score depends on changed: same answer, no charge
+        score, breakdown, feedback = stored
+        return {
+            "resume_score": score,
+            "breakdown": breakdown,
+            "feedback": feedback,
+            "credits_remaining": current_user.credits,
+            "cached": True,
+        }
+
     _deduct_credits(current_user, RESUME_SCORE_COST, db,
                     "Resume scoring", "profile_score_resume")
+    user_id, profile_id = current_user.id, profile.id
 
-    prompt = RESUME_PROMPT.format(
-        target_roles=", ".join(profile.target_roles or []) or "(not specified)",
-        experience_years=profile.experience_years or 0,
-        skills=", ".join(profile.skills or []) or "(not specified)",
-        resume_text=(profile.resume_text or "")[:15000],
-    )
+    # Commits the charge and frees the connection for the model round-trip
+    release_connection(db)
 
     try:
         result = _call_scorer(prompt)
     except Exception as e:
         # Refund on model failure
-        current_user.credits = (current_user.credits or 0) + RESUME_SCORE_COST
-        db.add(CreditTransaction(
-            user_id=current_user.id,
-            amount=RESUME_SCORE_COST,
-            balance_after=current_user.credits,
-            transaction_type="refund",
-            description=f"Refund: resume scoring failed ({e})",
-        ))
+        _refund_credits(db.get(User, user_id), RESUME_SCORE_COST, db,
+                        f"Refund: resume scoring failed ({e})")
         db.commit()
         raise HTTPException(status_code=502, detail=f"Resume scoring failed: {e}")
 
-    score = _clamp_score(result.get("resume_score"))
-    breakdown_raw = result.get("breakdown") or {}
-    breakdown = {k: _clamp_score(breakdown_raw.get(k)) for k in ("experience", "projects", "leadership", "thinking")}
-    feedback = str(result.get("feedback") or "").strip()
+    score, breakdown, feedback = _parse_scorer_result(result, "resume_score", RESUME_DIMENSIONS)
 
+    user = db.get(User, user_id)
+    profile = db.get(UserProfile, profile_id)
     profile.resume_score = score
     profile.resume_score_breakdown = breakdown
     profile.resume_feedback = feedback
+    profile.resume_score_hash = prompt_hash
     db.commit()
-    _save_completion(profile, current_user, db)
 
     return {
         "resume_score": score,
         "breakdown": breakdown,
         "feedback": feedback,
-        "credits_remaining": current_user.credits,
+        "credits_remaining": user.credits,
+        "cached": False,
     }
 
 
@@ -376,6 +520,7 @@ Return ONLY this JSON shape:
   "feedback": "<string>"
 }}
 """
+GITHUB_DIMENSIONS = ("activity", "breadth", "depth", "impact")
 
 
 def _parse_github_username(url: str) -> Optional[str]:
@@ -385,36 +530,15 @@ def _parse_github_username(url: str) -> Optional[str]:
     return m.group(1) if m else None
 
 
-@router.post("/score/github")
-async def score_github(
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db),
-):
-    profile = _get_or_create_profile(current_user, db)
-    username = _parse_github_username(profile.github_url or "")
-    if not username:
-        raise HTTPException(status_code=400, detail="Add a valid GitHub URL to your profile first.")
-
+async def _fetch_github(username: str):
+    """(profile JSON, recent repos) from the GitHub API; HTTPException on failure."""
     try:
-        user_resp = requests.get(f"https://api.github.com/users/{username}", timeout=10)
-        repos_resp = requests.get(
-            f"https://api.github.com/users/{username}/repos?sort=pushed&per_page=10",
-            timeout=10,
-        )
-    except requests.RequestException as e:
-        raise HTTPException(status_code=502, detail=f"GitHub API unreachable: {e}")
+        return await github_client.fetch_profile(username)
+    except github_client.GitHubError as e:
+        raise HTTPException(status_code=e.status_code, detail=e.detail)
 
-    if user_resp.status_code == 404:
-        raise HTTPException(status_code=404, detail=f"GitHub user '{username}' not found")
-    if user_resp.status_code != 200:
-        raise HTTPException(status_code=502, detail=f"GitHub API error {user_resp.status_code}")
-
-    gh_user = user_resp.json()
-    repos = repos_resp.json() if repos_resp.status_code == 200 else []
-
-    _deduct_credits(current_user, GITHUB_SCORE_COST, db,
-                    "GitHub scoring", "profile_score_github")
 
+def _github_prompt(target_roles: str, gh_user: dict, repos: list) -> str:
     trimmed_profile = {
         "login": gh_user.get("login"),
         "name": gh_user.get("name"),
@@ -440,43 +564,63 @@ async def score_github(
         }
         for r in (repos or [])
     ]
-
-    prompt = GITHUB_PROMPT.format(
-        target_roles=", ".join(profile.target_roles or []) or "(not specified)",
+    return GITHUB_PROMPT.format(
+        target_roles=target_roles,
         profile_json=json.dumps(trimmed_profile, indent=2),
         repos_json=json.dumps(trimmed_repos, indent=2),
     )
 
+
+@router.post("/score/github")
+async def score_github(
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db),
+):
+    profile = _get_or_create_profile(current_user, db)
+    username = _parse_github_username(profile.github_url or "")
+    if not username:
+        raise HTTPException(status_code=400, detail="Add a valid GitHub URL to your profile first.")
+    if (current_user.credits or 0) < GITHUB_SCORE_COST:
+        raise HTTPException(
+            status_code=402,
+            detail=f"Insufficient credits. Need {GITHUB_SCORE_COST}, have {current_user.credits or 0}.",
+        )
+    user_id, profile_id = current_user.id, profile.id
+    target_roles = ", ".join(profile.target_roles or []) or "(not specified)"
+
+    # Nothing to hold a connection for while GitHub and the model respond
+    release_connection(db)
+
+    gh_user, repos = await _fetch_github(username)
+
+    _deduct_credits(db.get(User, user_id), GITHUB_SCORE_COST, db,
+                    "GitHub scoring", "profile_score_github")
+    release_connection(db)
+
+    prompt = _github_prompt(target_roles, gh_user, repos)
+
     try:
         result = _call_scorer(prompt)
     except Exception as e:
-        current_user.credits = (current_user.credits or 0) + GITHUB_SCORE_COST
-        db.add(CreditTransaction(
-            user_id=current_user.id,
-            amount=GITHUB_SCORE_COST,
-            balance_after=current_user.credits,
-            transaction_type="refund",
-            description=f"Refund: github scoring failed ({e})",
-        ))
+        _refund_credits(db.get(User, user_id), GITHUB_SCORE_COST, db,
+                        f"Refund: github scoring failed ({e})")
         db.commit()
         raise HTTPException(status_code=502, detail=f"GitHub scoring failed: {e}")
 
-    score = _clamp_score(result.get("github_score"))
-    breakdown_raw = result.get("breakdown") or {}
-    breakdown = {k: _clamp_score(breakdown_raw.get(k)) for k in ("activity", "breadth", "depth", "impact")}
-    feedback = str(result.get("feedback") or "").strip()
+    score, breakdown, feedback = _parse_scorer_result(result, "github_score", GITHUB_DIMENSIONS)
 
+    user = db.get(User, user_id)
+    profile = db.get(UserProfile, profile_id)
     profile.github_score = score
     profile.github_score_breakdown = breakdown
     profile.github_feedback = feedback
     db.commit()
-    _save_completion(profile, current_user, db)
 
     return {
         "github_score": score,
         "breakdown": breakdown,
         "feedback": feedback,
-        "credits_remaining": current_user.credits,
+        "credits_remaining": user.credits,
     }
 
 
@@ -517,10 +661,26 @@ Return ONLY this JSON:
 """
 
 
+LINKEDIN_DIMENSIONS = ("url_validity", "completeness", "consistency", "searchability")
+
+
 def _looks_like_linkedin(url: str) -> bool:
     return bool(re.search(r"linkedin\.com/in/[A-Za-z0-9_\-]+", url or ""))
 
 
+def _linkedin_prompt(profile: UserProfile) -> str:
+    return LINKEDIN_PROMPT.format(
+        url=profile.linkedin_url,
+        headline=profile.headline or "(empty)",
+        bio=(profile.bio or "(empty)")[:1500],
+        experience_years=profile.experience_years or 0,
+        target_roles=", ".join(profile.target_roles or []) or "(none)",
+        skills_count=len(profile.skills or []),
+        work_count=len(profile.work_experience or []),
+        edu_count=len(profile.education or []),
+    )
+
+
 @router.post("/score/linkedin")
 async def score_linkedin(
     current_user: User = Depends(get_current_user),
@@ -535,60 +695,44 @@ async def score_linkedin(
     _deduct_credits(current_user, LINKEDIN_SCORE_COST, db,
                     "LinkedIn scoring", "profile_score_linkedin")
 
-    prompt = LINKEDIN_PROMPT.format(
-        url=profile.linkedin_url,
-        headline=profile.headline or "(empty)",
-        bio=(profile.bio or "(empty)")[:1500],
-        experience_years=profile.experience_years or 0,
-        target_roles=", ".join(profile.target_roles or []) or "(none)",
-        skills_count=len(profile.skills or []),
-        work_count=len(profile.work_experience or []),
-        edu_count=len(profile.education or []),
-    )
+    prompt = _linkedin_prompt(profile)
+    user_id, profile_id = current_user.id, profile.id
+
+    # Commits the charge and frees the connection for the model round-trip
+    release_connection(db)
 
     try:
         result = _call_scorer(prompt)
     except Exception as e:
-        current_user.credits = (current_user.credits or 0) + LINKEDIN_SCORE_COST
-        db.add(CreditTransaction(
-            user_id=current_user.id,
-            amount=LINKEDIN_SCORE_COST,
-            balance_after=current_user.credits,
-            transaction_type="refund",
-            description=f"Refund: linkedin scoring failed ({e})",
-        ))
+        _refund_credits(db.get(User, user_id), LINKEDIN_SCORE_COST, db,
+                        f"Refund: linkedin scoring failed ({e})")
         db.commit()
         raise HTTPException(status_code=502, detail=f"LinkedIn scoring failed: {e}")
 
-    score = _clamp_score(result.get("linkedin_score"))
-    breakdown_raw = result.get("breakdown") or {}
-    breakdown = {k: _clamp_score(breakdown_raw.get(k)) for k in ("url_validity", "completeness", "consistency", "searchability")}
-    feedback = str(result.get("feedback") or "").strip()
+    score, breakdown, feedback = _parse_scorer_result(result, "linkedin_score", LINKEDIN_DIMENSIONS)
 
+    user = db.get(User, user_id)
+    profile = db.get(UserProfile, profile_id)
     profile.linkedin_score = score
     profile.linkedin_score_breakdown = breakdown
     profile.linkedin_feedback = feedback
     db.commit()
-    _save_completion(profile, current_user, db)
 
     return {
         "linkedin_score": score,
         "breakdown": breakdown,
         "feedback": feedback,
-        "credits_remaining": current_user.credits,
+        "credits_remaining": user.credits,
     }
 
 
 # ── Overall profile score ─────────────────────────────────────────────────
 
-@router.post("/score/overall")
-async def score_overall(
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db),
-):
-    profile = _get_or_create_profile(current_user, db)
+OVERALL_WEIGHTS = {"resume": 0.5, "github": 0.25, "linkedin": 0.25}
 
-    weights = {"resume": 0.5, "github": 0.25, "linkedin": 0.25}
+
+def _overall_score(profile: UserProfile) -> Optional[float]:
+    """Weighted mean of the component scores present, or None if there are none."""
     scores = {
         "resume": profile.resume_score,
         "github": profile.github_score,
@@ -596,6 +740,20 @@ async def score_overall(
     }
     available = {k: v for k, v in scores.items() if v is not None}
     if not available:
+        return None
+    total_weight = sum(OVERALL_WEIGHTS[k] for k in available)
+    overall = sum(available[k] * OVERALL_WEIGHTS[k] for k in available) / total_weight
+    return round(_clamp_score(overall), 2)
+
+@router.post("/score/overall")
+async def score_overall(
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db),
+):
+    profile = _get_or_create_profile(current_user, db)
+
+    overall = _overall_score(profile)
+    if overall is None:
         raise HTTPException(
             status_code=400,
             detail="No component scores yet. Score your resume, GitHub, or LinkedIn first.",
@@ -604,16 +762,9 @@ async def score_overall(
     _deduct_credits(current_user, OVERALL_SCORE_COST, db,
                     "Overall profile score", "profile_score_overall")
 
-    total_weight = sum(weights[k] for k in available)
-    overall = sum(available[k] * weights[k] for k in available) / total_weight
-    overall = round(_clamp_score(overall), 2)
-
     profile.profile_score = overall
-    db.commit()
-    info = _save_completion(profile, current_user, db)
-    db.refresh(profile)
-
-    return {
+    info = compute_completion(profile, current_user)
+    result = {
         "completion_pct": info["completion_pct"],
         "missing": info["missing"],
         "scores": {
@@ -624,107 +775,295 @@ async def score_overall(
         },
         "credits_remaining": current_user.credits,
     }
+    db.commit()
+    return result
+
+
+# ── All scores at once ────────────────────────────────────────────────────
+
+# component: (cost, result score key, breakdown dimensions)
+SCORE_COMPONENTS = {
+    "resume": (RESUME_SCORE_COST, "resume_score", RESUME_DIMENSIONS),
+    "github": (GITHUB_SCORE_COST, "github_score", GITHUB_DIMENSIONS),
+    "linkedin": (LINKEDIN_SCORE_COST, "linkedin_score", LINKEDIN_DIMENSIONS),
+}
+
+# Scoring runs keep going if the client disconnects; hold references so the
+# event loop doesn't garbage-collect them mid-flight.
+_scoring_runs: set = set()
+
+
+async def _run_all_scorers(user_id: int, profile_id: int, scorers: Dict[str, Any], events: asyncio.Queue,
+                           reused: Dict[str, tuple], input_hashes: Dict[str, str]):
+    """
+    Run the scorers (coroutine functions returning the model's JSON)
+    concurrently, reporting each as it finishes, then save every score,
+    refunds for failed components, the overall score and completion in one
+    transaction. `reused` components (inputs unchanged since the stored
+    score) are reported up front and not re-run.
+    """
+    for name, (score, breakdown, feedback) in reused.items():
+        await events.put({"event": "component", "component": name, "status": "ok", "cached": True,
+                          "score": score, "breakdown": breakdown, "feedback": feedback})
+
+    pending = {asyncio.create_task(run()): name for name, run in scorers.items()}
+    results: Dict[str, tuple] = {}
+    failed: List[str] = []
+    while pending:
+        done, _ = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+        for task in done:
+            name = pending.pop(task)
+            cost, score_key, dimensions = SCORE_COMPONENTS[name]
+            try:
+                results[name] = _parse_scorer_result(task.result(), score_key, dimensions)
+            except Exception as e:
+                failed.append(name)
+                error = e.detail if isinstance(e, HTTPException) else str(e)
+                await events.put({"event": "component", "component": name, "status": "failed",
+                                  "error": error, "refunded": cost})
+                continue
+            score, breakdown, feedback = results[name]
+            await events.put({"event": "component", "component": name, "status": "ok",
+                              "score": score, "breakdown": breakdown, "feedback": feedback})
 
+    db = SessionLocal()
+    try:
+        user = db.get(User, user_id)
+        profile = db.get(UserProfile, profile_id)
+        for name, (score, breakdown, feedback) in results.items():
+            setattr(profile, f"{name}_score", score)
+            setattr(profile, f"{name}_score_breakdown", breakdown)
+            setattr(profile, f"{name}_feedback", feedback)
+            if name in input_hashes:
+                setattr(profile, f"{name}_score_hash", input_hashes[name])
+        if failed:
+            _refund_credits(user, sum(SCORE_COMPONENTS[n][0] for n in failed), db,
+                            f"Refund: {', '.join(failed)} scoring failed")
+        overall = _overall_score(profile)
+        if overall is not None:
+            profile.profile_score = overall
+        info = compute_completion(profile, user)
+        db.commit()
+        await events.put({
+            "event": "done",
+            "scores": {
+                "resume": profile.resume_score,
+                "github": profile.github_score,
+                "linkedin": profile.linkedin_score,
+                "overall": profile.profile_score,
+            },
+            "completion_pct": info["completion_pct"],
+            "missing": info["missing"],
+            "credits_remaining": user.credits,
+        })
+    except Exception as e:
+        db.rollback()
+        print(f"Profile scoring for user {user_id} failed to save: {e}")
+        await events.put({"event": "error", "error": "Scores could not be saved"})
+    finally:
+        db.close()
+        await events.put(None)
 
-# ── Activity / streak ─────────────────────────────────────────────────────
 
-def record_interview_activity(user: User, db: Session) -> None:
-    """Called by interview completion to bump today's count and recompute streak."""
-    profile = _get_or_create_profile(user, db)
-    today = date.today()
-    today_iso = today.isoformat()
-
-    activity = dict(profile.daily_activity or {})
-    activity[today_iso] = int(activity.get(today_iso, 0)) + 1
-    profile.daily_activity = activity
-
-    # Recompute streak ending today
-    streak = 0
-    d = today
-    while activity.get(d.isoformat(), 0) > 0:
-        streak += 1
-        d -= timedelta(days=1)
-    profile.streak_days = streak
-    profile.last_active_date = today
+@router.post("/score/all")
+async def score_all(
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db),
+):
+    """
+    Score resume, GitHub and LinkedIn concurrently and recompute the overall
+    score locally (no separate overall charge). Components the profile can't
+    be scored on are skipped, and a resume whose scoring inputs are unchanged
+    reuses its stored score for free. The combined cost is charged once up
+    front; a component that fails is refunded.
+
+    Streams NDJSON progress: a "started" line, one "component" line per
+    scorer as it finishes, then "done" with the saved scores.
+    """
+    profile = _get_or_create_profile(current_user, db)
+    target_roles = ", ".join(profile.target_roles or []) or "(not specified)"
+    username = _parse_github_username(profile.github_url or "")
 
-    db.commit()
+    scorers: Dict[str, Any] = {}
+    reused: Dict[str, tuple] = {}
+    input_hashes: Dict[str, str] = {}
+    skipped: Dict[str, str] = {}
+    if profile.resume_text and profile.resume_text.strip():
+        prompt = _resume_prompt(profile)
+        input_hashes["resume"] = _prompt_hash(prompt)
+        stored = _stored_resume_score(profile, input_hashes["resume"])
+        if stored:
+            reused["resume"] = stored
+        else:
+            scorers["resume"] = lambda: asyncio.to_thread(_call_scorer, prompt)
+    else:
+        skipped["resume"] = "No resume on file. Upload your resume first."
+    if username:
+        async def score_github_component():
+            gh_user, repos = await _fetch_github(username)
+            return await asyncio.to_thread(_call_scorer, _github_prompt(target_roles, gh_user, repos))
+        scorers["github"] = score_github_component
+    else:
+        skipped["github"] = "Add a valid GitHub URL to your profile first."
+    if _looks_like_linkedin(profile.linkedin_url or ""):
+        linkedin_prompt = _linkedin_prompt(profile)
+        scorers["linkedin"] = lambda: asyncio.to_thread(_call_scorer, linkedin_prompt)
+    else:
+        skipped["linkedin"] = "Add a valid LinkedIn URL (linkedin.com/in/<slug>) to your profile first."
+    if not scorers and not reused:
+        raise HTTPException(status_code=400, detail="Nothing to score yet. " + " ".join(skipped.values()))
+
+    cost = sum(SCORE_COMPONENTS[name][0] for name in scorers)
+    user_id, profile_id = current_user.id, profile.id
+    balance = current_user.credits or 0
+    if cost:
+        balance = _charge_credits_atomic(user_id, cost, db, f"Profile scoring: {', '.join(scorers)}",
+                                         "profile_score_all")
+    # Commits the charge and frees the connection for the model round-trips
+    release_connection(db)
+
+    events: asyncio.Queue = asyncio.Queue()
+    run = asyncio.create_task(_run_all_scorers(user_id, profile_id, scorers, events, reused, input_hashes))
+    _scoring_runs.add(run)
+    run.add_done_callback(_scoring_runs.discard)
+
+    async def stream():
+        yield json.dumps({"event": "started", "components": [*reused, *scorers], "skipped": skipped,
+                          "charged": cost, "credits_remaining": balance}) + "\n"
+        while (event := await events.get()) is not None:
+            yield json.dumps(event) + "\n"
+
+    return StreamingResponse(stream(), media_type="application/x-ndjson")
 
 
-def get_completion_pct(user: User, db: Session) -> float:
-    """Cheap helper for interview-start gating."""
-    profile = db.query(UserProfile).filter(UserProfile.user_id == user.id).first()
-    if not profile:
-        return 0.0
-    info = _compute_completion(profile, user)
-    return info["completion_pct"]
+# ── Activity / streak ─────────────────────────────────────────────────────
 
+def record_interview_activity(user: User, db: Session) -> None:
+    """Called by interview completion to bump today's count and advance the streak."""
+    profile = _get_or_create_profile(user, db, commit=False)
+    record_activity(profile, db)
+    db.commit()
 
-# ── Public profile / search ───────────────────────────────────────────────
 
-@router.get("/{user_id}")
-async def get_public_profile(
-    user_id: int,
-    current_user: Optional[User] = Depends(get_current_user_optional),
-    db: Session = Depends(get_db),
+@router.get("/activity")
+async def get_activity(
+    start: Optional[date] = None,
+    end: Optional[date] = None,
+    current_user: UserSnapshot = Depends(get_current_identity),
+    db: Session = Depends(get_read_db),
 ):
-    profile = db.query(UserProfile).filter(UserProfile.user_id == user_id).first()
-    if not profile:
-        raise HTTPException(status_code=404, detail="Profile not found")
+    """
+    Heatmap data for [start, end] (ISO dates, default the last 53 weeks,
+    at most MAX_RANGE_DAYS apart); only active days are listed.
+    """
+    end = end or date.today()
+    start = start or end - timedelta(days=HEATMAP_DAYS)
+    if start > end:
+        raise HTTPException(status_code=400, detail="start must not be after end")
+    if (end - start).days > MAX_RANGE_DAYS:
+        raise HTTPException(status_code=400, detail=f"Date range is limited to {MAX_RANGE_DAYS} days")
+
+    days = activity_between(current_user.id, start, end, db)
+    profile = (
+        db.query(UserProfile.streak_days, UserProfile.last_active_date)
+        .filter(UserProfile.user_id == current_user.id)
+        .first()
+    )
+    return {
+        "start": start.isoformat(),
+        "end": end.isoformat(),
+        "days": days,
+        "total": sum(days.values()),
+        "streak_days": current_streak(profile) if profile else 0,
+        "last_active_date": profile.last_active_date.isoformat() if profile and profile.last_active_date else None,
+    }
 
-    is_own = current_user and current_user.id == user_id
-    if not is_own and not profile.is_visible_to_recruiters:
-        raise HTTPException(status_code=403, detail="This profile is private")
 
-    user = db.query(User).filter(User.id == user_id).first()
-    return _profile_to_dict(profile, user)
+def get_completion_pct(user: UserSnapshot) -> float:
+    """Interview-start gating; completion rides along in the user snapshot (kept current on commit)."""
+    return user.profile_completion
+
 
+# ── Public profile / search ───────────────────────────────────────────────
 
+# Declared before /{user_id}, which would otherwise capture "search".
 @router.get("/search/candidates")
 async def search_candidates(
     role: Optional[str] = None,
     skills: Optional[str] = None,
+    skills_mode: str = "any",
     min_experience: Optional[float] = None,
     max_experience: Optional[float] = None,
     location: Optional[str] = None,
     limit: int = 20,
     offset: int = 0,
-    db: Session = Depends(get_db),
 ):
-    query = db.query(UserProfile).filter(UserProfile.is_visible_to_recruiters == True)
-
-    if min_experience is not None:
-        query = query.filter(UserProfile.experience_years >= min_experience)
-    if max_experience is not None:
-        query = query.filter(UserProfile.experience_years <= max_experience)
-
-    profiles = query.offset(offset).limit(limit).all()
-
-    results = []
-    for p in profiles:
-        user = db.query(User).filter(User.id == p.user_id).first()
-        if not user:
-            continue
+    if skills_mode not in ("any", "all"):
+        raise HTTPException(status_code=400, detail="skills_mode must be 'any' or 'all'")
+
+    docs, total = get_candidate_index().search(
+        role=role,
+        skills=skills.split(",") if skills else None,
+        skills_mode=skills_mode,
+        location=location,
+        min_experience=min_experience,
+        max_experience=max_experience,
+        offset=offset,
+        limit=min(max(limit, 1), 100),
+    )
+    return {
+        "candidates": [
+            {
+                "user_id": d.user_id,
+                "full_name": d.full_name,
+                "headline": d.headline,
+                "location": d.location,
+                "experience_years": d.experience_years,
+                "skills": d.skills,
+                "target_roles": d.target_roles,
+                "profile_score": d.profile_score,
+            }
+            for d in docs
+        ],
+        "total": total,
+    }
 
-        if role:
-            role_lower = role.lower()
-            if not any(role_lower in r.lower() for r in (p.target_roles or [])):
-                continue
 
-        if skills:
-            wanted = {s.strip().lower() for s in skills.split(",")}
-            candidate_skills = {s.lower() for s in (p.skills or [])}
-            if not wanted.intersection(candidate_skills):
-                continue
+@router.get("/{user_id}")
+async def get_public_profile(
+    user_id: int,
+    request: Request,
+    response: Response,
+    fields: Optional[str] = None,
+    current_user: Optional[UserSnapshot] = Depends(get_current_identity_optional),
+    db: Session = Depends(get_read_db),
+):
+    """`fields=a,b` returns only those keys; supports If-None-Match."""
+    fields = parse_fields(fields, PROFILE_FIELDS)
+    # Validators first: the privacy check and a 304 need neither the profile body nor the history
+    head = (
+        db.query(UserProfile.updated_at, UserProfile.is_visible_to_recruiters, User)
+        .join(User, User.id == UserProfile.user_id)
+        .filter(UserProfile.user_id == user_id)
+        .first()
+    )
+    if not head:
+        raise HTTPException(status_code=404, detail="Profile not found")
+    updated_at, visible, user = head
 
-        results.append({
-            "user_id": p.user_id,
-            "full_name": user.full_name,
-            "headline": p.headline,
-            "location": p.location,
-            "experience_years": p.experience_years,
-            "skills": p.skills or [],
-            "target_roles": p.target_roles or [],
-            "profile_score": p.profile_score,
-        })
+    is_own = current_user and current_user.id == user_id
+    if not is_own and not visible:
+        raise HTTPException(status_code=403, detail="This profile is private")
 
-    return {"candidates": results, "total": len(results)}
+    etag = _profile_etag(updated_at, user, fields)
+    cached = not_modified(request, etag)
+    if cached:
+        return cached
+    set_validators(response, etag)
+
+    query = db.query(UserProfile).filter(UserProfile.user_id == user_id)
+    if fields is not None:
+        query = query.options(_profile_load_only(fields))
+    profile = query.first()
+    activity = recent_activity(user_id, db) if fields is None or "daily_activity" in fields else None
+    return _profile_to_dict(profile, user, activity, fields)
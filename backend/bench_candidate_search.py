@@ -0,0 +1,113 @@
+"""
+Benchmark recruiter candidate search against the in-memory inverted index.
+
+Builds a scratch SQLite database (or uses BENCH_DATABASE_URL) with synthetic
+candidate profiles, builds the index from it, and times a mix of searches.
+Each result total is checked against a brute-force scan of the same data.
+
+Usage: python bench_candidate_search.py [--profiles 100000]
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+_scratch = os.path.join(tempfile.gettempdir(), "interviewer_bench_search.db")
+os.environ["DATABASE_URL"] = os.getenv("BENCH_DATABASE_URL", f"sqlite:///{_scratch}")
+
+from sqlalchemy import inspect  # noqa: E402
+from sqlalchemy.orm import Session  # noqa: E402
+
+from database import engine  # noqa: E402
+from models import UserProfile  # noqa: E402
+from search_index import CandidateIndex, ResultCache  # noqa: E402
+from skill_vocabulary import skill_key  # noqa: E402
+from synthetic_data import generate  # noqa: E402
+
+QUERIES = [
+    {},
+    {"skills": ["Python"]},
+    {"skills": ["python", "go", "rust"]},
+    {"skills": ["Python", "AWS", "Docker"], "skills_mode": "all"},
+    {"role": "backend engineer"},
+    {"role": "ML Engineer", "skills": ["PyTorch"], "min_experience": 3},
+    {"location": "bengaluru", "min_experience": 2, "max_experience": 5},
+    {"min_experience": 5, "max_experience": 8},
+    {"skills": ["Kubernetes"], "offset": 2_000},
+]
+
+
+def _brute_force_total(profiles, q):
+    skills = {skill_key(s) for s in q.get("skills", [])}
+    role, loc = (q.get("role") or "").lower(), (q.get("location") or "").lower()
+    lo, hi = q.get("min_experience", float("-inf")), q.get("max_experience", float("inf"))
+    total = 0
+    for p in profiles:
+        have = set(p.skill_ids or []) | {skill_key(s) for s in p.skills or []}
+        if skills and not (skills <= have if q.get("skills_mode") == "all" else skills & have):
+            continue
+        if role and not any(role in r.lower() for r in (p.target_roles or []) + [p.headline or ""]):
+            continue
+        if loc and p.location and loc not in p.location.lower():
+            continue
+        if "min_experience" in q or "max_experience" in q:
+            if p.experience_years is None or not lo <= p.experience_years <= hi:
+                continue
+        total += 1
+    return total
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--profiles", type=int, default=100_000)
+    args = parser.parse_args()
+
+    existing = 0
+    if inspect(engine).has_table("user_profiles"):
+        with Session(engine) as db:
+            existing = db.query(UserProfile).count()
+    if existing != args.profiles:
+        engine.dispose()
+        if engine.url.get_backend_name() == "sqlite" and os.path.exists(_scratch):
+            os.remove(_scratch)
+        print(f"Generating {args.profiles} profiles...")
+        generate(engine, users=args.profiles, sessions=0, profiles=True)
+
+    index = CandidateIndex()
+    with Session(engine) as db:
+        t0 = time.perf_counter()
+        index.load(db)
+        print(f"Index built over {len(index)} visible profiles in {time.perf_counter() - t0:.2f}s")
+        visible = db.query(UserProfile).filter(UserProfile.is_visible_to_recruiters == True).all()
+
+    print(f"\n{'query':<80} {'total':>7} {'cold ms':>8} {'hit ms':>7}")
+    for q in QUERIES:
+        cold = hit = float("inf")
+        for _ in range(5):
+            index.results = ResultCache()
+            t0 = time.perf_counter()
+            _, total = index.search(**q)
+            cold = min(cold, time.perf_counter() - t0)
+            t0 = time.perf_counter()
+            index.search(**q)
+            hit = min(hit, time.perf_counter() - t0)
+        assert total == _brute_force_total(visible, q), q
+        print(f"{str(q):<80} {total:>7} {cold * 1000:>8.2f} {hit * 1000:>7.2f}")
+
+    # Incremental maintenance cost
+    t0 = time.perf_counter()
+    for uid in range(1, 1001):
+        doc = index._docs.get(uid)
+        if doc:
+            index.upsert({"user_id": uid, "skills": doc.skills + ["Elixir"],
+                          "target_roles": doc.target_roles, "headline": doc.headline,
+                          "experience_years": doc.experience_years,
+                          "profile_score": doc.profile_score}, None)
+    print(f"\n1000 incremental upserts in {(time.perf_counter() - t0) * 1000:.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+"""
+Benchmark password logins with hashing on the event loop against the
+password thread pool (passwords.py).
+
+Fires --logins concurrent password verifications at one event loop while a
+cheap "other request" ticks every 10 ms, and reports login throughput plus
+how long that other traffic was stalled. On the loop every verification
+blocks everything else for its full duration; off the loop the ticks keep
+their schedule and, with more than one core, verifications run in parallel.
+
+Usage: python bench_login.py [--logins 32] [--rounds 12] [--workers 4]
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import time
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+TICK = 0.010
+
+
+async def _ticker(stop: asyncio.Event, lags: list):
+    while not stop.is_set():
+        t0 = time.perf_counter()
+        await asyncio.sleep(TICK)
+        lags.append(time.perf_counter() - t0 - TICK)
+
+
+async def _run(login, n: int):
+    stop = asyncio.Event()
+    lags: list = []
+    ticker = asyncio.create_task(_ticker(stop, lags))
+    await asyncio.sleep(0)
+    t0 = time.perf_counter()
+    results = await asyncio.gather(*(login() for _ in range(n)))
+    elapsed = time.perf_counter() - t0
+    stop.set()
+    await ticker
+    assert all(results)
+    lags.sort()
+    return {
+        "logins_per_s": n / elapsed,
+        "elapsed_s": elapsed,
+        "max_stall_ms": lags[-1] * 1000 if lags else 0.0,
+        "p99_stall_ms": lags[int(len(lags) * 0.99) - 1] * 1000 if lags else 0.0,
+        "median_stall_ms": statistics.median(lags) * 1000 if lags else 0.0,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--logins", type=int, default=32)
+    parser.add_argument("--rounds", type=int, default=None, help="bcrypt cost (default: BCRYPT_ROUNDS or 12)")
+    parser.add_argument("--workers", type=int, default=None, help="password pool size (default: PASSWORD_HASH_WORKERS)")
+    args = parser.parse_args()
+    if args.rounds:
+        os.environ["BCRYPT_ROUNDS"] = str(args.rounds)
+    if args.workers:
+        os.environ["PASSWORD_HASH_WORKERS"] = str(args.workers)
+
+    import passwords  # noqa: E402  (reads the policy from the environment)
+
+    password = "correct horse battery staple"
+    stored = passwords.pwd_context.hash(password)
+
+    async def on_loop():
+        # What the login endpoint used to do: verify inline in async def
+        return passwords.pwd_context.verify(password, stored)
+
+    async def off_loop():
+        valid, _ = await passwords.verify_password(password, stored)
+        return valid
+
+    async def bench():
+        await passwords.verify_password(password, stored)  # start the pool threads
+        return await _run(on_loop, args.logins), await _run(off_loop, args.logins)
+
+    before, after = asyncio.run(bench())
+    print(f"{args.logins} concurrent logins, scheme={passwords.pwd_context.default_scheme()}, "
+          f"bcrypt rounds={passwords.BCRYPT_ROUNDS}, pool={passwords.PASSWORD_HASH_WORKERS}, "
+          f"cpus={os.cpu_count()}")
+    print(f"{'':<14} {'logins/s':>9} {'total s':>8} {'max stall ms':>13} {'p99 stall ms':>13} {'median ms':>10}")
+    for label, r in (("on the loop", before), ("thread pool", after)):
+        print(f"{label:<14} {r['logins_per_s']:>9.1f} {r['elapsed_s']:>8.2f} {r['max_stall_ms']:>13.1f} "
+              f"{r['p99_stall_ms']:>13.1f} {r['median_stall_ms']:>10.1f}")
+    passwords.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+"""
+Benchmark OFFSET/LIMIT against keyset pagination on a synthetic dataset.
+
+Builds a scratch SQLite database (or uses BENCH_DATABASE_URL) with a million
+interview sessions and times fetching pages at increasing depth both ways.
+
+Usage: python bench_pagination.py [--sessions 1000000] [--page-size 100]
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+_scratch = os.path.join(tempfile.gettempdir(), "interviewer_bench_pagination.db")
+os.environ["DATABASE_URL"] = os.getenv("BENCH_DATABASE_URL", f"sqlite:///{_scratch}")
+
+from sqlalchemy import inspect  # noqa: E402
+from sqlalchemy.orm import Session  # noqa: E402
+
+from database import engine  # noqa: E402
+from models import InterviewSession  # noqa: E402
+from pagination import encode_cursor, paginate_desc  # noqa: E402
+from synthetic_data import generate  # noqa: E402
+
+
+def _time(fn, repeat=5):
+    best = float("inf")
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - t0)
+    return best * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sessions", type=int, default=1_000_000)
+    parser.add_argument("--users", type=int, default=50_000)
+    parser.add_argument("--page-size", type=int, default=100)
+    args = parser.parse_args()
+
+    existing = 0
+    if inspect(engine).has_table("interview_sessions"):
+        with Session(engine) as db:
+            existing = db.query(InterviewSession).count()
+    if existing != args.sessions:
+        engine.dispose()
+        if engine.url.get_backend_name() == "sqlite" and os.path.exists(_scratch):
+            os.remove(_scratch)
+        print(f"Generating {args.sessions} sessions...")
+        t0 = time.perf_counter()
+        generate(engine, users=args.users, sessions=args.sessions)
+        print(f"  done in {time.perf_counter() - t0:.1f}s")
+
+    limit = args.page_size
+    print(f"\n{'page depth':>12} {'offset ms':>12} {'keyset ms':>12}")
+    with Session(engine) as db:
+        for depth in (0, 100, 1_000, 5_000):
+            offset = depth * limit
+            if offset >= args.sessions:
+                break
+
+            def offset_page():
+                return (
+                    db.query(InterviewSession)
+                    .order_by(InterviewSession.created_at.desc(), InterviewSession.id.desc())
+                    .offset(offset).limit(limit).all()
+                )
+
+            # Walk to the same depth once to get the cursor a client would hold.
+            boundary = offset_page()
+            cursor = None
+            if depth:
+                prev = (
+                    db.query(InterviewSession)
+                    .order_by(InterviewSession.created_at.desc(), InterviewSession.id.desc())
+                    .offset(offset - 1).limit(1).one()
+                )
+                cursor = encode_cursor(prev.created_at, prev.id)
+
+            def keyset_page():
+                rows, _ = paginate_desc(db.query(InterviewSession), InterviewSession, cursor, limit)
+                return rows
+
+            assert [r.id for r in keyset_page()] == [r.id for r in boundary]
+            db.expunge_all()
+            print(f"{depth:>12} {_time(offset_page):>12.2f} {_time(keyset_page):>12.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,128 @@
+"""
+Calibrate the local resume scorer (resume_heuristics.py) against the LLM
+resume scores stored in user_profiles.
+
+For every profile with resume_text and a stored resume_score_breakdown it
+compares the heuristic sub-scores with the stored ones (MAE, Pearson r),
+fits a per-dimension linear map (scale, offset) by least squares and prints
+a CALIBRATION block to paste into resume_heuristics.py. Rows whose stored
+breakdown is exactly what the heuristic produces today were scored by it,
+not by the LLM, and are skipped.
+
+Also reports how long local scoring takes per resume.
+
+Usage:
+    python calibrate_resume_scorer.py
+    python calibrate_resume_scorer.py --limit 2000
+"""
+import argparse
+import math
+import os
+import sys
+import time
+from typing import Dict, List, Tuple
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from database import SessionLocal  # noqa: E402
+from models import UserProfile  # noqa: E402
+from resume_heuristics import (  # noqa: E402
+    CALIBRATION, DIMENSIONS, _raw_scores, extract_features, score_features,
+)
+
+
+def _fit(xs: List[float], ys: List[float]) -> Tuple[float, float]:
+    """Least-squares y = scale * x + offset."""
+    n = len(xs)
+    mx, my = sum(xs) / n, sum(ys) / n
+    var = sum((x - mx) ** 2 for x in xs)
+    if var == 0:
+        return 1.0, my - mx
+    scale = sum((x - mx) * (y - my) for x, y in zip(xs, ys)) / var
+    return scale, my - scale * mx
+
+
+def _pearson(xs: List[float], ys: List[float]) -> float:
+    n = len(xs)
+    mx, my = sum(xs) / n, sum(ys) / n
+    sx = math.sqrt(sum((x - mx) ** 2 for x in xs))
+    sy = math.sqrt(sum((y - my) ** 2 for y in ys))
+    if not sx or not sy:
+        return float("nan")
+    return sum((x - mx) * (y - my) for x, y in zip(xs, ys)) / (sx * sy)
+
+
+def _mae(xs: List[float], ys: List[float]) -> float:
+    return sum(abs(x - y) for x, y in zip(xs, ys)) / len(xs)
+
+
+def _clamp(v: float) -> float:
+    return max(0.0, min(10.0, v))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Calibrate resume_heuristics against stored LLM scores")
+    parser.add_argument("--limit", type=int, default=None, help="use at most this many profiles")
+    args = parser.parse_args()
+
+    raw: Dict[str, List[float]] = {d: [] for d in DIMENSIONS}
+    current: Dict[str, List[float]] = {d: [] for d in DIMENSIONS}
+    stored: Dict[str, List[float]] = {d: [] for d in DIMENSIONS}
+    skipped = 0
+    elapsed = 0.0
+
+    db = SessionLocal()
+    try:
+        query = (
+            db.query(UserProfile)
+            .filter(UserProfile.resume_text.isnot(None), UserProfile.resume_score_breakdown.isnot(None))
+            .order_by(UserProfile.id)
+        )
+        if args.limit:
+            query = query.limit(args.limit)
+        for profile in query.yield_per(500):
+            reference = profile.resume_score_breakdown or {}
+            if not all(isinstance(reference.get(d), (int, float)) for d in DIMENSIONS):
+                continue
+            t0 = time.perf_counter()
+            features = extract_features(profile.resume_text, profile.target_roles or [],
+                                        profile.skills or [], profile.experience_years)
+            _, breakdown = score_features(features)
+            elapsed += time.perf_counter() - t0
+            if all(breakdown[d] == reference[d] for d in DIMENSIONS):
+                skipped += 1
+                continue
+            for dim, value in _raw_scores(features).items():
+                raw[dim].append(value)
+                current[dim].append(breakdown[dim])
+                stored[dim].append(float(reference[dim]))
+    finally:
+        db.close()
+
+    n = len(stored[DIMENSIONS[0]])
+    print(f"{n} LLM-scored resumes ({skipped} heuristic-scored rows skipped)")
+    if n + skipped:
+        print(f"Local scoring: {elapsed / (n + skipped) * 1000:.2f} ms per resume")
+    if n < 10:
+        print("Not enough LLM-scored resumes to calibrate (need at least 10).")
+        return
+
+    print(f"\n{'dimension':<12} {'MAE now':>8} {'r':>6} {'scale':>7} {'offset':>7} {'MAE fitted':>11}")
+    fitted = {}
+    for dim in DIMENSIONS:
+        scale, offset = _fit(raw[dim], stored[dim])
+        after = [_clamp(x * scale + offset) for x in raw[dim]]
+        fitted[dim] = (round(scale, 3), round(offset, 3))
+        print(f"{dim:<12} {_mae(current[dim], stored[dim]):>8.2f} {_pearson(raw[dim], stored[dim]):>6.2f} "
+              f"{scale:>7.3f} {offset:>7.3f} {_mae(after, stored[dim]):>11.2f}")
+
+    print("\nCurrent calibration:", CALIBRATION)
+    print("\nFitted calibration for resume_heuristics.py:")
+    print("CALIBRATION: Dict[str, Tuple[float, float]] = {")
+    for dim in DIMENSIONS:
+        print(f'    "{dim}": {fitted[dim]},')
+    print("}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,8 +1,14 @@
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import sessionmaker
+from sqlalchemy.orm import Session, sessionmaker
+from fastapi import Request
 import os
+import time
+from typing import Dict, Optional
 from dotenv import load_dotenv
+from jose import JWTError, jwt
+
+from db_metrics import InstrumentedQueuePool, instrument
 
 # Load environment variables
 load_dotenv()
@@ -13,21 +19,128 @@ DATABASE_URL = os.getenv("DATABASE_URL")
 if not DATABASE_URL:
     raise ValueError("DATABASE_URL environment variable is not set")
 
+# Optional read replica. When unset, reads go to the primary.
+READ_DATABASE_URL = os.getenv("READ_DATABASE_URL")
+
+# After a caller commits a write, their reads stay on the primary this long
+# so replica lag never hides their own changes.
+READ_YOUR_WRITES_SECONDS = float(os.getenv("READ_YOUR_WRITES_SECONDS", "5"))
+
+# Pool sizing. LLM-heavy requests hold connections for a long time, so these
+# are tunable per deployment; watch /debug/db/pool (peak_in_use, checkout
+# waits) before raising them.
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "10"))
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "20"))
+DB_POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", "30"))
+DB_POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", "3600"))
+
+
+def _create_engine(url: str):
+    return create_engine(
+        url,
+        poolclass=InstrumentedQueuePool,
+        pool_pre_ping=True,
+        pool_size=DB_POOL_SIZE,
+        max_overflow=DB_MAX_OVERFLOW,
+        pool_timeout=DB_POOL_TIMEOUT,
+        pool_recycle=DB_POOL_RECYCLE
+    )
+
+
 # Create SQLAlchemy engine
-engine = create_engine(
-    DATABASE_URL,
-    pool_pre_ping=True,
-    pool_size=10,
-    max_overflow=20,
-    pool_recycle=3600
-)
+engine = _create_engine(DATABASE_URL)
+instrument(engine, "primary")
+
+read_engine = engine
+if READ_DATABASE_URL:
+    read_engine = _create_engine(READ_DATABASE_URL)
+    instrument(read_engine, "replica")
 
 # Create session factory
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+ReadSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=read_engine)
 
 # Base class for models
 Base = declarative_base()
 
+# ── Read-your-writes tracking ─────────────────────────────────────────────
+# Auth dependencies tag the primary session with the caller's key
+# (db.info["rw_key"] = caller_key(token)); a commit that actually flushed rows
+# stamps that key. The key is the principal the token names, not the token
+# itself, so the window survives /auth/refresh handing out a new access token.
+
+_recent_writes: Dict[str, float] = {}
+
+
+@event.listens_for(SessionLocal, "after_flush")
+def _flag_write(session, flush_context):
+    session.info["wrote"] = True
+
+
+@event.listens_for(SessionLocal, "after_commit")
+def _stamp_write(session):
+    if session.info.pop("wrote", False):
+        key = session.info.get("rw_key")
+        if key:
+            mark_recent_write(key)
+
+
+@event.listens_for(SessionLocal, "after_rollback")
+def _clear_write_flag(session):
+    session.info.pop("wrote", None)
+
+
+@event.listens_for(ReadSessionLocal, "before_flush")
+def _reject_replica_writes(session, flush_context, instances):
+    if read_engine is not engine:
+        raise RuntimeError("Attempted to write through a read-replica session; use get_db")
+
+
+def mark_recent_write(key: str) -> None:
+    now = time.time()
+    _recent_writes[key] = now
+    # Drop stale stamps so the map stays bounded by recent writers
+    if len(_recent_writes) > 10000:
+        cutoff = now - READ_YOUR_WRITES_SECONDS
+        for k in [k for k, t in _recent_writes.items() if t < cutoff]:
+            del _recent_writes[k]
+
+
+def wrote_recently(key: Optional[str]) -> bool:
+    if not key:
+        return False
+    stamp = _recent_writes.get(key)
+    return stamp is not None and time.time() - stamp < READ_YOUR_WRITES_SECONDS
+
+
+def caller_key(token: Optional[str]) -> Optional[str]:
+    """
+    Read-your-writes key for a bearer token: "user:<id>", "company:<id>", or
+    "sub:<email>" for tokens issued before "uid" was added.
+
+    The claims are read without verifying the signature: the key only routes
+    reads to the primary, and the endpoint's auth dependency still verifies
+    the token. A forged claim at worst sends that caller's reads to the primary.
+    """
+    if not token:
+        return None
+    try:
+        claims = jwt.get_unverified_claims(token)
+    except JWTError:
+        return None
+    for claim, prefix in (("uid", "user"), ("company_id", "company"), ("sub", "sub")):
+        value = claims.get(claim)
+        if value:
+            return f"{prefix}:{value}"
+    return None
+
+
+def _bearer_token(request: Request) -> Optional[str]:
+    auth = request.headers.get("authorization") or ""
+    scheme, _, token = auth.partition(" ")
+    return token if scheme.lower() == "bearer" and token else None
+
+
 def get_db():
     """
     Dependency function that yields database sessions.
@@ -37,3 +150,32 @@ def get_db():
         yield db
     finally:
         db.close()
+
+
+def release_connection(db: Session) -> None:
+    """
+    Hand the session's pooled connection back before a slow non-database call
+    (LLM requests, third-party APIs) so it isn't pinned for tens of seconds.
+
+    Pending changes are committed first. Loaded objects are detached afterwards:
+    copy what you need beforehand and re-query before writing again. The
+    session itself stays usable and checks out a fresh connection on next use.
+    """
+    if db.new or db.dirty or db.deleted or db.info.get("wrote"):
+        db.commit()
+    db.close()
+
+
+def get_read_db(request: Request):
+    """
+    Dependency for read-only endpoints. Yields a replica session, or a primary
+    session when no replica is configured or the caller wrote very recently.
+    """
+    if read_engine is engine or wrote_recently(caller_key(_bearer_token(request))):
+        db = SessionLocal()
+    else:
+        db = ReadSessionLocal()
+    try:
+        yield db
+    finally:
+        db.close()
@@ -0,0 +1,135 @@
+"""
+Connection-pool instrumentation.
+
+Records how long requests wait to check a connection out of the pool, how
+many are in use / in overflow, and which endpoints hold connections longest,
+so pool exhaustion during LLM-heavy requests shows up as numbers instead of
+mystery latency. Exposed through /debug/db/pool.
+"""
+import threading
+import time
+from contextvars import ContextVar
+from typing import Dict, List
+
+from sqlalchemy import event
+from sqlalchemy.pool import QueuePool
+
+# Set per request by the middleware in main.py
+current_endpoint: ContextVar[str] = ContextVar("current_endpoint", default="(background)")
+
+SLOW_HOLDS_KEPT = 10
+WAIT_BUCKETS_MS = (1, 5, 25, 100, 500, 2000)
+
+
+class PoolStats:
+    def __init__(self, name: str):
+        self.name = name
+        self._lock = threading.Lock()
+        self.checkouts = 0
+        self.timeouts = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+        self.wait_histogram = [0] * (len(WAIT_BUCKETS_MS) + 1)
+        self.peak_in_use = 0
+        self.active: Dict[int, tuple] = {}      # id(connection_record) -> (endpoint, since)
+        self.slowest_holds: List[tuple] = []    # (seconds, endpoint, released_at)
+
+    def record_wait(self, seconds: float, timed_out: bool = False):
+        ms = seconds * 1000
+        bucket = next((i for i, b in enumerate(WAIT_BUCKETS_MS) if ms <= b), len(WAIT_BUCKETS_MS))
+        with self._lock:
+            if timed_out:
+                self.timeouts += 1
+            self.total_wait += seconds
+            self.max_wait = max(self.max_wait, seconds)
+            self.wait_histogram[bucket] += 1
+
+    def on_checkout(self, record_id: int, in_use: int):
+        with self._lock:
+            self.checkouts += 1
+            self.peak_in_use = max(self.peak_in_use, in_use)
+            self.active[record_id] = (current_endpoint.get(), time.time())
+
+    def on_checkin(self, record_id: int):
+        with self._lock:
+            held = self.active.pop(record_id, None)
+            if not held:
+                return
+            endpoint, since = held
+            now = time.time()
+            self.slowest_holds.append((now - since, endpoint, now))
+            self.slowest_holds.sort(key=lambda h: h[0], reverse=True)
+            del self.slowest_holds[SLOW_HOLDS_KEPT:]
+
+    def snapshot(self, pool) -> dict:
+        now = time.time()
+        with self._lock:
+            waits = sum(self.wait_histogram)
+            holders = sorted(self.active.values(), key=lambda h: h[1])[:SLOW_HOLDS_KEPT]
+            return {
+                "pool_size": pool.size(),
+                "in_use": pool.checkedout(),
+                "idle": pool.checkedin(),
+                "overflow": max(pool.overflow(), 0),
+                "peak_in_use": self.peak_in_use,
+                "checkouts": self.checkouts,
+                "checkout_timeouts": self.timeouts,
+                "avg_checkout_wait_ms": round(self.total_wait / waits * 1000, 3) if waits else 0.0,
+                "max_checkout_wait_ms": round(self.max_wait * 1000, 3),
+                "checkout_wait_histogram_ms": {
+                    **{f"<={b}": n for b, n in zip(WAIT_BUCKETS_MS, self.wait_histogram)},
+                    f">{WAIT_BUCKETS_MS[-1]}": self.wait_histogram[-1],
+                },
+                "longest_current_holders": [
+                    {"endpoint": ep, "held_ms": round((now - since) * 1000, 1)} for ep, since in holders
+                ],
+                "slowest_recent_holds": [
+                    {"endpoint": ep, "held_ms": round(secs * 1000, 1), "released_at": at}
+                    for secs, ep, at in self.slowest_holds
+                ],
+            }
+
+
+class InstrumentedQueuePool(QueuePool):
+    """QueuePool that times how long each checkout waits for a free connection."""
+
+    stats: PoolStats = None
+
+    def _do_get(self):
+        started = time.perf_counter()
+        try:
+            conn = super()._do_get()
+        except Exception:
+            if self.stats:
+                self.stats.record_wait(time.perf_counter() - started, timed_out=True)
+            raise
+        if self.stats:
+            self.stats.record_wait(time.perf_counter() - started)
+        return conn
+
+
+_instrumented: Dict[str, tuple] = {}
+
+
+def instrument(engine, name: str) -> None:
+    """Attach checkout/checkin hooks to `engine`'s pool and register it for reporting."""
+    if name in _instrumented:
+        return
+    pool = engine.pool
+    stats = PoolStats(name)
+    if isinstance(pool, InstrumentedQueuePool):
+        pool.stats = stats
+
+    @event.listens_for(pool, "checkout")
+    def _on_checkout(dbapi_conn, record, proxy):
+        stats.on_checkout(id(record), pool.checkedout())
+
+    @event.listens_for(pool, "checkin")
+    def _on_checkin(dbapi_conn, record):
+        stats.on_checkin(id(record))
+
+    _instrumented[name] = (pool, stats)
+
+
+def pool_metrics() -> dict:
+    return {name: stats.snapshot(pool) for name, (pool, stats) in _instrumented.items()}
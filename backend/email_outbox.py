@@ -0,0 +1,337 @@
+"""
+Email outbox: requests queue mail, a background sender delivers it.
+
+enqueue() adds an email_outbox row to the caller's session, so the email is
+committed (or rolled back) together with whatever caused it, and the request
+returns without touching SMTP. After the commit a session hook wakes the
+OutboxSender thread, which:
+
+- claims up to OUTBOX_BATCH_SIZE due rows (FOR UPDATE SKIP LOCKED on
+  Postgres, so several workers can run senders side by side) by pushing
+  their next_attempt_at OUTBOX_CLAIM_TIMEOUT ahead; if a sender dies
+  mid-batch its rows simply come due again;
+- sends them over one persistent, authenticated SMTP connection, opened
+  on demand and closed after SMTP_IDLE_TIMEOUT without mail;
+- records the outcome: sent, retried with exponential backoff (transient
+  errors), or failed (permanent 5xx rejections, or OUTBOX_MAX_ATTEMPTS).
+  Either final state blanks the body, so delivered OTP codes don't sit in
+  the table in plaintext.
+
+Between wake-ups it polls every OUTBOX_POLL_INTERVAL seconds for retries
+and for mail queued by other workers. A maintenance job deletes sent and
+failed rows OUTBOX_RETENTION_DAYS after their last attempt.
+/debug/email/outbox shows queue depth and sender counters.
+"""
+import os
+import random
+import smtplib
+import ssl
+import threading
+import time
+from datetime import datetime, timedelta
+from email.message import EmailMessage
+from typing import List, Optional
+
+from sqlalchemy import delete, event, func, update
+from sqlalchemy.orm import Session
+
+import email_utils
+import maintenance
+from database import SessionLocal
+from models import EmailOutbox
+
+OUTBOX_BATCH_SIZE = int(os.getenv("OUTBOX_BATCH_SIZE", "20"))
+OUTBOX_MAX_ATTEMPTS = int(os.getenv("OUTBOX_MAX_ATTEMPTS", "6"))
+OUTBOX_RETRY_BASE = float(os.getenv("OUTBOX_RETRY_BASE", "30"))      # first retry delay, doubles each time
+OUTBOX_RETRY_MAX = float(os.getenv("OUTBOX_RETRY_MAX", "3600"))
+OUTBOX_POLL_INTERVAL = float(os.getenv("OUTBOX_POLL_INTERVAL", "5"))
+OUTBOX_CLAIM_TIMEOUT = float(os.getenv("OUTBOX_CLAIM_TIMEOUT", "120"))
+SMTP_IDLE_TIMEOUT = float(os.getenv("SMTP_IDLE_TIMEOUT", "60"))
+SMTP_TIMEOUT = float(os.getenv("SMTP_TIMEOUT", "20"))
+SMTP_STARTTLS = os.getenv("SMTP_STARTTLS", "true").lower() in ("1", "true", "yes")
+OUTBOX_RETENTION_DAYS = float(os.getenv("OUTBOX_RETENTION_DAYS", "7"))
+OUTBOX_PURGE_INTERVAL = float(os.getenv("OUTBOX_PURGE_INTERVAL", "3600"))
+
+PENDING, SENT, FAILED = "pending", "sent", "failed"
+
+# Set on rows that reached SENT or FAILED: the body is no longer needed
+_BLANK_BODY = {"text_body": "", "html_body": None}
+
+
+def enqueue(db: Session, to_email: str, subject: str, text_body: str,
+            html_body: Optional[str] = None, kind: str = "generic") -> EmailOutbox:
+    """Queue an email in `db`; it is sent once the caller commits."""
+    row = EmailOutbox(
+        kind=kind,
+        to_email=to_email,
+        subject=subject,
+        text_body=text_body,
+        html_body=html_body,
+        status=PENDING,
+        attempts=0,
+        next_attempt_at=datetime.utcnow(),
+    )
+    db.add(row)
+    db.info["outbox_wake"] = True
+    return row
+
+
+def retry_delay(attempts: int) -> float:
+    """Seconds before attempt `attempts + 1`: exponential, capped, with ±20% jitter."""
+    delay = min(OUTBOX_RETRY_MAX, OUTBOX_RETRY_BASE * (2 ** max(0, attempts - 1)))
+    return delay * random.uniform(0.8, 1.2)
+
+
+def is_permanent(error: Exception) -> bool:
+    """5xx rejections of the message or recipient won't succeed on retry."""
+    if isinstance(error, smtplib.SMTPRecipientsRefused):
+        return all(500 <= code < 600 for code, _ in error.recipients.values())
+    if isinstance(error, smtplib.SMTPAuthenticationError):
+        return False  # our credentials, not the message; retry once they're fixed
+    if isinstance(error, smtplib.SMTPResponseException):
+        return 500 <= error.smtp_code < 600
+    return False
+
+
+class SMTPConnection:
+    """One SMTP session reused across messages, reopened when it drops or idles out."""
+
+    def __init__(self):
+        self._smtp: Optional[smtplib.SMTP] = None
+        self._last_used = 0.0
+        self.opened = 0
+
+    def _open(self) -> smtplib.SMTP:
+        smtp = smtplib.SMTP(email_utils.SMTP_SERVER, email_utils.SMTP_PORT, timeout=SMTP_TIMEOUT)
+        try:
+            if SMTP_STARTTLS:
+                smtp.starttls(context=ssl.create_default_context())
+            if email_utils.EMAIL_USER and email_utils.EMAIL_PASSWORD:
+                smtp.login(email_utils.EMAIL_USER, email_utils.EMAIL_PASSWORD)
+        except Exception:
+            smtp.close()
+            raise
+        self.opened += 1
+        return smtp
+
+    def send(self, message: EmailMessage) -> None:
+        self.close_if_idle()
+        reused = self._smtp is not None
+        if self._smtp is None:
+            self._smtp = self._open()
+        try:
+            self._smtp.send_message(message)
+        except smtplib.SMTPServerDisconnected:
+            # The server dropped a kept-alive connection; one retry on a fresh one
+            self.close()
+            if not reused:
+                raise
+            self._smtp = self._open()
+            self._smtp.send_message(message)
+        except (OSError, smtplib.SMTPException) as e:
+            rejected = isinstance(e, (smtplib.SMTPResponseException, smtplib.SMTPRecipientsRefused))
+            if not rejected or isinstance(e, smtplib.SMTPAuthenticationError):
+                self.close()  # the connection itself is suspect; a rejection leaves it usable
+            else:
+                self._last_used = time.monotonic()
+            raise
+        self._last_used = time.monotonic()
+
+    def close_if_idle(self) -> None:
+        if self._smtp is not None and time.monotonic() - self._last_used > SMTP_IDLE_TIMEOUT:
+            self.close()
+
+    def close(self) -> None:
+        if self._smtp is None:
+            return
+        try:
+            self._smtp.quit()
+        except Exception:
+            self._smtp.close()
+        self._smtp = None
+
+    @property
+    def is_open(self) -> bool:
+        return self._smtp is not None
+
+
+def _build_message(row) -> EmailMessage:
+    message = EmailMessage()
+    message["Subject"] = row.subject
+    message["From"] = email_utils.EMAIL_FROM
+    message["To"] = row.to_email
+    message.set_content(row.text_body)
+    if row.html_body:
+        message.add_alternative(row.html_body, subtype="html")
+    return message
+
+
+class OutboxSender:
+    def __init__(self, session_factory=SessionLocal):
+        self.session_factory = session_factory
+        self.smtp = SMTPConnection()
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self.batches = self.sent = self.retried = self.failed = 0
+
+    # ── lifecycle ──
+    def start(self) -> None:
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="email-outbox", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: float = 10) -> None:
+        self._stop.set()
+        self._wake.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+
+    def wake(self) -> None:
+        self._wake.set()
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            try:
+                claimed = self.run_once()
+            except Exception as e:
+                print(f"⚠️ Email outbox batch failed: {e}")
+                claimed = 0
+            if claimed >= OUTBOX_BATCH_SIZE:
+                continue  # more may be waiting
+            self._wake.wait(OUTBOX_POLL_INTERVAL)
+            self._wake.clear()
+            self.smtp.close_if_idle()
+        self.smtp.close()
+
+    # ── one batch ──
+    def _claim(self, db: Session) -> List:
+        now = datetime.utcnow()
+        query = (
+            db.query(EmailOutbox.id, EmailOutbox.to_email, EmailOutbox.subject,
+                     EmailOutbox.text_body, EmailOutbox.html_body, EmailOutbox.attempts)
+            .filter(EmailOutbox.status == PENDING, EmailOutbox.next_attempt_at <= now)
+            .order_by(EmailOutbox.next_attempt_at, EmailOutbox.id)
+            .limit(OUTBOX_BATCH_SIZE)
+        )
+        if db.bind.dialect.name == "postgresql":
+            query = query.with_for_update(skip_locked=True, of=EmailOutbox)
+        rows = query.all()
+        if rows:
+            db.execute(
+                update(EmailOutbox)
+                .where(EmailOutbox.id.in_([r.id for r in rows]))
+                .values(next_attempt_at=now + timedelta(seconds=OUTBOX_CLAIM_TIMEOUT))
+            )
+        db.commit()
+        return rows
+
+    def run_once(self) -> int:
+        """Claim, send and record one batch. Returns how many rows were claimed."""
+        db = self.session_factory()
+        try:
+            rows = self._claim(db)
+            if not rows:
+                return 0
+            results = []
+            deferred_until = None   # set once the connection fails; the rest of the batch waits
+            for row in rows:
+                now = datetime.utcnow()
+                if deferred_until is not None:
+                    results.append({"id": row.id, "next_attempt_at": deferred_until})
+                    continue
+                attempts = row.attempts + 1
+                try:
+                    self.smtp.send(_build_message(row))
+                except Exception as e:
+                    error = f"{type(e).__name__}: {e}"[:1000]
+                    if is_permanent(e) or attempts >= OUTBOX_MAX_ATTEMPTS:
+                        results.append({"id": row.id, "status": FAILED, "attempts": attempts, "last_error": error,
+                                        **_BLANK_BODY})
+                        self.failed += 1
+                        print(f"⚠️ Email {row.id} to {row.to_email} failed permanently: {error}")
+                    else:
+                        retry_at = now + timedelta(seconds=retry_delay(attempts))
+                        results.append({"id": row.id, "attempts": attempts, "last_error": error,
+                                        "next_attempt_at": retry_at})
+                        self.retried += 1
+                        if not self.smtp.is_open:
+                            deferred_until = retry_at
+                    continue
+                results.append({"id": row.id, "status": SENT, "attempts": attempts, "sent_at": now,
+                                "last_error": None, **_BLANK_BODY})
+                self.sent += 1
+            db.execute(update(EmailOutbox), results)
+            db.commit()
+            self.batches += 1
+            return len(rows)
+        finally:
+            db.close()
+
+    def metrics(self) -> dict:
+        return {
+            "running": self._thread is not None and self._thread.is_alive(),
+            "batches": self.batches,
+            "sent": self.sent,
+            "retried": self.retried,
+            "failed": self.failed,
+            "smtp_connections_opened": self.smtp.opened,
+            "smtp_connection_open": self.smtp.is_open,
+        }
+
+
+sender = OutboxSender()
+
+
+def outbox_metrics(db: Session) -> dict:
+    counts = dict(db.query(EmailOutbox.status, func.count(EmailOutbox.id)).group_by(EmailOutbox.status).all())
+    due = (
+        db.query(func.count(EmailOutbox.id))
+        .filter(EmailOutbox.status == PENDING, EmailOutbox.next_attempt_at <= datetime.utcnow())
+        .scalar()
+    )
+    oldest = db.query(func.min(EmailOutbox.created_at)).filter(EmailOutbox.status == PENDING).scalar()
+    return {
+        "by_status": {s: counts.get(s, 0) for s in (PENDING, SENT, FAILED)},
+        "due": due,
+        "oldest_pending": oldest.isoformat() if oldest else None,
+        "sender": sender.metrics(),
+    }
+
+
+def purge_outbox(db: Session) -> int:
+    """Delete sent and failed rows whose last attempt is older than OUTBOX_RETENTION_DAYS."""
+    cutoff = datetime.utcnow() - timedelta(days=OUTBOX_RETENTION_DAYS)
+    # next_attempt_at of a finished row is its last claim, so the claim index serves this
+    return db.execute(
+        delete(EmailOutbox)
+        .where(EmailOutbox.status.in_((SENT, FAILED)), EmailOutbox.next_attempt_at < cutoff)
+    ).rowcount
+
+
+@maintenance.every(OUTBOX_PURGE_INTERVAL, "email_outbox_purge")
+def purge_email_outbox() -> None:
+    db = SessionLocal()
+    try:
+        purged = purge_outbox(db)
+        db.commit()
+        if purged:
+            print(f"EMAIL OUTBOX: purged {purged} finished emails")
+    finally:
+        db.close()
+
+
+# ── Session hooks ────────────────────────────────────────────────────────
+
+@event.listens_for(SessionLocal, "after_commit")
+def _wake_sender(session):
+    if session.info.pop("outbox_wake", False):
+        sender.wake()
+
+
+@event.listens_for(SessionLocal, "after_rollback")
+def _forget_wake(session):
+    session.info.pop("outbox_wake", None)
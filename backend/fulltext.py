@@ -0,0 +1,195 @@
+"""
+Full-text search over candidate profiles (headline, bio, work experience
+descriptions and resume text).
+
+On Postgres, user_profiles carries a generated, weighted `search_vector`
+tsvector column with a GIN index; matches are ranked with ts_rank and
+highlighted with ts_headline. On SQLite (local dev) an FTS5 table kept in
+sync by triggers stands in, ranked with bm25 and highlighted with snippet().
+Both index the same text: for work experience, only the entries'
+descriptions, not the JSON around them.
+
+Matches are capped at MAX_FULLTEXT_MATCHES (ranking past that is noise);
+match_user_ids says when the cap cut a result short.
+
+The column is deliberately not mapped on the UserProfile model so
+metadata.create_all keeps working on SQLite.
+"""
+import re
+from typing import Dict, Iterable, List, Tuple
+
+from sqlalchemy import false, text
+from sqlalchemy.orm import Session
+
+HIGHLIGHT_START = "<mark>"
+HIGHLIGHT_STOP = "</mark>"
+MAX_FULLTEXT_MATCHES = 5000
+
+POSTGRES_DDL = [
+    """
+    ALTER TABLE user_profiles ADD COLUMN IF NOT EXISTS search_vector tsvector
+    GENERATED ALWAYS AS (
+        setweight(to_tsvector('english', coalesce(headline, '')), 'A') ||
+        setweight(to_tsvector('english', coalesce(bio, '')), 'B') ||
+        setweight(to_tsvector('english', coalesce(
+            jsonb_path_query_array(work_experience::jsonb, '$[*].description')::text, '')), 'C') ||
+        setweight(to_tsvector('english', coalesce(resume_text, '')), 'D')
+    ) STORED
+    """,
+    "CREATE INDEX IF NOT EXISTS ix_user_profiles_search_vector ON user_profiles USING GIN (search_vector)",
+]
+
+_FTS_COLUMNS = "headline, bio, work_experience, resume_text"
+
+
+def _sqlite_fts_values(row: str) -> str:
+    # Work experience contributes its descriptions only, like the Postgres
+    # jsonb_path_query_array(work_experience, '$[*].description')
+    descriptions = (
+        f"(SELECT group_concat(json_extract(value, '$.description'), ' ') FROM json_each("
+        f"CASE WHEN json_valid({row}.work_experience) THEN {row}.work_experience ELSE '[]' END))"
+    )
+    return f"{row}.headline, {row}.bio, {descriptions}, {row}.resume_text"
+
+
+# The FTS5 table keeps its own copy of the indexed text (not external
+# content), since that text is derived rather than a user_profiles column
+SQLITE_DDL = [
+    f"""
+    CREATE VIRTUAL TABLE IF NOT EXISTS user_profiles_fts USING fts5(
+        {_FTS_COLUMNS}, tokenize='porter unicode61'
+    )
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS user_profiles_fts_ai AFTER INSERT ON user_profiles BEGIN
+        INSERT INTO user_profiles_fts(rowid, {_FTS_COLUMNS}) VALUES (new.id, {_sqlite_fts_values("new")});
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS user_profiles_fts_ad AFTER DELETE ON user_profiles BEGIN
+        DELETE FROM user_profiles_fts WHERE rowid = old.id;
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS user_profiles_fts_au
+    AFTER UPDATE OF {_FTS_COLUMNS} ON user_profiles BEGIN
+        DELETE FROM user_profiles_fts WHERE rowid = old.id;
+        INSERT INTO user_profiles_fts(rowid, {_FTS_COLUMNS}) VALUES (new.id, {_sqlite_fts_values("new")});
+    END
+    """,
+]
+
+SQLITE_REBUILD = f"""
+    INSERT INTO user_profiles_fts(rowid, {_FTS_COLUMNS})
+    SELECT p.id, {_sqlite_fts_values("p")} FROM user_profiles p
+"""
+
+
+def ensure_fulltext_schema(engine) -> None:
+    """Create the search column/index (Postgres) or FTS5 table (SQLite). Idempotent."""
+    dialect = engine.dialect.name
+    with engine.begin() as conn:
+        if dialect == "postgresql":
+            for ddl in POSTGRES_DDL:
+                conn.execute(text(ddl))
+        elif dialect == "sqlite":
+            existing = conn.execute(text(
+                "SELECT sql FROM sqlite_master WHERE name = 'user_profiles_fts'"
+            )).scalar()
+            if existing and "content=" in existing:
+                # Earlier external-content layout indexed the raw work_experience JSON
+                for trigger in ("ai", "ad", "au"):
+                    conn.execute(text(f"DROP TRIGGER IF EXISTS user_profiles_fts_{trigger}"))
+                conn.execute(text("DROP TABLE user_profiles_fts"))
+                existing = None
+            for ddl in SQLITE_DDL:
+                conn.execute(text(ddl))
+            if not existing:
+                conn.execute(text(SQLITE_REBUILD))
+
+
+def _fts5_query(q: str) -> str:
+    # Quote every term so user input can't inject FTS5 operators; terms are ANDed.
+    terms = re.findall(r"\w+", q.lower())
+    return " ".join(f'"{t}"' for t in terms)
+
+
+def match_user_ids(db: Session, q: str, limit: int = MAX_FULLTEXT_MATCHES) -> Tuple[Dict[int, float], bool]:
+    """
+    ({user_id: rank}, truncated) for visible profiles matching `q`, best
+    first. At most `limit` matches are returned; `truncated` is True when
+    more profiles matched. Higher rank is better on both backends.
+    """
+    if db.bind.dialect.name == "postgresql":
+        rows = db.execute(text("""
+            SELECT p.user_id, ts_rank(p.search_vector, query) AS rank
+            FROM user_profiles p, websearch_to_tsquery('english', :q) query
+            WHERE p.search_vector @@ query AND p.is_visible_to_recruiters
+            ORDER BY rank DESC, p.user_id
+            LIMIT :limit
+        """), {"q": q, "limit": limit + 1}).all()
+    else:
+        match = _fts5_query(q)
+        if not match:
+            return {}, False
+        rows = db.execute(text("""
+            SELECT p.user_id, -bm25(user_profiles_fts, 8.0, 4.0, 2.0, 1.0) AS rank
+            FROM user_profiles_fts
+            JOIN user_profiles p ON p.id = user_profiles_fts.rowid
+            WHERE user_profiles_fts MATCH :q AND p.is_visible_to_recruiters
+            ORDER BY rank DESC, p.user_id
+            LIMIT :limit
+        """), {"q": match, "limit": limit + 1}).all()
+    return {user_id: float(rank) for user_id, rank in rows[:limit]}, len(rows) > limit
+
+
+def match_condition(db: Session, q: str):
+    """
+    WHERE condition on user_profiles for every profile matching `q`, with
+    no cap, for callers that stream all matches instead of ranking them.
+    """
+    if db.bind.dialect.name == "postgresql":
+        return text(
+            "user_profiles.search_vector @@ websearch_to_tsquery('english', :fulltext_q)"
+        ).bindparams(fulltext_q=q)
+    match = _fts5_query(q)
+    if not match:
+        return false()
+    return text(
+        "user_profiles.id IN (SELECT rowid FROM user_profiles_fts WHERE user_profiles_fts MATCH :fulltext_q)"
+    ).bindparams(fulltext_q=match)
+
+
+def highlight_snippets(db: Session, q: str, user_ids: Iterable[int]) -> Dict[int, str]:
+    """Highlighted excerpts for a page of results; only run on the page, it isn't cheap."""
+    user_ids: List[int] = list(user_ids)
+    if not user_ids:
+        return {}
+    if db.bind.dialect.name == "postgresql":
+        rows = db.execute(text(f"""
+            SELECT p.user_id, ts_headline(
+                'english',
+                concat_ws(' … ', p.headline, p.bio,
+                          jsonb_path_query_array(p.work_experience::jsonb, '$[*].description')::text,
+                          p.resume_text),
+                websearch_to_tsquery('english', :q),
+                'StartSel={HIGHLIGHT_START}, StopSel={HIGHLIGHT_STOP}, MaxFragments=2, MaxWords=20, MinWords=8'
+            )
+            FROM user_profiles p
+            WHERE p.user_id = ANY(:ids)
+        """), {"q": q, "ids": user_ids}).all()
+    else:
+        match = _fts5_query(q)
+        if not match:
+            return {}
+        placeholders = ", ".join(f":id{i}" for i in range(len(user_ids)))
+        params = {f"id{i}": uid for i, uid in enumerate(user_ids)}
+        rows = db.execute(text(f"""
+            SELECT p.user_id,
+                   snippet(user_profiles_fts, -1, '{HIGHLIGHT_START}', '{HIGHLIGHT_STOP}', '…', 16)
+            FROM user_profiles_fts
+            JOIN user_profiles p ON p.id = user_profiles_fts.rowid
+            WHERE user_profiles_fts MATCH :q AND p.user_id IN ({placeholders})
+        """), {"q": match, **params}).all()
+    return {user_id: snippet for user_id, snippet in rows}
+
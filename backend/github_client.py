@@ -0,0 +1,167 @@
+"""
+Async GitHub API client for profile scoring.
+
+One pooled httpx.AsyncClient per event loop, so rescoring reuses the
+keep-alive connection. Without a token the profile and repo list are
+fetched concurrently over REST, and every response is cached with its ETag:
+a rescore revalidates with If-None-Match and a 304 (which GitHub doesn't
+count against the 60/h unauthenticated quota) serves the cached body.
+
+With GITHUB_TOKEN set, a single GraphQL query fetches both and its result is
+mapped onto the REST field names, so callers never see the difference.
+
+GITHUB_API_URL points the client elsewhere (e.g. a local stub server, as in
+tests/unit/test_github_client.py).
+"""
+import asyncio
+import os
+from typing import Any, Dict, List, Optional, Tuple
+
+import httpx
+
+from cache import cache
+
+GITHUB_API_URL = os.getenv("GITHUB_API_URL", "https://api.github.com").rstrip("/")
+GITHUB_TOKEN = os.getenv("GITHUB_TOKEN")
+GITHUB_TIMEOUT = float(os.getenv("GITHUB_TIMEOUT", "10"))
+RECENT_REPOS = 10
+
+# Cached bodies only matter while their ETag is still current; a day bounds
+# memory for users who never rescore.
+ETAG_CACHE_TTL = 24 * 3600
+
+USER_QUERY = """
+query($login: String!, $repos: Int!) {
+  user(login: $login) {
+    login name bio company createdAt updatedAt
+    followers { totalCount }
+    following { totalCount }
+    repositories(first: $repos, privacy: PUBLIC, ownerAffiliations: OWNER,
+                 orderBy: {field: PUSHED_AT, direction: DESC}) {
+      totalCount
+      nodes {
+        name description isFork pushedAt diskUsage stargazerCount forkCount
+        primaryLanguage { name }
+      }
+    }
+  }
+}
+"""
+
+
+class GitHubError(Exception):
+    def __init__(self, status_code: int, detail: str):
+        super().__init__(detail)
+        self.status_code = status_code
+        self.detail = detail
+
+
+_client: Optional[httpx.AsyncClient] = None
+_client_loop: Optional[asyncio.AbstractEventLoop] = None
+
+
+def _get_client() -> httpx.AsyncClient:
+    """The shared client for the running event loop (httpx clients are loop-bound)."""
+    global _client, _client_loop
+    loop = asyncio.get_running_loop()
+    if _client is None or _client_loop is not loop or _client.is_closed:
+        headers = {"Accept": "application/vnd.github+json", "User-Agent": "ai-interviewer"}
+        if GITHUB_TOKEN:
+            headers["Authorization"] = f"Bearer {GITHUB_TOKEN}"
+        _client = httpx.AsyncClient(
+            base_url=GITHUB_API_URL,
+            headers=headers,
+            timeout=GITHUB_TIMEOUT,
+            limits=httpx.Limits(max_connections=20, max_keepalive_connections=10),
+        )
+        _client_loop = loop
+    return _client
+
+
+async def close_client() -> None:
+    global _client
+    if _client is not None:
+        await _client.aclose()
+        _client = None
+
+
+async def _get_json(path: str, params: Optional[Dict[str, Any]] = None) -> Tuple[int, Any]:
+    """GET with ETag revalidation. Returns (status, body); a 304 is reported as 200."""
+    key = f"github:{path}?{sorted((params or {}).items())}"
+    cached = cache.get(key)
+    headers = {"If-None-Match": cached[0]} if cached else {}
+    resp = await _get_client().get(path, params=params, headers=headers)
+    if resp.status_code == 304 and cached:
+        cache.set(key, cached, ttl=ETAG_CACHE_TTL)
+        return 200, cached[1]
+    if resp.status_code != 200:
+        return resp.status_code, None
+    body = resp.json()
+    etag = resp.headers.get("etag")
+    if etag:
+        cache.set(key, (etag, body), ttl=ETAG_CACHE_TTL)
+    return 200, body
+
+
+async def _fetch_rest(username: str) -> Tuple[dict, List[dict]]:
+    (user_status, user), (repos_status, repos) = await asyncio.gather(
+        _get_json(f"/users/{username}"),
+        _get_json(f"/users/{username}/repos", {"sort": "pushed", "per_page": RECENT_REPOS}),
+    )
+    if user_status == 404:
+        raise GitHubError(404, f"GitHub user '{username}' not found")
+    if user_status != 200:
+        raise GitHubError(502, f"GitHub API error {user_status}")
+    return user, repos if repos_status == 200 else []
+
+
+async def _fetch_graphql(username: str) -> Tuple[dict, List[dict]]:
+    resp = await _get_client().post(
+        "/graphql", json={"query": USER_QUERY, "variables": {"login": username, "repos": RECENT_REPOS}},
+    )
+    if resp.status_code != 200:
+        raise GitHubError(502, f"GitHub API error {resp.status_code}")
+    payload = resp.json()
+    user = (payload.get("data") or {}).get("user")
+    if user is None:
+        if any(e.get("type") == "NOT_FOUND" for e in payload.get("errors") or []):
+            raise GitHubError(404, f"GitHub user '{username}' not found")
+        detail = "; ".join(e.get("message", "") for e in payload.get("errors") or [] if e.get("message"))
+        raise GitHubError(502, f"GitHub API error: {detail or 'empty response'}")
+
+    repositories = user.get("repositories") or {}
+    profile = {
+        "login": user.get("login"),
+        "name": user.get("name"),
+        "bio": user.get("bio"),
+        "company": user.get("company"),
+        "public_repos": repositories.get("totalCount"),
+        "followers": (user.get("followers") or {}).get("totalCount"),
+        "following": (user.get("following") or {}).get("totalCount"),
+        "created_at": user.get("createdAt"),
+        "updated_at": user.get("updatedAt"),
+    }
+    repos = [
+        {
+            "name": r.get("name"),
+            "description": r.get("description"),
+            "language": (r.get("primaryLanguage") or {}).get("name"),
+            "stargazers_count": r.get("stargazerCount"),
+            "forks_count": r.get("forkCount"),
+            "fork": r.get("isFork"),
+            "pushed_at": r.get("pushedAt"),
+            "size": r.get("diskUsage"),
+        }
+        for r in repositories.get("nodes") or []
+    ]
+    return profile, repos
+
+
+async def fetch_profile(username: str) -> Tuple[dict, List[dict]]:
+    """(profile, most recently pushed repos) in REST field names; raises GitHubError."""
+    try:
+        if GITHUB_TOKEN:
+            return await _fetch_graphql(username)
+        return await _fetch_rest(username)
+    except httpx.HTTPError as e:
+        raise GitHubError(502, f"GitHub API unreachable: {e}")
@@ -0,0 +1,152 @@
+"""
+Google ID token verification against cached signing certificates.
+
+google.oauth2.id_token.verify_oauth2_token downloads Google's certificates on
+every call. Here they are fetched through one pooled requests.Session and
+kept for as long as Google's Cache-Control max-age allows (minus Age), so a
+sign-in is a local signature check:
+
+- shortly before expiry (REFRESH_AHEAD seconds) the next caller triggers a
+  refresh on a background thread and keeps using the current certificates;
+- once expired, callers wait for a single refresh (concurrent callers share it);
+- a token signed with a key id we don't have (Google rotated keys) forces a
+  refresh, at most once per MIN_REFRESH_INTERVAL so junk tokens can't make
+  us hammer Google.
+
+GOOGLE_CERTS_URL points elsewhere for local testing.
+"""
+import json
+import os
+import re
+import threading
+import time
+from typing import Dict, Mapping, Optional
+
+import requests
+from google.auth import jwt as google_jwt
+from jose import jwt as jose_jwt
+from jose.exceptions import JWTError
+
+GOOGLE_CERTS_URL = os.getenv("GOOGLE_CERTS_URL", "https://www.googleapis.com/oauth2/v1/certs")
+GOOGLE_ISSUERS = ("accounts.google.com", "https://accounts.google.com")
+DEFAULT_MAX_AGE = 3600          # when the response carries no usable Cache-Control
+REFRESH_AHEAD = 300             # refresh in the background this long before expiry
+MIN_REFRESH_INTERVAL = 30       # cap on refreshes forced by unknown key ids
+FETCH_TIMEOUT = 5
+CLOCK_SKEW = 10
+
+_MAX_AGE_RE = re.compile(r"max-age=(\d+)")
+
+
+def _max_age(headers: Mapping[str, str]) -> int:
+    match = _MAX_AGE_RE.search(headers.get("Cache-Control", ""))
+    if not match:
+        return DEFAULT_MAX_AGE
+    try:
+        age = int(headers.get("Age", "0"))
+    except ValueError:
+        age = 0
+    return max(0, int(match.group(1)) - age)
+
+
+class GoogleCertCache:
+    def __init__(self, url: str = GOOGLE_CERTS_URL):
+        self.url = url
+        self._session = requests.Session()
+        self._certs: Dict[str, str] = {}
+        self._expires_at = 0.0
+        self._fetched_at = 0.0
+        self._lock = threading.Lock()          # one fetch at a time
+        self._background_lock = threading.Lock()
+        self._background: Optional[threading.Thread] = None
+        self.fetches = 0
+
+    def _fetch(self) -> None:
+        resp = self._session.get(self.url, timeout=FETCH_TIMEOUT)
+        resp.raise_for_status()
+        certs = resp.json()
+        if not isinstance(certs, dict) or not certs:
+            raise ValueError("Unexpected certificate response from Google")
+        now = time.monotonic()
+        self._certs = certs
+        self._fetched_at = now
+        self._expires_at = now + _max_age(resp.headers)
+        self.fetches += 1
+
+    def _refresh(self, force: bool = False) -> None:
+        started = time.monotonic()
+        with self._lock:
+            # Someone else refreshed while we waited for the lock
+            if self._fetched_at >= started or (not force and self._expires_at > time.monotonic()):
+                return
+            self._fetch()
+
+    def _refresh_in_background(self) -> None:
+        def run():
+            try:
+                self._refresh(force=True)
+            except Exception as e:
+                print(f"⚠️ Background Google certificate refresh failed: {e}")
+
+        with self._background_lock:
+            if self._background is not None and self._background.is_alive():
+                return
+            self._background = threading.Thread(target=run, name="google-certs-refresh", daemon=True)
+            self._background.start()
+
+    def certs(self) -> Dict[str, str]:
+        now = time.monotonic()
+        if now >= self._expires_at:
+            self._refresh()
+        elif now >= self._expires_at - REFRESH_AHEAD:
+            self._refresh_in_background()
+        return self._certs
+
+    def certs_for(self, kid: Optional[str]) -> Dict[str, str]:
+        """Current certificates, refreshed first if `kid` is one we haven't seen (key rotation)."""
+        certs = self.certs()
+        if kid and kid not in certs and time.monotonic() - self._fetched_at >= MIN_REFRESH_INTERVAL:
+            self._refresh(force=True)
+            certs = self._certs
+        return certs
+
+    def warm(self) -> None:
+        """Fetch in the background so the first sign-in doesn't wait on Google."""
+        if not self._certs:
+            self._refresh_in_background()
+
+    def metrics(self) -> dict:
+        return {
+            "url": self.url,
+            "keys": sorted(self._certs),
+            "fetches": self.fetches,
+            "expires_in_seconds": round(max(0.0, self._expires_at - time.monotonic()), 1),
+        }
+
+    def clear(self) -> None:
+        with self._lock:
+            self._certs = {}
+            self._expires_at = self._fetched_at = 0.0
+
+
+cert_cache = GoogleCertCache()
+
+
+def verify_id_token(token: str, audience: Optional[str]) -> dict:
+    """
+    Verify a Google ID token's signature, expiry, audience and issuer.
+    Raises ValueError on any failure (as verify_oauth2_token does).
+    """
+    try:
+        kid = jose_jwt.get_unverified_header(token).get("kid")
+    except JWTError as e:
+        raise ValueError(f"Malformed token: {e}")
+    try:
+        certs = cert_cache.certs_for(kid)
+    except (requests.RequestException, json.JSONDecodeError) as e:
+        raise ValueError(f"Could not fetch Google certificates: {e}")
+
+    claims = google_jwt.decode(token, certs=certs, audience=audience, clock_skew_in_seconds=CLOCK_SKEW)
+    if claims.get("iss") not in GOOGLE_ISSUERS:
+        raise ValueError("Wrong issuer.")
+    return claims
@@ -0,0 +1,65 @@
+"""
+Sparse fieldsets and conditional GETs for read endpoints.
+
+`?fields=a,b` narrows a response to the named top-level keys; endpoints map
+those keys to the columns they need and load only those (SQLAlchemy
+load_only), so a header card never pulls resume_text or a message history.
+
+Responses carry a weak ETag derived from the row's updated_at (plus whatever
+else the representation depends on, and the fieldset). Clients that send it
+back in If-None-Match get an empty 304. Responses are marked
+`Cache-Control: private, no-cache`, so browsers keep them and revalidate on
+every load without any frontend changes.
+"""
+import hashlib
+from typing import Any, Iterable, Optional, Set
+
+from fastapi import HTTPException, Request, Response
+
+CACHE_CONTROL = "private, no-cache"
+
+
+def parse_fields(fields: Optional[str], allowed: Iterable[str]) -> Optional[Set[str]]:
+    """Requested field names, or None for the full representation. Raises 400 on unknown names."""
+    if fields is None:
+        return None
+    requested = {f.strip() for f in fields.split(",") if f.strip()}
+    unknown = requested.difference(allowed)
+    if unknown:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Unknown fields: {', '.join(sorted(unknown))}. Allowed: {', '.join(allowed)}",
+        )
+    return requested
+
+
+def weak_etag(*parts: Any, fields: Optional[Set[str]] = None) -> str:
+    """W/"..." over the validator parts and the fieldset."""
+    raw = "|".join(str(p) for p in parts)
+    if fields is not None:
+        raw += "|fields=" + ",".join(sorted(fields))
+    return 'W/"' + hashlib.sha1(raw.encode()).hexdigest()[:20] + '"'
+
+
+def _opaque(tag: str) -> str:
+    tag = tag.strip()
+    return tag[2:] if tag.startswith("W/") else tag
+
+
+def not_modified(request: Request, etag: str) -> Optional[Response]:
+    """A 304 if If-None-Match matches `etag` (weak comparison), else None."""
+    header = request.headers.get("if-none-match")
+    if not header:
+        return None
+    if header.strip() == "*" or _opaque(etag) in {_opaque(t) for t in header.split(",")}:
+        return Response(status_code=304, headers={"ETag": etag, "Cache-Control": CACHE_CONTROL})
+    return None
+
+
+def set_validators(response: Response, etag: str) -> None:
+    response.headers["ETag"] = etag
+    response.headers["Cache-Control"] = CACHE_CONTROL
+
+
+def select_fields(data: dict, fields: Optional[Set[str]]) -> dict:
+    return data if fields is None else {k: v for k, v in data.items() if k in fields}
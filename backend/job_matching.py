@@ -0,0 +1,248 @@
+"""
+Job-to-candidate matching for GET /company/jobs/{id}/matches.
+
+Every recruiter-visible candidate is a row in a columnar snapshot derived
+from the search index (search_index.py) and the candidate_performance
+summaries (performance.py): experience, profile score and rolling-mean
+interview dimension scores as NumPy arrays, plus one boolean column per skill,
+materialized the first time a posting asks for that skill. A posting is scored
+against all candidates in one vectorized pass and the top-k are returned.
+
+A posting's required skills are its canonical ids (JobPosting.required_skill_ids,
+normalized when the posting was written) plus normalized strings for the
+skills outside the vocabulary. Location fit is 1 for a candidate in the
+posting's location, 0.5 for one without a location and 0 otherwise; remote
+postings and postings without a location fit everyone.
+
+Results are cached per posting. The cache entry is stamped with the search
+index version, the state of the candidate_performance table (row count and
+latest updated_at, read from the database so every worker agrees) and a
+fingerprint of the posting, so any profile change, newly completed interview
+or posting edit misses.
+"""
+import threading
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+
+from cache import cache
+from models import CandidatePerformance, JobPosting
+from search_index import CandidateDoc, get_candidate_index
+from skill_vocabulary import SkillKey, skill_key, skill_name
+
+WEIGHTS = {"skills": 0.40, "experience": 0.20, "interview": 0.20, "profile": 0.10, "location": 0.10}
+SCORE_DIMENSIONS = (
+    "score_technical", "score_communication", "score_leadership",
+    "score_critical_thinking", "score_decision_making", "score_project_knowledge",
+)
+EXPERIENCE_SLACK_YEARS = 3.0    # fit falls to 0 this far below the minimum
+UNKNOWN_LOCATION_FIT = 0.5      # candidates who haven't said where they are
+MATCH_CACHE_TTL = 600
+DEFAULT_TOP_K = 20
+MAX_TOP_K = 100
+
+
+class MatchSnapshot:
+    def __init__(self, key: tuple, docs: List[CandidateDoc], interview: Dict[int, Tuple[float, ...]]):
+        n = len(docs)
+        self.key = key
+        self.docs = docs
+        self.user_ids = np.fromiter((d.user_id for d in docs), np.int64, n)
+        self.experience = np.fromiter((d.experience_years or 0.0 for d in docs), np.float32, n)
+        self.profile = np.fromiter(
+            (d.profile_score if d.profile_score is not None else 0.0 for d in docs), np.float32, n
+        ) / 10.0
+
+        dims = np.full((n, len(SCORE_DIMENSIONS)), np.nan, np.float32)
+        for row, doc in enumerate(docs):
+            scores = interview.get(doc.user_id)
+            if scores:
+                dims[row] = scores
+        self.dimensions = dims
+        has_any = ~np.isnan(dims).all(axis=1)
+        mean = np.zeros(n, np.float32)
+        mean[has_any] = np.nanmean(dims[has_any], axis=1)
+        self.interview = mean / 10.0
+
+        self._skill_columns: Dict[SkillKey, np.ndarray] = {}
+        self._location_columns: Dict[str, np.ndarray] = {}
+        self._lock = threading.Lock()
+
+    def skill_column(self, key: SkillKey) -> np.ndarray:
+        col = self._skill_columns.get(key)
+        if col is None:
+            with self._lock:
+                col = self._skill_columns.get(key)
+                if col is None:
+                    col = np.fromiter((key in d.skill_keys for d in self.docs), np.bool_, len(self.docs))
+                    self._skill_columns[key] = col
+        return col
+
+    def location_column(self, location: str) -> np.ndarray:
+        needle = location.lower()
+        col = self._location_columns.get(needle)
+        if col is None:
+            with self._lock:
+                col = self._location_columns.get(needle)
+                if col is None:
+                    col = np.fromiter(
+                        (1.0 if needle in d.location_value else UNKNOWN_LOCATION_FIT if not d.location_value else 0.0
+                         for d in self.docs),
+                        np.float32, len(self.docs),
+                    )
+                    self._location_columns[needle] = col
+        return col
+
+    def rank(self, keys: List[SkillKey], experience_min: Optional[float],
+             experience_max: Optional[float], location: Optional[str], top_k: int) -> List[dict]:
+        n = len(self.docs)
+        if not n:
+            return []
+
+        if keys:
+            overlap = np.zeros(n, np.float32)
+            for key in keys:
+                overlap += self.skill_column(key)
+            skill_fit = overlap / len(keys)
+        else:
+            overlap = None
+            skill_fit = np.ones(n, np.float32)
+
+        shortfall = np.clip(((experience_min or 0.0) - self.experience) / EXPERIENCE_SLACK_YEARS, 0, 1)
+        experience_fit = 1.0 - shortfall
+        if experience_max is not None:
+            # Overqualified candidates are penalized, but half as hard
+            excess = np.clip((self.experience - experience_max) / (2 * EXPERIENCE_SLACK_YEARS), 0, 1)
+            experience_fit -= 0.5 * excess
+
+        location_fit = self.location_column(location) if location else np.ones(n, np.float32)
+
+        total = (
+            WEIGHTS["skills"] * skill_fit
+            + WEIGHTS["experience"] * experience_fit
+            + WEIGHTS["interview"] * self.interview
+            + WEIGHTS["profile"] * self.profile
+            + WEIGHTS["location"] * location_fit
+        )
+        if overlap is not None:
+            total = np.where(overlap > 0, total, -np.inf)
+
+        eligible = int(np.isfinite(total).sum())
+        k = min(top_k, eligible)
+        if not k:
+            return []
+        rows = np.argpartition(-total, k - 1)[:k]
+        rows = rows[np.lexsort((self.user_ids[rows], -total[rows]))]
+
+        results = []
+        for row in rows.tolist():
+            doc = self.docs[row]
+            dims = self.dimensions[row]
+            results.append({
+                "user_id": doc.user_id,
+                "full_name": doc.full_name,
+                "headline": doc.headline,
+                "location": doc.location,
+                "experience_years": doc.experience_years,
+                "skills": doc.skills[:10],
+                "matched_skills": [
+                    skill_name(k) if isinstance(k, int) else k for k in keys if k in doc.skill_keys
+                ],
+                "profile_score": doc.profile_score,
+                "match_score": round(float(total[row]) * 100, 1),
+                "breakdown": {
+                    "skills": round(float(skill_fit[row]) * 100, 1),
+                    "experience": round(float(experience_fit[row]) * 100, 1),
+                    "interview": round(float(self.interview[row]) * 100, 1),
+                    "profile": round(float(self.profile[row]) * 100, 1),
+                    "location": round(float(location_fit[row]) * 100, 1),
+                },
+                "interview_scores": {
+                    dim.replace("score_", ""): (None if np.isnan(v) else round(float(v), 2))
+                    for dim, v in zip(SCORE_DIMENSIONS, dims.tolist())
+                },
+            })
+        return results
+
+
+# ── Snapshot management ──────────────────────────────────────────────────
+
+_snapshot: Optional[MatchSnapshot] = None
+_snapshot_lock = threading.Lock()
+_interview_scores: Tuple[tuple, Dict[int, Tuple[float, ...]]] = ((), {})
+
+
+def _load_interview_scores(db: Session) -> Dict[int, Tuple[float, ...]]:
+    """Rolling mean of each score dimension, from the candidate_performance summaries."""
+    columns = [getattr(CandidatePerformance, f"mean_{dim.replace('score_', '')}") for dim in SCORE_DIMENSIONS]
+    rows = db.query(CandidatePerformance.user_id, *columns).all()
+    return {
+        row[0]: tuple(float(v) if v is not None else np.nan for v in row[1:])
+        for row in rows
+    }
+
+
+def _interview_version(db: Session) -> tuple:
+    """
+    Changes whenever a summary is added, updated or deleted, in any worker:
+    every write goes through the ORM, which bumps updated_at.
+    """
+    count, updated = db.query(
+        func.count(CandidatePerformance.user_id), func.max(CandidatePerformance.updated_at)
+    ).one()
+    return (count, updated.isoformat() if updated else None)
+
+
+def _current_key(db: Session) -> tuple:
+    index = get_candidate_index()
+    return (id(index), index.version, _interview_version(db))
+
+
+def get_snapshot(db: Session, interview_version: Optional[tuple] = None) -> MatchSnapshot:
+    global _snapshot, _interview_scores
+    index = get_candidate_index()
+    if interview_version is None:
+        interview_version = _interview_version(db)
+    with _snapshot_lock:
+        version, docs = index.snapshot()
+        key = (id(index), version, interview_version)
+        if _snapshot is not None and _snapshot.key == key:
+            return _snapshot
+        if _interview_scores[0] != interview_version:
+            _interview_scores = (interview_version, _load_interview_scores(db))
+        _snapshot = MatchSnapshot(key, docs, _interview_scores[1])
+        return _snapshot
+
+
+def posting_skill_keys(job: JobPosting) -> List[SkillKey]:
+    """The posting's canonical ids, then normalized strings for skills outside the vocabulary."""
+    if job.required_skill_ids is None:
+        # Written before canonical ids existed and not yet backfilled
+        return list(dict.fromkeys(k for k in map(skill_key, job.required_skills or []) if k != ""))
+    unknown = (skill_key(s) for s in job.required_skills or [])
+    return list(dict.fromkeys([*job.required_skill_ids, *(k for k in unknown if isinstance(k, str) and k)]))
+
+
+def _posting_fingerprint(job: JobPosting) -> tuple:
+    return (
+        tuple(job.required_skills or []), tuple(job.required_skill_ids or []),
+        job.experience_min, job.experience_max, job.location, job.is_remote,
+    )
+
+
+def match_candidates(job: JobPosting, db: Session, top_k: int = DEFAULT_TOP_K) -> List[dict]:
+    top_k = min(max(top_k, 1), MAX_TOP_K)
+    cache_key = f"job_matches:{job.id}:{top_k}"
+    current = _current_key(db)
+    stamp = (current, _posting_fingerprint(job))
+    cached = cache.get(cache_key)
+    if cached is not None and cached[0] == stamp:
+        return cached[1]
+
+    snapshot = get_snapshot(db, interview_version=current[2])
+    location = None if job.is_remote else (job.location or "").strip() or None
+    results = snapshot.rank(posting_skill_keys(job), job.experience_min, job.experience_max, location, top_k)
+    cache.set(cache_key, ((snapshot.key, stamp[1]), results), ttl=MATCH_CACHE_TTL)
+    return results
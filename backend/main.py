@@ -16,6 +16,7 @@ if current_dir not in sys.path:
 
 # Initialize database before importing routers
 from database import Base, engine
+from db_metrics import current_endpoint, pool_metrics
 from sqlalchemy import text
 
 # Run ADD COLUMN IF NOT EXISTS on every startup to ensure production DB is up to date
@@ -28,6 +29,7 @@ def _patch_db():
         ("user_profiles", "target_roles",            "JSON"),
         ("user_profiles", "experience_years",        "FLOAT DEFAULT 0"),
         ("user_profiles", "skills",                  "JSON"),
+        ("user_profiles", "skill_ids",               "JSON"),
         ("user_profiles", "work_experience",         "JSON"),
         ("user_profiles", "education",               "JSON"),
         ("user_profiles", "projects",                "JSON"),
@@ -47,6 +49,7 @@ def _patch_db():
         ("user_profiles", "last_active_date",        "DATE"),
         ("user_profiles", "daily_activity",          "JSON"),
         ("user_profiles", "resume_score_breakdown",  "JSON"),
+        ("user_profiles", "resume_score_hash",       "VARCHAR(64)"),
         ("user_profiles", "github_score_breakdown",  "JSON"),
         ("user_profiles", "linkedin_score_breakdown","JSON"),
         ("user_profiles", "resume_feedback",         "TEXT"),
@@ -55,6 +58,7 @@ def _patch_db():
         ("user_profiles", "created_at",              "TIMESTAMP DEFAULT now()"),
         ("user_profiles", "updated_at",              "TIMESTAMP DEFAULT now()"),
         ("users",         "credits",                 "INTEGER DEFAULT 20"),
+        ("job_postings",  "required_skill_ids",      "JSON"),
         ("interview_sessions", "plan_type",              "VARCHAR DEFAULT 'normal'"),
         ("interview_sessions", "credits_used",           "INTEGER DEFAULT 0"),
         ("interview_sessions", "score_technical",        "FLOAT"),
@@ -77,6 +81,13 @@ def _patch_db():
 
 _patch_db()
 
+# Full-text search column + GIN index (Postgres) or FTS5 table (SQLite)
+try:
+    from fulltext import ensure_fulltext_schema
+    ensure_fulltext_schema(engine)
+except Exception as e:
+    print(f"⚠️  Full-text schema warning: {e}")
+
 # Import the routers after database initialization
 from api.interview import router as interview_router
 from api.auth import router as auth_router
@@ -134,8 +145,18 @@ app.add_middleware(
     allow_credentials=True,  # Enable credentials for OAuth
     allow_methods=["GET", "POST", "PUT", "DELETE", "OPTIONS"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor"],
 )
 
+# Tag pool checkouts with the endpoint holding them (see /debug/db/pool)
+@app.middleware("http")
+async def track_db_endpoint(request: Request, call_next):
+    token = current_endpoint.set(f"{request.method} {request.url.path}")
+    try:
+        return await call_next(request)
+    finally:
+        current_endpoint.reset(token)
+
 # Add security headers middleware
 @app.middleware("http")
 async def add_security_headers(request: Request, call_next):
@@ -173,6 +194,51 @@ if _has_tts:
 if _has_voice:
     app.include_router(voice_router)
 
+# Build the recruiter search index before the first search needs it
+@app.on_event("startup")
+async def warm_search_index():
+    from search_index import warm_candidate_index
+    warm_candidate_index()
+
+# Have Google's signing certificates on hand before the first Google sign-in
+@app.on_event("startup")
+async def warm_google_certs():
+    if os.getenv("GOOGLE_CLIENT_ID"):
+        from google_certs import cert_cache
+        cert_cache.warm()
+
+# Deliver queued email (password reset OTPs, confirmations) in the background
+@app.on_event("startup")
+async def start_email_outbox():
+    from email_outbox import sender
+    sender.start()
+
+@app.on_event("shutdown")
+async def stop_email_outbox():
+    from email_outbox import sender
+    sender.stop()
+
+# Periodic jobs (admin dashboard snapshot, ...) on one background thread
+@app.on_event("startup")
+async def start_maintenance():
+    from maintenance import scheduler
+    scheduler.start()
+
+@app.on_event("shutdown")
+async def stop_maintenance():
+    from maintenance import scheduler
+    scheduler.stop()
+
+@app.on_event("shutdown")
+async def close_github_client():
+    from github_client import close_client
+    await close_client()
+
+@app.on_event("shutdown")
+async def stop_password_pool():
+    from passwords import shutdown
+    shutdown()
+
 # Basic routes
 @app.get("/")
 async def root():
@@ -214,6 +280,52 @@ async def debug_database():
             "error_type": type(e).__name__
         }
 
+@app.get("/debug/db/pool")
+async def debug_database_pool():
+    """Connection-pool metrics: checkout waits, usage, overflow and longest holders."""
+    return pool_metrics()
+
+@app.get("/debug/search/cache")
+async def debug_search_cache():
+    """Recruiter search result cache: hits, misses, hit rate and invalidations."""
+    from search_index import search_cache_metrics
+    return search_cache_metrics()
+
+@app.get("/debug/auth/snapshots")
+async def debug_user_snapshots():
+    """Authenticated-user snapshot cache: size, hits, misses and invalidations."""
+    from user_snapshot import snapshots
+    return snapshots.metrics()
+
+@app.get("/debug/auth/google-certs")
+async def debug_google_certs():
+    """Cached Google sign-in certificates: key ids, fetch count and time to expiry."""
+    from google_certs import cert_cache
+    return cert_cache.metrics()
+
+@app.get("/debug/auth/rate-limits")
+async def debug_rate_limits():
+    """Auth rate limiting: configured buckets and allowed/rejected counts per scope."""
+    from rate_limit import rate_limit_metrics
+    return rate_limit_metrics()
+
+@app.get("/debug/email/outbox")
+async def debug_email_outbox():
+    """Email outbox: rows by status, due now, oldest pending, and sender counters."""
+    from database import SessionLocal
+    from email_outbox import outbox_metrics
+    db = SessionLocal()
+    try:
+        return outbox_metrics(db)
+    finally:
+        db.close()
+
+@app.get("/debug/maintenance")
+async def debug_maintenance():
+    """Periodic background jobs: interval, run count, last run, duration and error."""
+    from maintenance import scheduler
+    return scheduler.metrics()
+
 # Temporary basic routes for testing
 @app.get("/api/test")
 async def test_endpoint():
@@ -0,0 +1,111 @@
+"""
+Periodic background jobs for this worker.
+
+Some work is too heavy for a request but fine on a timer, e.g. the admin
+dashboard aggregates. Modules register a job with @every(seconds, name); one
+daemon thread, started and stopped from main.py, runs each job when it comes
+due (the first run right at start-up). A job that raises is logged and tried
+again at its next interval, so one failing job never stops the others.
+
+run_now(name) makes a job due immediately; /debug/maintenance shows when each
+job last ran, how long it took and its last error.
+"""
+import threading
+import time
+from typing import Callable, Dict, Optional
+
+MAINTENANCE_TICK = 1.0   # seconds between checks for due jobs
+
+
+class Job:
+    def __init__(self, name: str, interval: float, fn: Callable[[], None]):
+        self.name = name
+        self.interval = interval
+        self.fn = fn
+        self.next_run = 0.0          # monotonic; 0 = due at start-up
+        self.runs = 0
+        self.last_run: Optional[float] = None
+        self.last_duration_ms: Optional[float] = None
+        self.last_error: Optional[str] = None
+
+    def run(self) -> None:
+        started = time.monotonic()
+        try:
+            self.fn()
+            self.last_error = None
+        except Exception as e:
+            self.last_error = f"{type(e).__name__}: {e}"
+            print(f"⚠️ Maintenance job {self.name} failed: {e}")
+        finally:
+            self.runs += 1
+            self.last_run = time.time()
+            self.last_duration_ms = round((time.monotonic() - started) * 1000, 1)
+            self.next_run = time.monotonic() + self.interval
+
+
+class Scheduler:
+    def __init__(self):
+        self.jobs: Dict[str, Job] = {}
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def every(self, seconds: float, name: str):
+        """Decorator registering `fn` to run every `seconds` in the background."""
+        def decorator(fn: Callable[[], None]) -> Callable[[], None]:
+            self.jobs[name] = Job(name, seconds, fn)
+            return fn
+        return decorator
+
+    # ── lifecycle ──
+    def start(self) -> None:
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="maintenance", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: float = 10) -> None:
+        self._stop.set()
+        self._wake.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+
+    def run_now(self, name: str) -> None:
+        """Make `name` due at once; the background thread picks it up."""
+        self.jobs[name].next_run = 0.0
+        self._wake.set()
+
+    def run_pending(self) -> int:
+        """Run every due job in this thread. Returns how many ran."""
+        due = [job for job in list(self.jobs.values()) if job.next_run <= time.monotonic()]
+        for job in due:
+            job.run()
+        return len(due)
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            self.run_pending()
+            self._wake.wait(MAINTENANCE_TICK)
+            self._wake.clear()
+
+    def metrics(self) -> dict:
+        return {
+            "running": self._thread is not None and self._thread.is_alive(),
+            "jobs": {
+                job.name: {
+                    "interval_s": job.interval,
+                    "runs": job.runs,
+                    "last_run": job.last_run,
+                    "last_duration_ms": job.last_duration_ms,
+                    "last_error": job.last_error,
+                }
+                for job in self.jobs.values()
+            },
+        }
+
+
+scheduler = Scheduler()
+every = scheduler.every
+run_now = scheduler.run_now
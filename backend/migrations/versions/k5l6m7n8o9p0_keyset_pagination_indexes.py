@@ -0,0 +1,48 @@
+"""Composite indexes for keyset pagination on (created_at, id)
+
+Revision ID: k5l6m7n8o9p0
+Revises: j4k5l6m7n8o9
+Create Date: 2026-10-19
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = 'k5l6m7n8o9p0'
+down_revision = 'j4k5l6m7n8o9'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # /interview/sessions: WHERE user_id = ? ORDER BY created_at DESC, id DESC
+    op.create_index(
+        'ix_interview_sessions_user_id_created_at_id',
+        'interview_sessions',
+        ['user_id', 'created_at', 'id'],
+        unique=False,
+        if_not_exists=True
+    )
+
+    # /admin/interviews: ORDER BY created_at DESC, id DESC over the whole table
+    op.create_index(
+        'ix_interview_sessions_created_at_id',
+        'interview_sessions',
+        ['created_at', 'id'],
+        unique=False,
+        if_not_exists=True
+    )
+
+    # /credits/transactions: WHERE user_id = ? ORDER BY created_at DESC, id DESC
+    op.create_index(
+        'ix_credit_transactions_user_id_created_at_id',
+        'credit_transactions',
+        ['user_id', 'created_at', 'id'],
+        unique=False,
+        if_not_exists=True
+    )
+
+
+def downgrade():
+    op.drop_index('ix_credit_transactions_user_id_created_at_id', table_name='credit_transactions')
+    op.drop_index('ix_interview_sessions_created_at_id', table_name='interview_sessions')
+    op.drop_index('ix_interview_sessions_user_id_created_at_id', table_name='interview_sessions')
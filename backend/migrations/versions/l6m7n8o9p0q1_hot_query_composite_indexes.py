@@ -0,0 +1,51 @@
+"""Composite indexes for hot queries flagged by check_query_plans.py
+
+Revision ID: l6m7n8o9p0q1
+Revises: k5l6m7n8o9p0
+Create Date: 2026-10-19
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = 'l6m7n8o9p0q1'
+down_revision = 'k5l6m7n8o9p0'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Transcript loads in submit_answer / get_session: WHERE thread_id = ? ORDER BY id
+    op.create_index(
+        'ix_chat_messages_thread_id_id',
+        'chat_messages',
+        ['thread_id', 'id'],
+        unique=False,
+        if_not_exists=True
+    )
+
+    # Leaderboard: WHERE status = 'completed' ORDER BY average_score DESC LIMIT 20
+    op.create_index(
+        'ix_interview_sessions_status_average_score',
+        'interview_sessions',
+        ['status', 'average_score'],
+        unique=False,
+        if_not_exists=True
+    )
+
+    # Best-answer lookup: WHERE session_id = ? AND question_number = ?
+    op.create_index(
+        'ix_best_answers_session_id_question_number',
+        'best_answers',
+        ['session_id', 'question_number'],
+        unique=False,
+        if_not_exists=True
+    )
+
+    # credit_transactions (user_id, created_at) is already covered by
+    # ix_credit_transactions_user_id_created_at_id from k5l6m7n8o9p0.
+
+
+def downgrade():
+    op.drop_index('ix_best_answers_session_id_question_number', table_name='best_answers')
+    op.drop_index('ix_interview_sessions_status_average_score', table_name='interview_sessions')
+    op.drop_index('ix_chat_messages_thread_id_id', table_name='chat_messages')
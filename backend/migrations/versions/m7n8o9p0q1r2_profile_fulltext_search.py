@@ -0,0 +1,46 @@
+"""Full-text search vector on user_profiles with GIN index
+
+Revision ID: m7n8o9p0q1r2
+Revises: l6m7n8o9p0q1
+Create Date: 2026-10-19
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = 'm7n8o9p0q1r2'
+down_revision = 'l6m7n8o9p0q1'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Postgres only; SQLite dev databases get an FTS5 table at startup instead
+    # (see fulltext.ensure_fulltext_schema).
+    if op.get_bind().dialect.name != 'postgresql':
+        return
+
+    op.execute("""
+        ALTER TABLE user_profiles ADD COLUMN IF NOT EXISTS search_vector tsvector
+        GENERATED ALWAYS AS (
+            setweight(to_tsvector('english', coalesce(headline, '')), 'A') ||
+            setweight(to_tsvector('english', coalesce(bio, '')), 'B') ||
+            setweight(to_tsvector('english', coalesce(
+                jsonb_path_query_array(work_experience::jsonb, '$[*].description')::text, '')), 'C') ||
+            setweight(to_tsvector('english', coalesce(resume_text, '')), 'D')
+        ) STORED
+    """)
+    op.create_index(
+        'ix_user_profiles_search_vector',
+        'user_profiles',
+        ['search_vector'],
+        unique=False,
+        postgresql_using='gin',
+        if_not_exists=True
+    )
+
+
+def downgrade():
+    if op.get_bind().dialect.name != 'postgresql':
+        return
+    op.drop_index('ix_user_profiles_search_vector', table_name='user_profiles')
+    op.drop_column('user_profiles', 'search_vector')
@@ -0,0 +1,52 @@
+"""Candidate performance summary table
+
+Revision ID: n8o9p0q1r2s3
+Revises: m7n8o9p0q1r2
+Create Date: 2026-10-19
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = 'n8o9p0q1r2s3'
+down_revision = 'm7n8o9p0q1r2'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        'candidate_performance',
+        sa.Column('user_id', sa.Integer(), sa.ForeignKey('users.id'), primary_key=True),
+        sa.Column('interviews_completed', sa.Integer(), server_default='0'),
+        sa.Column('average_score', sa.Float(), nullable=True),
+        sa.Column('mean_technical', sa.Float(), nullable=True),
+        sa.Column('mean_communication', sa.Float(), nullable=True),
+        sa.Column('mean_leadership', sa.Float(), nullable=True),
+        sa.Column('mean_critical_thinking', sa.Float(), nullable=True),
+        sa.Column('mean_decision_making', sa.Float(), nullable=True),
+        sa.Column('mean_project_knowledge', sa.Float(), nullable=True),
+        sa.Column('trends', sa.JSON(), nullable=True),
+        sa.Column('best_by_role', sa.JSON(), nullable=True),
+        sa.Column('role_percentiles', sa.JSON(), nullable=True),
+        sa.Column('interviews_by_plan', sa.JSON(), nullable=True),
+        sa.Column('recent_sessions', sa.JSON(), nullable=True),
+        sa.Column('last_completed_at', sa.DateTime(), nullable=True),
+        sa.Column('updated_at', sa.DateTime(), server_default=sa.func.now()),
+        if_not_exists=True
+    )
+
+    # Role percentiles: best score per user among completed sessions for a role
+    op.create_index(
+        'ix_interview_sessions_role_status_user_id',
+        'interview_sessions',
+        ['role', 'status', 'user_id'],
+        unique=False,
+        if_not_exists=True
+    )
+
+    # Existing history is backfilled with `python performance.py`.
+
+
+def downgrade():
+    op.drop_index('ix_interview_sessions_role_status_user_id', table_name='interview_sessions')
+    op.drop_table('candidate_performance')
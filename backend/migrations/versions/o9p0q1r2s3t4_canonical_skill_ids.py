@@ -0,0 +1,25 @@
+"""Canonical skill ids on profiles and job postings
+
+Revision ID: o9p0q1r2s3t4
+Revises: n8o9p0q1r2s3
+Create Date: 2026-10-19
+
+Populate existing rows afterwards with `python skill_vocabulary.py --backfill`.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = 'o9p0q1r2s3t4'
+down_revision = 'n8o9p0q1r2s3'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.add_column('user_profiles', sa.Column('skill_ids', sa.JSON(), nullable=True))
+    op.add_column('job_postings', sa.Column('required_skill_ids', sa.JSON(), nullable=True))
+
+
+def downgrade():
+    op.drop_column('job_postings', 'required_skill_ids')
+    op.drop_column('user_profiles', 'skill_ids')
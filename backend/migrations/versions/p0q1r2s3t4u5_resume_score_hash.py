@@ -0,0 +1,21 @@
+"""Resume score input hash
+
+Revision ID: p0q1r2s3t4u5
+Revises: o9p0q1r2s3t4
+Create Date: 2026-10-19
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = 'p0q1r2s3t4u5'
+down_revision = 'o9p0q1r2s3t4'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.add_column('user_profiles', sa.Column('resume_score_hash', sa.String(64), nullable=True))
+
+
+def downgrade():
+    op.drop_column('user_profiles', 'resume_score_hash')
@@ -0,0 +1,29 @@
+"""User daily activity table
+
+Revision ID: q1r2s3t4u5v6
+Revises: p0q1r2s3t4u5
+Create Date: 2026-10-19
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = 'q1r2s3t4u5v6'
+down_revision = 'p0q1r2s3t4u5'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        'user_daily_activity',
+        sa.Column('user_id', sa.Integer(), sa.ForeignKey('users.id'), primary_key=True),
+        sa.Column('day', sa.Date(), primary_key=True),
+        sa.Column('count', sa.Integer(), nullable=False, server_default='0'),
+        if_not_exists=True
+    )
+
+    # Existing user_profiles.daily_activity JSON is copied with `python activity.py --backfill`.
+
+
+def downgrade():
+    op.drop_table('user_daily_activity')
@@ -0,0 +1,41 @@
+"""Refresh tokens table
+
+Revision ID: s3t4u5v6w7x8
+Revises: r2s3t4u5v6w7
+Create Date: 2026-10-19
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = 's3t4u5v6w7x8'
+down_revision = 'r2s3t4u5v6w7'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        'refresh_tokens',
+        sa.Column('id', sa.Integer(), primary_key=True),
+        sa.Column('user_id', sa.Integer(), sa.ForeignKey('users.id'), nullable=False),
+        sa.Column('family_id', sa.String(32), nullable=False),
+        sa.Column('token_hash', sa.String(64), nullable=False),
+        sa.Column('created_at', sa.DateTime(), nullable=True),
+        sa.Column('expires_at', sa.DateTime(), nullable=False),
+        sa.Column('rotated_at', sa.DateTime(), nullable=True),
+        sa.Column('revoked_at', sa.DateTime(), nullable=True),
+        if_not_exists=True
+    )
+    op.create_index('ix_refresh_tokens_id', 'refresh_tokens', ['id'], if_not_exists=True)
+    op.create_index('ix_refresh_tokens_user_id', 'refresh_tokens', ['user_id'], if_not_exists=True)
+    op.create_index('ix_refresh_tokens_family_id', 'refresh_tokens', ['family_id'], if_not_exists=True)
+    op.create_index('ix_refresh_tokens_token_hash', 'refresh_tokens', ['token_hash'], unique=True,
+                    if_not_exists=True)
+
+
+def downgrade():
+    op.drop_index('ix_refresh_tokens_token_hash', table_name='refresh_tokens')
+    op.drop_index('ix_refresh_tokens_family_id', table_name='refresh_tokens')
+    op.drop_index('ix_refresh_tokens_user_id', table_name='refresh_tokens')
+    op.drop_index('ix_refresh_tokens_id', table_name='refresh_tokens')
+    op.drop_table('refresh_tokens')
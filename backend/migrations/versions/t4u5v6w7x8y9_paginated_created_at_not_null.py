@@ -0,0 +1,38 @@
+"""Make created_at NOT NULL on the cursor-paginated tables
+
+Keyset pagination orders interview_sessions and credit_transactions by
+(created_at, id) and encodes created_at into the cursor, so a NULL there
+breaks both the ordering and the cursor. Backfill legacy NULLs, then
+forbid them.
+
+Revision ID: t4u5v6w7x8y9
+Revises: s3t4u5v6w7x8
+Create Date: 2026-10-19
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = 't4u5v6w7x8y9'
+down_revision = 's3t4u5v6w7x8'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.execute(
+        "UPDATE interview_sessions "
+        "SET created_at = COALESCE(updated_at, completed_at, CURRENT_TIMESTAMP) "
+        "WHERE created_at IS NULL"
+    )
+    op.execute("UPDATE credit_transactions SET created_at = CURRENT_TIMESTAMP WHERE created_at IS NULL")
+    with op.batch_alter_table('interview_sessions') as batch_op:
+        batch_op.alter_column('created_at', existing_type=sa.DateTime(), nullable=False)
+    with op.batch_alter_table('credit_transactions') as batch_op:
+        batch_op.alter_column('created_at', existing_type=sa.DateTime(), nullable=False)
+
+
+def downgrade():
+    with op.batch_alter_table('credit_transactions') as batch_op:
+        batch_op.alter_column('created_at', existing_type=sa.DateTime(), nullable=True)
+    with op.batch_alter_table('interview_sessions') as batch_op:
+        batch_op.alter_column('created_at', existing_type=sa.DateTime(), nullable=True)
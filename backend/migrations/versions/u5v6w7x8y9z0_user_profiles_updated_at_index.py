@@ -0,0 +1,23 @@
+"""Index user_profiles.updated_at for the search index sync
+
+Each worker's candidate search index polls for profiles changed since its
+last sync (search_index.py), a range scan on updated_at.
+
+Revision ID: u5v6w7x8y9z0
+Revises: t4u5v6w7x8y9
+Create Date: 2026-10-19
+"""
+from alembic import op
+
+revision = 'u5v6w7x8y9z0'
+down_revision = 't4u5v6w7x8y9'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_index('ix_user_profiles_updated_at', 'user_profiles', ['updated_at'], if_not_exists=True)
+
+
+def downgrade():
+    op.drop_index('ix_user_profiles_updated_at', table_name='user_profiles')
@@ -0,0 +1,23 @@
+"""Index refresh_tokens.expires_at for the expired-token purge
+
+refresh_tokens.purge_expired() deletes rows that expired more than the
+reuse grace ago, a range scan on expires_at.
+
+Revision ID: v6w7x8y9z0a1
+Revises: u5v6w7x8y9z0
+Create Date: 2026-10-19
+"""
+from alembic import op
+
+revision = 'v6w7x8y9z0a1'
+down_revision = 'u5v6w7x8y9z0'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_index('ix_refresh_tokens_expires_at', 'refresh_tokens', ['expires_at'], if_not_exists=True)
+
+
+def downgrade():
+    op.drop_index('ix_refresh_tokens_expires_at', table_name='refresh_tokens')
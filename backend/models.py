@@ -2,7 +2,7 @@ from typing import List, Optional, Dict, Any, TypedDict
 from datetime import datetime
 from enum import Enum
 from pydantic import BaseModel, Field, HttpUrl
-from sqlalchemy import Boolean, Column, Integer, String, Text, DateTime, Date, ForeignKey, JSON, Float
+from sqlalchemy import Boolean, Column, Integer, String, Text, DateTime, Date, ForeignKey, JSON, Float, Index
 from sqlalchemy.orm import relationship
 from database import Base
 
@@ -82,6 +82,8 @@ class UserProfile(Base):
 
     # Skills stored as JSON list
     skills = Column(JSON, default=list)
+    # Canonical skill ids (skill_vocabulary.py): listed skills plus those found in the resume
+    skill_ids = Column(JSON, default=list)
 
     # Work experience: list of {company, role, start, end, description}
     work_experience = Column(JSON, default=list)
@@ -113,9 +115,10 @@ class UserProfile(Base):
     resume_uploaded_at = Column(DateTime, nullable=True)
     streak_days = Column(Integer, default=0)
     last_active_date = Column(Date, nullable=True)
-    daily_activity = Column(JSON, default=dict)
+    daily_activity = Column(JSON, default=dict)      # legacy; history now lives in user_daily_activity
 
     resume_score_breakdown = Column(JSON, nullable=True)
+    resume_score_hash = Column(String(64), nullable=True)   # sha256 of the scoring prompt; unchanged = reuse
     github_score_breakdown = Column(JSON, nullable=True)
     linkedin_score_breakdown = Column(JSON, nullable=True)
     resume_feedback = Column(Text, nullable=True)
@@ -123,7 +126,7 @@ class UserProfile(Base):
     linkedin_feedback = Column(Text, nullable=True)
 
     created_at = Column(DateTime, default=datetime.utcnow)
-    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, index=True)  # search index sync
 
     user = relationship("User", back_populates="profile")
 
@@ -162,6 +165,7 @@ class JobPosting(Base):
     title = Column(String, nullable=False)
     description = Column(Text, nullable=True)
     required_skills = Column(JSON, default=list)
+    required_skill_ids = Column(JSON, default=list)
     experience_min = Column(Float, default=0.0)
     experience_max = Column(Float, nullable=True)
     location = Column(String, nullable=True)
@@ -189,10 +193,87 @@ class CreditTransaction(Base):
     # Payment reference for purchases
     payment_id = Column(Integer, ForeignKey("payments.id"), nullable=True)
 
-    created_at = Column(DateTime, default=datetime.utcnow)
+    created_at = Column(DateTime, default=datetime.utcnow, nullable=False)  # keyset pagination key
 
     user = relationship("User", back_populates="credit_transactions")
 
+    __table_args__ = (
+        # Keyset pagination of a user's history (see pagination.py)
+        Index("ix_credit_transactions_user_id_created_at_id", "user_id", "created_at", "id"),
+    )
+
+
+class CandidatePerformance(Base):
+    """Per-candidate interview summary, updated as each session completes (see performance.py)."""
+    __tablename__ = "candidate_performance"
+
+    user_id = Column(Integer, ForeignKey("users.id"), primary_key=True)
+    interviews_completed = Column(Integer, default=0)
+    average_score = Column(Float, nullable=True)
+
+    # Rolling means over the last ROLLING_WINDOW completed interviews
+    mean_technical = Column(Float, nullable=True)
+    mean_communication = Column(Float, nullable=True)
+    mean_leadership = Column(Float, nullable=True)
+    mean_critical_thinking = Column(Float, nullable=True)
+    mean_decision_making = Column(Float, nullable=True)
+    mean_project_knowledge = Column(Float, nullable=True)
+
+    trends = Column(JSON, default=dict)              # {dimension: points per interview over the window}
+    best_by_role = Column(JSON, default=dict)        # {role: best average_score}
+    role_percentiles = Column(JSON, default=dict)    # {role: percentile of best score among candidates}
+    interviews_by_plan = Column(JSON, default=dict)  # {plan_type: count}
+    recent_sessions = Column(JSON, default=list)     # the rolling window, newest first
+
+    last_completed_at = Column(DateTime, nullable=True)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+
+class UserDailyActivity(Base):
+    """Interviews completed per user per day; written by upsert, read by date range (see activity.py)."""
+    __tablename__ = "user_daily_activity"
+
+    user_id = Column(Integer, ForeignKey("users.id"), primary_key=True)
+    day = Column(Date, primary_key=True)
+    count = Column(Integer, nullable=False, default=0)
+
+
+class RefreshToken(Base):
+    """One refresh token (SHA-256 of it; the token itself is never stored). See refresh_tokens.py."""
+    __tablename__ = "refresh_tokens"
+
+    id = Column(Integer, primary_key=True, index=True)
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=False, index=True)
+    family_id = Column(String(32), nullable=False, index=True)   # shared by a login's rotation chain
+    token_hash = Column(String(64), nullable=False, unique=True, index=True)
+    created_at = Column(DateTime, default=datetime.utcnow)
+    expires_at = Column(DateTime, nullable=False, index=True)
+    rotated_at = Column(DateTime, nullable=True)   # exchanged for its successor
+    revoked_at = Column(DateTime, nullable=True)
+
+
+class EmailOutbox(Base):
+    """Queued transactional email; delivered and retried by email_outbox.OutboxSender."""
+    __tablename__ = "email_outbox"
+
+    id = Column(Integer, primary_key=True, index=True)
+    kind = Column(String, nullable=False)                # e.g. password_reset_otp
+    to_email = Column(String, nullable=False)
+    subject = Column(String, nullable=False)
+    text_body = Column(Text, nullable=False)
+    html_body = Column(Text, nullable=True)
+    status = Column(String, nullable=False, default="pending")  # pending, sent, failed
+    attempts = Column(Integer, nullable=False, default=0)
+    next_attempt_at = Column(DateTime, nullable=False, default=datetime.utcnow)
+    last_error = Column(Text, nullable=True)
+    created_at = Column(DateTime, default=datetime.utcnow)
+    sent_at = Column(DateTime, nullable=True)
+
+    __table_args__ = (
+        # The sender's claim query: due pending rows, oldest first
+        Index("ix_email_outbox_status_next_attempt", "status", "next_attempt_at"),
+    )
+
 
 class OTP(Base):
     __tablename__ = "otps"
@@ -225,7 +306,7 @@ class InterviewSession(Base):
     average_score = Column(Float, default=0.0)
     is_pinned = Column(Boolean, default=False)
     proctoring_data = Column(JSON, nullable=True)
-    created_at = Column(DateTime, default=datetime.utcnow)
+    created_at = Column(DateTime, default=datetime.utcnow, nullable=False)  # keyset pagination key
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     completed_at = Column(DateTime, nullable=True)
 
@@ -253,6 +334,16 @@ class InterviewSession(Base):
     messages = relationship("ChatMessage", back_populates="session")
     best_answers = relationship("BestAnswer", back_populates="session")
 
+    __table_args__ = (
+        # Keyset pagination (see pagination.py)
+        Index("ix_interview_sessions_user_id_created_at_id", "user_id", "created_at", "id"),
+        Index("ix_interview_sessions_created_at_id", "created_at", "id"),
+        # Leaderboard: WHERE status = 'completed' ORDER BY average_score DESC
+        Index("ix_interview_sessions_status_average_score", "status", "average_score"),
+        # Role percentiles in performance.py: best score per user for a role
+        Index("ix_interview_sessions_role_status_user_id", "role", "status", "user_id"),
+    )
+
 
 class ChatMessage(Base):
     __tablename__ = "chat_messages"
@@ -270,6 +361,13 @@ class ChatMessage(Base):
 
     session = relationship("InterviewSession", back_populates="messages")
 
+    __table_args__ = (
+        # Transcript loads: WHERE thread_id = ? ORDER BY id
+        Index("ix_chat_messages_thread_id_id", "thread_id", "id"),
+        # Feedback/roadmap lookups per session (created by migration 7b98a5b1950d)
+        Index("ix_chat_messages_session_id_message_type", "session_id", "message_type"),
+    )
+
 
 class BestAnswer(Base):
     __tablename__ = "best_answers"
@@ -285,6 +383,10 @@ class BestAnswer(Base):
 
     session = relationship("InterviewSession", back_populates="best_answers")
 
+    __table_args__ = (
+        Index("ix_best_answers_session_id_question_number", "session_id", "question_number"),
+    )
+
 
 class Payment(Base):
     __tablename__ = "payments"
@@ -0,0 +1,77 @@
+"""
+Keyset (cursor) pagination helpers.
+
+List endpoints page newest-first on (created_at, id). The cursor handed to the
+client is an opaque base64 token of the last row's sort key, so the next page
+is a plain index range scan instead of an ever-growing OFFSET.
+"""
+import base64
+import json
+from datetime import datetime
+from typing import Any, List, Optional, Tuple
+
+from fastapi import HTTPException
+from sqlalchemy import tuple_
+
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 200
+
+
+def encode_cursor(created_at: datetime, row_id: int) -> str:
+    """Encode a (created_at, id) sort key as an opaque, URL-safe cursor."""
+    raw = json.dumps([created_at.isoformat(), row_id], separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[datetime, int]:
+    """Inverse of encode_cursor. Raises 400 on anything malformed."""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        created_at, row_id = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        return datetime.fromisoformat(created_at), int(row_id)
+    except Exception:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+
+def clamp_limit(limit: Optional[int]) -> int:
+    if not limit or limit < 1:
+        return DEFAULT_PAGE_SIZE
+    return min(limit, MAX_PAGE_SIZE)
+
+
+def paginate_desc(query, model, cursor: Optional[str], limit: int) -> Tuple[List[Any], Optional[str]]:
+    """
+    Apply newest-first keyset pagination on (model.created_at, model.id).
+
+    Fetches one extra row to learn whether another page exists, so the caller
+    never needs a COUNT. Returns (rows, next_cursor); next_cursor is None on
+    the last page.
+    """
+    limit = clamp_limit(limit)
+    if cursor:
+        created_at, row_id = decode_cursor(cursor)
+        # Row-value comparison so the planner turns it into a single index range.
+        query = query.filter(tuple_(model.created_at, model.id) < tuple_(created_at, row_id))
+
+    rows = (
+        query.order_by(model.created_at.desc(), model.id.desc())
+        .limit(limit + 1)
+        .all()
+    )
+
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        last = _sort_key_source(rows[-1], model)
+        next_cursor = encode_cursor(last.created_at, last.id)
+    return rows, next_cursor
+
+
+def _sort_key_source(row, model):
+    """Rows may be bare entities or tuples like (InterviewSession, User)."""
+    if isinstance(row, model):
+        return row
+    for item in row:
+        if isinstance(item, model):
+            return item
+    raise ValueError(f"Row does not contain a {model.__name__}")
@@ -0,0 +1,117 @@
+"""
+Password hashing off the event loop.
+
+bcrypt (and argon2) are deliberately slow, a few hundred ms per call; run
+inside an async endpoint that stalls every other request on the worker.
+hash_password() and verify_password() run on a small dedicated thread pool
+instead (both backends release the GIL), so the loop keeps serving while
+logins queue there, and PASSWORD_HASH_WORKERS caps how many cores password
+work can take.
+
+The hash policy is configurable:
+    PASSWORD_HASH_SCHEME   bcrypt (default) or argon2 (argon2id, needs argon2-cffi)
+    BCRYPT_ROUNDS          bcrypt cost, default 12
+    ARGON2_TIME_COST / ARGON2_MEMORY_COST_KB / ARGON2_PARALLELISM
+
+Hashes made under any earlier policy still verify, and a successful login
+transparently re-hashes them under the current one (verify_password returns
+the replacement), so changing the policy migrates users as they sign in.
+
+OAuth-only accounts store UNUSABLE_PASSWORD instead of hashing a random
+secret: it is not a hash and never verifies.
+
+bench_login.py measures login throughput on and off the loop.
+"""
+import asyncio
+import hmac
+import os
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional, Tuple
+
+from passlib.context import CryptContext
+from passlib.exc import UnknownHashError
+
+PASSWORD_HASH_SCHEME = os.getenv("PASSWORD_HASH_SCHEME", "bcrypt").lower()
+BCRYPT_ROUNDS = int(os.getenv("BCRYPT_ROUNDS", "12"))
+ARGON2_TIME_COST = int(os.getenv("ARGON2_TIME_COST", "3"))
+ARGON2_MEMORY_COST_KB = int(os.getenv("ARGON2_MEMORY_COST_KB", "65536"))
+ARGON2_PARALLELISM = int(os.getenv("ARGON2_PARALLELISM", "1"))
+PASSWORD_HASH_WORKERS = int(os.getenv("PASSWORD_HASH_WORKERS", str(min(4, os.cpu_count() or 1))))
+
+# Stored for accounts that can only sign in through OAuth. Can never equal a
+# real hash, and verify_password() rejects it before touching passlib.
+UNUSABLE_PASSWORD = "!"
+
+
+def _argon2_available() -> bool:
+    try:
+        import argon2  # noqa: F401
+        return True
+    except ImportError:
+        return False
+
+
+def _build_context() -> CryptContext:
+    scheme = PASSWORD_HASH_SCHEME
+    if scheme == "argon2" and not _argon2_available():
+        print("⚠️ PASSWORD_HASH_SCHEME=argon2 but argon2-cffi is not installed; using bcrypt")
+        scheme = "bcrypt"
+    settings = {
+        # min == max == default, so a cost change (either way) also triggers a re-hash
+        "bcrypt__default_rounds": BCRYPT_ROUNDS,
+        "bcrypt__min_rounds": BCRYPT_ROUNDS,
+        "bcrypt__max_rounds": BCRYPT_ROUNDS,
+    }
+    if scheme == "argon2":
+        settings.update({
+            "argon2__type": "ID",
+            "argon2__time_cost": ARGON2_TIME_COST,
+            "argon2__memory_cost": ARGON2_MEMORY_COST_KB,
+            "argon2__parallelism": ARGON2_PARALLELISM,
+        })
+    return CryptContext(
+        schemes=["argon2", "bcrypt"] if scheme == "argon2" else ["bcrypt"],
+        default=scheme,
+        deprecated="auto",  # everything but the default scheme gets re-hashed on login
+        **settings,
+    )
+
+
+pwd_context = _build_context()
+_executor = ThreadPoolExecutor(max_workers=PASSWORD_HASH_WORKERS, thread_name_prefix="password-hash")
+
+
+def _verify_and_update(password: str, stored: str) -> Tuple[bool, Optional[str]]:
+    if not stored or stored == UNUSABLE_PASSWORD:
+        return False, None
+    try:
+        return pwd_context.verify_and_update(password, stored)
+    except UnknownHashError:
+        # Legacy rows stored the password itself. Accept it only if it
+        # looks nothing like a hash, compare in constant time, and hand
+        # back a real hash so the caller replaces it.
+        if stored.startswith("$") or stored.startswith("!"):
+            return False, None
+        if hmac.compare_digest(stored.encode(), password.encode()):
+            return True, pwd_context.hash(password)
+        return False, None
+
+
+async def _run(fn, *args):
+    return await asyncio.get_running_loop().run_in_executor(_executor, fn, *args)
+
+
+async def hash_password(password: str) -> str:
+    return await _run(pwd_context.hash, password)
+
+
+async def verify_password(password: str, stored: str) -> Tuple[bool, Optional[str]]:
+    """
+    (valid, replacement hash). The replacement is set when the stored value
+    predates the current policy (or is legacy plaintext); save it.
+    """
+    return await _run(_verify_and_update, password, stored)
+
+
+def shutdown() -> None:
+    _executor.shutdown(wait=False)
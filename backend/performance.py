@@ -0,0 +1,256 @@
+"""
+Candidate performance summaries (candidate_performance table).
+
+record_completed_session() is called in the same transaction that marks an
+interview completed and updates the candidate's row incrementally: rolling
+means and trends of the six score dimensions over the last ROLLING_WINDOW
+interviews, best score per role, interview count by plan and the percentile
+of the candidate's best score among everyone interviewed for that role.
+
+Recruiter views read the row together with the profile instead of
+re-aggregating sessions. Other candidates' percentiles move as new people
+interview; run this module as a script to rebuild every row (also used to
+backfill existing data).
+
+Usage: python performance.py
+"""
+import os
+import sys
+from bisect import bisect_left, bisect_right
+from typing import Dict, List, Optional
+
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from models import CandidatePerformance, InterviewSession  # noqa: E402
+
+ROLLING_WINDOW = 10
+BATCH_SIZE = 5_000
+DIMENSIONS = (
+    "technical", "communication", "leadership",
+    "critical_thinking", "decision_making", "project_knowledge",
+)
+
+
+def _session_entry(session: InterviewSession) -> dict:
+    return {
+        "session_id": session.id,
+        "role": session.role,
+        "plan_type": session.plan_type,
+        "average_score": session.average_score,
+        **{f"score_{dim}": getattr(session, f"score_{dim}") for dim in DIMENSIONS},
+        "completed_at": session.completed_at.isoformat() if session.completed_at else None,
+    }
+
+
+def _slope(values: List[float]) -> Optional[float]:
+    """Least-squares slope of values in chronological order (points per interview)."""
+    n = len(values)
+    if n < 2:
+        return None
+    mean_x = (n - 1) / 2
+    mean_y = sum(values) / n
+    num = sum((x - mean_x) * (y - mean_y) for x, y in enumerate(values))
+    den = sum((x - mean_x) ** 2 for x in range(n))
+    return round(num / den, 3)
+
+
+def _apply_window(perf: CandidatePerformance) -> None:
+    window = perf.recent_sessions or []
+    trends = {}
+    for dim in DIMENSIONS:
+        values = [e[f"score_{dim}"] for e in reversed(window) if e.get(f"score_{dim}") is not None]
+        setattr(perf, f"mean_{dim}", round(sum(values) / len(values), 2) if values else None)
+        trends[dim] = _slope(values)
+    perf.trends = trends
+
+
+def _percentile(sorted_bests: List[float], best: float) -> float:
+    """Percentile of `best` within sorted_bests, which includes it once."""
+    others = len(sorted_bests) - 1
+    if others <= 0:
+        return 100.0
+    below = bisect_left(sorted_bests, best)
+    ties = bisect_right(sorted_bests, best) - below - 1
+    return round((below + 0.5 * ties) / others * 100, 1)
+
+
+def _role_bests(db: Session, role: str, exclude_user_id: Optional[int] = None) -> List[float]:
+    query = (
+        db.query(func.max(InterviewSession.average_score))
+        .filter(
+            InterviewSession.role == role,
+            InterviewSession.status == "completed",
+            InterviewSession.user_id.isnot(None),
+        )
+        .group_by(InterviewSession.user_id)
+    )
+    if exclude_user_id is not None:
+        query = query.filter(InterviewSession.user_id != exclude_user_id)
+    return sorted(score or 0.0 for (score,) in query.all())
+
+
+def record_completed_session(session: InterviewSession, db: Session) -> Optional[CandidatePerformance]:
+    """Fold a just-completed session into its candidate's summary. Does not commit."""
+    if not session.user_id:
+        return None
+    perf = db.get(CandidatePerformance, session.user_id)
+    if perf is None:
+        # First summary for this candidate: build it from their full history
+        db.flush()
+        return rebuild_candidate_performance(session.user_id, db)
+
+    score = session.average_score or 0.0
+    count = (perf.interviews_completed or 0) + 1
+    perf.average_score = round(((perf.average_score or 0.0) * (count - 1) + score) / count, 3)
+    perf.interviews_completed = count
+
+    by_plan = dict(perf.interviews_by_plan or {})
+    by_plan[session.plan_type or "normal"] = by_plan.get(session.plan_type or "normal", 0) + 1
+    perf.interviews_by_plan = by_plan
+
+    best_by_role = dict(perf.best_by_role or {})
+    best = max(best_by_role.get(session.role, 0.0), score)
+    best_by_role[session.role] = best
+    perf.best_by_role = best_by_role
+
+    bests = _role_bests(db, session.role, exclude_user_id=session.user_id)
+    bests.insert(bisect_left(bests, best), best)
+    perf.role_percentiles = {**(perf.role_percentiles or {}), session.role: _percentile(bests, best)}
+
+    perf.recent_sessions = ([_session_entry(session)] + list(perf.recent_sessions or []))[:ROLLING_WINDOW]
+    perf.last_completed_at = session.completed_at
+    _apply_window(perf)
+    return perf
+
+
+def rebuild_candidate_performance(
+    user_id: int, db: Session, role_bests: Optional[Dict[str, List[float]]] = None
+) -> Optional[CandidatePerformance]:
+    """Recompute a candidate's summary from all their completed sessions. Does not commit."""
+    sessions = (
+        db.query(InterviewSession)
+        .filter(InterviewSession.user_id == user_id, InterviewSession.status == "completed")
+        .order_by(InterviewSession.completed_at.desc(), InterviewSession.id.desc())
+        .all()
+    )
+    perf = db.get(CandidatePerformance, user_id)
+    if not sessions:
+        if perf is not None:
+            db.delete(perf)
+        return None
+    if perf is None:
+        perf = CandidatePerformance(user_id=user_id)
+        db.add(perf)
+    _fill(perf, sessions, role_bests, db)
+    return perf
+
+
+def _fill(perf: CandidatePerformance, sessions: List[InterviewSession],
+          role_bests: Optional[Dict[str, List[float]]], db: Session) -> None:
+    """Populate `perf` from a candidate's completed sessions, newest first."""
+    scores = [s.average_score or 0.0 for s in sessions]
+    perf.interviews_completed = len(sessions)
+    perf.average_score = round(sum(scores) / len(scores), 3)
+
+    by_plan: Dict[str, int] = {}
+    best_by_role: Dict[str, float] = {}
+    for s in sessions:
+        by_plan[s.plan_type or "normal"] = by_plan.get(s.plan_type or "normal", 0) + 1
+        best_by_role[s.role] = max(best_by_role.get(s.role, 0.0), s.average_score or 0.0)
+    perf.interviews_by_plan = by_plan
+    perf.best_by_role = best_by_role
+
+    percentiles = {}
+    for role, best in best_by_role.items():
+        if role_bests is not None and role in role_bests:
+            bests = role_bests[role]
+        else:
+            bests = _role_bests(db, role, exclude_user_id=perf.user_id)
+            bests.insert(bisect_left(bests, best), best)
+        percentiles[role] = _percentile(bests, best)
+    perf.role_percentiles = percentiles
+
+    perf.recent_sessions = [_session_entry(s) for s in sessions[:ROLLING_WINDOW]]
+    perf.last_completed_at = sessions[0].completed_at
+    _apply_window(perf)
+
+
+def summary_to_dict(perf: Optional[CandidatePerformance]) -> Optional[dict]:
+    if perf is None:
+        return None
+    return {
+        "interviews_completed": perf.interviews_completed or 0,
+        "average_score": perf.average_score,
+        "dimension_means": {dim: getattr(perf, f"mean_{dim}") for dim in DIMENSIONS},
+        "dimension_trends": perf.trends or {},
+        "best_by_role": perf.best_by_role or {},
+        "role_percentiles": perf.role_percentiles or {},
+        "interviews_by_plan": perf.interviews_by_plan or {},
+        "last_completed_at": perf.last_completed_at.isoformat() if perf.last_completed_at else None,
+    }
+
+
+def rebuild_all(db: Session) -> int:
+    """
+    Rebuild every candidate's summary in one pass over completed sessions,
+    sharing per-role score distributions. Commits once at the end.
+    """
+    rows = (
+        db.query(InterviewSession.role, InterviewSession.user_id, func.max(InterviewSession.average_score))
+        .filter(InterviewSession.status == "completed", InterviewSession.user_id.isnot(None))
+        .group_by(InterviewSession.role, InterviewSession.user_id)
+        .all()
+    )
+    role_bests: Dict[str, List[float]] = {}
+    for role, _, best in rows:
+        role_bests.setdefault(role, []).append(best or 0.0)
+    for bests in role_bests.values():
+        bests.sort()
+
+    existing = {p.user_id: p for p in db.query(CandidatePerformance)}
+    sessions = (
+        db.query(InterviewSession)
+        .filter(InterviewSession.status == "completed", InterviewSession.user_id.isnot(None))
+        .order_by(InterviewSession.user_id, InterviewSession.completed_at.desc(), InterviewSession.id.desc())
+        .yield_per(BATCH_SIZE)
+    )
+
+    rebuilt = set()
+
+    def flush_user(user_id, history):
+        perf = existing.get(user_id)
+        if perf is None:
+            perf = CandidatePerformance(user_id=user_id)
+            db.add(perf)
+        _fill(perf, history, role_bests, db)
+        rebuilt.add(user_id)
+
+    current, history = None, []
+    for s in sessions:
+        if s.user_id != current and history:
+            flush_user(current, history)
+            history = []
+        current = s.user_id
+        history.append(s)
+    if history:
+        flush_user(current, history)
+
+    for user_id, perf in existing.items():
+        if user_id not in rebuilt:
+            db.delete(perf)
+    db.commit()
+    return len(rebuilt)
+
+
+if __name__ == "__main__":
+    from database import SessionLocal
+
+    db = SessionLocal()
+    try:
+        count = rebuild_all(db)
+        print(f"✓ Rebuilt performance summaries for {count} candidates")
+    finally:
+        db.close()
@@ -0,0 +1,136 @@
+"""
+Profile completion, maintained at write time.
+
+A before_flush hook recomputes UserProfile.profile_completion whenever a
+field it depends on changes (or the user's full name does), so it is stored
+in the same transaction as the edit that moved it and reads never write.
+
+The value also rides along in the cached user snapshot (user_snapshot.py),
+which loads it in the same query as the user and is updated here on commit,
+so interview gating reads it without a query.
+
+Rows written before completion was maintained here can hold a stale value,
+which --backfill recomputes once.
+
+Usage: python profile_completion.py --backfill
+"""
+import argparse
+from typing import Any, Dict, Optional, Set, Tuple
+
+from sqlalchemy import event, inspect
+
+from database import SessionLocal
+from models import User, UserProfile
+from user_snapshot import snapshots
+
+# (label, weight, predicate over the profile and its user)
+CHECKS = (
+    ("Full name", 10, lambda p, u: bool(u is not None and u.full_name and u.full_name.strip())),
+    ("Bio", 10, lambda p, u: bool(p.bio and p.bio.strip())),
+    ("Target roles", 10, lambda p, u: bool(p.target_roles)),
+    ("Skills", 10, lambda p, u: bool(p.skills)),
+    ("Experience years", 10, lambda p, u: (p.experience_years or 0) > 0),
+    ("Resume", 15, lambda p, u: bool(p.resume_text and p.resume_text.strip())),
+    ("LinkedIn URL", 10, lambda p, u: bool(p.linkedin_url)),
+    ("GitHub URL", 10, lambda p, u: bool(p.github_url)),
+    ("Resume scored", 10, lambda p, u: p.resume_score is not None),
+    ("Overall score", 5, lambda p, u: p.profile_score is not None),
+)
+
+# Profile columns the checks read; edits to anything else leave completion alone
+COMPLETION_FIELDS = frozenset({
+    "bio", "target_roles", "skills", "experience_years", "resume_text",
+    "linkedin_url", "github_url", "resume_score", "profile_score",
+})
+
+
+def compute_completion(profile: UserProfile, user: Optional[User]) -> Dict[str, Any]:
+    """Returns dict {completion_pct, missing[]}."""
+    results = [(label, weight, check(profile, user)) for label, weight, check in CHECKS]
+    return {
+        "completion_pct": float(sum(weight for _, weight, ok in results if ok)),
+        "missing": [label for label, _, ok in results if not ok],
+    }
+
+
+# ── User snapshot ────────────────────────────────────────────────────────
+
+def remember(user_id: int, completion_pct: Optional[float]) -> None:
+    """Refresh the cached snapshot's completion, if the user is cached."""
+    snapshots.update(user_id, profile_completion=float(completion_pct or 0.0))
+
+
+# ── Write-time maintenance ───────────────────────────────────────────────
+
+def _changed_attrs(obj) -> Set[str]:
+    return {a.key for a in inspect(obj).attrs if a.history.has_changes()}
+
+
+@event.listens_for(SessionLocal, "before_flush")
+def _update_completion(session, flush_context, instances):
+    profiles = {}
+    for obj in list(session.new) + list(session.dirty):
+        if isinstance(obj, UserProfile):
+            if obj in session.new or _changed_attrs(obj) & COMPLETION_FIELDS:
+                profiles[id(obj)] = obj
+        elif isinstance(obj, User) and obj in session.dirty and "full_name" in _changed_attrs(obj):
+            profile = session.query(UserProfile).filter(UserProfile.user_id == obj.id).first()
+            if profile is not None:
+                profiles[id(profile)] = profile
+
+    if not profiles:
+        return
+    pending = session.info.setdefault("profile_completion", {})
+    for profile in profiles.values():
+        user = session.get(User, profile.user_id) if profile.user_id is not None else None
+        pct = compute_completion(profile, user)["completion_pct"]
+        if profile.profile_completion != pct:
+            profile.profile_completion = pct
+        if profile.user_id is not None:
+            pending[profile.user_id] = pct
+
+
+@event.listens_for(SessionLocal, "after_commit")
+def _publish_completion(session):
+    for user_id, pct in session.info.pop("profile_completion", {}).items():
+        remember(user_id, pct)
+
+
+@event.listens_for(SessionLocal, "after_rollback")
+def _drop_completion(session):
+    session.info.pop("profile_completion", None)
+
+
+# ── Backfill ─────────────────────────────────────────────────────────────
+
+def backfill(db) -> Tuple[int, int]:
+    """Recompute every stored profile_completion. Returns (profiles, corrected)."""
+    profiles = corrected = 0
+    pending = db.info.setdefault("profile_completion", {})
+    query = db.query(UserProfile, User).outerjoin(User, User.id == UserProfile.user_id)
+    for profile, user in query.yield_per(1000):
+        pct = compute_completion(profile, user)["completion_pct"]
+        if profile.profile_completion != pct:
+            profile.profile_completion = pct
+            if profile.user_id is not None:
+                pending[profile.user_id] = pct
+            corrected += 1
+        profiles += 1
+    db.commit()
+    return profiles, corrected
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Profile completion tools")
+    parser.add_argument("--backfill", action="store_true", help="recompute stored profile completion")
+    args = parser.parse_args()
+
+    if args.backfill:
+        db = SessionLocal()
+        try:
+            profiles, corrected = backfill(db)
+            print(f"✓ Checked {profiles} profiles, corrected completion on {corrected}")
+        finally:
+            db.close()
+    else:
+        parser.print_help()
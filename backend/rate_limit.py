@@ -0,0 +1,231 @@
+"""
+Token-bucket admission control for the expensive auth endpoints.
+
+Login runs bcrypt, forgot-password queues an OTP email and verify-otp is a
+6-digit guess, so each takes one token from two buckets before doing any
+work: one per client IP and one per email address. A request that finds
+either bucket empty gets 429 with Retry-After, which costs a dict lookup
+instead of a bcrypt round, so a burst from one source can't starve a worker
+and other users' logins stay fast.
+
+Limits are "capacity/seconds" (burst size, refilled evenly over that many
+seconds) and can be overridden per scope and key, e.g.
+RATE_LIMIT_LOGIN_IP=20/60 or RATE_LIMIT_VERIFY_OTP_EMAIL=10/600.
+
+Buckets live in this process by default (bounded LRU, RATE_LIMIT_MAX_KEYS);
+with RATE_LIMIT_REDIS_URL set and the redis package installed they are
+shared by all workers. Behind a proxy the client IP comes from
+X-Forwarded-For: RATE_LIMIT_PROXY_HOPS is how many proxies (Render's is one)
+append to it, so spoofed entries further left are ignored.
+
+/debug/auth/rate-limits reports allowed and rejected counts per scope.
+"""
+import math
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, NamedTuple, Optional, Tuple
+
+from fastapi import HTTPException, Request, status
+
+RATE_LIMIT_ENABLED = os.getenv("RATE_LIMIT_ENABLED", "true").lower() in ("1", "true", "yes")
+RATE_LIMIT_REDIS_URL = os.getenv("RATE_LIMIT_REDIS_URL")
+RATE_LIMIT_MAX_KEYS = int(os.getenv("RATE_LIMIT_MAX_KEYS", "100000"))
+RATE_LIMIT_PROXY_HOPS = int(os.getenv("RATE_LIMIT_PROXY_HOPS", "1"))
+
+
+class Limit(NamedTuple):
+    capacity: float     # burst size
+    rate: float         # tokens per second
+
+    @classmethod
+    def parse(cls, spec: str) -> "Limit":
+        capacity, seconds = spec.split("/")
+        return cls(float(capacity), float(capacity) / float(seconds))
+
+
+# scope -> (per IP, per email) defaults
+_DEFAULT_LIMITS = {
+    "login": ("20/60", "10/300"),
+    "forgot_password": ("10/600", "3/900"),
+    "verify_otp": ("20/60", "10/600"),
+}
+
+
+def _limits() -> Dict[str, Tuple[Limit, Limit]]:
+    limits = {}
+    for scope, (ip, email) in _DEFAULT_LIMITS.items():
+        prefix = f"RATE_LIMIT_{scope.upper()}"
+        limits[scope] = (
+            Limit.parse(os.getenv(f"{prefix}_IP", ip)),
+            Limit.parse(os.getenv(f"{prefix}_EMAIL", email)),
+        )
+    return limits
+
+
+LIMITS = _limits()
+
+
+class MemoryBuckets:
+    """Buckets in this process: key -> (tokens, last refill), least recently used evicted first."""
+
+    def __init__(self, max_keys: int = RATE_LIMIT_MAX_KEYS):
+        self.max_keys = max_keys
+        self._buckets: "OrderedDict[str, Tuple[float, float]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def take(self, key: str, limit: Limit) -> float:
+        """Take a token. Returns 0 if granted, else seconds until one is available."""
+        now = time.monotonic()
+        with self._lock:
+            tokens, last = self._buckets.get(key, (limit.capacity, now))
+            tokens = min(limit.capacity, tokens + (now - last) * limit.rate)
+            wait = 0.0
+            if tokens >= 1:
+                tokens -= 1
+            else:
+                wait = (1 - tokens) / limit.rate
+            self._buckets[key] = (tokens, now)
+            self._buckets.move_to_end(key)
+            while len(self._buckets) > self.max_keys:
+                self._buckets.popitem(last=False)
+            return wait
+
+    def clear(self) -> None:
+        with self._lock:
+            self._buckets.clear()
+
+    def size(self) -> int:
+        return len(self._buckets)
+
+
+# Same refill-and-take as MemoryBuckets.take, atomically in Redis with its clock
+_REDIS_TAKE = """
+local capacity = tonumber(ARGV[1])
+local rate = tonumber(ARGV[2])
+local t = redis.call('TIME')
+local now = tonumber(t[1]) + tonumber(t[2]) / 1000000
+local state = redis.call('HMGET', KEYS[1], 'tokens', 'ts')
+local tokens = tonumber(state[1]) or capacity
+local ts = tonumber(state[2]) or now
+tokens = math.min(capacity, tokens + math.max(0, now - ts) * rate)
+local wait = 0
+if tokens >= 1 then
+  tokens = tokens - 1
+else
+  wait = (1 - tokens) / rate
+end
+redis.call('HSET', KEYS[1], 'tokens', tostring(tokens), 'ts', tostring(now))
+redis.call('EXPIRE', KEYS[1], math.ceil(capacity / rate) + 1)
+return tostring(wait)
+"""
+
+
+class RedisBuckets:
+    """Buckets shared by every worker through Redis (one round trip per take)."""
+
+    def __init__(self, url: str):
+        import redis
+        self._client = redis.Redis.from_url(url, socket_timeout=0.5)
+        self._take = self._client.register_script(_REDIS_TAKE)
+
+    def take(self, key: str, limit: Limit) -> float:
+        return float(self._take(keys=[f"ratelimit:{key}"], args=[limit.capacity, limit.rate]))
+
+    def clear(self) -> None:
+        for key in self._client.scan_iter("ratelimit:*"):
+            self._client.delete(key)
+
+    def size(self) -> Optional[int]:
+        return None
+
+
+def _build_store():
+    if RATE_LIMIT_REDIS_URL:
+        try:
+            return RedisBuckets(RATE_LIMIT_REDIS_URL)
+        except ImportError:
+            print("⚠️ RATE_LIMIT_REDIS_URL is set but redis is not installed; using per-process rate limits")
+    return MemoryBuckets()
+
+
+store = _build_store()
+
+
+class _Counters:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.by_scope: Dict[str, Dict[str, int]] = {}
+
+    def add(self, scope: str, outcome: str) -> None:
+        with self._lock:
+            counts = self.by_scope.setdefault(scope, {"allowed": 0, "rejected_ip": 0, "rejected_email": 0})
+            counts[outcome] += 1
+
+    def snapshot(self) -> Dict[str, Dict[str, int]]:
+        with self._lock:
+            return {scope: dict(counts) for scope, counts in self.by_scope.items()}
+
+
+counters = _Counters()
+
+
+def client_ip(request: Request) -> str:
+    """The address the nearest trusted proxy saw, or the socket peer without one."""
+    forwarded = request.headers.get("x-forwarded-for")
+    if forwarded and RATE_LIMIT_PROXY_HOPS > 0:
+        hops = [h.strip() for h in forwarded.split(",") if h.strip()]
+        if hops:
+            return hops[-min(RATE_LIMIT_PROXY_HOPS, len(hops))]
+    return request.client.host if request.client else "unknown"
+
+
+def _take(key: str, limit: Limit) -> float:
+    try:
+        return store.take(key, limit)
+    except Exception as e:
+        # A shared store that is down must not lock everyone out
+        print(f"⚠️ Rate limit store unavailable, allowing request: {e}")
+        return 0.0
+
+
+def enforce(request: Request, scope: str, email: Optional[str] = None) -> None:
+    """
+    Take a token from `scope`'s per-IP bucket and, when `email` is given, its
+    per-email bucket. Raises 429 with Retry-After if either is empty.
+    """
+    if not RATE_LIMIT_ENABLED:
+        return
+    ip_limit, email_limit = LIMITS[scope]
+    checks = [("rejected_ip", f"{scope}:ip:{client_ip(request)}", ip_limit)]
+    if email:
+        checks.append(("rejected_email", f"{scope}:email:{email.strip().lower()}", email_limit))
+
+    for outcome, key, limit in checks:
+        wait = _take(key, limit)
+        if wait > 0:
+            counters.add(scope, outcome)
+            retry_after = max(1, math.ceil(wait))
+            raise HTTPException(
+                status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+                detail=f"Too many attempts. Try again in {retry_after} seconds.",
+                headers={"Retry-After": str(retry_after)},
+            )
+    counters.add(scope, "allowed")
+
+
+def rate_limit_metrics() -> dict:
+    return {
+        "enabled": RATE_LIMIT_ENABLED,
+        "store": "redis" if isinstance(store, RedisBuckets) else "memory",
+        "buckets": store.size(),
+        "limits": {
+            scope: {
+                "ip": {"capacity": ip.capacity, "per_second": round(ip.rate, 4)},
+                "email": {"capacity": em.capacity, "per_second": round(em.rate, 4)},
+            }
+            for scope, (ip, em) in LIMITS.items()
+        },
+        "by_scope": counters.snapshot(),
+    }
@@ -0,0 +1,142 @@
+"""
+Rotating refresh tokens (refresh_tokens table).
+
+A sign-in issues a 30-day refresh token next to the short-lived access
+token. POST /auth/refresh trades it for a new access token *and* a new
+refresh token; the old one is marked rotated and can't be used again. No
+password hashing, OAuth round-trip or cache warming is involved: the token
+is 256 random bits, so it is stored and looked up as a plain SHA-256.
+
+Every token descends from one sign-in and shares its family_id. If a
+rotated token is presented again, someone kept a copy of it (a stolen token
+used after the owner refreshed, or the other way round), so the whole
+family is revoked and both parties have to sign in again. A replay within
+REFRESH_TOKEN_REUSE_GRACE seconds of the rotation is two tabs refreshing at
+once, not theft: it gets its own successor in the same family.
+
+Rows are kept until they expire, so a replayed token is still recognized;
+a maintenance job deletes them REFRESH_TOKEN_REUSE_GRACE after expiry,
+every REFRESH_TOKEN_PURGE_INTERVAL seconds.
+
+Nothing here commits except that job; callers commit with the rest of their work.
+"""
+import hashlib
+import os
+import secrets
+from datetime import datetime, timedelta
+from typing import Optional, Tuple
+
+from sqlalchemy import delete, update
+from sqlalchemy.orm import Session
+
+import maintenance
+from database import SessionLocal
+from models import RefreshToken
+
+REFRESH_TOKEN_EXPIRE_DAYS = int(os.getenv("REFRESH_TOKEN_EXPIRE_DAYS", "30"))
+REFRESH_TOKEN_REUSE_GRACE = float(os.getenv("REFRESH_TOKEN_REUSE_GRACE", "10"))
+REFRESH_TOKEN_PURGE_INTERVAL = float(os.getenv("REFRESH_TOKEN_PURGE_INTERVAL", "3600"))
+
+
+class RefreshTokenError(Exception):
+    """The presented refresh token can't be exchanged (unknown, expired, revoked or reused)."""
+
+
+def _hash(token: str) -> str:
+    return hashlib.sha256(token.encode()).hexdigest()
+
+
+def issue(db: Session, user_id: int, family_id: Optional[str] = None) -> str:
+    """New refresh token for `user_id`, starting a family unless one is given."""
+    token = secrets.token_urlsafe(32)
+    db.add(RefreshToken(
+        user_id=user_id,
+        family_id=family_id or secrets.token_hex(16),
+        token_hash=_hash(token),
+        expires_at=datetime.utcnow() + timedelta(days=REFRESH_TOKEN_EXPIRE_DAYS),
+    ))
+    return token
+
+
+def rotate(db: Session, token: str) -> Tuple[int, str]:
+    """
+    Exchange `token` for a successor in the same family. Returns
+    (user_id, new token). A token rotated less than
+    REFRESH_TOKEN_REUSE_GRACE seconds ago gets another successor (a
+    concurrent refresh); later, it raises RefreshTokenError after revoking
+    the family. Unknown, expired and revoked tokens raise too.
+    """
+    now = datetime.utcnow()
+    token_hash = _hash(token)
+    # Single conditional UPDATE: of two concurrent exchanges only one wins
+    claimed = db.execute(
+        update(RefreshToken)
+        .where(
+            RefreshToken.token_hash == token_hash,
+            RefreshToken.rotated_at.is_(None),
+            RefreshToken.revoked_at.is_(None),
+            RefreshToken.expires_at > now,
+        )
+        .values(rotated_at=now)
+        .returning(RefreshToken.user_id, RefreshToken.family_id)
+    ).first()
+    if claimed is not None:
+        return claimed.user_id, issue(db, claimed.user_id, claimed.family_id)
+
+    row = (
+        db.query(RefreshToken.user_id, RefreshToken.family_id, RefreshToken.expires_at,
+                 RefreshToken.rotated_at, RefreshToken.revoked_at)
+        .filter(RefreshToken.token_hash == token_hash)
+        .first()
+    )
+    if row is None:
+        raise RefreshTokenError("Invalid refresh token")
+    if row.revoked_at is None and row.rotated_at is not None:
+        if (now - row.rotated_at).total_seconds() > REFRESH_TOKEN_REUSE_GRACE:
+            revoke_family(db, row.family_id)
+            raise RefreshTokenError("Refresh token reuse detected")
+        if row.expires_at > now:
+            return row.user_id, issue(db, row.user_id, row.family_id)
+    raise RefreshTokenError("Refresh token expired or revoked")
+
+
+def revoke_family(db: Session, family_id: str) -> int:
+    return db.execute(
+        update(RefreshToken)
+        .where(RefreshToken.family_id == family_id, RefreshToken.revoked_at.is_(None))
+        .values(revoked_at=datetime.utcnow())
+    ).rowcount
+
+
+def revoke_token(db: Session, token: str) -> int:
+    """Sign-out: revoke the family `token` belongs to (0 if unknown)."""
+    family_id = db.query(RefreshToken.family_id).filter(RefreshToken.token_hash == _hash(token)).scalar()
+    return revoke_family(db, family_id) if family_id else 0
+
+
+def revoke_user(db: Session, user_id: int) -> int:
+    """Every refresh token of the user, e.g. after a password reset."""
+    return db.execute(
+        update(RefreshToken)
+        .where(RefreshToken.user_id == user_id, RefreshToken.revoked_at.is_(None))
+        .values(revoked_at=datetime.utcnow())
+    ).rowcount
+
+
+
+def purge_expired(db: Session) -> int:
+    """Delete tokens that expired more than the reuse grace ago; rotated or revoked, they're all dead."""
+    cutoff = datetime.utcnow() - timedelta(seconds=REFRESH_TOKEN_REUSE_GRACE)
+    return db.execute(delete(RefreshToken).where(RefreshToken.expires_at < cutoff)).rowcount
+
+
+@maintenance.every(REFRESH_TOKEN_PURGE_INTERVAL, "refresh_token_purge")
+def purge_expired_refresh_tokens() -> None:
+    db = SessionLocal()
+    try:
+        purged = purge_expired(db)
+        db.commit()
+        if purged:
+            print(f"REFRESH TOKENS: purged {purged} expired tokens")
+    finally:
+        db.close()
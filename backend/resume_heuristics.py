@@ -0,0 +1,270 @@
+"""
+Deterministic resume scorer.
+
+Splits resume_text into sections and scores the four resume sub-dimensions
+(experience, projects, leadership, thinking) from countable features:
+quantified outcomes, action verbs, coverage of the skills the target roles
+call for, tenure from date ranges, and project counts. Runs in
+milliseconds, so GET /profile/score/resume/preview is instant and free.
+The stored resume_score still comes from the LLM (POST /score/resume).
+
+CALIBRATION maps the raw heuristic onto the scale of the LLM scores. It is
+the identity until it has been fitted against stored LLM scores with
+calibrate_resume_scorer.py; only then can the heuristic stand in for them.
+"""
+import math
+import re
+from datetime import date
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from skill_vocabulary import canonicalize_skills, extract_skill_ids
+
+DIMENSIONS = ("experience", "projects", "leadership", "thinking")
+WEIGHTS = {"experience": 0.3, "projects": 0.25, "leadership": 0.2, "thinking": 0.25}
+
+# dimension: (scale, offset) applied to the raw 0-10 heuristic
+CALIBRATION: Dict[str, Tuple[float, float]] = {
+    "experience": (1.0, 0.0),
+    "projects": (1.0, 0.0),
+    "leadership": (1.0, 0.0),
+    "thinking": (1.0, 0.0),
+}
+
+SECTION_HEADINGS = {
+    "summary": ("summary", "profile", "about", "about me", "objective", "professional summary"),
+    "experience": ("experience", "work experience", "professional experience", "employment",
+                   "employment history", "work history", "internships", "internship"),
+    "projects": ("projects", "personal projects", "academic projects", "key projects", "side projects"),
+    "education": ("education", "academics", "academic background"),
+    "skills": ("skills", "technical skills", "core skills", "technologies", "tech stack", "tools"),
+    "leadership": ("leadership", "activities", "extracurricular", "extracurricular activities",
+                   "volunteering", "positions of responsibility"),
+    "achievements": ("achievements", "awards", "honors", "honours", "accomplishments"),
+    "certifications": ("certifications", "certificates", "courses"),
+}
+_HEADING_TO_SECTION = {h: s for s, headings in SECTION_HEADINGS.items() for h in headings}
+
+ACTION_VERBS = {
+    "built", "designed", "developed", "implemented", "created", "launched", "shipped", "delivered",
+    "architected", "engineered", "automated", "optimized", "optimised", "improved", "reduced",
+    "increased", "migrated", "refactored", "scaled", "deployed", "integrated", "led", "owned",
+    "drove", "established", "introduced", "streamlined", "analyzed", "analysed", "researched",
+    "debugged", "resolved", "wrote", "maintained", "rebuilt", "redesigned", "cut", "saved",
+    "accelerated", "spearheaded", "mentored", "managed", "coordinated", "founded", "initiated",
+}
+LEADERSHIP_TERMS = (
+    r"\bled\b", r"\bmentor(ed|ing)?\b", r"\bmanag(ed|ing)\b", r"\bowned\b", r"\bownership\b",
+    r"\bspearhead(ed)?\b", r"\bcoordinat(ed|ing)\b", r"\bhired\b", r"\binterview(ed|ing) candidates\b",
+    r"\bfounded\b", r"\bco-?founded\b", r"\bteam of \d+", r"\bcross[- ]functional\b",
+    r"\bstakeholders?\b", r"\bpresident\b", r"\bcaptain\b", r"\bhead of\b", r"\btech lead\b",
+    r"\bonboard(ed|ing)\b",
+)
+THINKING_TERMS = (
+    r"\btrade-?offs?\b", r"\broot cause\b", r"\barchitect(ed|ure)\b", r"\bdesign(ed)?\b",
+    r"\boptimi[sz](ed|ation)\b", r"\bbottlenecks?\b", r"\blatency\b", r"\bthroughput\b",
+    r"\bscalab(le|ility)\b", r"\bbenchmark(ed|s)?\b", r"\bprofil(ed|ing)\b", r"\bdebugg(ed|ing)\b",
+    r"\bhypothes[ie]s\b", r"\bexperiment(s|ed)?\b", r"\ba/b test", r"\binstead of\b",
+    r"\bby (reducing|replacing|introducing|caching|batching|parallelizing)\b",
+)
+_LEADERSHIP_RE = re.compile("|".join(LEADERSHIP_TERMS), re.IGNORECASE)
+_THINKING_RE = re.compile("|".join(THINKING_TERMS), re.IGNORECASE)
+
+_QUANTIFIED_RE = re.compile(
+    r"[$€£₹]\s?\d|\b\d[\d,.]*\s?(%|percent\b|x\b|k\b|m\b|mm\b|bn?\b|ms\b|sec\b|seconds\b|hrs?\b|hours\b"
+    r"|days\b|weeks\b|users\b|customers\b|clients\b|requests\b|rps\b|qps\b|tps\b|tb\b|gb\b|"
+    r"million\b|billion\b|lakh\b|crore\b)|\b\d{2,}[\d,]*\+",
+    re.IGNORECASE,
+)
+_BULLET_RE = re.compile(r"^\s*(?:[-•*▪◦●‣–]|\d+[.)])\s+")
+
+_MONTHS = {m: i for i, m in enumerate(
+    ("jan", "feb", "mar", "apr", "may", "jun", "jul", "aug", "sep", "oct", "nov", "dec"), start=1)}
+_DATE = r"(?:(?P<{p}m>[a-z]{{3}})[a-z]*\.?\s+|(?P<{p}n>\d{{1,2}})[/.-])?(?P<{p}y>(?:19|20)\d{{2}})"
+_RANGE_RE = re.compile(
+    _DATE.format(p="s") + r"\s*(?:-|–|—|to|until)\s*(?:" + _DATE.format(p="e")
+    + r"|(?P<present>present|current|now|today|ongoing))",
+    re.IGNORECASE,
+)
+
+# Target-role keyword: canonical skill ids (skill_vocabulary.py) the role calls for
+ROLE_SKILLS: Dict[str, Tuple[int, ...]] = {
+    "backend": (1, 4, 5, 16, 60, 63, 83, 107, 109, 140),
+    "frontend": (2, 3, 40, 46, 47, 42, 41, 43),
+    "full": (2, 3, 40, 34, 16, 60, 107, 83),
+    "data": (1, 16, 102, 104, 100, 70, 71, 125),
+    "ml": (1, 120, 121, 123, 122, 124, 125, 126),
+    "machine": (1, 120, 121, 123, 122, 124, 125, 126),
+    "ai": (1, 120, 121, 123, 127, 129, 130),
+    "devops": (80, 83, 84, 85, 89, 90, 87, 17),
+    "sre": (80, 83, 84, 90, 93, 94, 17),
+    "platform": (80, 83, 84, 85, 89, 90),
+    "cloud": (80, 81, 82, 83, 84, 85),
+    "mobile": (12, 13, 49, 50, 18),
+    "android": (12, 4, 50),
+    "ios": (13, 21, 50),
+    "product": (145, 143, 131, 16),
+    "analyst": (16, 131, 125, 132, 133),
+    "security": (90, 1, 17, 80),
+}
+# Years of experience a role level expects at minimum
+SENIORITY_YEARS = (
+    (("intern", "trainee", "graduate", "fresher"), 0.0),
+    (("junior", "associate", "entry", "sde-1", "sde 1", "sde1"), 1.0),
+    (("principal", "staff", "architect", "director"), 8.0),
+    (("senior", "lead", "sde-3", "sde 3", "sde3", "manager"), 5.0),
+)
+DEFAULT_EXPECTED_YEARS = 2.0
+
+
+def _saturate(x: float, half: float) -> float:
+    """0 at x=0, 0.5 at x=half, approaching 1."""
+    return 1.0 - math.exp(-math.log(2) * max(x, 0.0) / half) if half > 0 else 1.0
+
+
+def parse_sections(text: str) -> Dict[str, List[str]]:
+    """{section: non-empty lines}; lines before the first heading go to "header"."""
+    sections: Dict[str, List[str]] = {"header": []}
+    current = "header"
+    for raw in (text or "").splitlines():
+        line = raw.strip()
+        if not line:
+            continue
+        heading = re.sub(r"[^a-z &/-]", "", line.lower()).strip(" &/-")
+        if len(line) <= 40 and heading in _HEADING_TO_SECTION:
+            current = _HEADING_TO_SECTION[heading]
+            sections.setdefault(current, [])
+            continue
+        sections.setdefault(current, []).append(line)
+    return sections
+
+
+def _month(name: Optional[str], number: Optional[str], default: int) -> int:
+    if name:
+        return _MONTHS.get(name[:3].lower(), default)
+    if number and 1 <= int(number) <= 12:
+        return int(number)
+    return default
+
+
+def tenure_years(lines: Iterable[str], today: Optional[date] = None) -> float:
+    """Years covered by the date ranges in `lines`, overlapping ranges counted once."""
+    today = today or date.today()
+    now = today.year * 12 + today.month
+    spans = []
+    for m in _RANGE_RE.finditer("\n".join(lines)):
+        start = int(m.group("sy")) * 12 + _month(m.group("sm"), m.group("sn"), 1)
+        if m.group("present"):
+            end = now
+        else:
+            end = int(m.group("ey")) * 12 + _month(m.group("em"), m.group("en"), 12)
+        if start <= end <= now + 12:
+            spans.append((start, min(end, now)))
+    months, covered_to = 0, 0
+    for start, end in sorted(spans):
+        start = max(start, covered_to)
+        if end > start:
+            months += end - start
+            covered_to = end
+    return months / 12.0
+
+
+def expected_skills(target_roles: Iterable[str]) -> set:
+    ids = set()
+    for role in target_roles or []:
+        for token in re.findall(r"[a-z]+", role.lower()):
+            ids.update(ROLE_SKILLS.get(token, ()))
+    return ids
+
+
+def expected_years(target_roles: Iterable[str]) -> float:
+    text = " ".join(target_roles or []).lower()
+    for keywords, years in SENIORITY_YEARS:
+        if any(k in text for k in keywords):
+            return years
+    return DEFAULT_EXPECTED_YEARS
+
+
+def _bullets(lines: List[str]) -> List[str]:
+    """Bullet points, or every line when the section isn't bulleted."""
+    bullets = [_BULLET_RE.sub("", l) for l in lines if _BULLET_RE.match(l)]
+    return bullets or lines
+
+
+def extract_features(resume_text: str, target_roles: Iterable[str] = (), skills: Iterable[str] = (),
+                     experience_years: Optional[float] = None, today: Optional[date] = None) -> Dict[str, float]:
+    sections = parse_sections(resume_text)
+    experience_lines = sections.get("experience", [])
+    project_lines = sections.get("projects", [])
+    body = [l for name, lines in sections.items() if name not in ("education", "skills") for l in lines]
+
+    bullets = _bullets(experience_lines + project_lines) if experience_lines or project_lines else _bullets(body)
+    first_words = [re.findall(r"[a-z]+", b.lower())[:1] for b in bullets]
+    text = "\n".join(body)
+
+    found = set(extract_skill_ids(resume_text)) | set(canonicalize_skills(skills)[1])
+    wanted = expected_skills(target_roles)
+    tenure = tenure_years(experience_lines or body, today)
+
+    project_titles = [l for l in project_lines if not _BULLET_RE.match(l) and len(l) <= 80]
+    project_bullets = [l for l in project_lines if _BULLET_RE.match(l)]
+    project_count = len(project_titles) or math.ceil(len(project_bullets) / 3)
+
+    return {
+        "sections": float(len([s for s in sections if s != "header"])),
+        "bullets": float(len(bullets)),
+        "quantified_ratio": sum(bool(_QUANTIFIED_RE.search(b)) for b in bullets) / len(bullets) if bullets else 0.0,
+        "action_verb_ratio": sum(bool(w) and w[0] in ACTION_VERBS for w in first_words) / len(bullets) if bullets else 0.0,
+        "leadership_signals": float(len(_LEADERSHIP_RE.findall(text))),
+        "thinking_signals": float(len(_THINKING_RE.findall(text))),
+        "skills_found": float(len(found)),
+        "skill_coverage": len(found & wanted) / len(wanted) if wanted else min(len(found) / 8.0, 1.0),
+        "tenure_years": round(tenure, 1),
+        "claimed_years": float(experience_years or 0.0),
+        "expected_years": expected_years(target_roles),
+        "experience_bullets": float(len(_bullets(experience_lines)) if experience_lines else 0),
+        "project_count": float(project_count),
+        "project_skills": float(len(extract_skill_ids("\n".join(project_lines)))),
+        "project_quantified": float(sum(bool(_QUANTIFIED_RE.search(l)) for l in project_lines)),
+    }
+
+
+def _raw_scores(f: Dict[str, float]) -> Dict[str, float]:
+    # Dated history wins; fall back to the claimed years, trusted a little less
+    years = f["tenure_years"] if f["tenure_years"] > 0 else 0.8 * f["claimed_years"]
+    tenure_fit = min(years / f["expected_years"], 1.0) if f["expected_years"] > 0 else _saturate(years, 1.0)
+    return {
+        "experience": 10 * (
+            0.45 * tenure_fit
+            + 0.35 * f["skill_coverage"]
+            + 0.20 * _saturate(f["experience_bullets"], 4)
+        ),
+        "projects": 10 * (
+            0.40 * _saturate(f["project_count"], 2)
+            + 0.35 * _saturate(f["project_skills"], 3)
+            + 0.25 * _saturate(f["project_quantified"], 1)
+        ),
+        "leadership": 10 * _saturate(f["leadership_signals"], 2.5),
+        "thinking": 10 * (
+            0.45 * _saturate(f["quantified_ratio"], 0.3)
+            + 0.25 * f["action_verb_ratio"]
+            + 0.30 * _saturate(f["thinking_signals"], 3)
+        ),
+    }
+
+
+def score_features(features: Dict[str, float]) -> Tuple[float, Dict[str, float]]:
+    """(resume_score, breakdown), all 0-10 and calibrated."""
+    breakdown = {}
+    for dim, raw in _raw_scores(features).items():
+        scale, offset = CALIBRATION[dim]
+        breakdown[dim] = round(max(0.0, min(10.0, raw * scale + offset)), 1)
+    overall = sum(breakdown[d] * WEIGHTS[d] for d in DIMENSIONS)
+    return round(overall, 1), breakdown
+
+
+def assess_resume(resume_text: str, target_roles: Iterable[str] = (), skills: Iterable[str] = (),
+                  experience_years: Optional[float] = None) -> Dict:
+    """{"resume_score", "breakdown", "features"} for a resume."""
+    features = extract_features(resume_text, target_roles, skills, experience_years)
+    score, breakdown = score_features(features)
+    return {"resume_score": score, "breakdown": breakdown, "features": features}
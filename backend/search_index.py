@@ -0,0 +1,609 @@
+"""
+In-memory inverted index for recruiter candidate search.
+
+Maps normalized skills, the distinct lowercased target roles and headlines,
+and locations to the set of user ids whose profile is visible to recruiters.
+A search intersects (or, for skills in "any" mode, unions) the posting sets
+(role and location postings whose key contains the search text), filters
+the experience range, and pages over a ranking kept sorted by profile score,
+so totals are exact and no row is read from the database per query.
+
+The index is built from user_profiles on first use and kept current by the
+session hooks at the bottom of this module: every committed insert/update/
+delete of a UserProfile (and full-name change on User) is applied to it, and
+changes committed while an index is being built (the first one included)
+are replayed onto it before it is swapped in.
+Other workers' writes are picked up by a sync every SEARCH_INDEX_SYNC_INTERVAL
+seconds (a maintenance job) that re-reads profiles whose updated_at is
+recent; rows that haven't changed are skipped, so the overlap window only
+costs the read. A full background rebuild every SEARCH_INDEX_MAX_AGE seconds
+catches what the sync can't see (deleted profiles, renamed users).
+
+Filter-only searches (no full-text `within`) are memoized per index in a
+ResultCache keyed by the normalized filters. A profile change, local or
+synced, evicts exactly the entries whose filter matched the profile before
+or after the change; hit rates are exposed at /debug/search/cache.
+"""
+import os
+import threading
+import time
+from collections import OrderedDict
+from bisect import bisect_left, bisect_right, insort
+from datetime import datetime, timedelta
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from sqlalchemy import event, inspect
+
+import maintenance
+from database import SessionLocal
+from models import User, UserProfile
+from skill_vocabulary import SkillKey, skill_key
+
+SEARCH_INDEX_MAX_AGE = float(os.getenv("SEARCH_INDEX_MAX_AGE", "600"))
+SEARCH_INDEX_SYNC_INTERVAL = float(os.getenv("SEARCH_INDEX_SYNC_INTERVAL", "5"))
+# Re-read this far behind the last sync, for transactions that committed late
+# and for clock skew between workers (updated_at is set by the writer's clock)
+SEARCH_INDEX_SYNC_OVERLAP = float(os.getenv("SEARCH_INDEX_SYNC_OVERLAP", "60"))
+SEARCH_CACHE_SIZE = int(os.getenv("SEARCH_CACHE_SIZE", "1024"))
+
+_EMPTY: Set[int] = frozenset()
+
+
+class CandidateDoc:
+    """Everything a search result needs, so results never touch the DB."""
+
+    __slots__ = (
+        "user_id", "full_name", "headline", "location", "experience_years",
+        "skills", "target_roles", "github_url", "linkedin_url", "portfolio_url",
+        "profile_score", "skill_keys", "role_values", "location_value", "source",
+    )
+
+    def __init__(self, profile: dict, full_name: Optional[str]):
+        self.source = tuple(profile.get(f) for f in PROFILE_FIELDS)
+        self.user_id = profile["user_id"]
+        self.full_name = full_name
+        self.headline = profile.get("headline")
+        self.location = profile.get("location")
+        # None when unset: experience filters exclude it, as the SQL comparison did
+        self.experience_years = profile.get("experience_years")
+        self.skills = list(profile.get("skills") or [])
+        self.target_roles = list(profile.get("target_roles") or [])
+        self.github_url = profile.get("github_url")
+        self.linkedin_url = profile.get("linkedin_url")
+        self.portfolio_url = profile.get("portfolio_url")
+        self.profile_score = profile.get("profile_score")
+
+        # Canonical ids (listed skills plus any found in the resume), with
+        # unknown skills as normalized strings
+        self.skill_keys = set(profile.get("skill_ids") or [])
+        self.skill_keys.update(k for k in map(skill_key, self.skills) if k != "")
+        # Lowercased strings the role and location filters search within
+        self.role_values = {r.lower() for r in self.target_roles if r}
+        if self.headline:
+            self.role_values.add(self.headline.lower())
+        self.location_value = (self.location or "").lower()
+
+    @property
+    def rank_key(self) -> Tuple[float, int]:
+        # Highest profile score first, unscored last, ties by user id
+        score = self.profile_score if self.profile_score is not None else -1.0
+        return (-score, self.user_id)
+
+    @property
+    def experience_key(self) -> Optional[Tuple[float, int]]:
+        """Position in the experience ordering; None (not ordered) without a value."""
+        if self.experience_years is None:
+            return None
+        return (self.experience_years, self.user_id)
+
+
+class CandidateFilter:
+    """
+    The filter semantics of CandidateIndex.search as a per-document
+    predicate, for callers that stream rows instead of querying the index.
+    """
+
+    def __init__(self, role: Optional[str] = None, skills: Optional[Iterable[str]] = None,
+                 skills_mode: str = "any", location: Optional[str] = None,
+                 min_experience: Optional[float] = None, max_experience: Optional[float] = None):
+        self.skill_keys = {k for k in map(skill_key, skills or []) if k != ""}
+        self.all_skills = skills_mode == "all"
+        self.role = role.lower() if role else None
+        self.location = location.lower() if location else None
+        self.min_experience = min_experience if min_experience is not None else float("-inf")
+        self.max_experience = max_experience if max_experience is not None else float("inf")
+        self.filters_experience = min_experience is not None or max_experience is not None
+
+    @property
+    def key(self) -> tuple:
+        """Hashable form of the filters; equal for searches that must return the same result."""
+        return (
+            frozenset(self.skill_keys), self.all_skills and len(self.skill_keys) > 1,
+            self.role, self.location,
+            self.min_experience, self.max_experience,
+        )
+
+    def __call__(self, doc: CandidateDoc) -> bool:
+        if self.skill_keys:
+            if self.all_skills:
+                if not self.skill_keys <= doc.skill_keys:
+                    return False
+            elif not self.skill_keys & doc.skill_keys:
+                return False
+        if self.role is not None and not any(self.role in v for v in doc.role_values):
+            return False
+        if self.location is not None and doc.location_value and self.location not in doc.location_value:
+            return False
+        if doc.experience_years is None:
+            return not self.filters_experience
+        return self.min_experience <= doc.experience_years <= self.max_experience
+
+
+class SearchCacheStats:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+        self.evictions = 0
+
+    def count(self, field: str, n: int = 1) -> None:
+        with self._lock:
+            setattr(self, field, getattr(self, field) + n)
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+                "invalidations": self.invalidations,
+                "evictions": self.evictions,
+            }
+
+
+# Shared across index rebuilds so hit rates cover the process lifetime
+search_cache_stats = SearchCacheStats()
+
+
+class ResultCache:
+    """
+    LRU of (page, total) per (filter key, offset, limit). Not thread-safe on
+    its own: CandidateIndex only touches it under its lock.
+    """
+
+    def __init__(self, max_entries: int = SEARCH_CACHE_SIZE):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[tuple, Tuple[CandidateFilter, tuple]]" = OrderedDict()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def get(self, key: tuple) -> Optional[tuple]:
+        entry = self._entries.get(key)
+        if entry is None:
+            search_cache_stats.count("misses")
+            return None
+        self._entries.move_to_end(key)
+        search_cache_stats.count("hits")
+        return entry[1]
+
+    def put(self, key: tuple, match: CandidateFilter, value: tuple) -> None:
+        if self.max_entries <= 0:
+            return
+        self._entries[key] = (match, value)
+        self._entries.move_to_end(key)
+        if len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            search_cache_stats.count("evictions")
+
+    def invalidate(self, *docs: Optional[CandidateDoc]) -> None:
+        """Drop every entry whose result could include any of `docs`."""
+        docs = [d for d in docs if d is not None]
+        if not docs or not self._entries:
+            return
+        stale = [key for key, (match, _) in self._entries.items() if any(match(d) for d in docs)]
+        for key in stale:
+            del self._entries[key]
+        if stale:
+            search_cache_stats.count("invalidations", len(stale))
+
+
+# Fields snapshotted from a UserProfile row / ORM object
+PROFILE_FIELDS = (
+    "user_id", "headline", "location", "experience_years", "skills", "skill_ids", "target_roles",
+    "github_url", "linkedin_url", "portfolio_url", "profile_score", "is_visible_to_recruiters",
+)
+_INDEXED_FIELDS = frozenset(PROFILE_FIELDS)
+
+
+class CandidateIndex:
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._docs: Dict[int, CandidateDoc] = {}
+        self._skills: Dict[SkillKey, Set[int]] = {}
+        self._roles: Dict[str, Set[int]] = {}
+        self._locations: Dict[str, Set[int]] = {}
+        self._ranked: List[Tuple[float, int]] = []
+        self._by_experience: List[Tuple[float, int]] = []
+        self.built_at = 0.0
+        self.synced_to: Optional[datetime] = None   # profiles updated before this are reflected
+        self.version = 0     # bumped on every change; lets derived caches detect staleness
+        self.results = ResultCache()
+
+    def __len__(self):
+        return len(self._docs)
+
+    def snapshot(self) -> Tuple[int, List[CandidateDoc]]:
+        """(version, docs) as of now, for consumers that derive their own structures."""
+        with self._lock:
+            return self.version, list(self._docs.values())
+
+    # ── Maintenance ──────────────────────────────────────────────────────
+
+    def load(self, db) -> None:
+        started = datetime.utcnow()
+        rows = (
+            db.query(*[getattr(UserProfile, f) for f in PROFILE_FIELDS], User.full_name)
+            .join(User, User.id == UserProfile.user_id)
+            .filter(UserProfile.is_visible_to_recruiters == True)
+            .all()
+        )
+        with self._lock:
+            for row in rows:
+                doc = CandidateDoc(dict(zip(PROFILE_FIELDS, row)), row[-1])
+                self._add(doc)
+                self._ranked.append(doc.rank_key)
+                if doc.experience_key is not None:
+                    self._by_experience.append(doc.experience_key)
+            self._ranked.sort()
+            self._by_experience.sort()
+            self.built_at = time.time()
+            self.synced_to = started
+
+    def sync(self, db) -> int:
+        """Apply profiles updated (by any worker) since the last sync. Returns how many changed."""
+        started = datetime.utcnow()
+        since = (self.synced_to or started) - timedelta(seconds=SEARCH_INDEX_SYNC_OVERLAP)
+        rows = (
+            db.query(*[getattr(UserProfile, f) for f in PROFILE_FIELDS], User.full_name)
+            .join(User, User.id == UserProfile.user_id)
+            .filter(UserProfile.updated_at >= since)
+            .all()
+        )
+        version = self.version
+        for row in rows:
+            self.upsert(dict(zip(PROFILE_FIELDS, row)), row[-1])
+        self.synced_to = started
+        return self.version - version
+
+    def upsert(self, profile: dict, full_name: Optional[str]) -> None:
+        """Insert, replace or drop (if hidden) the profile's entry."""
+        with self._lock:
+            old = self._docs.get(profile["user_id"])
+            visible = profile.get("is_visible_to_recruiters") is not False
+            if old is None and not visible:
+                return
+            if old and old.source == tuple(profile.get(f) for f in PROFILE_FIELDS) \
+                    and full_name in (None, old.full_name):
+                return  # already current (e.g. our own commit seen again by sync)
+            if old:
+                self._remove(old)
+                full_name = full_name if full_name is not None else old.full_name
+            doc = None
+            if visible:
+                doc = CandidateDoc(profile, full_name)
+                self._add(doc)
+                insort(self._ranked, doc.rank_key)
+                if doc.experience_key is not None:
+                    insort(self._by_experience, doc.experience_key)
+            self.results.invalidate(old, doc)
+            self.version += 1
+
+    def remove(self, user_id: int) -> None:
+        with self._lock:
+            doc = self._docs.get(user_id)
+            if doc:
+                self._remove(doc)
+                self.results.invalidate(doc)
+                self.version += 1
+
+    def rename(self, user_id: int, full_name: str) -> None:
+        with self._lock:
+            doc = self._docs.get(user_id)
+            if doc:
+                doc.full_name = full_name
+                self.results.invalidate(doc)
+                self.version += 1
+
+    def _add(self, doc: CandidateDoc) -> None:
+        """Add postings only; callers place the doc in _ranked/_by_experience."""
+        uid = doc.user_id
+        self._docs[uid] = doc
+        for postings, keys in self._postings(doc):
+            for key in keys:
+                postings.setdefault(key, set()).add(uid)
+
+    def _remove(self, doc: CandidateDoc) -> None:
+        uid = doc.user_id
+        del self._docs[uid]
+        for postings, keys in self._postings(doc):
+            for key in keys:
+                ids = postings.get(key)
+                if ids is not None:
+                    ids.discard(uid)
+                    if not ids:
+                        del postings[key]
+        for ordered, key in ((self._ranked, doc.rank_key), (self._by_experience, doc.experience_key)):
+            if key is None:
+                continue
+            i = bisect_left(ordered, key)
+            if i < len(ordered) and ordered[i] == key:
+                del ordered[i]
+
+    def _postings(self, doc: CandidateDoc):
+        return (
+            (self._skills, doc.skill_keys),
+            (self._roles, doc.role_values),
+            (self._locations, (doc.location_value,)),
+        )
+
+    # ── Query ────────────────────────────────────────────────────────────
+
+    def search(
+        self,
+        role: Optional[str] = None,
+        skills: Optional[Iterable[str]] = None,
+        skills_mode: str = "any",
+        location: Optional[str] = None,
+        min_experience: Optional[float] = None,
+        max_experience: Optional[float] = None,
+        offset: int = 0,
+        limit: int = 20,
+        within: Optional[Dict[int, float]] = None,
+    ) -> Tuple[List[CandidateDoc], int]:
+        """
+        Return (page, total). Role and location are case-insensitive
+        substring matches: role against each target role and the headline,
+        location against the profile's location, which profiles without one
+        always pass. Both scan the distinct strings, not the profiles. Skills
+        match by canonical id (aliases included; see skill_vocabulary.py),
+        any of them or all of them.
+
+        `within` ({user_id: relevance}, e.g. from full-text search) restricts
+        the result to those users and orders it by relevance instead. Such
+        searches bypass the result cache: full-text matches depend on columns
+        the index doesn't track.
+        """
+        offset = max(offset, 0)
+        limit = max(limit, 0)
+        cache_key = match_filter = None
+        if within is None:
+            match_filter = CandidateFilter(role, skills, skills_mode, location, min_experience, max_experience)
+            cache_key = (match_filter.key, offset, limit)
+        with self._lock:
+            if cache_key is not None:
+                cached = self.results.get(cache_key)
+                if cached is not None:
+                    return list(cached[0]), cached[1]
+            required: List[Set[int]] = []
+            skill_keys = [k for k in map(skill_key, skills or []) if k != ""]
+            if skill_keys:
+                if skills_mode == "all":
+                    required.extend(self._skills.get(k, _EMPTY) for k in skill_keys)
+                else:
+                    required.append(set().union(*(self._skills.get(k, _EMPTY) for k in skill_keys)))
+            if role:
+                needle = role.lower()
+                required.append(set().union(*(ids for value, ids in self._roles.items() if needle in value)))
+            if location:
+                needle = location.lower()
+                required.append(set().union(*(
+                    ids for value, ids in self._locations.items() if not value or needle in value
+                )))
+            if within is not None:
+                required.append(within.keys())
+
+            lo = min_experience if min_experience is not None else float("-inf")
+            hi = max_experience if max_experience is not None else float("inf")
+            exp_filtered = min_experience is not None or max_experience is not None
+
+            if required:
+                required.sort(key=len)
+                match = set(required[0]).intersection(*required[1:])
+                if exp_filtered:
+                    docs = self._docs
+                    match = {
+                        u for u in match
+                        if docs[u].experience_years is not None and lo <= docs[u].experience_years <= hi
+                    }
+            elif exp_filtered:
+                start = bisect_left(self._by_experience, (lo, -1))
+                end = bisect_right(self._by_experience, (hi, float("inf")))
+                match = {uid for _, uid in self._by_experience[start:end]}
+            else:
+                match = None
+
+            if match is None:
+                total = len(self._ranked)
+                page = [uid for _, uid in self._ranked[offset:offset + limit]]
+            elif within is not None:
+                total = len(match)
+                page = sorted(match, key=lambda u: (-within[u], u))[offset:offset + limit]
+            else:
+                total = len(match)
+                page = self._page(match, offset, limit)
+            docs = [self._docs[uid] for uid in page]
+            if cache_key is not None:
+                self.results.put(cache_key, match_filter, (tuple(docs), total))
+            return docs, total
+
+    def _page(self, match: Set[int], offset: int, limit: int) -> List[int]:
+        # Small result sets are cheaper to sort; big ones to pick from the ranking
+        if len(match) * 8 < len(self._ranked):
+            docs = self._docs
+            return sorted(match, key=lambda u: docs[u].rank_key)[offset:offset + limit]
+        page, skipped = [], 0
+        for _, uid in self._ranked:
+            if uid in match:
+                if skipped < offset:
+                    skipped += 1
+                    continue
+                page.append(uid)
+                if len(page) >= limit:
+                    break
+        return page
+
+
+# ── Process-wide instance ────────────────────────────────────────────────
+
+_index: Optional[CandidateIndex] = None
+_first_build_lock = threading.Lock()   # one initial build; other callers wait for it
+_build_lock = threading.Lock()         # guards _index swaps, _building and _replay (held briefly)
+_building = False
+_replay: Optional[list] = None   # updates committed while a build runs
+
+
+def _build() -> Optional[CandidateIndex]:
+    """
+    Load a fresh index, replay the updates committed while it loaded, and
+    swap it in. Returns None if another build is already running.
+    """
+    global _index, _building, _replay
+    with _build_lock:
+        if _building:
+            return None
+        _building = True
+        _replay = []
+    try:
+        fresh = CandidateIndex()
+        db = SessionLocal()
+        try:
+            fresh.load(db)
+        finally:
+            db.close()
+        with _build_lock:
+            for op in _replay:
+                _apply(fresh, op)
+            _index = fresh
+        return fresh
+    finally:
+        with _build_lock:
+            _building = False
+            _replay = None
+
+
+def _rebuild_in_background() -> None:
+    def run():
+        try:
+            fresh = _build()
+            if fresh is not None:
+                print(f"SEARCH INDEX: rebuilt with {len(fresh)} candidates")
+        except Exception as e:
+            print(f"SEARCH INDEX ERROR: rebuild failed: {e}")
+
+    if not _building:
+        threading.Thread(target=run, name="candidate-index-rebuild", daemon=True).start()
+
+
+def get_candidate_index() -> CandidateIndex:
+    """The shared index, built on first use and refreshed when stale."""
+    if _index is None:
+        with _first_build_lock:
+            if _index is None:
+                t0 = time.perf_counter()
+                _build()
+                print(f"SEARCH INDEX: built {len(_index)} candidates in {time.perf_counter() - t0:.2f}s")
+    elif time.time() - _index.built_at > SEARCH_INDEX_MAX_AGE:
+        _rebuild_in_background()
+    return _index
+
+
+@maintenance.every(SEARCH_INDEX_SYNC_INTERVAL, "search_index_sync")
+def sync_candidate_index() -> None:
+    """Pull other workers' profile changes into this worker's index."""
+    index = _index
+    if index is None:
+        return
+    db = SessionLocal()
+    try:
+        index.sync(db)
+    finally:
+        db.close()
+
+
+def warm_candidate_index() -> None:
+    """Build the index off the request path (called at startup)."""
+    threading.Thread(target=get_candidate_index, name="candidate-index-build", daemon=True).start()
+
+
+def search_cache_metrics() -> dict:
+    return {
+        **search_cache_stats.snapshot(),
+        "entries": len(_index.results) if _index is not None else 0,
+        "max_entries": SEARCH_CACHE_SIZE,
+    }
+
+
+def _apply(index: CandidateIndex, op: tuple) -> None:
+    kind, payload = op
+    if kind == "upsert":
+        index.upsert(*payload)
+    elif kind == "remove":
+        index.remove(payload)
+    elif kind == "rename":
+        index.rename(*payload)
+
+
+# ── Incremental maintenance ──────────────────────────────────────────────
+# Snapshot changes at flush time (objects still hold their values and SQL
+# may run), apply them only once the transaction commits.
+
+@event.listens_for(SessionLocal, "after_flush")
+def _collect_profile_changes(session, flush_context):
+    # Collected even before the first build: a build may start, and load
+    # without this transaction's rows, before it commits
+    index = _index
+    pending = session.info.setdefault("candidate_index", [])
+    for obj in list(session.new) + list(session.dirty):
+        if isinstance(obj, UserProfile):
+            if obj in session.dirty and not _changed_attrs(obj) & _INDEXED_FIELDS:
+                continue
+            profile = {f: getattr(obj, f) for f in PROFILE_FIELDS}
+            doc = index._docs.get(obj.user_id) if index is not None else None
+            if doc is None and profile.get("is_visible_to_recruiters") is not False:
+                user = session.get(User, obj.user_id)
+                full_name = user.full_name if user else None
+            else:
+                full_name = None
+            pending.append(("upsert", (profile, full_name)))
+        elif isinstance(obj, User) and obj in session.dirty and "full_name" in _changed_attrs(obj):
+            pending.append(("rename", (obj.id, obj.full_name)))
+    for obj in session.deleted:
+        if isinstance(obj, UserProfile):
+            pending.append(("remove", obj.user_id))
+
+
+def _changed_attrs(obj) -> Set[str]:
+    return {a.key for a in inspect(obj).attrs if a.history.has_changes()}
+
+
+@event.listens_for(SessionLocal, "after_commit")
+def _apply_profile_changes(session):
+    pending = session.info.pop("candidate_index", None)
+    if not pending:
+        return
+    # Applied to the live index if there is one, and queued for the index
+    # being built (the initial one included) so its load can't miss them
+    with _build_lock:
+        for op in pending:
+            if _index is not None:
+                _apply(_index, op)
+            if _replay is not None:
+                _replay.append(op)
+
+
+@event.listens_for(SessionLocal, "after_rollback")
+def _drop_profile_changes(session):
+    session.info.pop("candidate_index", None)
@@ -0,0 +1,311 @@
+"""
+Canonical skill vocabulary.
+
+Every known skill has a stable integer id, a display name and aliases
+("ReactJS", "react.js" and "React" are all skill 40). Profiles and job
+postings store the canonical ids next to the free-text lists
+(UserProfile.skill_ids, JobPosting.required_skill_ids), normalized once at
+write time, so search compares small integers instead of re-lowercasing
+strings on every request. Skills outside the vocabulary keep working as
+normalized strings.
+
+extract_skill_ids() finds vocabulary skills in free text (resumes) in one
+linear pass with a word-level Aho-Corasick automaton.
+
+Ids are persisted: never renumber or reuse one, only append.
+
+Usage: python skill_vocabulary.py --backfill
+"""
+import argparse
+import os
+import re
+import sys
+from collections import deque
+from typing import Dict, Iterable, List, Optional, Set, Tuple, Union
+
+# id: (display name, aliases)
+VOCABULARY: Dict[int, Tuple[str, List[str]]] = {
+    # Languages
+    1: ("Python", ["python3", "py"]),
+    2: ("JavaScript", ["js", "ecmascript", "es6", "java script"]),
+    3: ("TypeScript", ["ts"]),
+    4: ("Java", ["java8", "java 8", "java 11", "java 17"]),
+    5: ("Go", ["golang"]),
+    6: ("Rust", ["rustlang"]),
+    7: ("C++", ["cpp", "c plus plus"]),
+    8: ("C#", ["csharp", "c sharp"]),
+    9: ("C", ["c language", "ansi c"]),
+    10: ("Ruby", []),
+    11: ("PHP", []),
+    12: ("Kotlin", []),
+    13: ("Swift", []),
+    14: ("Scala", []),
+    15: ("R", ["r language", "rlang"]),
+    16: ("SQL", ["structured query language"]),
+    17: ("Bash", ["shell scripting", "shell", "sh"]),
+    18: ("Dart", []),
+    19: ("Elixir", []),
+    20: ("Haskell", []),
+    21: ("Objective-C", ["objective c", "objc"]),
+    22: ("MATLAB", []),
+    23: ("Perl", []),
+    24: ("Solidity", []),
+    # Backend frameworks
+    30: ("Django", ["django rest framework", "drf"]),
+    31: ("Flask", []),
+    32: ("FastAPI", ["fast api"]),
+    33: ("Spring", ["spring boot", "springboot", "spring framework"]),
+    34: ("Node.js", ["node", "nodejs", "node js"]),
+    35: ("Express", ["express.js", "expressjs", "express js"]),
+    36: ("Ruby on Rails", ["rails", "ror"]),
+    37: ("ASP.NET", ["asp.net core", ".net", "dotnet", ".net core"]),
+    38: ("Laravel", []),
+    39: ("NestJS", ["nest.js", "nest js"]),
+    # Frontend
+    40: ("React", ["reactjs", "react.js", "react js"]),
+    41: ("Angular", ["angularjs", "angular.js", "angular js"]),
+    42: ("Vue", ["vuejs", "vue.js", "vue js"]),
+    43: ("Next.js", ["nextjs", "next js"]),
+    44: ("Svelte", ["sveltekit"]),
+    45: ("Redux", []),
+    46: ("HTML", ["html5"]),
+    47: ("CSS", ["css3"]),
+    48: ("Tailwind CSS", ["tailwind", "tailwindcss"]),
+    49: ("React Native", ["react-native", "reactnative"]),
+    50: ("Flutter", []),
+    51: ("jQuery", []),
+    # Data stores
+    60: ("PostgreSQL", ["postgres", "postgresql", "psql", "pg"]),
+    61: ("MySQL", []),
+    62: ("MongoDB", ["mongo"]),
+    63: ("Redis", []),
+    64: ("SQLite", []),
+    65: ("Elasticsearch", ["elastic search", "elk"]),
+    66: ("Cassandra", ["apache cassandra"]),
+    67: ("DynamoDB", ["dynamo db"]),
+    68: ("Oracle Database", ["oracle", "oracle db"]),
+    69: ("Microsoft SQL Server", ["sql server", "mssql"]),
+    70: ("Snowflake", []),
+    71: ("BigQuery", ["big query"]),
+    # Infrastructure
+    80: ("AWS", ["amazon web services"]),
+    81: ("GCP", ["google cloud", "google cloud platform"]),
+    82: ("Azure", ["microsoft azure"]),
+    83: ("Docker", []),
+    84: ("Kubernetes", ["k8s"]),
+    85: ("Terraform", []),
+    86: ("Ansible", []),
+    87: ("Jenkins", []),
+    88: ("GitHub Actions", []),
+    89: ("CI/CD", ["ci cd", "cicd", "continuous integration"]),
+    90: ("Linux", ["unix"]),
+    91: ("Nginx", []),
+    92: ("Git", ["github", "gitlab"]),
+    93: ("Prometheus", []),
+    94: ("Grafana", []),
+    # Messaging / data engineering
+    100: ("Kafka", ["apache kafka"]),
+    101: ("RabbitMQ", ["rabbit mq"]),
+    102: ("Spark", ["apache spark", "pyspark"]),
+    103: ("Hadoop", []),
+    104: ("Airflow", ["apache airflow"]),
+    105: ("dbt", []),
+    106: ("GraphQL", []),
+    107: ("REST APIs", ["rest", "rest api", "restful", "restful apis"]),
+    108: ("gRPC", []),
+    109: ("Microservices", ["microservice", "micro services"]),
+    # ML / data science
+    120: ("Machine Learning", ["ml"]),
+    121: ("Deep Learning", ["dl"]),
+    122: ("TensorFlow", ["tf"]),
+    123: ("PyTorch", ["torch"]),
+    124: ("scikit-learn", ["sklearn", "scikit learn"]),
+    125: ("Pandas", []),
+    126: ("NumPy", []),
+    127: ("NLP", ["natural language processing"]),
+    128: ("Computer Vision", ["cv", "opencv"]),
+    129: ("LLMs", ["llm", "large language models", "large language model"]),
+    130: ("LangChain", []),
+    131: ("Data Analysis", ["data analytics"]),
+    132: ("Tableau", []),
+    133: ("Power BI", ["powerbi"]),
+    # Practices
+    140: ("System Design", ["distributed systems"]),
+    141: ("Data Structures", ["dsa", "data structures and algorithms"]),
+    142: ("Algorithms", []),
+    143: ("Agile", ["scrum"]),
+    144: ("Unit Testing", ["testing", "tdd"]),
+    145: ("Product Management", []),
+    146: ("Figma", []),
+}
+
+# Keys too ambiguous to pick out of prose ("go to market", "shell company");
+# they still canonicalize when listed explicitly as a skill.
+NOT_EXTRACTED = {
+    ("go",), ("c",), ("r",), ("swift",), ("rust",), ("dart",), ("spring",), ("express",),
+    ("node",), ("shell",), ("sh",), ("py",), ("js",), ("ts",), ("pg",), ("ml",), ("dl",),
+    ("tf",), ("cv",), ("rest",), ("git",), ("oracle",), ("rails",), ("agile",), ("testing",),
+    ("scrum",), ("spark",), ("torch",), ("elk",), ("unix",), ("llm",), ("ror",), ("drf",),
+}
+
+_TOKEN_RE = re.compile(r"[a-z0-9+#]+(?:\.[a-z0-9+#]+)*|\.[a-z0-9]+")
+
+SkillKey = Union[int, str]
+
+
+def _tokens(text: str) -> Tuple[str, ...]:
+    return tuple(_TOKEN_RE.findall((text or "").lower().replace("-", " ").replace("/", " ")))
+
+
+def _build_alias_map() -> Dict[Tuple[str, ...], int]:
+    aliases: Dict[Tuple[str, ...], int] = {}
+    for skill_id, (name, extra) in VOCABULARY.items():
+        for alias in [name, *extra]:
+            key = _tokens(alias)
+            if key in aliases and aliases[key] != skill_id:
+                raise ValueError(f"Alias {alias!r} maps to both {aliases[key]} and {skill_id}")
+            aliases[key] = skill_id
+    return aliases
+
+
+ALIASES = _build_alias_map()
+
+
+def skill_id(skill: str) -> Optional[int]:
+    """Canonical id of a free-text skill, or None if it isn't in the vocabulary."""
+    return ALIASES.get(_tokens(skill))
+
+
+def skill_name(skill_id_: int) -> str:
+    return VOCABULARY[skill_id_][0]
+
+
+def skill_key(skill: str) -> SkillKey:
+    """Canonical id when known, otherwise the whitespace/case-normalized string."""
+    sid = skill_id(skill)
+    return sid if sid is not None else " ".join((skill or "").lower().split())
+
+
+def canonicalize_skills(skills: Iterable[str]) -> Tuple[List[str], List[int]]:
+    """
+    Normalize a user-entered skill list: known skills are renamed to their
+    display name and de-duplicated, unknown ones are kept as typed.
+    Returns (display list, canonical ids).
+    """
+    names: List[str] = []
+    ids: List[int] = []
+    seen: Set[SkillKey] = set()
+    for raw in skills or []:
+        raw = (raw or "").strip()
+        if not raw:
+            continue
+        key = skill_key(raw)
+        if key in seen:
+            continue
+        seen.add(key)
+        if isinstance(key, int):
+            names.append(skill_name(key))
+            ids.append(key)
+        else:
+            names.append(raw)
+    return names, ids
+
+
+class SkillMatcher:
+    """
+    Aho-Corasick automaton over word tokens: finds every vocabulary alias in
+    a token stream in a single pass, matching whole words only.
+    """
+
+    def __init__(self, patterns: Dict[Tuple[str, ...], int]):
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._out: List[Set[int]] = [set()]
+        for tokens, sid in patterns.items():
+            node = 0
+            for tok in tokens:
+                nxt = self._goto[node].get(tok)
+                if nxt is None:
+                    nxt = len(self._goto)
+                    self._goto[node][tok] = nxt
+                    self._goto.append({})
+                    self._fail.append(0)
+                    self._out.append(set())
+                node = nxt
+            self._out[node].add(sid)
+
+        # Breadth-first failure links; depth-1 nodes fail to the root
+        queue = deque(self._goto[0].values())
+        while queue:
+            node = queue.popleft()
+            for tok, child in self._goto[node].items():
+                queue.append(child)
+                f = self._fail[node]
+                while f and tok not in self._goto[f]:
+                    f = self._fail[f]
+                self._fail[child] = self._goto[f].get(tok, 0) if node else 0
+                self._out[child] |= self._out[self._fail[child]]
+
+    def find(self, text: str) -> Set[int]:
+        found: Set[int] = set()
+        node = 0
+        for tok in _tokens(text):
+            while node and tok not in self._goto[node]:
+                node = self._fail[node]
+            node = self._goto[node].get(tok, 0)
+            if self._out[node]:
+                found |= self._out[node]
+        return found
+
+
+_matcher = SkillMatcher({k: v for k, v in ALIASES.items() if k not in NOT_EXTRACTED})
+
+
+def extract_skill_ids(text: Optional[str]) -> List[int]:
+    """Vocabulary skills mentioned anywhere in `text` (e.g. a resume), sorted by id."""
+    if not text:
+        return []
+    return sorted(_matcher.find(text))
+
+
+def profile_skill_ids(skills: Iterable[str], resume_text: Optional[str]) -> List[int]:
+    """Ids stored on UserProfile.skill_ids: listed skills plus those found in the resume."""
+    _, ids = canonicalize_skills(skills)
+    return sorted(set(ids) | set(extract_skill_ids(resume_text)))
+
+
+def backfill(db) -> Tuple[int, int]:
+    """Canonicalize every stored profile and job posting."""
+    from models import JobPosting, UserProfile
+
+    profiles = 0
+    for profile in db.query(UserProfile).yield_per(1000):
+        names, _ = canonicalize_skills(profile.skills or [])
+        profile.skills = names
+        profile.skill_ids = profile_skill_ids(names, profile.resume_text)
+        profiles += 1
+    jobs = 0
+    for job in db.query(JobPosting).yield_per(1000):
+        job.required_skills, job.required_skill_ids = canonicalize_skills(job.required_skills or [])
+        jobs += 1
+    db.commit()
+    return profiles, jobs
+
+
+if __name__ == "__main__":
+    sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+    parser = argparse.ArgumentParser(description="Skill vocabulary tools")
+    parser.add_argument("--backfill", action="store_true", help="canonicalize stored profiles and job postings")
+    parser.add_argument("--extract", metavar="TEXT", help="print the skills found in TEXT")
+    args = parser.parse_args()
+
+    if args.extract:
+        print([skill_name(i) for i in extract_skill_ids(args.extract)])
+    if args.backfill:
+        from database import SessionLocal
+        db = SessionLocal()
+        try:
+            profiles, jobs = backfill(db)
+            print(f"✓ Canonicalized skills on {profiles} profiles and {jobs} job postings")
+        finally:
+            db.close()
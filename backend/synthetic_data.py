@@ -0,0 +1,224 @@
+"""
+Seeded synthetic data for benchmarks and query-plan checks
+(bench_pagination.py, bench_candidate_search.py, tests/unit/test_query_plans.py).
+
+Writes straight through SQLAlchemy Core in large batches so a million-row
+dataset loads in seconds rather than minutes. Never point this at production.
+
+Usage: DATABASE_URL=sqlite:///./bench.db python synthetic_data.py --sessions 1000000 --messages-per-session 8
+"""
+import argparse
+import os
+import random
+import sys
+from datetime import datetime, timedelta
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+BATCH_SIZE = 10_000
+
+ROLES = [
+    "Backend Engineer", "Frontend Engineer", "Full Stack Engineer", "Data Scientist",
+    "ML Engineer", "DevOps Engineer", "Product Manager", "SDE-2", "Mobile Developer",
+]
+PLANS = ["normal", "normal", "normal", "thunder", "max"]
+STATUSES = ["completed", "completed", "completed", "active", "terminated"]
+MESSAGE_TYPES = ["question", "answer", "follow_up", "answer"]
+SKILLS = [
+    "Python", "Java", "Go", "Rust", "TypeScript", "JavaScript", "React", "Node.js", "Django",
+    "FastAPI", "Spring", "Kubernetes", "Docker", "AWS", "GCP", "PostgreSQL", "MongoDB", "Redis",
+    "Kafka", "TensorFlow", "PyTorch", "SQL", "C++", "Swift", "Kotlin", "GraphQL", "Terraform",
+]
+CITIES = ["Bengaluru", "Hyderabad", "Pune", "Delhi", "Mumbai", "Chennai", "Remote", "San Francisco", "London"]
+SCORE_DIMENSIONS = [
+    "score_technical", "score_communication", "score_leadership",
+    "score_critical_thinking", "score_decision_making", "score_project_knowledge",
+]
+TXN_TYPES = ["interview_cost", "interview_cost", "purchase", "best_answer", "profile_score_resume"]
+
+
+def _batched(rows_iter, size=BATCH_SIZE):
+    batch = []
+    for row in rows_iter:
+        batch.append(row)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def generate_users(conn, n_users: int, rng: random.Random, start: datetime):
+    from models import User
+
+    def rows():
+        for i in range(1, n_users + 1):
+            yield {
+                "id": i,
+                "email": f"user{i}@example.test",
+                "full_name": f"Synthetic User {i}",
+                # Not a usable hash; synthetic users never log in.
+                "hashed_password": "!synthetic",
+                "is_active": True,
+                "credits": rng.randint(0, 200),
+                "created_at": start + timedelta(seconds=rng.randint(0, 86400 * 365)),
+            }
+
+    for batch in _batched(rows()):
+        conn.execute(User.__table__.insert(), batch)
+
+
+def generate_profiles(conn, n_users: int, rng: random.Random, start: datetime):
+    from models import UserProfile
+    from skill_vocabulary import canonicalize_skills
+
+    def rows():
+        for i in range(1, n_users + 1):
+            roles = rng.sample(ROLES, rng.randint(1, 2))
+            years = round(rng.uniform(0, 15), 1)
+            skills, skill_ids = canonicalize_skills(rng.sample(SKILLS, rng.randint(2, 8)))
+            yield {
+                "id": i,
+                "user_id": i,
+                "headline": f"{roles[0]} | {years:g} YoE",
+                "location": rng.choice(CITIES),
+                "target_roles": roles,
+                "experience_years": years,
+                "skills": skills,
+                "skill_ids": skill_ids,
+                "is_visible_to_recruiters": rng.random() < 0.9,
+                "profile_score": round(rng.uniform(3, 10), 1) if rng.random() < 0.6 else None,
+                "profile_completion": 0.0,
+                "daily_activity": {},
+                "created_at": start,
+                "updated_at": start,
+            }
+
+    for batch in _batched(rows()):
+        conn.execute(UserProfile.__table__.insert(), batch)
+
+
+def generate_sessions(conn, n_sessions: int, n_users: int, rng: random.Random, start: datetime):
+    from models import InterviewSession
+
+    def rows():
+        for i in range(1, n_sessions + 1):
+            status = rng.choice(STATUSES)
+            created = start + timedelta(seconds=rng.randint(0, 86400 * 365))
+            score = round(rng.uniform(2, 10), 2) if status == "completed" else 0.0
+            yield {
+                "id": i,
+                "user_id": rng.randint(1, n_users),
+                "thread_id": f"synthetic-{i}",
+                "role": rng.choice(ROLES),
+                "status": status,
+                "plan_type": rng.choice(PLANS),
+                "total_score": score * 10,
+                "average_score": score,
+                "is_pinned": rng.random() < 0.02,
+                "interview_mode": "adaptive",
+                "created_at": created,
+                "updated_at": created,
+                "completed_at": created + timedelta(minutes=30) if status == "completed" else None,
+                **{
+                    dim: round(min(10.0, max(0.0, rng.gauss(score, 1.5))), 1) if status == "completed" else None
+                    for dim in SCORE_DIMENSIONS
+                },
+            }
+
+    for batch in _batched(rows()):
+        conn.execute(InterviewSession.__table__.insert(), batch)
+
+
+def generate_messages(conn, n_sessions: int, per_session: int, rng: random.Random, start: datetime):
+    from models import ChatMessage
+
+    def rows():
+        msg_id = 0
+        for session_id in range(1, n_sessions + 1):
+            created = start + timedelta(seconds=rng.randint(0, 86400 * 365))
+            for n in range(per_session):
+                msg_id += 1
+                msg_type = MESSAGE_TYPES[n % len(MESSAGE_TYPES)]
+                yield {
+                    "id": msg_id,
+                    "session_id": session_id,
+                    "thread_id": f"synthetic-{session_id}",
+                    "message_type": msg_type,
+                    "role": "user" if msg_type == "answer" else "assistant",
+                    "content": f"Synthetic {msg_type} {n}",
+                    "question_number": n // 2 + 1 if msg_type == "question" else None,
+                    "created_at": created + timedelta(minutes=n),
+                }
+
+    for batch in _batched(rows()):
+        conn.execute(ChatMessage.__table__.insert(), batch)
+
+
+def generate_transactions(conn, n_transactions: int, n_users: int, rng: random.Random, start: datetime):
+    from models import CreditTransaction
+
+    def rows():
+        for i in range(1, n_transactions + 1):
+            txn_type = rng.choice(TXN_TYPES)
+            amount = rng.choice([50, 100, 200]) if txn_type == "purchase" else -rng.randint(1, 60)
+            yield {
+                "id": i,
+                "user_id": rng.randint(1, n_users),
+                "amount": amount,
+                "balance_after": rng.randint(0, 400),
+                "transaction_type": txn_type,
+                "description": f"Synthetic {txn_type}",
+                "created_at": start + timedelta(seconds=rng.randint(0, 86400 * 365)),
+            }
+
+    for batch in _batched(rows()):
+        conn.execute(CreditTransaction.__table__.insert(), batch)
+
+
+def generate(engine, users: int = 10_000, sessions: int = 100_000,
+             messages_per_session: int = 0, transactions: int = 0,
+             profiles: bool = False, seed: int = 42):
+    """Create all tables on `engine` and fill them deterministically for `seed`."""
+    from database import Base
+    import models  # noqa: F401 -- registers tables on Base.metadata
+
+    rng = random.Random(seed)
+    start = datetime(2025, 1, 1)
+    Base.metadata.create_all(bind=engine)
+    with engine.begin() as conn:
+        generate_users(conn, users, rng, start)
+        if profiles:
+            generate_profiles(conn, users, rng, start)
+        generate_sessions(conn, sessions, users, rng, start)
+        if messages_per_session:
+            generate_messages(conn, sessions, messages_per_session, rng, start)
+        if transactions:
+            generate_transactions(conn, transactions, users, rng, start)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Fill a scratch database with synthetic data")
+    parser.add_argument("--users", type=int, default=10_000)
+    parser.add_argument("--sessions", type=int, default=100_000)
+    parser.add_argument("--messages-per-session", type=int, default=0)
+    parser.add_argument("--transactions", type=int, default=0)
+    parser.add_argument("--profiles", action="store_true", help="give every user a candidate profile")
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    from database import engine
+    generate(
+        engine,
+        users=args.users,
+        sessions=args.sessions,
+        messages_per_session=args.messages_per_session,
+        transactions=args.transactions,
+        profiles=args.profiles,
+        seed=args.seed,
+    )
+    print(
+        f"✓ Generated {args.users} users, {args.sessions} sessions, "
+        f"{args.sessions * args.messages_per_session} messages and "
+        f"{args.transactions} transactions (seed={args.seed})"
+    )
@@ -0,0 +1,55 @@
+"""
+Shared fixtures. database.py reads its URLs at import time, so the scratch
+databases are configured here before any backend module is imported: a
+SQLite primary and a separate SQLite "replica" file, which lets tests see
+which engine a session actually used.
+"""
+import os
+import sys
+import tempfile
+
+import pytest
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+
+_scratch = tempfile.mkdtemp(prefix="interviewer-tests-")
+os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(_scratch, 'primary.db')}"
+os.environ["READ_DATABASE_URL"] = f"sqlite:///{os.path.join(_scratch, 'replica.db')}"
+os.environ.setdefault("OPENAI_API_KEY", "test-key")
+os.environ.setdefault("BCRYPT_ROUNDS", "4")     # bcrypt's minimum; test_passwords.py covers cost changes
+os.environ.pop("RATE_LIMIT_REDIS_URL", None)
+
+from database import Base, SessionLocal, engine, read_engine  # noqa: E402
+import models  # noqa: E402,F401 -- registers tables on Base.metadata
+
+Base.metadata.create_all(bind=engine)
+Base.metadata.create_all(bind=read_engine)
+
+
+def _truncate(bind) -> None:
+    with bind.begin() as conn:
+        for table in reversed(Base.metadata.sorted_tables):
+            conn.execute(table.delete())
+
+
+@pytest.fixture
+def db():
+    """A primary session; every table on both databases is emptied afterwards."""
+    session = SessionLocal()
+    try:
+        yield session
+    finally:
+        session.rollback()
+        session.close()
+        _truncate(engine)
+        _truncate(read_engine)
+
+
+@pytest.fixture
+def user(db):
+    """A committed user to hang sessions, tokens and OTPs off."""
+    row = models.User(email="candidate@example.com", full_name="Candidate", hashed_password="x")
+    db.add(row)
+    db.commit()
+    return row
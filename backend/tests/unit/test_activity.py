@@ -0,0 +1,109 @@
+"""Daily activity: the per-day upsert, streak arithmetic and GET /profile/activity."""
+import asyncio
+from datetime import date, timedelta
+
+import pytest
+from fastapi import HTTPException
+
+from activity import MAX_RANGE_DAYS, activity_between, current_streak, record_activity
+from api import profile as profile_api
+from models import UserDailyActivity, UserProfile
+from user_snapshot import load_snapshot
+
+DAY = date(2025, 3, 10)
+
+
+@pytest.fixture
+def profile(db, user):
+    row = UserProfile(user_id=user.id)
+    db.add(row)
+    db.commit()
+    return row
+
+
+def _record(db, profile, *days):
+    for day in days:
+        record_activity(profile, db, day=day)
+        db.commit()
+
+
+def _counts(db, user_id):
+    return {row.day: row.count for row in db.query(UserDailyActivity).filter_by(user_id=user_id)}
+
+
+def test_same_day_twice_is_one_row(db, profile):
+    _record(db, profile, DAY, DAY)
+    assert _counts(db, profile.user_id) == {DAY: 2}
+    assert profile.streak_days == 1 and profile.last_active_date == DAY
+
+
+@pytest.mark.parametrize("offsets, streak", [
+    ([0], 1),
+    ([0, 1, 2], 3),
+    ([0, 1, 1, 2], 3),          # a second interview on a day doesn't extend the streak
+    ([0, 1, 3], 1),             # one missed day starts over
+    ([0, 1, 2, 10, 11], 2),
+    ([0, 2, 1], 1),             # a late write for an earlier day leaves the streak alone
+])
+def test_streak(db, profile, offsets, streak):
+    _record(db, profile, *(DAY + timedelta(days=n) for n in offsets))
+    assert profile.streak_days == streak
+    assert profile.last_active_date == DAY + timedelta(days=max(offsets))
+    assert sum(_counts(db, profile.user_id).values()) == len(offsets)
+
+
+@pytest.mark.parametrize("last_active, streak", [
+    (DAY, 4),
+    (DAY - timedelta(days=1), 4),     # today's interview may still come
+    (DAY - timedelta(days=2), 0),
+    (None, 0),
+])
+def test_current_streak(last_active, streak):
+    assert current_streak(UserProfile(streak_days=4, last_active_date=last_active), today=DAY) == streak
+
+
+def test_activity_between_includes_both_ends(db, profile):
+    _record(db, profile, DAY - timedelta(days=1), DAY, DAY + timedelta(days=5), DAY + timedelta(days=6))
+    db.add(UserDailyActivity(user_id=profile.user_id, day=DAY + timedelta(days=2), count=0))
+    db.commit()
+    assert activity_between(profile.user_id, DAY, DAY + timedelta(days=5), db) == {
+        DAY.isoformat(): 1, (DAY + timedelta(days=5)).isoformat(): 1,
+    }
+    assert activity_between(profile.user_id, DAY, DAY, db) == {DAY.isoformat(): 1}
+
+
+def _get_activity(db, user_id, **params):
+    return asyncio.run(profile_api.get_activity(current_user=load_snapshot(db, user_id), db=db, **params))
+
+
+def test_endpoint_defaults_to_the_heatmap_window(db, profile):
+    today = date.today()
+    _record(db, profile, today - timedelta(days=profile_api.HEATMAP_DAYS + 1), today - timedelta(days=1), today)
+    result = _get_activity(db, profile.user_id)
+    assert result["end"] == today.isoformat()
+    assert result["start"] == (today - timedelta(days=profile_api.HEATMAP_DAYS)).isoformat()
+    assert result["total"] == 2 and result["streak_days"] == 2
+    assert result["last_active_date"] == today.isoformat()
+
+
+def test_endpoint_range_edges(db, profile):
+    start = date(2020, 1, 1)
+    end = start + timedelta(days=MAX_RANGE_DAYS)
+    _record(db, profile, start, end)
+    result = _get_activity(db, profile.user_id, start=start, end=end)
+    assert result["total"] == 2
+    # The stored streak ended long ago
+    assert result["streak_days"] == 0
+
+    with pytest.raises(HTTPException) as exc:
+        _get_activity(db, profile.user_id, start=start, end=end + timedelta(days=1))
+    assert exc.value.status_code == 400
+
+    with pytest.raises(HTTPException) as exc:
+        _get_activity(db, profile.user_id, start=start, end=start - timedelta(days=1))
+    assert exc.value.status_code == 400
+
+
+def test_endpoint_without_a_profile(db, user):
+    result = _get_activity(db, user.id, start=DAY, end=DAY)
+    assert result["days"] == {} and result["streak_days"] == 0 and result["last_active_date"] is None
@@ -0,0 +1,100 @@
+"""Admin dashboard stats: the aggregate queries and the snapshot the endpoint serves."""
+import asyncio
+from datetime import datetime, timedelta
+
+import pytest
+from fastapi import HTTPException
+
+from api import admin
+from database import SessionLocal
+from models import InterviewSession
+
+
+def _session(db, n, **fields):
+    db.add(InterviewSession(thread_id=f"admin-{n}", role="SWE", **fields))
+
+
+@pytest.fixture
+def seeded(db, user):
+    now = datetime.utcnow()
+    rows = [
+        # (status, mode, average_score, created_at)
+        ("completed", "short", 2.0, now),
+        ("completed", "short", 4.0, now),                       # 4 is the bottom of "Average"
+        ("completed", "detailed", 5.99, now - timedelta(days=1)),
+        ("completed", "detailed", 6.0, now - timedelta(days=1)),
+        ("completed", "short", 8.0, now - timedelta(days=6)),   # 8 is the bottom of "Excellent"
+        ("completed", "short", 10.0, now - timedelta(days=7)),  # outside the 7-day window
+        ("completed", "short", None, now),                      # unscored: counted as 0
+        ("active", "short", 0.0, now),
+        ("terminated", "detailed", 7.0, now),                   # scored but not completed
+    ]
+    for n, (status, mode, score, created_at) in enumerate(rows):
+        _session(db, n, user_id=user.id, status=status, interview_mode=mode,
+                 average_score=score, created_at=created_at)
+    db.commit()
+    return rows
+
+
+@pytest.fixture
+def snapshot(monkeypatch):
+    monkeypatch.setattr(admin, "_stats_snapshot", None)
+    # The rebuild reads the replica; point it at the primary the fixtures write to
+    monkeypatch.setattr(admin, "ReadSessionLocal", SessionLocal)
+
+
+def _dist(stats, key):
+    return {item["name"]: item["value"] for item in stats[key]}
+
+
+def test_score_buckets(db, seeded):
+    stats = admin._compute_admin_stats(db)
+    assert _dist(stats, "score_distribution") == {
+        "Needs Improvement (0-4)": 2,     # 2.0 and the NULL score
+        "Average (4-6)": 2,               # 4.0 and 5.99
+        "Good (6-8)": 1,                  # 6.0; the terminated 7.0 is not completed
+        "Excellent (8-10)": 2,            # 8.0 and 10.0
+    }
+
+
+def test_totals_and_distributions(db, seeded):
+    stats = admin._compute_admin_stats(db)
+    assert stats["total_interviews"] == 9 and stats["total_users"] == 1
+    # Zero and NULL scores are left out of the average
+    scored = [score for _, _, score, _ in seeded if score]
+    assert stats["average_score"] == round(sum(scored) / len(scored), 2)
+    assert _dist(stats, "status_distribution") == {"completed": 7, "active": 1, "terminated": 1}
+    assert _dist(stats, "mode_distribution") == {"short": 6, "detailed": 3}
+
+
+def test_daily_activity_is_zero_filled(db, seeded):
+    days = admin._compute_admin_stats(db)["daily_activity"]
+    today = datetime.utcnow().date()
+    assert [d["date"] for d in days] == [str(today - timedelta(days=i)) for i in range(6, -1, -1)]
+    counts = [d["count"] for d in days]
+    assert counts[-1] == 5 and counts[-2] == 2 and counts[0] == 1 and sum(counts) == 9 - 1
+
+
+def test_empty_database(db):
+    stats = admin._compute_admin_stats(db)
+    assert stats["total_interviews"] == 0 and stats["average_score"] == 0.0
+    assert stats["status_distribution"] == [] and set(_dist(stats, "score_distribution").values()) == {0}
+
+
+def test_503_until_the_first_build(db, snapshot):
+    with pytest.raises(HTTPException) as exc:
+        asyncio.run(admin.get_admin_stats())
+    assert exc.value.status_code == 503
+    assert exc.value.headers == {"Retry-After": "5"}
+
+    admin.refresh_admin_stats()
+    assert asyncio.run(admin.get_admin_stats())["total_interviews"] == 0
+
+
+def test_refresh_rebuilds_before_answering(db, user, snapshot):
+    admin.refresh_admin_stats()
+    _session(db, 1, user_id=user.id, status="completed", average_score=9.0)
+    db.commit()
+
+    assert asyncio.run(admin.get_admin_stats())["total_interviews"] == 0      # cached snapshot
+    assert asyncio.run(admin.get_admin_stats(refresh=True))["total_interviews"] == 1
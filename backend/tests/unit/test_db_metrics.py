@@ -0,0 +1,91 @@
+"""Pool instrumentation (pool_metrics) and release_connection()."""
+import pytest
+from sqlalchemy import create_engine, text
+from sqlalchemy.exc import TimeoutError as PoolTimeout
+
+import db_metrics
+from database import engine, release_connection
+from db_metrics import InstrumentedQueuePool, PoolStats, current_endpoint, instrument, pool_metrics
+from models import User
+
+
+@pytest.fixture
+def tiny_pool(tmp_path, monkeypatch):
+    """A one-connection instrumented engine, registered as "tiny" for this test only."""
+    monkeypatch.setattr(db_metrics, "_instrumented", dict(db_metrics._instrumented))
+    tiny = create_engine(f"sqlite:///{tmp_path / 'tiny.db'}", poolclass=InstrumentedQueuePool,
+                         pool_size=1, max_overflow=0, pool_timeout=0.05)
+    instrument(tiny, "tiny")
+    yield tiny
+    tiny.dispose()
+
+
+def test_both_engines_are_reported():
+    assert {"primary", "replica"} <= set(pool_metrics())
+
+
+def test_checkout_and_hold_are_attributed_to_the_endpoint(tiny_pool):
+    token = current_endpoint.set("GET /interview/sessions")
+    try:
+        conn = tiny_pool.connect()
+        held = pool_metrics()["tiny"]
+        assert held["in_use"] == 1 and held["peak_in_use"] == 1 and held["checkouts"] == 1
+        assert [h["endpoint"] for h in held["longest_current_holders"]] == ["GET /interview/sessions"]
+        conn.close()
+    finally:
+        current_endpoint.reset(token)
+
+    released = pool_metrics()["tiny"]
+    assert released["in_use"] == 0 and released["longest_current_holders"] == []
+    assert [h["endpoint"] for h in released["slowest_recent_holds"]] == ["GET /interview/sessions"]
+
+
+def test_checkout_timeouts_are_counted(tiny_pool):
+    with tiny_pool.connect():
+        with pytest.raises(PoolTimeout):
+            tiny_pool.connect()
+    stats = pool_metrics()["tiny"]
+    assert stats["checkout_timeouts"] == 1
+    assert stats["max_checkout_wait_ms"] >= 50
+
+
+@pytest.mark.parametrize("seconds, bucket", [
+    (0.0005, "<=1"), (0.001, "<=1"), (0.003, "<=5"), (0.1, "<=100"), (1.0, "<=2000"), (3.0, ">2000"),
+])
+def test_wait_histogram_buckets(seconds, bucket, tiny_pool):
+    stats = PoolStats("hist")
+    stats.record_wait(seconds)
+    histogram = stats.snapshot(tiny_pool.pool)["checkout_wait_histogram_ms"]
+    assert {k for k, n in histogram.items() if n} == {bucket}
+
+
+def test_slowest_holds_are_capped():
+    stats = PoolStats("holds")
+    for i in range(db_metrics.SLOW_HOLDS_KEPT + 5):
+        stats.on_checkout(i, 1)
+        stats.on_checkin(i)
+    stats.on_checkin(999)                     # checkin without a recorded checkout is ignored
+    assert len(stats.slowest_holds) == db_metrics.SLOW_HOLDS_KEPT
+
+
+def test_release_connection_commits_and_returns_the_connection(db, user):
+    db.execute(text("SELECT 1"))
+    in_use = pool_metrics()["primary"]["in_use"]
+    assert in_use >= 1
+
+    user.full_name = "Renamed"
+    release_connection(db)
+    assert pool_metrics()["primary"]["in_use"] == in_use - 1
+
+    # Committed, and the session checks out a fresh connection on next use
+    assert db.query(User).filter_by(full_name="Renamed").count() == 1
+    with engine.connect() as other:
+        assert other.execute(text("SELECT full_name FROM users")).scalar() == "Renamed"
+
+
+def test_release_connection_without_changes_does_not_commit(db, user, monkeypatch):
+    commits = []
+    monkeypatch.setattr(db, "commit", lambda: commits.append(1))
+    db.query(User).all()
+    release_connection(db)
+    assert commits == []
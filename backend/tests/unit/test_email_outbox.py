@@ -0,0 +1,322 @@
+"""Email outbox: queuing with the caller's transaction, backoff, and delivery
+through the real SMTPConnection to a local aiosmtpd server."""
+import logging
+import smtplib
+import socket
+from datetime import datetime, timedelta
+
+import pytest
+from aiosmtpd.controller import Controller
+from aiosmtpd.smtp import AuthResult
+
+import email_outbox
+import email_utils
+from api.auth import create_otp
+from database import SessionLocal
+from email_outbox import (
+    FAILED, PENDING, SENT, OutboxSender, SMTPConnection, enqueue, is_permanent, purge_outbox, retry_delay,
+)
+from models import OTP, EmailOutbox
+
+logging.getLogger("mail.log").setLevel(logging.ERROR)   # aiosmtpd's own chatter
+
+
+class StubSMTP:
+    """aiosmtpd handler: accepts everything except bounce* (550) and scheduled 451s."""
+
+    def __init__(self):
+        self.messages = []       # (recipients, raw message)
+        self.logins = 0          # one per SMTP connection the client opens
+        self.accept_login = True
+        self.transient = {}      # address -> number of 451s still to return
+
+    def authenticate(self, server, session, envelope, mechanism, auth_data):
+        self.logins += 1
+        return AuthResult(success=self.accept_login, handled=False)   # let aiosmtpd send 235/535
+
+    async def handle_RCPT(self, server, session, envelope, address, rcpt_options):
+        if address.startswith("bounce"):
+            return "550 5.1.1 No such user"
+        if self.transient.get(address, 0) > 0:
+            self.transient[address] -= 1
+            return "451 4.3.0 Try again later"
+        envelope.rcpt_tos.append(address)
+        return "250 OK"
+
+    async def handle_DATA(self, server, session, envelope):
+        self.messages.append((list(envelope.rcpt_tos), envelope.content))
+        return "250 Message accepted"
+
+    @property
+    def recipients(self):
+        return [to for rcpts, _ in self.messages for to in rcpts]
+
+
+class SMTPServer:
+    """A local SMTP server on a fixed port that can be stopped and restarted."""
+
+    def __init__(self, handler):
+        with socket.socket() as s:
+            s.bind(("127.0.0.1", 0))
+            self.port = s.getsockname()[1]
+        self.handler = handler
+        self.controller = None
+
+    def start(self):
+        self.controller = Controller(self.handler, hostname="127.0.0.1", port=self.port,
+                                     authenticator=self.handler.authenticate, auth_require_tls=False)
+        self.controller.start()
+
+    def stop(self):
+        if self.controller is not None:
+            self.controller.stop()
+            self.controller = None
+
+
+@pytest.fixture
+def smtp_server(monkeypatch):
+    server = SMTPServer(StubSMTP())
+    server.start()
+    monkeypatch.setattr(email_utils, "SMTP_SERVER", "127.0.0.1")
+    monkeypatch.setattr(email_utils, "SMTP_PORT", server.port)
+    monkeypatch.setattr(email_utils, "EMAIL_USER", "noreply@example.com")
+    monkeypatch.setattr(email_utils, "EMAIL_PASSWORD", "secret")
+    monkeypatch.setattr(email_utils, "EMAIL_FROM", "noreply@example.com")
+    monkeypatch.setattr(email_outbox, "SMTP_STARTTLS", False)
+    yield server
+    server.stop()
+
+
+@pytest.fixture
+def stub(smtp_server):
+    return smtp_server.handler
+
+
+@pytest.fixture
+def sender(smtp_server):
+    sender = OutboxSender(SessionLocal)
+    yield sender
+    sender.smtp.close()
+
+
+def _queue(db, *recipients):
+    rows = [enqueue(db, to, f"Hello {to}", "Body", "<p>Body</p>", kind="test") for to in recipients]
+    db.commit()
+    return [row.id for row in rows]
+
+
+def _row(db, row_id) -> EmailOutbox:
+    db.expire_all()
+    return db.get(EmailOutbox, row_id)
+
+
+def _make_due(db, row_id):
+    _row(db, row_id).next_attempt_at = datetime.utcnow()
+    db.commit()
+
+
+# ── queuing ──
+
+def test_enqueue_commits_with_the_caller(db):
+    enqueue(db, "a@example.com", "Subject", "Body")
+    assert db.info["outbox_wake"]
+    db.rollback()
+    assert "outbox_wake" not in db.info
+    assert db.query(EmailOutbox).count() == 0
+
+    (row_id,) = _queue(db, "a@example.com")
+    row = _row(db, row_id)
+    assert (row.status, row.attempts) == (PENDING, 0)
+    assert "outbox_wake" not in db.info             # consumed by the commit hook
+
+
+def test_otp_and_its_email_share_one_transaction(db, user, monkeypatch):
+    monkeypatch.setattr(email_utils, "EMAIL_USER", "noreply@example.com")
+    monkeypatch.setattr(email_utils, "EMAIL_PASSWORD", "secret")
+    otp = create_otp(db, user.email)
+    email_utils.queue_otp_email(db, user.email, otp.otp_code, user.full_name)
+    db.rollback()
+    assert db.query(OTP).count() == 0 and db.query(EmailOutbox).count() == 0
+
+    otp = create_otp(db, user.email)
+    email_utils.queue_otp_email(db, user.email, otp.otp_code, user.full_name)
+    db.commit()
+    assert db.query(OTP).count() == 1 and db.query(EmailOutbox).count() == 1
+
+
+@pytest.mark.parametrize("attempts, factor", [(1, 1), (2, 2), (3, 4), (40, None)])
+def test_retry_delay_doubles_with_jitter_and_a_cap(attempts, factor):
+    base = email_outbox.OUTBOX_RETRY_BASE * factor if factor else email_outbox.OUTBOX_RETRY_MAX
+    delays = [retry_delay(attempts) for _ in range(200)]
+    assert all(0.8 * base <= d <= 1.2 * base for d in delays)
+    assert len(set(delays)) > 1
+
+
+@pytest.mark.parametrize("error, permanent", [
+    (smtplib.SMTPDataError(550, b"mailbox unavailable"), True),
+    (smtplib.SMTPDataError(451, b"try again later"), False),
+    (smtplib.SMTPRecipientsRefused({"a@example.com": (550, b"no such user")}), True),
+    (smtplib.SMTPRecipientsRefused({"a@example.com": (550, b"no"), "b@example.com": (452, b"full")}), False),
+    (smtplib.SMTPAuthenticationError(535, b"bad credentials"), False),
+    (smtplib.SMTPServerDisconnected("gone"), False),
+    (ConnectionRefusedError(), False),
+])
+def test_is_permanent(error, permanent):
+    assert is_permanent(error) is permanent
+
+
+# ── delivery ──
+
+def test_batch_is_sent_over_one_connection(db, sender, stub):
+    ids = _queue(db, "a@example.com", "b@example.com", "c@example.com")
+    assert sender.run_once() == 3
+    assert stub.recipients == ["a@example.com", "b@example.com", "c@example.com"]
+    assert stub.logins == 1 and sender.smtp.opened == 1 and sender.smtp.is_open
+    _, raw = stub.messages[0]
+    assert b"Hello a@example.com" in raw and b"text/html" in raw
+
+    for row_id in ids:
+        row = _row(db, row_id)
+        assert (row.status, row.attempts, row.last_error) == (SENT, 1, None) and row.sent_at
+        assert (row.text_body, row.html_body) == ("", None)      # no delivered OTP left in plaintext
+    assert sender.run_once() == 0
+
+    _queue(db, "d@example.com")
+    sender.run_once()
+    assert stub.logins == 1                          # the kept-alive connection is reused
+
+
+def test_transient_failure_is_retried_with_backoff(db, sender, stub):
+    stub.transient["flaky@example.com"] = 1
+    (row_id,) = _queue(db, "flaky@example.com")
+    before = datetime.utcnow()
+    sender.run_once()
+
+    row = _row(db, row_id)
+    assert (row.status, row.attempts) == (PENDING, 1)
+    assert "451" in row.last_error and row.text_body == "Body"
+    assert before + timedelta(seconds=0.8 * email_outbox.OUTBOX_RETRY_BASE) <= row.next_attempt_at
+    assert sender.run_once() == 0                    # not due yet
+    assert sender.smtp.is_open                       # a rejection doesn't drop the connection
+
+    _make_due(db, row_id)
+    sender.run_once()
+    row = _row(db, row_id)
+    assert (row.status, row.attempts, row.last_error) == (SENT, 2, None)
+    assert stub.recipients == ["flaky@example.com"]
+
+
+def test_permanent_rejection_fails_immediately(db, sender, stub):
+    bounce, ok = _queue(db, "bounce@example.com", "ok@example.com")
+    sender.run_once()
+    row = _row(db, bounce)
+    assert (row.status, row.attempts) == (FAILED, 1) and "550" in row.last_error
+    assert row.text_body == ""
+    assert _row(db, ok).status == SENT               # the rest of the batch still goes out
+    assert sender.failed == 1 and stub.logins == 1
+
+
+def test_gives_up_after_max_attempts(db, sender, stub):
+    stub.transient["flaky@example.com"] = 1
+    (row_id,) = _queue(db, "flaky@example.com")
+    _row(db, row_id).attempts = email_outbox.OUTBOX_MAX_ATTEMPTS - 1
+    db.commit()
+    sender.run_once()
+    row = _row(db, row_id)
+    assert (row.status, row.attempts) == (FAILED, email_outbox.OUTBOX_MAX_ATTEMPTS)
+
+
+def test_rejected_login_is_retried_not_failed(db, sender, stub):
+    stub.accept_login = False
+    first, second = _queue(db, "a@example.com", "b@example.com")
+    sender.run_once()
+    a, b = _row(db, first), _row(db, second)
+    assert (a.status, a.attempts) == (PENDING, 1) and "Authentication" in a.last_error
+    assert (b.status, b.attempts) == (PENDING, 0)    # deferred with it, not attempted
+    assert not sender.smtp.is_open
+
+    stub.accept_login = True
+    _make_due(db, first)
+    _make_due(db, second)
+    sender.run_once()
+    assert sorted(stub.recipients) == ["a@example.com", "b@example.com"]
+
+
+def test_server_down_defers_the_batch_until_it_returns(db, sender, stub, smtp_server):
+    smtp_server.stop()
+    first, second = _queue(db, "a@example.com", "b@example.com")
+    sender.run_once()
+    a, b = _row(db, first), _row(db, second)
+    assert (a.status, a.attempts) == (PENDING, 1)
+    assert (b.status, b.attempts, b.last_error) == (PENDING, 0, None)
+    assert b.next_attempt_at == a.next_attempt_at
+
+    smtp_server.start()
+    _make_due(db, first)
+    _make_due(db, second)
+    sender.run_once()
+    assert _row(db, first).status == _row(db, second).status == SENT
+
+
+# ── the connection ──
+
+def _message(to="a@example.com"):
+    row = EmailOutbox(to_email=to, subject="Subject", text_body="Body", html_body=None)
+    return email_outbox._build_message(row)
+
+
+def test_connection_reopens_after_the_server_drops_it(smtp_server, stub):
+    smtp = SMTPConnection()
+    smtp.send(_message())
+    smtp_server.stop()               # the kept-alive socket is now dead
+    smtp_server.start()
+    smtp.send(_message("b@example.com"))
+    assert stub.recipients == ["a@example.com", "b@example.com"]
+    assert smtp.opened == stub.logins == 2
+    smtp.close()
+
+
+def test_idle_connection_is_closed_and_reopened(smtp_server, stub, monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(email_outbox.time, "monotonic", lambda: now[0])
+    smtp = SMTPConnection()
+    smtp.send(_message())
+    now[0] += email_outbox.SMTP_IDLE_TIMEOUT - 1
+    smtp.close_if_idle()
+    assert smtp.is_open
+
+    now[0] += 2
+    smtp.close_if_idle()
+    assert not smtp.is_open
+    smtp.send(_message("b@example.com"))
+    assert smtp.opened == stub.logins == 2
+    smtp.close()
+
+
+def test_login_uses_the_configured_credentials(smtp_server, stub, monkeypatch):
+    monkeypatch.setattr(email_utils, "EMAIL_PASSWORD", None)       # no credentials: no AUTH
+    smtp = SMTPConnection()
+    smtp.send(_message())
+    assert stub.logins == 0 and stub.recipients == ["a@example.com"]
+    smtp.close()
+
+
+# ── retention ──
+
+def test_purge_deletes_only_old_finished_rows(db):
+    now = datetime.utcnow()
+    old = now - timedelta(days=email_outbox.OUTBOX_RETENTION_DAYS + 1)
+    rows = {}
+    for name, status, last_attempt in (
+        ("old_sent", SENT, old), ("old_failed", FAILED, old),
+        ("old_pending", PENDING, old), ("recent_sent", SENT, now),
+    ):
+        row = enqueue(db, f"{name}@example.com", "Subject", "Body")
+        row.status, row.next_attempt_at = status, last_attempt
+        rows[name] = row
+    db.commit()
+
+    assert purge_outbox(db) == 2
+    db.commit()
+    remaining = {to for (to,) in db.query(EmailOutbox.to_email)}
+    assert remaining == {"old_pending@example.com", "recent_sent@example.com"}
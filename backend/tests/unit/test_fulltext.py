@@ -0,0 +1,77 @@
+"""Full-text candidate matching (the SQLite FTS5 side of fulltext.py)."""
+import json
+
+import pytest
+
+from api import company
+from database import SessionLocal, engine
+from fulltext import ensure_fulltext_schema, highlight_snippets, match_user_ids
+from models import User, UserProfile
+from search_index import CandidateFilter
+
+
+@pytest.fixture(autouse=True, scope="module")
+def _schema():
+    ensure_fulltext_schema(engine)
+
+
+def _profile(db, email, **fields):
+    user = User(email=email, hashed_password="x")
+    db.add(user)
+    db.flush()
+    fields.setdefault("is_visible_to_recruiters", True)
+    db.add(UserProfile(user_id=user.id, **fields))
+    db.commit()
+    return user.id
+
+
+def test_work_experience_indexes_descriptions_not_json_keys(db):
+    user_id = _profile(db, "kafka@example.com", work_experience=[
+        {"company": "Acme", "role": "Engineer", "description": "Built Kafka pipelines"},
+    ])
+    assert list(match_user_ids(db, "kafka pipelines")[0]) == [user_id]
+    # Keys and other fields of the entries aren't searchable, as on Postgres
+    assert match_user_ids(db, "company")[0] == {}
+    assert match_user_ids(db, "acme")[0] == {}
+    assert "<mark>Kafka</mark>" in highlight_snippets(db, "kafka", [user_id])[user_id]
+
+
+def test_updates_and_deletes_reach_the_fulltext_table(db):
+    user_id = _profile(db, "edit@example.com", headline="Rust developer")
+    profile = db.query(UserProfile).filter_by(user_id=user_id).one()
+    profile.headline = "Go developer"
+    db.commit()
+    assert match_user_ids(db, "rust")[0] == {}
+    assert list(match_user_ids(db, "go")[0]) == [user_id]
+
+    db.delete(profile)
+    db.commit()
+    assert match_user_ids(db, "go")[0] == {}
+
+
+def test_truncated_when_more_profiles_match_than_the_limit(db):
+    ids = [_profile(db, f"py{i}@example.com", bio="Python developer") for i in range(3)]
+    matches, truncated = match_user_ids(db, "python", limit=2)
+    assert len(matches) == 2 and truncated
+    matches, truncated = match_user_ids(db, "python", limit=3)
+    assert set(matches) == set(ids) and not truncated
+
+
+def test_hidden_profiles_and_operator_input_never_match(db):
+    _profile(db, "hidden@example.com", bio="Python developer", is_visible_to_recruiters=False)
+    assert match_user_ids(db, "python") == ({}, False)
+    assert match_user_ids(db, '" OR * NEAR(') == ({}, False)
+
+
+def test_export_streams_every_fulltext_match_uncapped(db, monkeypatch):
+    def capped(*args, **kwargs):
+        raise AssertionError("export must not go through the capped ranked match")
+
+    monkeypatch.setattr(company, "ReadSessionLocal", SessionLocal)   # rows live on the primary here
+    monkeypatch.setattr(company, "match_user_ids", capped)
+    ids = [_profile(db, f"k{i}@example.com", bio="Kafka engineer", experience_years=i) for i in range(4)]
+    _profile(db, "other@example.com", bio="Designer")
+
+    body = "".join(company._export_candidates(CandidateFilter(min_experience=1), "kafka", "ndjson"))
+    exported = [json.loads(line)["user_id"] for line in body.splitlines()]
+    assert exported == ids[1:]
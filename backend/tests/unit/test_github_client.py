@@ -0,0 +1,165 @@
+"""github_client.py against a local stub of the GitHub API (no network, no token)."""
+import asyncio
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+import github_client
+from cache import cache
+from github_client import GitHubError, fetch_profile
+
+STUB_DELAY = 0.3
+USER = {"login": "octo", "name": "Octo Cat", "bio": None, "company": None, "public_repos": 2,
+        "followers": 5, "following": 1, "created_at": "2020-01-01T00:00:00Z", "updated_at": "2024-01-01T00:00:00Z"}
+REPOS = [{"name": "hello", "description": "hi", "language": "Python", "stargazers_count": 3,
+          "forks_count": 0, "fork": False, "pushed_at": "2024-01-01T00:00:00Z", "size": 10}]
+GRAPHQL_USER = {
+    "login": "octo", "name": "Octo Cat", "bio": None, "company": None,
+    "createdAt": "2020-01-01T00:00:00Z", "updatedAt": "2024-01-01T00:00:00Z",
+    "followers": {"totalCount": 5}, "following": {"totalCount": 1},
+    "repositories": {"totalCount": 2, "nodes": [{
+        "name": "hello", "description": "hi", "isFork": False, "pushedAt": "2024-01-01T00:00:00Z",
+        "diskUsage": 10, "stargazerCount": 3, "forkCount": 0, "primaryLanguage": {"name": "Python"},
+    }]},
+}
+
+
+class StubGitHub(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"      # keep-alive, as api.github.com
+    seen = []                          # (method, path, status)
+    graphql_response = None            # overrides the GraphQL body when set
+
+    def log_message(self, *args):
+        pass
+
+    def _send(self, status, body=None, etag=None):
+        data = json.dumps(body).encode() if body is not None else b""
+        self.send_response(status)
+        if etag:
+            self.send_header("ETag", etag)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+        self.seen.append((self.command, self.path.split("?")[0], status))
+
+    def do_GET(self):
+        time.sleep(STUB_DELAY)
+        path = self.path.split("?")[0]
+        if path == "/users/octo":
+            body, etag = USER, '"user-v1"'
+        elif path == "/users/octo/repos":
+            body, etag = REPOS, '"repos-v1"'
+        else:
+            return self._send(404, {"message": "Not Found"})
+        if self.headers.get("If-None-Match") == etag:
+            return self._send(304, etag=etag)
+        self._send(200, body, etag)
+
+    def do_POST(self):
+        payload = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        if self.headers.get("Authorization") != "Bearer stub-token":
+            return self._send(401, {"message": "Bad credentials"})
+        if StubGitHub.graphql_response is not None:
+            return self._send(200, StubGitHub.graphql_response)
+        if payload["variables"]["login"] != "octo":
+            return self._send(200, {"data": {"user": None}, "errors": [{"type": "NOT_FOUND", "message": "nope"}]})
+        self._send(200, {"data": {"user": GRAPHQL_USER}})
+
+
+@pytest.fixture(scope="module")
+def stub_url():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), StubGitHub)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield f"http://127.0.0.1:{server.server_address[1]}"
+    server.shutdown()
+
+
+@pytest.fixture(autouse=True)
+def github(stub_url, monkeypatch):
+    monkeypatch.setattr(github_client, "GITHUB_API_URL", stub_url)
+    monkeypatch.setattr(github_client, "GITHUB_TOKEN", None)
+    monkeypatch.setattr(github_client, "_client", None)
+    monkeypatch.setattr(StubGitHub, "graphql_response", None)
+    StubGitHub.seen.clear()
+    cache.clear()
+    yield
+    cache.clear()
+
+
+def _run(*usernames):
+    """Fetch each username in turn on one event loop (the pooled client is loop-bound)."""
+    async def go():
+        try:
+            return [await fetch_profile(name) for name in usernames]
+        finally:
+            await github_client.close_client()
+    return asyncio.run(go())
+
+
+def test_rest_calls_run_concurrently():
+    async def go():
+        with pytest.raises(GitHubError):
+            await fetch_profile("ghost")           # creates the pooled client outside the timing
+        StubGitHub.seen.clear()
+        t0 = time.perf_counter()
+        result = await fetch_profile("octo")
+        elapsed = time.perf_counter() - t0
+        await github_client.close_client()
+        return result, elapsed
+
+    (profile, repos), elapsed = asyncio.run(go())
+    assert profile == USER and repos == REPOS
+    assert sorted(path for _, path, _ in StubGitHub.seen) == ["/users/octo", "/users/octo/repos"]
+    assert elapsed < 2 * STUB_DELAY, f"profile and repos fetched one after the other ({elapsed:.2f}s)"
+
+
+def test_rescore_revalidates_with_etags():
+    first, second = _run("octo", "octo")
+    assert first == second == (USER, REPOS)
+    assert sorted(status for *_, status in StubGitHub.seen) == [200, 200, 304, 304]
+
+
+def test_unknown_user_maps_to_404():
+    with pytest.raises(GitHubError) as exc:
+        _run("ghost")
+    assert exc.value.status_code == 404 and "ghost" in exc.value.detail
+
+
+def test_unreachable_api_maps_to_502(monkeypatch):
+    monkeypatch.setattr(github_client, "GITHUB_API_URL", "http://127.0.0.1:9")    # discard port: refused
+    with pytest.raises(GitHubError) as exc:
+        _run("octo")
+    assert exc.value.status_code == 502 and "unreachable" in exc.value.detail
+
+
+def test_graphql_is_mapped_onto_rest_field_names(monkeypatch):
+    monkeypatch.setattr(github_client, "GITHUB_TOKEN", "stub-token")
+    ((profile, repos),) = _run("octo")
+    assert [method for method, *_ in StubGitHub.seen] == ["POST"]      # one request for both
+    assert profile == USER
+    assert repos == REPOS
+
+
+@pytest.mark.parametrize("response, status, detail", [
+    ({"data": {"user": None}, "errors": [{"type": "NOT_FOUND", "message": "nope"}]}, 404, "not found"),
+    ({"data": {"user": None}, "errors": [{"message": "rate limited"}, {"message": "try later"}]},
+     502, "GitHub API error: rate limited; try later"),
+    ({"data": None}, 502, "GitHub API error: empty response"),
+])
+def test_graphql_errors(monkeypatch, response, status, detail):
+    monkeypatch.setattr(github_client, "GITHUB_TOKEN", "stub-token")
+    monkeypatch.setattr(StubGitHub, "graphql_response", response)
+    with pytest.raises(GitHubError) as exc:
+        _run("octo")
+    assert exc.value.status_code == status and detail in exc.value.detail
+
+
+def test_graphql_http_error_maps_to_502(monkeypatch):
+    monkeypatch.setattr(github_client, "GITHUB_TOKEN", "wrong-token")
+    with pytest.raises(GitHubError) as exc:
+        _run("octo")
+    assert exc.value.status_code == 502 and "401" in exc.value.detail
@@ -0,0 +1,109 @@
+"""Google signing certificate cache: Cache-Control lifetime, refresh and key rotation."""
+import asyncio
+import threading
+
+import pytest
+from fastapi import HTTPException
+
+import google_certs
+from api import auth
+from google_certs import MIN_REFRESH_INTERVAL, REFRESH_AHEAD, GoogleCertCache, _max_age
+
+
+class FakeResponse:
+    def __init__(self, certs, headers):
+        self._certs = certs
+        self.headers = headers
+
+    def raise_for_status(self):
+        pass
+
+    def json(self):
+        return self._certs
+
+
+class FakeSession:
+    """Serves one certificate set per fetch, numbered so tests can tell fetches apart."""
+
+    def __init__(self, max_age=3600):
+        self.max_age = max_age
+        self.calls = 0
+
+    def get(self, url, timeout):
+        self.calls += 1
+        return FakeResponse({f"key{self.calls}": "cert"}, {"Cache-Control": f"public, max-age={self.max_age}"})
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(google_certs.time, "monotonic", lambda: now[0])
+    return now
+
+
+@pytest.fixture
+def cache():
+    cache = GoogleCertCache("https://certs.example.com")
+    cache._session = FakeSession()
+    return cache
+
+
+@pytest.mark.parametrize("headers, expected", [
+    ({"Cache-Control": "public, max-age=21600, must-revalidate"}, 21600),
+    ({"Cache-Control": "max-age=600", "Age": "100"}, 500),
+    ({"Cache-Control": "max-age=600", "Age": "bogus"}, 600),
+    ({"Cache-Control": "max-age=60", "Age": "100"}, 0),
+    ({}, google_certs.DEFAULT_MAX_AGE),
+])
+def test_max_age(headers, expected):
+    assert _max_age(headers) == expected
+
+
+def test_certs_are_cached_until_they_expire(cache, clock):
+    assert cache.certs() == {"key1": "cert"}
+    clock[0] += 3600 - REFRESH_AHEAD - 1
+    assert cache.certs() == {"key1": "cert"} and cache.fetches == 1
+    clock[0] += REFRESH_AHEAD + 2
+    assert cache.certs() == {"key2": "cert"} and cache.fetches == 2
+
+
+def test_refresh_ahead_runs_in_the_background(cache, clock):
+    cache.certs()
+    clock[0] += 3600 - REFRESH_AHEAD + 1
+    cache.certs()
+    assert cache._background is not None          # fetched off the caller's thread
+    cache._background.join(5)
+    assert cache.certs() == {"key2": "cert"}
+
+
+def test_unknown_key_id_forces_a_rate_limited_refresh(cache, clock):
+    cache.certs()
+    assert cache.certs_for("rotated") == {"key1": "cert"}      # just fetched: no refetch yet
+    clock[0] += MIN_REFRESH_INTERVAL
+    assert cache.certs_for("rotated") == {"key2": "cert"}
+    assert cache.certs_for("key2") == {"key2": "cert"}
+    assert cache.fetches == 2
+
+
+def test_empty_response_is_an_error(cache, clock):
+    cache._session.get = lambda url, timeout: FakeResponse({}, {})
+    with pytest.raises(ValueError):
+        cache.certs()
+
+
+def test_malformed_token_is_a_value_error():
+    with pytest.raises(ValueError, match="Malformed"):
+        google_certs.verify_id_token("not-a-jwt", "client-id")
+
+
+def test_sign_in_verifies_off_the_event_loop(db, monkeypatch):
+    threads = []
+
+    def verify(credential):
+        threads.append(threading.current_thread())
+        raise HTTPException(status_code=400, detail="Invalid Google token")
+
+    monkeypatch.setattr(auth, "verify_google_token", verify)
+    with pytest.raises(HTTPException):
+        asyncio.run(auth.google_auth(auth.GoogleCredential(credential="token"), None, db))
+    assert threads and threads[0] is not threading.main_thread()
@@ -0,0 +1,184 @@
+"""Conditional GETs and sparse fieldsets: ETags, 304s and ?fields= on the profile and session reads."""
+import asyncio
+from datetime import datetime
+
+import pytest
+from fastapi import HTTPException, Response
+from sqlalchemy import event
+from starlette.requests import Request
+
+from api import interview, profile as profile_api
+from database import engine
+from http_cache import CACHE_CONTROL, not_modified, parse_fields, select_fields, weak_etag
+from models import ChatMessage, InterviewSession, UserProfile
+from user_snapshot import load_snapshot
+
+THREAD = "thread-cache"
+
+
+def _request(etag=None):
+    headers = [(b"if-none-match", etag.encode())] if etag else []
+    return Request({"type": "http", "headers": headers})
+
+
+@pytest.mark.parametrize("fields, expected", [
+    (None, None),
+    ("a", {"a"}),
+    (" a , b,,", {"a", "b"}),
+    ("", set()),
+])
+def test_parse_fields(fields, expected):
+    assert parse_fields(fields, ["a", "b", "c"]) == expected
+
+
+def test_unknown_fields_are_a_400():
+    with pytest.raises(HTTPException) as exc:
+        parse_fields("a,secret", ["a", "b"])
+    assert exc.value.status_code == 400 and "secret" in exc.value.detail
+
+
+def test_weak_etag():
+    tag = weak_etag("row", datetime(2025, 1, 1))
+    assert tag.startswith('W/"') and tag.endswith('"')
+    assert weak_etag("row", datetime(2025, 1, 1)) == tag
+    assert weak_etag("row", datetime(2025, 1, 2)) != tag
+    # The fieldset is part of the tag, in any order
+    assert weak_etag("row", fields={"a", "b"}) == weak_etag("row", fields={"b", "a"})
+    assert weak_etag("row", fields={"a"}) != weak_etag("row", fields=None)
+
+
+@pytest.mark.parametrize("header, matches", [
+    (None, False),
+    ('W/"abc"', True),
+    ('"abc"', True),                    # weak comparison ignores the W/ prefix
+    ('"other", W/"abc"', True),
+    ('"other"', False),
+    ("*", True),
+])
+def test_not_modified(header, matches):
+    response = not_modified(_request(header), 'W/"abc"')
+    if not matches:
+        assert response is None
+        return
+    assert response.status_code == 304 and response.body == b""
+    assert response.headers["etag"] == 'W/"abc"' and response.headers["cache-control"] == CACHE_CONTROL
+
+
+def test_select_fields():
+    data = {"a": 1, "b": 2}
+    assert select_fields(data, None) is data
+    assert select_fields(data, {"b", "c"}) == {"b": 2}
+
+
+# ── GET /profile/me ──────────────────────────────────────────────────────
+
+def _get_profile(db, user_id, etag=None, fields=None):
+    response = Response()
+    body = asyncio.run(profile_api.get_my_profile(
+        request=_request(etag), response=response, fields=fields,
+        current_user=load_snapshot(db, user_id), db=db,
+    ))
+    return body, response
+
+
+@pytest.fixture
+def profile(db, user):
+    db.add(UserProfile(user_id=user.id, headline="Backend engineer", resume_text="A long resume",
+                       skills=["Python"], updated_at=datetime(2025, 1, 1)))
+    db.commit()
+    return user.id
+
+
+def test_profile_revalidates_until_it_changes(db, profile):
+    body, response = _get_profile(db, profile)
+    etag = response.headers["etag"]
+    assert body["headline"] == "Backend engineer" and response.headers["cache-control"] == CACHE_CONTROL
+
+    cached, _ = _get_profile(db, profile, etag=etag)
+    assert cached.status_code == 304
+
+    db.query(UserProfile).filter_by(user_id=profile).update({"headline": "Staff engineer",
+                                                             "updated_at": datetime(2025, 1, 2)})
+    db.commit()
+    body, response = _get_profile(db, profile, etag=etag)
+    assert body["headline"] == "Staff engineer" and response.headers["etag"] != etag
+
+
+def test_profile_fields_select_keys_and_etag(db, profile):
+    body, response = _get_profile(db, profile, fields="headline,skills,full_name")
+    assert body == {"headline": "Backend engineer", "skills": ["Python"], "full_name": "Candidate"}
+
+    # A fieldset's tag doesn't validate the full representation, or another fieldset
+    _, full = _get_profile(db, profile)
+    assert full.headers["etag"] != response.headers["etag"]
+    body, _ = _get_profile(db, profile, etag=response.headers["etag"], fields="headline")
+    assert body == {"headline": "Backend engineer"}
+
+
+def test_profile_fields_load_only_the_needed_columns(db, profile):
+    statements = []
+
+    def capture(conn, cursor, statement, *args):
+        statements.append(statement)
+
+    db.expunge_all()
+    event.listen(engine, "before_cursor_execute", capture)
+    try:
+        _get_profile(db, profile, fields="headline")
+    finally:
+        event.remove(engine, "before_cursor_execute", capture)
+    selects = [s for s in statements if "user_profiles.headline" in s]
+    assert selects and all("resume_text" not in s for s in selects)
+
+
+def test_profile_without_a_row(db, user):
+    body, response = _get_profile(db, user.id, fields="headline,credits")
+    assert body == {"headline": None, "credits": 20}     # the signup grant
+    assert _get_profile(db, user.id, etag=response.headers["etag"], fields="headline,credits")[0].status_code == 304
+
+
+# ── GET /interview/session/{thread_id} ───────────────────────────────────
+
+def _get_session(db, etag=None, fields=None):
+    response = Response()
+    body = asyncio.run(interview.get_session(THREAD, _request(etag), response, fields=fields, db=db,
+                                             current_user=None))
+    return body, response
+
+
+@pytest.fixture
+def session(db):
+    row = InterviewSession(thread_id=THREAD, role="SWE", status="active")
+    db.add(row)
+    db.flush()
+    db.add(ChatMessage(session_id=row.id, thread_id=THREAD, role="assistant", content="Hi", message_type="question"))
+    db.commit()
+    return row.id
+
+
+def test_session_etag_moves_with_new_messages(db, session):
+    body, response = _get_session(db)
+    etag = response.headers["etag"]
+    assert [m["content"] for m in body["messages"]] == ["Hi"]
+    assert _get_session(db, etag=etag)[0].status_code == 304
+
+    # Appending a message doesn't touch the session row
+    db.add(ChatMessage(session_id=session, thread_id=THREAD, role="user", content="Hello", message_type="answer"))
+    db.commit()
+    body, _ = _get_session(db, etag=etag)
+    assert [m["content"] for m in body["messages"]] == ["Hi", "Hello"]
+
+
+def test_session_fields_without_messages(db, session):
+    body, response = _get_session(db, fields="status")
+    assert body == {"status": "active"}
+    # Messages aren't part of this representation, so a new one doesn't invalidate it
+    db.add(ChatMessage(session_id=session, thread_id=THREAD, role="user", content="Hello", message_type="answer"))
+    db.commit()
+    assert _get_session(db, etag=response.headers["etag"], fields="status")[0].status_code == 304
+
+
+def test_session_unknown_field(db, session):
+    with pytest.raises(HTTPException) as exc:
+        _get_session(db, fields="status,resume_text_secret")
+    assert exc.value.status_code == 400
@@ -0,0 +1,97 @@
+"""POST /interview/answer: concurrent submits for one interview are refused, whatever the action."""
+import asyncio
+
+import pytest
+from fastapi import HTTPException
+
+from adaptive_interview import DimensionEval, NextAction
+from api import interview
+from database import SessionLocal
+from models import AnswerSubmissionRequest, ChatMessage, InterviewSession
+
+THREAD = "thread-answer"
+
+
+@pytest.fixture
+def active(db):
+    session = InterviewSession(thread_id=THREAD, role="SWE", resume_text="", status="active", plan_type="normal")
+    db.add(session)
+    db.flush()
+    db.add(ChatMessage(session_id=session.id, thread_id=THREAD, message_type="question",
+                       role="assistant", content="Tell me about yourself", question_number=1))
+    db.commit()
+    return session.id
+
+
+def _model(monkeypatch, action, during=None):
+    """Fake the interviewer; `during` runs while the model "thinks", like a second request."""
+    def next_action(**kwargs):
+        if during:
+            during()
+        return NextAction(action=action, message="Next question" if action != "wrap_up" else "Thanks!")
+
+    monkeypatch.setattr(interview, "get_next_interviewer_action", next_action)
+    monkeypatch.setattr(interview, "evaluate_interview", lambda **kwargs: DimensionEval(
+        technical=7, communication=7, leadership=7, critical_thinking=7, decision_making=7,
+        project_knowledge=7, overall=7))
+
+
+def _submit(db, answer="An answer"):
+    return asyncio.run(interview.submit_answer(AnswerSubmissionRequest(thread_id=THREAD, answer=answer), db, None))
+
+
+def _messages(db):
+    db.expire_all()
+    return [(m.message_type, m.content) for m in
+            db.query(ChatMessage).filter_by(thread_id=THREAD).order_by(ChatMessage.id)]
+
+
+def _other_request_answers():
+    other = SessionLocal()
+    try:
+        session_id = other.query(InterviewSession.id).filter_by(thread_id=THREAD).scalar()
+        other.add(ChatMessage(session_id=session_id, thread_id=THREAD, message_type="answer",
+                              role="user", content="The other tab's answer"))
+        other.commit()
+    finally:
+        other.close()
+
+
+def test_answer_and_next_question(db, active, monkeypatch):
+    _model(monkeypatch, "ask_question")
+    assert _submit(db)["action"] == "ask_question"
+    assert [t for t, _ in _messages(db)] == ["question", "answer", "question"]
+
+
+@pytest.mark.parametrize("action", ["ask_question", "ask_followup", "wrap_up"])
+def test_a_concurrent_submit_is_refused(db, active, monkeypatch, action):
+    _model(monkeypatch, action, during=_other_request_answers)
+    with pytest.raises(HTTPException) as exc:
+        _submit(db)
+    assert exc.value.status_code == 409
+    # Only the other request's answer was written; this one left nothing behind
+    assert _messages(db) == [("question", "Tell me about yourself"), ("answer", "The other tab's answer")]
+    assert db.get(InterviewSession, active).status == "active"
+
+
+def test_submit_after_completion_by_another_request_is_refused(db, active, monkeypatch):
+    def complete():
+        other = SessionLocal()
+        other.query(InterviewSession).filter_by(thread_id=THREAD).update({"status": "completed"})
+        other.commit()
+        other.close()
+
+    _model(monkeypatch, "wrap_up", during=complete)
+    with pytest.raises(HTTPException) as exc:
+        _submit(db)
+    assert exc.value.status_code == 409 and "completed" in exc.value.detail
+
+
+def test_wrap_up_completes_the_interview(db, active, monkeypatch):
+    _model(monkeypatch, "wrap_up")
+    result = _submit(db)
+    assert result["action"] == "completed" and result["scores"]["overall"] == 7
+    db.expire_all()
+    session = db.get(InterviewSession, active)
+    assert session.status == "completed" and session.average_score == 7
+    assert [t for t, _ in _messages(db)] == ["question", "answer", "system", "roadmap"]
@@ -0,0 +1,129 @@
+"""Job matching: posting skills, location fit and cache invalidation across workers."""
+from datetime import datetime, timedelta
+
+import pytest
+
+import job_matching
+import search_index
+from cache import cache
+from database import engine
+from job_matching import match_candidates, posting_skill_keys
+from models import CandidatePerformance, JobPosting, User, UserProfile
+from skill_vocabulary import canonicalize_skills
+
+
+@pytest.fixture(autouse=True)
+def _fresh_state(monkeypatch):
+    monkeypatch.setattr(search_index, "_index", None)
+    monkeypatch.setattr(job_matching, "_snapshot", None)
+    monkeypatch.setattr(job_matching, "_interview_scores", ((), {}))
+    cache.clear()
+    yield
+    monkeypatch.setattr(search_index, "_index", None)
+    cache.clear()
+
+
+def _candidate(db, name, **profile):
+    user = User(email=f"{name}@example.com", full_name=name, hashed_password="x")
+    db.add(user)
+    db.flush()
+    profile.setdefault("is_visible_to_recruiters", True)
+    profile.setdefault("experience_years", 3.0)
+    if "skills" in profile:
+        profile["skills"], profile["skill_ids"] = canonicalize_skills(profile["skills"])
+    db.add(UserProfile(user_id=user.id, **profile))
+    db.commit()
+    return user.id
+
+
+def _job(db, skills=(), **fields):
+    names, ids = canonicalize_skills(skills)
+    job = JobPosting(title="Backend Engineer", required_skills=names, required_skill_ids=ids, **fields)
+    db.add(job)
+    db.commit()
+    return job
+
+
+def _ids(matches):
+    return [m["user_id"] for m in matches]
+
+
+def test_posting_skill_keys_use_the_stored_ids(db):
+    job = _job(db, ["ReactJS", "golang", "Internal DSL "])
+    assert posting_skill_keys(job) == [40, 5, "internal dsl"]
+
+    # The ids written with the posting win over re-deriving them from the names
+    job.required_skill_ids = [1]
+    job.required_skills = ["Pythonish", "Internal DSL"]
+    assert posting_skill_keys(job) == [1, "pythonish", "internal dsl"]
+
+    # Postings from before canonical ids fall back to the names
+    job.required_skill_ids = None
+    job.required_skills = ["react.js"]
+    assert posting_skill_keys(job) == [40]
+
+
+def test_candidates_need_a_required_skill(db):
+    react = _candidate(db, "react", skills=["React"])
+    _candidate(db, "rust", skills=["Rust"])
+    matches = match_candidates(_job(db, ["react.js"]), db)
+    assert _ids(matches) == [react]
+    assert matches[0]["matched_skills"] == ["React"]
+
+
+def test_location_is_scored_unless_remote(db):
+    pune = _candidate(db, "pune", skills=["Go"], location="Pune, India")
+    nowhere = _candidate(db, "nowhere", skills=["Go"])
+    delhi = _candidate(db, "delhi", skills=["Go"], location="Delhi")
+
+    onsite = match_candidates(_job(db, ["Go"], location="pune"), db)
+    assert _ids(onsite) == [pune, nowhere, delhi]
+    assert [m["breakdown"]["location"] for m in onsite] == [100.0, 50.0, 0.0]
+
+    remote = match_candidates(_job(db, ["Go"], location="Pune", is_remote=True), db)
+    assert {m["breakdown"]["location"] for m in remote} == {100.0}
+    assert len({m["match_score"] for m in remote}) == 1
+
+
+def test_editing_the_location_misses_the_cache(db):
+    _candidate(db, "pune", skills=["Go"], location="Pune")
+    job = _job(db, ["Go"], location="Pune")
+    assert match_candidates(job, db)[0]["breakdown"]["location"] == 100.0
+    job.location = "Delhi"
+    assert match_candidates(job, db)[0]["breakdown"]["location"] == 0.0
+
+
+def test_interview_scores_written_by_another_worker_are_picked_up(db):
+    user_id = _candidate(db, "ada", skills=["Python"])
+    job = _job(db, ["Python"])
+    assert match_candidates(job, db)[0]["breakdown"]["interview"] == 0.0
+
+    # No session hooks in this process see this write, as with another worker's
+    with engine.begin() as conn:
+        conn.execute(CandidatePerformance.__table__.insert().values(
+            user_id=user_id, interviews_completed=1, mean_technical=8.0, updated_at=datetime.utcnow(),
+        ))
+    match = match_candidates(job, db)[0]
+    assert match["breakdown"]["interview"] == 80.0 and match["interview_scores"]["technical"] == 8.0
+
+    with engine.begin() as conn:
+        conn.execute(CandidatePerformance.__table__.update().values(
+            mean_technical=6.0, updated_at=datetime.utcnow() + timedelta(seconds=1),
+        ))
+    assert match_candidates(job, db)[0]["breakdown"]["interview"] == 60.0
+
+    with engine.begin() as conn:
+        conn.execute(CandidatePerformance.__table__.delete())
+    assert match_candidates(job, db)[0]["breakdown"]["interview"] == 0.0
+
+
+def test_unchanged_state_is_served_from_the_cache(db, monkeypatch):
+    _candidate(db, "ada", skills=["Python"])
+    job = _job(db, ["Python"])
+    first = match_candidates(job, db)
+
+    def no_rank(*args, **kwargs):
+        raise AssertionError("ranked again")
+
+    monkeypatch.setattr(job_matching.MatchSnapshot, "rank", no_rank)
+    assert match_candidates(job, db) == first
@@ -0,0 +1,111 @@
+"""Keyset pagination: cursor round-trips, ties on created_at, bad cursors, the last page."""
+import asyncio
+from datetime import datetime, timedelta
+
+import pytest
+from fastapi import HTTPException
+
+from api import interview
+from models import InterviewSession
+from pagination import MAX_PAGE_SIZE, clamp_limit, decode_cursor, encode_cursor, paginate_desc
+from user_snapshot import load_snapshot
+
+T0 = datetime(2025, 1, 1, 12, 0, 0)
+
+
+def _add_sessions(db, user, created_at_list, **fields):
+    rows = [InterviewSession(user_id=user.id, thread_id=f"t-{i}-{at.timestamp()}", role="SWE",
+                             created_at=at, **fields)
+            for i, at in enumerate(created_at_list)]
+    db.add_all(rows)
+    db.commit()
+    return rows
+
+
+def _walk(db, limit):
+    """Every page in order, as lists of ids."""
+    pages, cursor = [], None
+    while True:
+        rows, cursor = paginate_desc(db.query(InterviewSession), InterviewSession, cursor, limit)
+        pages.append([row.id for row in rows])
+        if cursor is None:
+            return pages
+
+
+def test_cursor_round_trip():
+    at = datetime(2025, 3, 4, 5, 6, 7, 890123)
+    assert decode_cursor(encode_cursor(at, 42)) == (at, 42)
+
+
+@pytest.mark.parametrize("cursor", ["", "not base64!", encode_cursor(T0, 1)[:-3], "WzFd"])
+def test_invalid_cursor_is_a_400(cursor):
+    with pytest.raises(HTTPException) as exc:
+        decode_cursor(cursor)
+    assert exc.value.status_code == 400
+
+
+def test_invalid_cursor_in_a_query_is_a_400(db):
+    with pytest.raises(HTTPException) as exc:
+        paginate_desc(db.query(InterviewSession), InterviewSession, "garbage", 10)
+    assert exc.value.status_code == 400
+
+
+@pytest.mark.parametrize("limit, expected", [(None, 50), (0, 50), (-3, 50), (7, 7), (10_000, MAX_PAGE_SIZE)])
+def test_clamp_limit(limit, expected):
+    assert clamp_limit(limit) == expected
+
+
+def test_ties_on_created_at_are_split_by_id(db, user):
+    # Five rows share one timestamp: a page boundary falls inside the tie.
+    rows = _add_sessions(db, user, [T0] * 5 + [T0 - timedelta(minutes=1)] * 2)
+    pages = _walk(db, limit=3)
+    flat = [row_id for page in pages for row_id in page]
+    assert len(flat) == len(set(flat)) == len(rows)              # nothing skipped or repeated
+    tied = sorted((row.id for row in rows[:5]), reverse=True)
+    assert flat[:5] == tied and pages[0] == tied[:3]
+
+
+def test_last_page(db, user):
+    _add_sessions(db, user, [T0 - timedelta(minutes=i) for i in range(4)])
+    assert [len(page) for page in _walk(db, limit=2)] == [2, 2]  # exact fit: no empty trailing page
+    assert [len(page) for page in _walk(db, limit=3)] == [3, 1]
+    rows, cursor = paginate_desc(db.query(InterviewSession), InterviewSession, None, 10)
+    assert len(rows) == 4 and cursor is None
+
+
+def test_empty_table(db):
+    assert paginate_desc(db.query(InterviewSession), InterviewSession, None, 10) == ([], None)
+
+
+def test_tuple_rows(db, user):
+    _add_sessions(db, user, [T0 - timedelta(minutes=i) for i in range(3)])
+    query = db.query(InterviewSession, InterviewSession.role)
+    rows, cursor = paginate_desc(query, InterviewSession, None, 2)
+    assert len(rows) == 2
+    rest, cursor = paginate_desc(query, InterviewSession, cursor, 2)
+    assert len(rest) == 1 and cursor is None
+
+
+def test_summary_covers_every_session(db, user, monkeypatch):
+    monkeypatch.setattr(interview, "SUMMARY_RECENT", 4)
+    scores = [2.0, 4.0, 6.0, 8.0, 9.0, 7.0]
+    for i, score in enumerate(scores):
+        _add_sessions(db, user, [T0 + timedelta(hours=i)], status="completed", average_score=score,
+                      score_technical=score if i % 2 else None)
+    _add_sessions(db, user, [T0 + timedelta(hours=10)], status="active", average_score=0.0)
+
+    summary = asyncio.run(interview.get_summary(load_snapshot(db, user.id), db))
+    assert summary["total_sessions"] == 7
+    assert summary["completed_sessions"] == summary["scored_sessions"] == 6
+    assert summary["average_score"] == round(sum(scores) / 6, 2)
+    assert summary["best_score"] == 9.0
+    assert summary["dimension_averages"]["score_technical"] == round((4 + 8 + 7) / 3, 2)   # NULLs skipped
+    assert summary["dimension_averages"]["score_leadership"] is None
+    assert summary["baseline_score"] == 4.0
+    assert [s["average_score"] for s in summary["recent"]] == scores[-4:]
+
+
+def test_summary_without_sessions(db, user):
+    summary = asyncio.run(interview.get_summary(load_snapshot(db, user.id), db))
+    assert summary["total_sessions"] == 0 and summary["recent"] == []
+    assert summary["average_score"] == 0 and summary["baseline_score"] is None
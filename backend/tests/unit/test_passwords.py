@@ -0,0 +1,113 @@
+"""Password hashing policy: re-hash on login, unusable passwords and the legacy plaintext migration."""
+import asyncio
+
+import pytest
+
+import passwords
+from api.auth import authenticate_user
+from models import User
+from passwords import UNUSABLE_PASSWORD, hash_password, verify_password
+
+LOW_ROUNDS = 4      # bcrypt's minimum; keeps each hash at a few milliseconds
+
+
+def _policy(monkeypatch, scheme="bcrypt", rounds=LOW_ROUNDS):
+    """Switch the hash policy as a restart with new environment variables would."""
+    monkeypatch.setattr(passwords, "PASSWORD_HASH_SCHEME", scheme)
+    monkeypatch.setattr(passwords, "BCRYPT_ROUNDS", rounds)
+    monkeypatch.setattr(passwords, "pwd_context", passwords._build_context())
+
+
+@pytest.fixture(autouse=True)
+def low_cost(monkeypatch):
+    _policy(monkeypatch)
+
+
+def _hash(password):
+    return asyncio.run(hash_password(password))
+
+
+def _verify(password, stored):
+    return asyncio.run(verify_password(password, stored))
+
+
+def test_current_policy_hash_verifies_without_replacement():
+    stored = _hash("s3cret")
+    assert stored.startswith(f"$2b$0{LOW_ROUNDS}$")
+    assert _verify("s3cret", stored) == (True, None)
+    assert _verify("wrong", stored) == (False, None)
+
+
+def test_cost_change_rehashes_on_login(monkeypatch):
+    stored = _hash("s3cret")
+    _policy(monkeypatch, rounds=LOW_ROUNDS + 1)
+    valid, replacement = _verify("s3cret", stored)
+    assert valid and replacement.startswith(f"$2b$0{LOW_ROUNDS + 1}$")
+    assert _verify("s3cret", replacement) == (True, None)
+    # A wrong password never hands back a replacement
+    assert _verify("wrong", stored) == (False, None)
+
+
+def test_scheme_change_rehashes_on_login(monkeypatch):
+    pytest.importorskip("argon2")
+    stored = _hash("s3cret")
+    _policy(monkeypatch, scheme="argon2")
+    valid, replacement = _verify("s3cret", stored)
+    assert valid and replacement.startswith("$argon2id$")
+    assert _verify("s3cret", replacement) == (True, None)
+
+
+def test_argon2_without_the_library_falls_back_to_bcrypt(monkeypatch):
+    monkeypatch.setattr(passwords, "_argon2_available", lambda: False)
+    _policy(monkeypatch, scheme="argon2")
+    assert _hash("s3cret").startswith("$2b$")
+
+
+@pytest.mark.parametrize("password", ["", "!", "anything"])
+def test_unusable_password_never_verifies(password):
+    assert _verify(password, UNUSABLE_PASSWORD) == (False, None)
+
+
+@pytest.mark.parametrize("stored", [None, ""])
+def test_missing_hash_never_verifies(stored):
+    assert _verify("", stored) == (False, None)
+
+
+def test_legacy_plaintext_is_migrated():
+    valid, replacement = _verify("hunter2", "hunter2")
+    assert valid and replacement.startswith("$2b$")
+    assert _verify("hunter2", replacement) == (True, None)
+    assert _verify("hunter3", "hunter2") == (False, None)
+
+
+@pytest.mark.parametrize("stored", ["$not-a-known-hash", "!disabled"])
+def test_hash_like_values_are_not_treated_as_plaintext(stored):
+    # Typing the stored string back must not log anyone in
+    assert _verify(stored, stored) == (False, None)
+
+
+def test_login_saves_the_replacement(db, user, monkeypatch):
+    user.hashed_password = "hunter2"
+    db.commit()
+
+    assert asyncio.run(authenticate_user(db, user.email, "hunter2")) is not None
+    db.expire_all()
+    upgraded = db.get(User, user.id).hashed_password
+    assert upgraded.startswith(f"$2b$0{LOW_ROUNDS}$")
+
+    _policy(monkeypatch, rounds=LOW_ROUNDS + 1)
+    assert asyncio.run(authenticate_user(db, user.email, "hunter2")) is not None
+    db.expire_all()
+    assert db.get(User, user.id).hashed_password.startswith(f"$2b$0{LOW_ROUNDS + 1}$")
+
+    # Failed logins leave the stored hash alone
+    before = db.get(User, user.id).hashed_password
+    assert asyncio.run(authenticate_user(db, user.email, "wrong")) is None
+    db.expire_all()
+    assert db.get(User, user.id).hashed_password == before
+
+
+def test_oauth_only_account_cannot_log_in_with_a_password(db, user):
+    user.hashed_password = UNUSABLE_PASSWORD
+    db.commit()
+    assert asyncio.run(authenticate_user(db, user.email, UNUSABLE_PASSWORD)) is None
@@ -0,0 +1,67 @@
+"""Incremental candidate performance summaries agree with a full rebuild."""
+from datetime import datetime, timedelta
+
+import pytest
+
+from models import CandidatePerformance, InterviewSession, User
+from performance import (
+    DIMENSIONS, ROLLING_WINDOW, rebuild_candidate_performance, record_completed_session, summary_to_dict,
+)
+
+START = datetime(2026, 1, 1)
+
+
+def _complete(db, user_id, role, score, day, plan="normal"):
+    session = InterviewSession(
+        user_id=user_id, thread_id=f"t-{user_id}-{day}", role=role, plan_type=plan,
+        status="completed", average_score=score, completed_at=START + timedelta(days=day),
+        **{f"score_{dim}": score + i * 0.25 for i, dim in enumerate(DIMENSIONS)},
+    )
+    db.add(session)
+    db.flush()
+    return session
+
+
+@pytest.fixture
+def peers(db):
+    """Other candidates' results, so role percentiles have something to rank against."""
+    for i, (role, score) in enumerate([("Backend", 5.0), ("Backend", 7.5), ("Frontend", 6.0), ("Backend", 9.0)]):
+        peer = User(email=f"peer{i}@example.com", hashed_password="x")
+        db.add(peer)
+        db.flush()
+        _complete(db, peer.id, role, score, day=i)
+    db.commit()
+
+
+def _snapshot(perf: CandidatePerformance) -> dict:
+    return {**summary_to_dict(perf), "recent_sessions": perf.recent_sessions}
+
+
+def test_incremental_updates_match_a_full_rebuild(db, user, peers):
+    history = [("Backend", 6.0, "normal"), ("Backend", 8.0, "thunder"), ("Frontend", 4.5, "normal")]
+    history += [("Backend", 5.0 + (i % 4) * 0.5, "max") for i in range(ROLLING_WINDOW)]   # overflows the window
+    for day, (role, score, plan) in enumerate(history, start=10):
+        session = _complete(db, user.id, role, score, day, plan)
+        record_completed_session(session, db)
+        db.commit()
+
+    incremental = _snapshot(db.get(CandidatePerformance, user.id))
+    rebuilt = _snapshot(rebuild_candidate_performance(user.id, db))
+
+    assert incremental["interviews_completed"] == len(history)
+    assert len(incremental["recent_sessions"]) == ROLLING_WINDOW
+    assert incremental.pop("average_score") == pytest.approx(rebuilt.pop("average_score"), abs=1e-3)
+    assert incremental == rebuilt
+
+
+def test_first_completion_builds_the_summary(db, user, peers):
+    session = _complete(db, user.id, "Backend", 8.0, day=10)
+    perf = record_completed_session(session, db)
+    assert perf.interviews_completed == 1
+    assert perf.best_by_role == {"Backend": 8.0}
+    assert perf.role_percentiles == {"Backend": 66.7}     # above 5.0 and 7.5, below 9.0
+
+
+def test_anonymous_sessions_have_no_summary(db):
+    session = _complete(db, None, "Backend", 8.0, day=1)
+    assert record_completed_session(session, db) is None
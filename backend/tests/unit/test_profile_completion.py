@@ -0,0 +1,33 @@
+"""Profile completion: write-time maintenance and the one-time backfill."""
+from models import UserProfile
+from profile_completion import backfill, compute_completion
+
+
+def _stored(db, profile_id) -> float:
+    db.expire_all()
+    return db.get(UserProfile, profile_id).profile_completion
+
+
+def test_edits_keep_completion_current(db, user):
+    profile = UserProfile(user_id=user.id, bio="Backend engineer", skills=["Python"])
+    db.add(profile)
+    db.commit()
+    assert _stored(db, profile.id) == 30.0          # full name, bio, skills
+
+    profile.github_url = "https://github.com/candidate"
+    db.commit()
+    assert _stored(db, profile.id) == 40.0
+
+
+def test_backfill_corrects_stale_rows(db, user):
+    profile = UserProfile(user_id=user.id, bio="Backend engineer", resume_text="Resume")
+    db.add(profile)
+    db.commit()
+    # A row written before completion was maintained at write time
+    db.query(UserProfile).filter_by(id=profile.id).update({"profile_completion": 0.0})
+    db.commit()
+
+    assert backfill(db) == (1, 1)
+    expected = compute_completion(db.get(UserProfile, profile.id), user)["completion_pct"]
+    assert _stored(db, profile.id) == expected == 35.0
+    assert backfill(db) == (1, 0)                   # idempotent
@@ -0,0 +1,216 @@
+"""POST /profile/score/all: one up-front charge, refunds for failed components, NDJSON progress."""
+import asyncio
+import json
+
+import pytest
+from fastapi import HTTPException
+
+from api import profile as profile_api
+from database import SessionLocal
+from models import CreditTransaction, User, UserProfile
+
+RESUME = "Experience\n- Built billing APIs in Python"
+ALL_COMPONENTS = profile_api.RESUME_SCORE_COST + profile_api.GITHUB_SCORE_COST + profile_api.LINKEDIN_SCORE_COST
+
+
+def _reply(score_key, score):
+    return {score_key: score, "breakdown": {}, "feedback": f"{score_key} feedback"}
+
+
+@pytest.fixture
+def scorers(monkeypatch):
+    """Model replies by prompt; a component listed in `failing` raises instead."""
+    failing = set()
+
+    def call_scorer(prompt):
+        component = ("github" if "GitHub presence" in prompt
+                     else "linkedin" if "LinkedIn presence" in prompt else "resume")
+        calls.append(component)
+        if component in failing:
+            raise ValueError(f"{component} model error")
+        return _reply(f"{component}_score", {"resume": 8.0, "github": 6.0, "linkedin": 4.0}[component])
+
+    async def fetch_github(username):
+        return {"login": username}, []
+
+    calls = []
+    monkeypatch.setattr(profile_api, "_call_scorer", call_scorer)
+    monkeypatch.setattr(profile_api, "_fetch_github", fetch_github)
+    return failing, calls
+
+
+@pytest.fixture
+def candidate(db, user):
+    user.credits = 10
+    db.add(UserProfile(user_id=user.id, resume_text=RESUME, target_roles=["Backend Engineer"],
+                       github_url="https://github.com/ada", linkedin_url="https://linkedin.com/in/ada"))
+    db.commit()
+    return user.id
+
+
+def _score_all(db, user_id):
+    """Run the endpoint as a request would: the session is released mid-request, so reload after."""
+    async def run():
+        response = await profile_api.score_all(current_user=db.get(User, user_id), db=db)
+        assert response.media_type == "application/x-ndjson"
+        return [json.loads(line) async for line in response.body_iterator]
+
+    return asyncio.run(run())
+
+
+def _ledger(db, user_id):
+    db.expire_all()
+    return [(t.transaction_type, t.amount, t.balance_after) for t in
+            db.query(CreditTransaction).filter_by(user_id=user_id).order_by(CreditTransaction.id)]
+
+
+def test_all_components_charged_once_and_streamed(db, candidate, scorers):
+    events = _score_all(db, candidate)
+
+    started, *components, done = events
+    assert started["event"] == "started" and started["charged"] == ALL_COMPONENTS
+    assert sorted(started["components"]) == ["github", "linkedin", "resume"]
+    assert started["credits_remaining"] == 10 - ALL_COMPONENTS
+    assert {e["component"]: (e["status"], e["score"]) for e in components} == {
+        "resume": ("ok", 8.0), "github": ("ok", 6.0), "linkedin": ("ok", 4.0),
+    }
+    assert done["event"] == "done" and done["credits_remaining"] == 10 - ALL_COMPONENTS
+    assert done["scores"] == {"resume": 8.0, "github": 6.0, "linkedin": 4.0, "overall": 6.5}
+
+    assert _ledger(db, candidate) == [("profile_score_all", -ALL_COMPONENTS, 10 - ALL_COMPONENTS)]
+    saved = db.query(UserProfile).filter_by(user_id=candidate).one()
+    assert (saved.resume_score, saved.github_score, saved.linkedin_score, saved.profile_score) == (8.0, 6.0, 4.0, 6.5)
+    assert saved.resume_feedback == "resume_score feedback"
+
+
+def test_failed_component_is_refunded(db, candidate, scorers):
+    failing, _ = scorers
+    failing.add("github")
+    events = _score_all(db, candidate)
+
+    failed = [e for e in events if e.get("status") == "failed"]
+    assert failed == [{"event": "component", "component": "github", "status": "failed",
+                       "error": "github model error", "refunded": profile_api.GITHUB_SCORE_COST}]
+    balance = 10 - ALL_COMPONENTS + profile_api.GITHUB_SCORE_COST
+    done = events[-1]
+    assert done["credits_remaining"] == balance
+    # The overall score is the weighted mean of what did get scored
+    assert done["scores"] == {"resume": 8.0, "github": None, "linkedin": 4.0, "overall": round((8 * 0.5 + 4 * 0.25) / 0.75, 2)}
+
+    assert _ledger(db, candidate) == [
+        ("profile_score_all", -ALL_COMPONENTS, 10 - ALL_COMPONENTS),
+        ("refund", profile_api.GITHUB_SCORE_COST, balance),
+    ]
+    assert db.get(User, candidate).credits == balance
+
+
+def test_every_component_failing_refunds_everything(db, candidate, scorers):
+    failing, _ = scorers
+    failing.update({"resume", "github", "linkedin"})
+    events = _score_all(db, candidate)
+    assert events[-1]["credits_remaining"] == 10
+    assert events[-1]["scores"]["overall"] is None
+    assert _ledger(db, candidate)[-1] == ("refund", ALL_COMPONENTS, 10)
+
+
+def test_insufficient_credits_charges_nothing(db, candidate, scorers):
+    _, calls = scorers
+    db.get(User, candidate).credits = ALL_COMPONENTS - 1
+    db.commit()
+    with pytest.raises(HTTPException) as exc:
+        _score_all(db, candidate)
+    assert exc.value.status_code == 402
+    assert calls == [] and _ledger(db, candidate) == []
+    assert db.get(User, candidate).credits == ALL_COMPONENTS - 1
+
+
+def test_nothing_to_score(db, user, scorers):
+    db.add(UserProfile(user_id=user.id))
+    db.commit()
+    with pytest.raises(HTTPException) as exc:
+        _score_all(db, user.id)
+    assert exc.value.status_code == 400
+
+
+def test_atomic_charge_cannot_spend_the_same_balance_twice(db, user):
+    user.credits = 5
+    db.commit()
+    first, second = SessionLocal(), SessionLocal()
+    try:
+        assert second.get(User, user.id).credits == 5
+        assert profile_api._charge_credits_atomic(user.id, 3, first, "first", "test") == 2
+        first.commit()
+        # The second request saw a balance of 5 too, but the UPDATE is conditional
+        with pytest.raises(HTTPException) as exc:
+            profile_api._charge_credits_atomic(user.id, 3, second, "second", "test")
+        assert exc.value.status_code == 402 and exc.value.detail == "Insufficient credits. Need 3, have 2."
+        second.rollback()
+    finally:
+        first.close()
+        second.close()
+    db.expire_all()
+    assert db.get(User, user.id).credits == 2
+    assert _ledger(db, user.id) == [("test", -3, 2)]
+
+
+# ── Resume-hash memo ─────────────────────────────────────────────────────
+
+def _score_resume(db, user_id):
+    return asyncio.run(profile_api.score_resume(current_user=db.get(User, user_id), db=db))
+
+
+def test_unchanged_resume_is_served_from_the_memo(db, candidate, scorers):
+    _, calls = scorers
+    first = _score_resume(db, candidate)
+    assert first["cached"] is False and first["credits_remaining"] == 10 - profile_api.RESUME_SCORE_COST
+
+    again = _score_resume(db, candidate)
+    assert again["cached"] is True and again["resume_score"] == first["resume_score"]
+    assert again["credits_remaining"] == first["credits_remaining"]
+    assert calls == ["resume"] and len(_ledger(db, candidate)) == 1
+
+    # score_all reuses it too, for free, and says so
+    events = _score_all(db, candidate)
+    assert events[0]["components"][0] == "resume"          # reused components are listed first
+    assert events[0]["charged"] == ALL_COMPONENTS - profile_api.RESUME_SCORE_COST
+    assert [e for e in events if e.get("component") == "resume"][0]["cached"] is True
+    assert calls.count("resume") == 1
+
+
+@pytest.mark.parametrize("field, value", [
+    ("resume_text", RESUME + "\n- Led the payments migration"),
+    ("target_roles", ["Staff Engineer"]),
+    ("experience_years", 6.0),
+    ("skills", ["Python", "Go"]),
+])
+def test_changed_scoring_inputs_miss_the_memo(db, candidate, scorers, field, value):
+    _, calls = scorers
+    _score_resume(db, candidate)
+    profile = db.query(UserProfile).filter_by(user_id=candidate).one()
+    setattr(profile, field, value)
+    db.commit()
+
+    result = _score_resume(db, candidate)
+    assert result["cached"] is False
+    assert result["credits_remaining"] == 10 - 2 * profile_api.RESUME_SCORE_COST
+    assert calls == ["resume", "resume"]
+
+
+def test_fields_outside_the_prompt_keep_the_memo(db, candidate, scorers):
+    _score_resume(db, candidate)
+    profile = db.query(UserProfile).filter_by(user_id=candidate).one()
+    profile.headline = "Backend engineer"
+    profile.bio = "Likes hard problems"
+    db.commit()
+    assert _score_resume(db, candidate)["cached"] is True
+
+
+def test_a_failed_scoring_does_not_memoize(db, candidate, scorers):
+    failing, calls = scorers
+    failing.add("resume")
+    with pytest.raises(HTTPException) as exc:
+        _score_resume(db, candidate)
+    assert exc.value.status_code == 502
+    failing.clear()
+    assert _score_resume(db, candidate)["cached"] is False
+    assert _ledger(db, candidate)[1][0] == "refund"
@@ -0,0 +1,192 @@
+"""
+Query-plan regression tests for the hot read paths.
+
+EXPLAIN runs on every query in HOT_QUERIES against a seeded synthetic
+database, and each plan must be served by an index on the listed columns:
+no sequential scan, and no explicit sort where the index should provide the
+order. The database is a temporary SQLite file by default; set
+CHECK_DATABASE_URL to check a Postgres instead (seeded if empty). Postgres
+runs with enable_seqscan=off, so a Seq Scan there means no usable index
+exists rather than the planner preferring a scan on a small table.
+"""
+import json
+import os
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Callable, List, Tuple
+
+import pytest
+from sqlalchemy import create_engine, func, inspect, select, tuple_
+
+from models import BestAnswer, ChatMessage, CreditTransaction, InterviewSession
+from synthetic_data import generate
+
+
+@dataclass
+class HotQuery:
+    name: str
+    build: Callable
+    table: str
+    advice: Tuple[str, ...]          # leading columns of the index that serves this query
+    allow_sort: bool = False
+
+
+_CURSOR = (datetime(2025, 7, 1), 50_000)
+
+HOT_QUERIES = [
+    HotQuery(
+        "sessions by user (keyset page)",
+        lambda: select(InterviewSession)
+        .where(InterviewSession.user_id == 1)
+        .where(tuple_(InterviewSession.created_at, InterviewSession.id) < tuple_(*_CURSOR))
+        .order_by(InterviewSession.created_at.desc(), InterviewSession.id.desc())
+        .limit(51),
+        "interview_sessions", ("user_id", "created_at", "id"),
+    ),
+    HotQuery(
+        "admin interviews (keyset page)",
+        lambda: select(InterviewSession)
+        .where(tuple_(InterviewSession.created_at, InterviewSession.id) < tuple_(*_CURSOR))
+        .order_by(InterviewSession.created_at.desc(), InterviewSession.id.desc())
+        .limit(101),
+        "interview_sessions", ("created_at", "id"),
+    ),
+    HotQuery(
+        "session by thread_id",
+        lambda: select(InterviewSession).where(InterviewSession.thread_id == "synthetic-1"),
+        "interview_sessions", ("thread_id",),
+    ),
+    HotQuery(
+        "transcript by thread_id",
+        lambda: select(ChatMessage)
+        .where(ChatMessage.thread_id == "synthetic-1")
+        .order_by(ChatMessage.id),
+        "chat_messages", ("thread_id", "id"),
+    ),
+    HotQuery(
+        "feedback messages for sessions",
+        lambda: select(ChatMessage.session_id)
+        .where(ChatMessage.session_id.in_([1, 2, 3]), ChatMessage.message_type == "feedback")
+        .distinct(),
+        "chat_messages", ("session_id", "message_type"),
+        allow_sort=True,
+    ),
+    HotQuery(
+        "leaderboard",
+        lambda: select(InterviewSession)
+        .where(InterviewSession.status == "completed")
+        .order_by(InterviewSession.average_score.desc())
+        .limit(20),
+        "interview_sessions", ("status", "average_score"),
+    ),
+    HotQuery(
+        "completed sessions for candidate",
+        lambda: select(InterviewSession)
+        .where(InterviewSession.user_id == 1, InterviewSession.status == "completed")
+        .order_by(InterviewSession.completed_at.desc())
+        .limit(10),
+        "interview_sessions", ("user_id",),
+        allow_sort=True,  # a handful of rows per user; sorting them is cheap
+    ),
+    HotQuery(
+        "credit transactions by user (keyset page)",
+        lambda: select(CreditTransaction)
+        .where(CreditTransaction.user_id == 1)
+        .where(tuple_(CreditTransaction.created_at, CreditTransaction.id) < tuple_(*_CURSOR))
+        .order_by(CreditTransaction.created_at.desc(), CreditTransaction.id.desc())
+        .limit(51),
+        "credit_transactions", ("user_id", "created_at", "id"),
+    ),
+    HotQuery(
+        "best answer lookup",
+        lambda: select(BestAnswer)
+        .where(BestAnswer.session_id == 1, BestAnswer.question_number == 1),
+        "best_answers", ("session_id", "question_number"),
+    ),
+    HotQuery(
+        "role percentile distribution",
+        lambda: select(func.max(InterviewSession.average_score))
+        .where(InterviewSession.role == "Backend Engineer", InterviewSession.status == "completed",
+               InterviewSession.user_id.isnot(None))
+        .group_by(InterviewSession.user_id),
+        "interview_sessions", ("role", "status", "user_id"),
+    ),
+    HotQuery(
+        "admin daily activity window",
+        lambda: select(InterviewSession.id).where(InterviewSession.created_at >= datetime(2025, 12, 25)),
+        "interview_sessions", ("created_at",),
+    ),
+]
+
+
+@pytest.fixture(scope="module")
+def plan_engine(tmp_path_factory):
+    url = os.getenv("CHECK_DATABASE_URL")
+    if url:
+        engine = create_engine(url)
+    else:
+        engine = create_engine(f"sqlite:///{tmp_path_factory.mktemp('plans') / 'plans.db'}")
+    if not inspect(engine).has_table("interview_sessions"):
+        generate(engine, users=500, sessions=5_000, messages_per_session=4, transactions=5_000)
+        # Statistics, so the planner picks by selectivity (SQLite otherwise
+        # breaks ties between equally usable indexes arbitrarily)
+        with engine.begin() as conn:
+            conn.exec_driver_sql("ANALYZE")
+    yield engine
+    engine.dispose()
+
+
+def _explain(conn, stmt) -> Tuple[List[str], List[str], List[str]]:
+    """(indexes used, sequential scans, sorts) in the plan of `stmt`."""
+    dialect = conn.engine.dialect
+    compiled = stmt.compile(dialect=dialect, compile_kwargs={"render_postcompile": True})
+    params = compiled.params
+    if compiled.positional:
+        params = tuple(params[name] for name in compiled.positiontup)
+
+    indexes, scans, sorts = [], [], []
+    if dialect.name == "postgresql":
+        conn.exec_driver_sql("SET LOCAL enable_seqscan = off")
+        plan = conn.exec_driver_sql(f"EXPLAIN (FORMAT JSON) {compiled}", params).scalar()
+        if isinstance(plan, str):
+            plan = json.loads(plan)
+        stack = [plan[0]["Plan"]]
+        while stack:
+            node = stack.pop()
+            if node["Node Type"] == "Seq Scan":
+                scans.append(f"Seq Scan on {node.get('Relation Name')}")
+            elif node["Node Type"] in ("Sort", "Incremental Sort"):
+                sorts.append(node["Node Type"])
+            if "Index Name" in node:
+                indexes.append(node["Index Name"])
+            stack.extend(node.get("Plans", []))
+    else:
+        for row in conn.exec_driver_sql(f"EXPLAIN QUERY PLAN {compiled}", params):
+            detail = row[-1]
+            if " INDEX " in detail:
+                indexes.append(detail.split(" INDEX ", 1)[1].split(" ", 1)[0])
+            elif detail.startswith("SCAN ") and "USING" not in detail:
+                scans.append(detail)
+            if "TEMP B-TREE" in detail:
+                sorts.append(detail)
+    return indexes, scans, sorts
+
+
+def _index_columns(engine, table: str) -> dict:
+    # Secondary indexes end in the row's primary key, which can serve ORDER BY id
+    return {ix["name"]: tuple(ix["column_names"]) + ("id",) for ix in inspect(engine).get_indexes(table)}
+
+
+@pytest.mark.parametrize("hq", HOT_QUERIES, ids=[hq.name for hq in HOT_QUERIES])
+def test_hot_query_is_index_backed(plan_engine, hq):
+    with plan_engine.connect() as conn, conn.begin():
+        indexes, scans, sorts = _explain(conn, hq.build())
+
+    suggestion = f"CREATE INDEX ix_{hq.table}_{'_'.join(hq.advice)} ON {hq.table} ({', '.join(hq.advice)})"
+    assert not scans, f"{scans}; suggest: {suggestion}"
+    if not hq.allow_sort:
+        assert not sorts, f"explicit sort instead of index order; suggest: {suggestion}"
+    columns = _index_columns(plan_engine, hq.table)
+    assert any(columns.get(name, ())[:len(hq.advice)] == hq.advice for name in indexes), (
+        f"plan uses {indexes or 'no index'}; suggest: {suggestion}"
+    )
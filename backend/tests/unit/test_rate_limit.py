@@ -0,0 +1,100 @@
+"""Token buckets and the 429 admission check on the auth endpoints."""
+import pytest
+from fastapi import HTTPException
+from starlette.requests import Request
+
+import rate_limit
+from rate_limit import Limit, MemoryBuckets, client_ip, enforce
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(rate_limit.time, "monotonic", lambda: now[0])
+    return now
+
+
+@pytest.fixture
+def buckets(monkeypatch):
+    store = MemoryBuckets()
+    monkeypatch.setattr(rate_limit, "store", store)
+    monkeypatch.setattr(rate_limit, "RATE_LIMIT_ENABLED", True)
+    monkeypatch.setattr(rate_limit, "LIMITS", {"login": (Limit.parse("3/30"), Limit.parse("2/60"))})
+    return store
+
+
+def _request(ip="203.0.113.7", forwarded=None):
+    headers = [(b"x-forwarded-for", forwarded.encode())] if forwarded else []
+    return Request({"type": "http", "headers": headers, "client": (ip, 50000)})
+
+
+def test_limit_parse():
+    assert Limit.parse("10/600") == Limit(10.0, 10 / 600)
+
+
+def test_burst_then_rejection_with_the_wait(clock):
+    buckets, limit = MemoryBuckets(), Limit.parse("3/30")     # one token every 10s
+    assert [buckets.take("k", limit) for _ in range(3)] == [0, 0, 0]
+    assert buckets.take("k", limit) == pytest.approx(10)
+    clock[0] += 4
+    assert buckets.take("k", limit) == pytest.approx(6)       # rejections don't consume
+
+
+def test_refill_is_gradual_and_capped(clock):
+    buckets, limit = MemoryBuckets(), Limit.parse("3/30")
+    for _ in range(3):
+        buckets.take("k", limit)
+    clock[0] += 20                                            # two tokens back
+    assert [buckets.take("k", limit) for _ in range(2)] == [0, 0]
+    assert buckets.take("k", limit) > 0
+
+    clock[0] += 3600                                          # never more than capacity
+    assert [buckets.take("k", limit) for _ in range(3)] == [0, 0, 0]
+    assert buckets.take("k", limit) > 0
+
+
+def test_keys_are_independent_and_lru_bounded(clock):
+    buckets, limit = MemoryBuckets(max_keys=2), Limit.parse("1/60")
+    assert buckets.take("a", limit) == 0
+    assert buckets.take("b", limit) == 0
+    assert buckets.take("a", limit) > 0                       # "a" is now most recent
+    assert buckets.take("c", limit) == 0                      # evicts "b"
+    assert buckets.size() == 2
+    assert buckets.take("b", limit) == 0                      # a fresh bucket
+    assert buckets.take("a", limit) == 0                      # "a" was evicted by "b"
+
+
+def test_enforce_raises_429_with_retry_after(buckets, clock):
+    for _ in range(2):
+        enforce(_request(), "login", "Ada@Example.com")
+    with pytest.raises(HTTPException) as exc:
+        enforce(_request(ip="198.51.100.1"), "login", " ada@example.com ")   # same email, any case
+    assert exc.value.status_code == 429
+    assert exc.value.headers["Retry-After"] == "30"
+
+
+def test_enforce_per_ip_bucket(buckets, clock):
+    for i in range(3):
+        enforce(_request(), "login", f"user{i}@example.com")
+    with pytest.raises(HTTPException) as exc:
+        enforce(_request(), "login", "other@example.com")
+    assert exc.value.headers["Retry-After"] == "10"
+    enforce(_request(ip="198.51.100.1"), "login", "other@example.com")
+
+
+def test_store_outage_allows_the_request(buckets, monkeypatch):
+    class Down:
+        def take(self, key, limit):
+            raise ConnectionError("redis down")
+
+    monkeypatch.setattr(rate_limit, "store", Down())
+    for _ in range(10):
+        enforce(_request(), "login", "a@example.com")
+
+
+def test_client_ip_trusts_only_the_proxy_hops(monkeypatch):
+    monkeypatch.setattr(rate_limit, "RATE_LIMIT_PROXY_HOPS", 1)
+    assert client_ip(_request(forwarded="1.1.1.1, 192.0.2.9")) == "192.0.2.9"   # 1.1.1.1 is spoofable
+    assert client_ip(_request()) == "203.0.113.7"
+    monkeypatch.setattr(rate_limit, "RATE_LIMIT_PROXY_HOPS", 0)
+    assert client_ip(_request(forwarded="192.0.2.9")) == "203.0.113.7"
@@ -0,0 +1,130 @@
+"""get_read_db routing between the primary and the read replica (two SQLite files)."""
+from datetime import timedelta
+
+import pytest
+from starlette.requests import Request
+
+import database
+from api.auth import create_access_token
+from database import SessionLocal, caller_key, engine, get_read_db, read_engine
+from models import User
+
+
+def _token(uid, email="a@example.com", minutes=15):
+    return create_access_token({"sub": email, "uid": uid}, timedelta(minutes=minutes))
+
+
+def _request(token=None) -> Request:
+    headers = [(b"authorization", f"Bearer {token}".encode())] if token else []
+    return Request({"type": "http", "headers": headers})
+
+
+def _read_session(token=None):
+    gen = get_read_db(_request(token))
+    return gen, next(gen)
+
+
+@pytest.fixture(autouse=True)
+def _forget_writes():
+    database._recent_writes.clear()
+    yield
+    database._recent_writes.clear()
+
+
+def test_replica_is_configured():
+    assert read_engine is not engine
+
+
+def test_reads_go_to_the_replica(db):
+    db.add(User(email="primary@example.com", hashed_password="x"))
+    db.commit()
+    with read_engine.begin() as conn:
+        conn.execute(User.__table__.insert().values(email="replica@example.com", hashed_password="x"))
+
+    gen, session = _read_session()
+    try:
+        assert session.get_bind() is read_engine
+        assert [u.email for u in session.query(User)] == ["replica@example.com"]
+    finally:
+        gen.close()
+
+
+def _write_as(token):
+    writer = SessionLocal()
+    writer.info["rw_key"] = caller_key(token)
+    writer.add(User(email=f"fresh{len(database._recent_writes)}@example.com", hashed_password="x"))
+    writer.commit()
+    writer.close()
+
+
+def test_read_your_writes_uses_the_primary_inside_the_window(db, monkeypatch):
+    token_a = _token(1)
+    _write_as(token_a)
+
+    gen, session = _read_session(token_a)
+    try:
+        assert session.get_bind() is engine
+        assert session.query(User).filter_by(email="fresh0@example.com").count() == 1
+    finally:
+        gen.close()
+
+    # Another caller isn't affected by user 1's write
+    gen, session = _read_session(_token(2, "b@example.com"))
+    try:
+        assert session.get_bind() is read_engine
+    finally:
+        gen.close()
+
+    # Once the window has passed, token-a reads from the replica again
+    monkeypatch.setattr(database, "READ_YOUR_WRITES_SECONDS", 0)
+    gen, session = _read_session(token_a)
+    try:
+        assert session.get_bind() is read_engine
+    finally:
+        gen.close()
+
+
+def test_commit_without_writes_does_not_pin_to_primary(db):
+    reader = SessionLocal()
+    reader.info["rw_key"] = "user:1"
+    reader.query(User).all()
+    reader.commit()
+    reader.close()
+    assert not database.wrote_recently("user:1")
+
+
+def test_window_survives_a_token_refresh(db):
+    _write_as(_token(1))
+    refreshed = _token(1, minutes=30)       # what /auth/refresh hands out: same user, new token
+    assert refreshed != _token(1)
+    gen, session = _read_session(refreshed)
+    try:
+        assert session.get_bind() is engine
+    finally:
+        gen.close()
+
+
+@pytest.mark.parametrize("claims, key", [
+    ({"sub": "a@example.com", "uid": 7}, "user:7"),
+    ({"sub": "a@example.com"}, "sub:a@example.com"),        # issued before "uid"
+    ({"company_id": 3}, "company:3"),
+    ({}, None),
+])
+def test_caller_key(claims, key):
+    assert caller_key(create_access_token(claims)) == key
+
+
+@pytest.mark.parametrize("token", [None, "", "not-a-jwt"])
+def test_caller_key_without_a_usable_token(token):
+    assert caller_key(token) is None
+
+
+def test_flush_on_a_replica_session_raises(db):
+    gen, session = _read_session()
+    try:
+        session.add(User(email="nope@example.com", hashed_password="x"))
+        with pytest.raises(RuntimeError, match="read-replica"):
+            session.flush()
+    finally:
+        session.rollback()
+        gen.close()
@@ -0,0 +1,144 @@
+"""Refresh token rotation, reuse detection, revocation and purging."""
+import asyncio
+from datetime import datetime, timedelta
+
+import pytest
+from fastapi import HTTPException
+from starlette.requests import Request
+
+import refresh_tokens
+from api import auth
+from models import OTP, RefreshToken, ResetPasswordRequest
+from refresh_tokens import RefreshTokenError, issue, purge_expired, revoke_token, rotate
+
+
+def _row(db, token) -> RefreshToken:
+    db.expire_all()
+    return db.query(RefreshToken).filter_by(token_hash=refresh_tokens._hash(token)).one()
+
+
+def _age_rotation(db, token, seconds):
+    row = _row(db, token)
+    row.rotated_at -= timedelta(seconds=seconds)
+    db.commit()
+
+
+def _live(db, user_id) -> int:
+    db.expire_all()
+    return db.query(RefreshToken).filter_by(user_id=user_id, revoked_at=None, rotated_at=None).count()
+
+
+@pytest.fixture
+def token(db, user):
+    value = issue(db, user.id)
+    db.commit()
+    return value
+
+
+def test_rotate_returns_a_new_token_in_the_same_family(db, user, token):
+    user_id, successor = rotate(db, token)
+    db.commit()
+    assert user_id == user.id and successor != token
+    assert _row(db, token).rotated_at is not None
+    assert _row(db, successor).family_id == _row(db, token).family_id
+    assert rotate(db, successor)[0] == user.id
+
+
+def test_replay_within_grace_gets_a_sibling(db, user, token):
+    _, first = rotate(db, token)
+    db.commit()
+    user_id, second = rotate(db, token)        # the other tab, a moment later
+    db.commit()
+    assert user_id == user.id and second not in (token, first)
+    assert _live(db, user.id) == 2
+    rotate(db, first)
+    rotate(db, second)
+
+
+def test_replay_after_grace_revokes_the_family(db, user, token):
+    _, successor = rotate(db, token)
+    other_sign_in = issue(db, user.id)
+    db.commit()
+    _age_rotation(db, token, refresh_tokens.REFRESH_TOKEN_REUSE_GRACE + 1)
+
+    with pytest.raises(RefreshTokenError, match="reuse"):
+        rotate(db, token)
+    db.commit()
+    with pytest.raises(RefreshTokenError, match="revoked"):
+        rotate(db, successor)
+    assert rotate(db, other_sign_in)[0] == user.id     # other families are untouched
+
+
+def test_unknown_and_expired_tokens_are_refused(db, user, token):
+    with pytest.raises(RefreshTokenError, match="Invalid"):
+        rotate(db, "not-a-token")
+    row = _row(db, token)
+    row.expires_at = datetime.utcnow() - timedelta(seconds=1)
+    db.commit()
+    with pytest.raises(RefreshTokenError, match="expired"):
+        rotate(db, token)
+
+
+def test_logout_revokes_the_chain(db, user, token):
+    _, successor = rotate(db, token)
+    other_sign_in = issue(db, user.id)
+    db.commit()
+    assert revoke_token(db, successor) == 2
+    db.commit()
+    with pytest.raises(RefreshTokenError):
+        rotate(db, successor)
+    assert _live(db, user.id) == 1 and rotate(db, other_sign_in)
+    assert revoke_token(db, "not-a-token") == 0
+
+
+def _reset(db, user, code="123456"):
+    db.add(OTP(user_id=user.id, email=user.email, otp_code=code, purpose="password_reset",
+               expires_at=datetime.utcnow() + timedelta(minutes=10)))
+    db.commit()
+    request = Request({"type": "http", "headers": [], "client": ("203.0.113.7", 50000)})
+    body = ResetPasswordRequest(email=user.email, otp_code=code, new_password="new-password")
+    return asyncio.run(auth.reset_password(body, request, db))
+
+
+def test_password_reset_revokes_every_sign_in(db, user, token):
+    issue(db, user.id)
+    db.commit()
+    _reset(db, user)
+    assert _live(db, user.id) == 0
+    with pytest.raises(RefreshTokenError):
+        rotate(db, token)
+    assert db.query(OTP).one().is_used
+
+
+def test_failed_password_reset_changes_nothing(db, user, token, monkeypatch):
+    def broken(*args, **kwargs):
+        raise RuntimeError("template missing")
+
+    monkeypatch.setattr(auth, "queue_password_reset_confirmation_email", broken)
+    with pytest.raises(HTTPException) as exc:
+        _reset(db, user)
+    assert exc.value.status_code == 500
+    db.expire_all()
+    assert _live(db, user.id) == 1
+    assert not db.query(OTP).one().is_used
+    assert user.hashed_password == "x"
+
+
+def test_purge_deletes_only_long_expired_tokens(db, user, token):
+    now = datetime.utcnow()
+    grace = refresh_tokens.REFRESH_TOKEN_REUSE_GRACE
+    expired_rotated = issue(db, user.id)
+    expired_revoked = issue(db, user.id)
+    just_expired = issue(db, user.id)
+    db.commit()
+    for value, changes in ((expired_rotated, {"expires_at": now - timedelta(days=1), "rotated_at": now}),
+                           (expired_revoked, {"expires_at": now - timedelta(seconds=grace + 5), "revoked_at": now}),
+                           (just_expired, {"expires_at": now - timedelta(seconds=1)})):
+        db.query(RefreshToken).filter_by(token_hash=refresh_tokens._hash(value)).update(changes)
+    db.commit()
+
+    assert purge_expired(db) == 2
+    db.commit()
+    db.expire_all()
+    remaining = {row.token_hash for row in db.query(RefreshToken)}
+    assert remaining == {refresh_tokens._hash(token), refresh_tokens._hash(just_expired)}
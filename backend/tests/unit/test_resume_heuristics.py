@@ -0,0 +1,163 @@
+"""Local resume scorer: section parsing, tenure merging and per-dimension features."""
+from datetime import date
+
+import pytest
+
+from resume_heuristics import (
+    CALIBRATION, DEFAULT_EXPECTED_YEARS, DIMENSIONS, assess_resume, expected_skills, expected_years,
+    extract_features, parse_sections, score_features, tenure_years,
+)
+
+TODAY = date(2025, 6, 15)
+
+RESUME = """Jane Doe
+jane@example.com
+
+Summary
+Backend engineer who likes hard problems.
+
+Work Experience
+Senior Engineer, Acme (Jan 2020 - Present)
+- Led a team of 4 engineers migrating billing to Go and PostgreSQL
+- Reduced p99 latency by 40% by caching hot reads in Redis
+- Designed the event pipeline; chose Kafka over polling after benchmarking throughput
+Engineer, Beta (Jun 2017 - Dec 2019)
+- Built REST APIs in Python serving 2M requests per day
+- Mentored two interns
+
+Projects
+Ledger
+- Double-entry ledger in Python with SQL reports
+Chat
+- Websocket chat in Docker handling 10k users
+
+Education
+B.Tech, 2013 - 2017
+
+Skills
+Python, Go, Docker, Kubernetes
+"""
+
+
+@pytest.mark.parametrize("text, expected", [
+    ("", {"header": []}),
+    ("Jane\nSkills\nPython, Go", {"header": ["Jane"], "skills": ["Python, Go"]}),
+    # Headings match case-insensitively, with punctuation and aliases
+    ("WORK EXPERIENCE:\nAcme\nTechnical Skills\nGo", {"header": [], "experience": ["Acme"], "skills": ["Go"]}),
+    ("Internships\nAcme intern", {"header": [], "experience": ["Acme intern"]}),
+    ("Positions of Responsibility\nClub president", {"header": [], "leadership": ["Club president"]}),
+    # A heading word inside a sentence is content, and so is an over-long line
+    ("Experience with Python", {"header": ["Experience with Python"]}),
+    ("Projects" + " " * 40 + "x", {"header": ["Projects" + " " * 40 + "x"]}),
+    # Repeated headings append to one section; blank lines vanish
+    ("Projects\nA\n\nSkills\nGo\nProjects\nB", {"header": [], "projects": ["A", "B"], "skills": ["Go"]}),
+])
+def test_parse_sections(text, expected):
+    assert parse_sections(text) == expected
+
+
+@pytest.mark.parametrize("lines, expected", [
+    ([], 0.0),
+    (["Jan 2020 - Dec 2020"], 11 / 12),
+    (["2018 - 2020"], 35 / 12),                                      # bare years: Jan start, Dec end
+    (["Jan 2024 - Present"], 17 / 12),
+    (["03/2021 – 09/2021"], 6 / 12),
+    (["March 2019 to June 2020"], 15 / 12),
+    # Overlapping and nested ranges count once
+    (["Jan 2020 - Dec 2021", "Jun 2021 - Jun 2022"], 29 / 12),
+    (["Jan 2018 - Dec 2022", "Mar 2019 - Apr 2020"], 59 / 12),
+    # Adjacent jobs add up; gaps are not counted
+    (["Jan 2018 - Jan 2019", "Jan 2019 - Jan 2020"], 24 / 12),
+    (["Jan 2015 - Jan 2016", "Jan 2020 - Jan 2021"], 24 / 12),
+    # Backwards and far-future ranges are ignored; a near-future end is capped at today
+    (["Dec 2020 - Jan 2019"], 0.0),
+    (["Jan 2020 - Dec 2030"], 0.0),
+    (["Jan 2025 - Dec 2025"], 5 / 12),
+])
+def test_tenure_years(lines, expected):
+    assert tenure_years(lines, TODAY) == pytest.approx(expected)
+
+
+@pytest.mark.parametrize("roles, years", [
+    (["Senior Backend Engineer"], 5.0),
+    (["Staff Engineer"], 8.0),
+    (["Software Engineering Intern"], 0.0),
+    (["SDE-1"], 1.0),
+    (["Backend Engineer"], DEFAULT_EXPECTED_YEARS),
+    ([], DEFAULT_EXPECTED_YEARS),
+])
+def test_expected_years(roles, years):
+    assert expected_years(roles) == years
+
+
+def test_expected_skills_union_role_keywords():
+    assert 40 in expected_skills(["Frontend Developer"])
+    assert expected_skills(["Backend", "DevOps"]) >= {1, 60, 80, 84}
+    assert expected_skills(["Chef"]) == set()
+
+
+@pytest.fixture
+def features():
+    return extract_features(RESUME, ["Senior Backend Engineer"], ["Python"], 7, today=TODAY)
+
+
+@pytest.mark.parametrize("name, expected", [
+    ("sections", 5.0),                     # summary, experience, projects, education, skills
+    ("bullets", 7.0),                      # experience and project bullets only
+    ("tenure_years", 7.9),                 # 30 + 65 months; education dates excluded
+    ("claimed_years", 7.0),
+    ("expected_years", 5.0),
+    ("experience_bullets", 5.0),
+    ("project_count", 2.0),                # titled projects
+    ("project_quantified", 1.0),           # "10k users"
+])
+def test_feature_values(features, name, expected):
+    assert features[name] == expected
+
+
+def test_feature_ratios(features):
+    assert features["quantified_ratio"] == pytest.approx(3 / 7)          # 40%, 2M requests, 10k users
+    assert features["action_verb_ratio"] == pytest.approx(5 / 7)         # not the two project blurbs
+    assert features["leadership_signals"] >= 3                          # led, team of 4, mentored
+    assert features["thinking_signals"] >= 3                            # latency, designed, benchmarking...
+    assert 0 < features["skill_coverage"] <= 1
+
+
+@pytest.mark.parametrize("text, low, high", [
+    # Each resume should move its own dimension, and not the others
+    ("Experience\n- Mentored 3 juniors\n- Led a team of 5\n- Managed stakeholders", "leadership", "projects"),
+    ("Projects\nA\n- Python and Docker\nB\n- Go and Redis, 5k users\nC\n- Kafka", "projects", "leadership"),
+    ("Experience\n- Cut latency 50% by caching\n- Reduced cost 30% after profiling the bottleneck",
+     "thinking", "leadership"),
+])
+def test_each_dimension_responds_to_its_signals(text, low, high):
+    _, empty = score_features(extract_features("", today=TODAY))
+    _, breakdown = score_features(extract_features(text, today=TODAY))
+    assert breakdown[low] > empty[low]
+    assert breakdown[high] == empty[high]
+
+
+def test_claimed_years_stand_in_for_undated_experience():
+    undated = "Experience\n- Built things"
+    _, without = score_features(extract_features(undated, ["Backend Engineer"], today=TODAY))
+    _, claimed = score_features(extract_features(undated, ["Backend Engineer"], experience_years=3, today=TODAY))
+    assert claimed["experience"] > without["experience"]
+
+
+def test_scores_are_bounded_and_weighted(features, monkeypatch):
+    score, breakdown = score_features(features)
+    assert set(breakdown) == set(DIMENSIONS)
+    assert all(0 <= v <= 10 for v in breakdown.values())
+    assert 0 < score <= 10
+
+    # Calibration is applied per dimension and clamped to 0-10
+    monkeypatch.setitem(CALIBRATION, "leadership", (10.0, 5.0))
+    monkeypatch.setitem(CALIBRATION, "projects", (0.0, -3.0))
+    _, calibrated = score_features(features)
+    assert calibrated["leadership"] == 10.0 and calibrated["projects"] == 0.0
+
+
+def test_empty_resume_scores_zero_without_errors():
+    result = assess_resume("")
+    assert result["resume_score"] == 0.0
+    assert set(result["breakdown"].values()) == {0.0}
@@ -0,0 +1,151 @@
+"""Candidate search index: incremental maintenance and filter semantics."""
+from datetime import datetime
+
+import pytest
+
+import search_index
+from database import SessionLocal, engine
+from models import User, UserProfile
+from search_index import CandidateIndex, get_candidate_index
+
+
+@pytest.fixture(autouse=True)
+def _fresh_index(monkeypatch):
+    monkeypatch.setattr(search_index, "_index", None)
+    yield
+    monkeypatch.setattr(search_index, "_index", None)
+
+
+def _add_candidate(db, email, **profile):
+    user = User(email=email, full_name=email.split("@")[0], hashed_password="x")
+    db.add(user)
+    db.flush()
+    profile.setdefault("is_visible_to_recruiters", True)
+    db.add(UserProfile(user_id=user.id, **profile))
+    db.commit()
+    return user.id
+
+
+def test_commits_are_applied_to_the_live_index(db):
+    get_candidate_index()
+    user_id = _add_candidate(db, "ada@example.com", skills=["Python"])
+    docs, total = get_candidate_index().search(skills=["python"])
+    assert total == 1 and docs[0].user_id == user_id
+
+
+def test_commit_during_initial_build_is_replayed(db, monkeypatch):
+    load = CandidateIndex.load
+    committed = {}
+
+    def load_then_commit(self, session):
+        load(self, session)     # reads the table before the profile exists
+        writer = SessionLocal()
+        try:
+            committed["user_id"] = _add_candidate(writer, "late@example.com", skills=["Rust"])
+        finally:
+            writer.close()
+
+    monkeypatch.setattr(CandidateIndex, "load", load_then_commit)
+    index = get_candidate_index()
+    docs, total = index.search(skills=["rust"])
+    assert total == 1 and docs[0].user_id == committed["user_id"]
+
+
+
+def test_sync_picks_up_other_workers_changes(db):
+    user_id = _add_candidate(db, "go@example.com", skills=["Go"], location="Pune")
+    index = get_candidate_index()
+    assert index.search(location="pune")[1] == 1          # now cached
+
+    # Another worker's write: straight to the database, no session hooks here
+    with engine.begin() as conn:
+        conn.execute(
+            UserProfile.__table__.update()
+            .where(UserProfile.user_id == user_id)
+            .values(location="Delhi", updated_at=datetime.utcnow())
+        )
+    assert index.search(location="pune")[1] == 1          # not seen yet
+
+    search_index.sync_candidate_index()
+    assert index.search(location="pune")[1] == 0
+    docs, _ = index.search(location="delhi")
+    assert [d.user_id for d in docs] == [user_id]
+
+
+def test_sync_skips_rows_it_already_reflects(db):
+    _add_candidate(db, "py@example.com", skills=["Python"])
+    _add_candidate(db, "hidden@example.com", skills=["Python"], is_visible_to_recruiters=False)
+    index = get_candidate_index()
+    index.search(skills=["python"])
+    version, cached = index.version, len(index.results)
+
+    search_index.sync_candidate_index()       # both rows are inside the overlap window
+    assert index.version == version and len(index.results) == cached
+
+
+@pytest.fixture
+def memory_index():
+    index = CandidateIndex()
+    for profile in (
+        {"user_id": 1, "target_roles": ["Backend Engineer"], "location": "Bengaluru, India"},
+        {"user_id": 2, "headline": "Senior backend developer", "location": "Pune"},
+        {"user_id": 3, "target_roles": ["Data Scientist"]},                  # no location
+        {"user_id": 4, "target_roles": ["Frontend Engineer"], "location": "Remote"},
+    ):
+        index.upsert(profile, f"user{profile['user_id']}")
+    return index
+
+
+@pytest.mark.parametrize("filters, expected", [
+    ({"role": "backend"}, {1, 2}),                 # target role or headline, any case
+    ({"role": "end eng"}, {1, 4}),                 # substring, not whole tokens
+    ({"role": "DATA"}, {3}),
+    ({"location": "bengal"}, {1, 3}),              # no location passes a location filter
+    ({"location": "india", "role": "engineer"}, {1}),
+    ({"location": "tokyo"}, {3}),
+])
+def test_role_and_location_are_substring_filters(memory_index, filters, expected):
+    docs, total = memory_index.search(**filters)
+    assert {d.user_id for d in docs} == expected and total == len(expected)
+    # The streaming predicate agrees with the index
+    match = search_index.CandidateFilter(**filters)
+    assert {uid for uid, d in memory_index._docs.items() if match(d)} == expected
+
+
+def test_unset_experience_is_excluded_by_experience_filters(db):
+    unset = _add_candidate(db, "unset@example.com", skills=["Python"])
+    # The column default fills in 0 on insert; NULLs come from older rows
+    with engine.begin() as conn:
+        conn.execute(
+            UserProfile.__table__.update()
+            .where(UserProfile.user_id == unset)
+            .values(experience_years=None)
+        )
+    junior = _add_candidate(db, "junior@example.com", skills=["Python"], experience_years=0.0)
+    senior = _add_candidate(db, "senior@example.com", skills=["Python"], experience_years=6.0)
+    index = get_candidate_index()
+
+    def ids(**filters):
+        docs, total = index.search(**filters)
+        assert total == len(docs)
+        return {d.user_id for d in docs}
+
+    assert ids() == {unset, junior, senior}
+    # Like the SQL comparison it replaced: NULL matches neither bound
+    assert ids(min_experience=0) == {junior, senior}
+    assert ids(max_experience=10) == {junior, senior}
+    assert ids(skills=["python"], min_experience=0) == {junior, senior}
+    assert ids(skills=["python"]) == {unset, junior, senior}
+
+    match = search_index.CandidateFilter(min_experience=0)
+    assert [match(index._docs[u]) for u in (unset, junior)] == [False, True]
+    assert search_index.CandidateFilter(skills=["python"])(index._docs[unset])
+
+    # Setting it later puts the profile in range; clearing it takes it out again
+    profile = db.query(UserProfile).filter_by(user_id=unset).one()
+    profile.experience_years = 3.0
+    db.commit()
+    assert ids(min_experience=2) == {unset, senior}
+    profile.experience_years = None
+    db.commit()
+    assert ids(min_experience=2) == {senior}
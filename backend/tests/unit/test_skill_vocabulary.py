@@ -0,0 +1,78 @@
+"""Skill canonicalization and the resume skill matcher."""
+import pytest
+
+from skill_vocabulary import (
+    ALIASES, NOT_EXTRACTED, SkillMatcher, _tokens, canonicalize_skills, extract_skill_ids,
+    profile_skill_ids, skill_key,
+)
+
+
+@pytest.mark.parametrize("raw, expected", [
+    ("React", 40),
+    ("ReactJS", 40),
+    ("react.js", 40),
+    ("  React   JS ", 40),
+    ("Node.js", 34),
+    ("C++", 7),
+    ("C#", 8),
+    (".NET", 37),
+    ("react-native", 49),
+    ("CI/CD", 89),
+    ("Go", 5),                       # ambiguous in prose, fine as a listed skill
+    ("Quantum   Basket Weaving", "quantum basket weaving"),
+    ("", ""),
+])
+def test_skill_key(raw, expected):
+    assert skill_key(raw) == expected
+
+
+def test_canonicalize_renames_and_dedupes_known_skills():
+    names, ids = canonicalize_skills(["reactjs", "React", " python3 ", "", "Zig", "zig ", "k8s"])
+    assert names == ["React", "Python", "Zig", "Kubernetes"]
+    assert ids == [40, 1, 84]
+
+
+@pytest.mark.parametrize("text, expected", [
+    ("Built services in Python and FastAPI on AWS", {1, 32, 80}),
+    ("Deployed with Docker and Kubernetes (k8s) via GitHub Actions", {83, 84, 88, 92}),  # "github" is Git
+    ("Apache Kafka and Apache Spark pipelines", {100, 102}),
+    ("React Native and React apps", {49, 40}),           # overlapping aliases both count
+    ("Led the go to market plan", set()),                 # NOT_EXTRACTED keys stay out of prose
+    ("reactive programming, pythonic code", set()),       # whole words only
+    ("Spring Boot microservices", {33, 109}),
+    ("", set()),
+])
+def test_extract_skill_ids(text, expected):
+    assert set(extract_skill_ids(text)) == expected
+
+
+def _brute_force(text):
+    tokens = _tokens(text)
+    patterns = {k: v for k, v in ALIASES.items() if k not in NOT_EXTRACTED}
+    return {
+        sid for key, sid in patterns.items()
+        for start in range(len(tokens) - len(key) + 1)
+        if tokens[start:start + len(key)] == key
+    }
+
+
+def test_matcher_agrees_with_a_brute_force_scan():
+    text = (
+        "Senior engineer: python3, Django REST framework, PostgreSQL and Redis. "
+        "Machine learning with scikit learn, PyTorch and large language models; "
+        "Apache Airflow, Google Cloud Platform, sql server, c plus plus, objective c. "
+        "Data structures and algorithms, system design, unit testing and CI/CD."
+    )
+    assert set(extract_skill_ids(text)) == _brute_force(text)
+
+
+def test_failure_links_recover_partial_matches():
+    # "a b" dead-ends on "d", but the failure link must still find "b d"
+    matcher = SkillMatcher({("a", "b", "c"): 1, ("b", "d"): 2, ("b",): 3})
+    assert matcher.find("a b d") == {2, 3}
+    assert matcher.find("a b c") == {1, 3}
+    assert matcher.find("a a b c") == {1, 3}
+
+
+def test_profile_skill_ids_merges_listed_and_resume_skills():
+    assert profile_skill_ids(["ReactJS", "Zig"], "Five years of Kafka and Python") == [1, 40, 100]
@@ -0,0 +1,76 @@
+"""User snapshot cache: LRU/TTL behaviour and invalidation on commit."""
+import pytest
+from sqlalchemy import update
+
+import user_snapshot
+from models import User
+from user_snapshot import SnapshotCache, UserSnapshot, load_snapshot, snapshots, user_changed
+
+
+@pytest.fixture(autouse=True)
+def _empty_cache():
+    snapshots.clear()
+    yield
+    snapshots.clear()
+
+
+def _snapshot(user_id, **fields):
+    return UserSnapshot(**{"id": user_id, "email": f"u{user_id}@example.com", "full_name": None,
+                           "is_active": True, "credits": 0, "profile_completion": 0.0, **fields})
+
+
+def test_lru_bound_and_ttl(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(user_snapshot.time, "monotonic", lambda: now[0])
+    cache = SnapshotCache(max_size=2, ttl=60)
+    for user_id in (1, 2):
+        cache.put(_snapshot(user_id))
+    cache.get(1)                       # 2 is now least recently used
+    cache.put(_snapshot(3))
+    assert cache.get(2) is None and cache.get(1) is not None and cache.get(3) is not None
+
+    now[0] += 61
+    assert cache.get(1) is None
+    assert cache.metrics()["size"] == 1     # the expired entry was dropped on lookup
+
+
+def test_orm_change_invalidates_on_commit_not_before(db, user):
+    assert load_snapshot(db, user.id).credits == user.credits
+    user.credits += 5
+    db.flush()
+    assert snapshots.get(user.id) is not None       # uncommitted: other requests keep the old one
+    db.commit()
+    assert snapshots.get(user.id) is None
+    assert load_snapshot(db, user.id).credits == user.credits
+
+
+def test_rollback_keeps_the_snapshot(db, user):
+    load_snapshot(db, user.id)
+    user.full_name = "Renamed"
+    db.flush()
+    db.rollback()
+    assert snapshots.get(user.id).full_name == "Candidate"
+
+
+def test_columns_outside_the_snapshot_do_not_invalidate(db, user):
+    load_snapshot(db, user.id)
+    user.hashed_password = "y"
+    db.commit()
+    assert snapshots.get(user.id) is not None
+
+
+def test_core_update_invalidates_through_user_changed(db, user):
+    load_snapshot(db, user.id)
+    db.execute(update(User).where(User.id == user.id).values(credits=User.credits - 1))
+    user_changed(db, user.id)
+    assert snapshots.get(user.id) is not None
+    db.commit()
+    assert snapshots.get(user.id) is None
+
+
+def test_deleted_user_is_dropped(db, user):
+    load_snapshot(db, user.id)
+    db.delete(user)
+    db.commit()
+    assert snapshots.get(user.id) is None
+    assert load_snapshot(db, user.id) is None
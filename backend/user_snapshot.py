@@ -0,0 +1,172 @@
+"""
+Per-worker cache of authenticated users as small immutable snapshots.
+
+Access tokens carry the user id ("uid"), so authenticating a request is a
+JWT decode plus a dict lookup: UserSnapshot holds what identity-only
+endpoints read (id, email, name, is_active, credits, profile completion)
+and never touches a Session. Endpoints that modify the user still get a
+fresh ORM row (api.auth.get_current_user), loaded by primary key.
+
+Snapshots live in a bounded LRU with a TTL (USER_SNAPSHOT_CACHE_SIZE,
+USER_SNAPSHOT_TTL). They are dropped when a commit changes one of their
+columns: ORM edits to User are picked up by a session hook, and code that
+changes users with Core statements (e.g. the conditional credit UPDATE in
+api/profile.py) calls user_changed(). Profile completion is refreshed in
+place by profile_completion.py. Other workers see a change within the TTL.
+"""
+import os
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, replace
+from typing import Optional, Tuple
+
+from sqlalchemy import event, inspect
+from sqlalchemy.orm import Session
+
+from database import SessionLocal
+from models import User, UserProfile
+
+USER_SNAPSHOT_CACHE_SIZE = int(os.getenv("USER_SNAPSHOT_CACHE_SIZE", "10000"))
+USER_SNAPSHOT_TTL = float(os.getenv("USER_SNAPSHOT_TTL", "60"))
+
+# User columns copied into the snapshot; a committed change to any of them drops it
+SNAPSHOT_COLUMNS = frozenset({"email", "full_name", "is_active", "credits"})
+
+
+@dataclass(frozen=True, slots=True)
+class UserSnapshot:
+    id: int
+    email: str
+    full_name: Optional[str]
+    is_active: bool
+    credits: int
+    profile_completion: float
+
+
+class SnapshotCache:
+    """LRU of user id -> (snapshot, expiry)."""
+
+    def __init__(self, max_size: int = USER_SNAPSHOT_CACHE_SIZE, ttl: float = USER_SNAPSHOT_TTL):
+        self.max_size = max_size
+        self.ttl = ttl
+        self._entries: "OrderedDict[int, Tuple[UserSnapshot, float]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = self.misses = self.invalidations = 0
+
+    def get(self, user_id: int) -> Optional[UserSnapshot]:
+        with self._lock:
+            entry = self._entries.get(user_id)
+            if entry is None or entry[1] < time.monotonic():
+                if entry is not None:
+                    del self._entries[user_id]
+                self.misses += 1
+                return None
+            self._entries.move_to_end(user_id)
+            self.hits += 1
+            return entry[0]
+
+    def put(self, snapshot: UserSnapshot) -> None:
+        with self._lock:
+            self._entries[snapshot.id] = (snapshot, time.monotonic() + self.ttl)
+            self._entries.move_to_end(snapshot.id)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def update(self, user_id: int, **changes) -> None:
+        """Replace fields of a cached snapshot (keeps its expiry); no-op if not cached."""
+        with self._lock:
+            entry = self._entries.get(user_id)
+            if entry is not None:
+                self._entries[user_id] = (replace(entry[0], **changes), entry[1])
+
+    def invalidate(self, user_id: int) -> None:
+        with self._lock:
+            if self._entries.pop(user_id, None) is not None:
+                self.invalidations += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def metrics(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self._entries),
+            "max_size": self.max_size,
+            "ttl_seconds": self.ttl,
+            "hits": self.hits,
+            "misses": self.misses,
+            "invalidations": self.invalidations,
+            "hit_ratio": round(self.hits / lookups, 3) if lookups else None,
+        }
+
+
+snapshots = SnapshotCache()
+
+
+def load_snapshot(db: Session, user_id: Optional[int] = None, email: Optional[str] = None) -> Optional[UserSnapshot]:
+    """Cached snapshot by id, else one column query (by id or email) that fills the cache."""
+    if user_id is not None:
+        cached = snapshots.get(user_id)
+        if cached is not None:
+            return cached
+    query = (
+        db.query(User.id, User.email, User.full_name, User.is_active, User.credits,
+                 UserProfile.profile_completion)
+        .outerjoin(UserProfile, UserProfile.user_id == User.id)
+    )
+    if user_id is not None:
+        query = query.filter(User.id == user_id)
+    elif email is not None:
+        query = query.filter(User.email == email)
+    else:
+        return None
+    row = query.first()
+    if row is None:
+        return None
+    snapshot = UserSnapshot(
+        id=row.id,
+        email=row.email,
+        full_name=row.full_name,
+        is_active=bool(row.is_active),
+        credits=row.credits or 0,
+        profile_completion=float(row.profile_completion or 0.0),
+    )
+    snapshots.put(snapshot)
+    return snapshot
+
+
+def user_changed(session: Session, user_id: int) -> None:
+    """Drop the user's snapshot once `session` commits (for changes made outside the ORM)."""
+    session.info.setdefault("stale_user_snapshots", set()).add(user_id)
+
+
+def invalidate_user(user_id: int) -> None:
+    """Drop the user's snapshot now."""
+    snapshots.invalidate(user_id)
+
+
+# ── Session hooks ────────────────────────────────────────────────────────
+
+@event.listens_for(SessionLocal, "before_flush")
+def _collect_changed_users(session, flush_context, instances):
+    for obj in session.dirty:
+        if isinstance(obj, User) and obj.id is not None:
+            changed = {a.key for a in inspect(obj).attrs if a.history.has_changes()}
+            if changed & SNAPSHOT_COLUMNS:
+                user_changed(session, obj.id)
+    for obj in session.deleted:
+        if isinstance(obj, User):
+            user_changed(session, obj.id)
+
+
+@event.listens_for(SessionLocal, "after_commit")
+def _drop_stale_snapshots(session):
+    for user_id in session.info.pop("stale_user_snapshots", ()):
+        snapshots.invalidate(user_id)
+
+
+@event.listens_for(SessionLocal, "after_rollback")
+def _forget_stale_snapshots(session):
+    session.info.pop("stale_user_snapshots", None)
@@ -2,6 +2,7 @@ import React, { useState, useEffect, useMemo } from 'react';
 import { useAuth } from '../contexts/AuthContext';
 import { useToast } from '../contexts/ToastContext';
 import { HistorySkeleton } from './LoadingSkeleton';
+import { fetchSessionsPage } from '../services/interview';
 import { Clock, Calendar, Star, User, MessageCircle, TrendingUp, FileText, Award, Target, Search, Filter, X, SlidersHorizontal } from 'lucide-react';
 
 // Component to format roadmap content from markdown to styled HTML
@@ -108,6 +109,8 @@ const ChatHistory = () => {
   const toast = useToast();
   const [sessions, setSessions] = useState(() => readCache('chatHistory_sessions') || []);
   const [loading, setLoading] = useState(!readCache('chatHistory_sessions'));
+  const [nextCursor, setNextCursor] = useState(() => readCache('chatHistory_cursor'));
+  const [loadingMore, setLoadingMore] = useState(false);
   const [error, setError] = useState('');
   const [selectedSession, setSelectedSession] = useState(null);
   
@@ -175,6 +178,7 @@ const ChatHistory = () => {
           const { data, ts } = JSON.parse(cached);
           if (Date.now() - ts < CACHE_TTL_SESSIONS) {
             setSessions(data);
+            setNextCursor(readCache('chatHistory_cursor'));
             setLoading(false);
             return;
           }
@@ -183,29 +187,24 @@ const ChatHistory = () => {
     }
     try {
       const token = localStorage.getItem('token');
-      const response = await fetch(
-        `${process.env.REACT_APP_API_URL || 'http://localhost:8000'}/interview/sessions`,
-        {
-          headers: {
-            'Authorization': `Bearer ${token}`,
-            'Content-Type': 'application/json'
-          }
+      let sessions, cursor;
+      try {
+        ({ sessions, nextCursor: cursor } = await fetchSessionsPage(null, {
+          'Authorization': `Bearer ${token}`,
+          'Content-Type': 'application/json'
+        }));
+      } catch (err) {
+        if (err.status === 401) {
+          toast.error('Session expired. Please login again.');
+          return;
         }
-      );
-
-      if (response.status === 401) {
-        toast.error('Session expired. Please login again.');
-        return;
-      }
-
-      if (!response.ok) {
         throw new Error('Failed to fetch chat history');
       }
 
-      const data = await response.json();
-      const sessions = data.sessions || [];
       setSessions(sessions);
+      setNextCursor(cursor);
       localStorage.setItem(cacheKey, JSON.stringify({ data: sessions, ts: Date.now() }));
+      localStorage.setItem('chatHistory_cursor', JSON.stringify({ data: cursor, ts: Date.now() }));
     } catch (err) {
       setError(err.message || 'Failed to load chat history');
       toast.error('Failed to load chat history');
@@ -215,6 +214,25 @@ const ChatHistory = () => {
     }
   };
 
+  // Older sessions are fetched a page at a time, on request
+  const loadMoreSessions = async () => {
+    if (!nextCursor || loadingMore) return;
+    setLoadingMore(true);
+    try {
+      const page = await fetchSessionsPage(nextCursor);
+      const merged = [...sessions, ...page.sessions];
+      setSessions(merged);
+      setNextCursor(page.nextCursor);
+      localStorage.setItem('chatHistory_sessions', JSON.stringify({ data: merged, ts: Date.now() }));
+      localStorage.setItem('chatHistory_cursor', JSON.stringify({ data: page.nextCursor, ts: Date.now() }));
+    } catch (err) {
+      toast.error('Failed to load more interviews');
+      console.error('Error loading more sessions:', err);
+    } finally {
+      setLoadingMore(false);
+    }
+  };
+
   // Filtered and searched sessions
   const filteredSessions = useMemo(() => {
     let filtered = [...sessions];
@@ -555,7 +573,7 @@ const ChatHistory = () => {
         {/* Results Summary */}
         <div className="mt-4 flex items-center justify-between text-sm">
           <span className="text-gray-600 dark:text-gray-400">
-            Showing {filteredSessions.length} of {sessions.length} interviews
+            Showing {filteredSessions.length} of {sessions.length}{nextCursor ? '+' : ''} interviews
           </span>
           {hasActiveFilters && (
             <span className="text-blue-900 dark:text-blue-800 font-medium">
@@ -695,6 +713,18 @@ const ChatHistory = () => {
         </div>
       )}
 
+      {nextCursor && sessions.length > 0 && (
+        <div className="mt-6 text-center">
+          <button
+            onClick={loadMoreSessions}
+            disabled={loadingMore}
+            className="inline-flex items-center px-4 py-2 border border-gray-300 dark:border-gray-600 rounded-md text-sm font-medium text-gray-700 dark:text-gray-200 bg-white dark:bg-gray-800 hover:bg-gray-50 dark:hover:bg-gray-700 disabled:opacity-50"
+          >
+            {loadingMore ? 'Loading...' : 'Load older interviews'}
+          </button>
+        </div>
+      )}
+
       {/* Session Details Modal */}
       {selectedSession && (
         <div className="fixed inset-0 bg-black bg-opacity-50 flex items-center justify-center z-50 p-4">
@@ -1,7 +1,7 @@
 import React, { createContext, useContext, useState, useEffect } from 'react';
 import { useNavigate } from 'react-router-dom';
 import { login as loginApi, signup as signupApi, googleAuth as googleAuthApi, githubAuth as githubAuthApi, getCurrentUser } from '../services/auth';
-import { apiClient } from '../services/apiClient';
+import { apiClient, refreshAccessToken, revokeRefreshToken, storeTokens, clearTokens } from '../services/apiClient';
 
 const AuthContext = createContext(null);
 
@@ -12,7 +12,8 @@ const getCachedUser = () => {
     const raw = localStorage.getItem('cached_user');
     if (!token || !loginTime || !raw) return null;
     const elapsed = Date.now() - parseInt(loginTime);
-    if (elapsed >= 1440 * 60 * 1000) return null; // token expired
+    // token expired, and no refresh token to renew it with
+    if (elapsed >= 1440 * 60 * 1000 && !localStorage.getItem('refresh_token')) return null;
     return JSON.parse(raw);
   } catch { return null; }
 };
@@ -40,14 +41,17 @@ export const AuthProvider = ({ children }) => {
         const loginTime = localStorage.getItem('loginTime');
         
         if (token && loginTime) {
-          const timeElapsed = Date.now() - parseInt(loginTime);
+          let timeElapsed = Date.now() - parseInt(loginTime);
           
-          // If token is expired, clear it silently
+          // If token is expired, renew it with the refresh token or clear it silently
           if (timeElapsed >= TOKEN_LIFETIME) {
-            localStorage.removeItem('token');
-            localStorage.removeItem('loginTime');
-            setUser(null);
-            return;
+            if (!(await refreshAccessToken())) {
+              clearTokens();
+              localStorage.removeItem('loginTime');
+              setUser(null);
+              return;
+            }
+            timeElapsed = 0;
           }
           
           // Try to get current user (but don't block the app)
@@ -59,14 +63,14 @@ export const AuthProvider = ({ children }) => {
           } catch (error) {
             // If getCurrentUser fails, just clear auth silently
             console.error('Auth check failed:', error);
-            localStorage.removeItem('token');
+            clearTokens();
             localStorage.removeItem('loginTime');
             setUser(null);
           }
         }
       } catch (error) {
         console.error('Auth check failed:', error);
-        localStorage.removeItem('token');
+        clearTokens();
         localStorage.removeItem('loginTime');
         setUser(null);
       } finally {
@@ -81,23 +85,28 @@ export const AuthProvider = ({ children }) => {
   const setupSessionWarning = (timeElapsed) => {
     const timeUntilWarning = TOKEN_LIFETIME - WARNING_BEFORE_EXPIRY - timeElapsed;
     
+    // Sessions with a refresh token renew themselves, so only warn the others
     if (timeUntilWarning > 0) {
       setTimeout(() => {
-        setSessionWarning(true);
+        if (!localStorage.getItem('refresh_token')) setSessionWarning(true);
       }, timeUntilWarning);
     }
     
-    // Auto logout after token expires
+    // Renew the access token when it expires, or log out if that fails
     const timeUntilExpiry = TOKEN_LIFETIME - timeElapsed;
     if (timeUntilExpiry > 0) {
-      setTimeout(() => {
-        handleSessionExpired();
+      setTimeout(async () => {
+        if (await refreshAccessToken()) {
+          setupSessionWarning(0);
+        } else {
+          handleSessionExpired();
+        }
       }, timeUntilExpiry);
     }
   };
 
   const handleSessionExpired = () => {
-    localStorage.removeItem('token');
+    clearTokens();
     localStorage.removeItem('loginTime');
     localStorage.removeItem('cached_user');
     setUser(null);
@@ -112,14 +121,19 @@ export const AuthProvider = ({ children }) => {
   };
 
   const extendSession = async () => {
-    // Re-validate token and extend session
+    // Trade the refresh token for a fresh access token, or re-validate the
+    // current one for sessions that predate refresh tokens
     try {
-      const userData = await getCurrentUser();
-      if (userData) {
+      const renewed = localStorage.getItem('refresh_token')
+        ? await refreshAccessToken()
+        : await getCurrentUser();
+      if (renewed) {
         // Reset login time
         localStorage.setItem('loginTime', Date.now().toString());
         setSessionWarning(false);
         setupSessionWarning(0);
+      } else {
+        handleSessionExpired();
       }
     } catch (error) {
       handleSessionExpired();
@@ -128,8 +142,8 @@ export const AuthProvider = ({ children }) => {
 
   const login = async (email, password) => {
     try {
-      const { user: userData, token } = await loginApi(email, password);
-      localStorage.setItem('token', token);
+      const { user: userData, token, refreshToken } = await loginApi(email, password);
+      storeTokens({ access_token: token, refresh_token: refreshToken });
       localStorage.setItem('loginTime', Date.now().toString());
       localStorage.setItem('cached_user', JSON.stringify(userData));
       setUser(userData);
@@ -148,7 +162,7 @@ export const AuthProvider = ({ children }) => {
       
       // The backend now returns token and user data directly on signup
       if (response.access_token && response.user) {
-        localStorage.setItem('token', response.access_token);
+        storeTokens(response);
         localStorage.setItem('loginTime', Date.now().toString());
         localStorage.setItem('cached_user', JSON.stringify(response.user));
         setUser(response.user);
@@ -166,8 +180,8 @@ export const AuthProvider = ({ children }) => {
 
   const googleLogin = async (credential) => {
     try {
-      const { user: userData, token } = await googleAuthApi(credential);
-      localStorage.setItem('token', token);
+      const { user: userData, token, refreshToken } = await googleAuthApi(credential);
+      storeTokens({ access_token: token, refresh_token: refreshToken });
       localStorage.setItem('loginTime', Date.now().toString());
       localStorage.setItem('cached_user', JSON.stringify(userData));
       setUser(userData);
@@ -182,8 +196,8 @@ export const AuthProvider = ({ children }) => {
 
   const githubLogin = async (code) => {
     try {
-      const { user: userData, token } = await githubAuthApi(code);
-      localStorage.setItem('token', token);
+      const { user: userData, token, refreshToken } = await githubAuthApi(code);
+      storeTokens({ access_token: token, refresh_token: refreshToken });
       localStorage.setItem('loginTime', Date.now().toString());
       localStorage.setItem('cached_user', JSON.stringify(userData));
       setUser(userData);
@@ -208,8 +222,10 @@ export const AuthProvider = ({ children }) => {
     }
   };
 
-  const logout = () => {
-    localStorage.removeItem('token');
+  const logout = async () => {
+    // Revoke the refresh token server-side; it reads the token before we clear it
+    revokeRefreshToken();
+    clearTokens();
     localStorage.removeItem('loginTime');
     localStorage.removeItem('cached_user');
     setUser(null);
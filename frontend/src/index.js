@@ -3,6 +3,10 @@ import ReactDOM from 'react-dom/client';
 import './index.css';
 import './mobile.css';
 import App from './App';
+import { installAuthRefresh } from './services/apiClient';
+
+// Retry API calls that hit an expired access token once via /auth/refresh
+installAuthRefresh();
 
 const root = ReactDOM.createRoot(document.getElementById('root'));
 root.render(
@@ -184,35 +184,26 @@ const Dashboard = () => {
     try { return Date.now() - JSON.parse(localStorage.getItem(key) || '{}').ts < CACHE_TTL; } catch { return false; }
   };
 
-  const [sessions, setSessions] = useState(() => fromCache('cache_sessions').data || []);
-  const [analytics, setAnalytics] = useState(() => fromCache('cache_analytics').data || {});
-  const [loading, setLoading] = useState(() => !localStorage.getItem('cache_sessions'));
+  // Aggregates come from /interview/summary, so the dashboard is one request
+  // however many sessions the user has.
+  const [summary, setSummary] = useState(() => fromCache('cache_summary').data || {});
+  const [loading, setLoading] = useState(() => !localStorage.getItem('cache_summary'));
 
   useEffect(() => {
     if (!user || hasFetched.current) return;
     hasFetched.current = true;
-    fetchAll(isFresh('cache_sessions') && isFresh('cache_analytics'));
+    fetchAll(isFresh('cache_summary'));
   }, [user]); // eslint-disable-line
 
   const fetchAll = async (background = false) => {
     if (!background) setLoading(true);
     try {
       const h = { Authorization: `Bearer ${localStorage.getItem('token')}` };
-      const [ar, sr] = await Promise.all([
-        fetch(`${API}/interview/analytics`, { headers: h }),
-        fetch(`${API}/interview/sessions`, { headers: h }),
-      ]);
-      if (ar.ok) {
-        const d = await ar.json();
-        localStorage.setItem('cache_analytics', JSON.stringify({ data: d, ts: Date.now() }));
-        setAnalytics(d);
-      }
-      if (sr.ok) {
-        const d = await sr.json();
-        const list = d.sessions || [];
-        localStorage.setItem('cache_sessions', JSON.stringify({ data: list, ts: Date.now() }));
-        setSessions(list);
-      }
+      const res = await fetch(`${API}/interview/summary`, { headers: h });
+      if (!res.ok) throw new Error(`HTTP error! status: ${res.status}`);
+      const d = await res.json();
+      localStorage.setItem('cache_summary', JSON.stringify({ data: d, ts: Date.now() }));
+      setSummary(d);
     } catch {
       if (!background) toast.error('Failed to load dashboard');
     } finally {
@@ -221,28 +212,26 @@ const Dashboard = () => {
   };
 
   // ── derived ────────────────────────────────────────────────────────────────
-  const completed = useMemo(() =>
-    sessions.filter(s => s.status === 'completed' && s.average_score > 0)
-      .sort((a, b) => new Date(a.created_at) - new Date(b.created_at)),
-    [sessions]
-  );
+  // Last few scored sessions, oldest first; counts and averages cover all of them
+  const completed = useMemo(() => summary.recent || [], [summary]);
+  const scoredCount = summary.scored_sessions || 0;
 
   const trendData = useMemo(() =>
-    completed.slice(-12).map((s, i, arr) => ({
-      n: completed.length - arr.length + i + 1,
+    completed.map((s, i, arr) => ({
+      n: scoredCount - arr.length + i + 1,
       score: s.average_score,
-    })), [completed]
+    })), [completed, scoredCount]
   );
 
   const dimStats = useMemo(() => DIMS.map(d => {
     const series = completed.map(s => s[d.key]).filter(v => v != null);
-    const avg = series.length ? series.reduce((a, b) => a + b, 0) / series.length : null;
+    const avg = summary.dimension_averages?.[d.key] ?? null;
     const last3 = series.slice(-3), prev3 = series.slice(-6, -3);
     const avgL = last3.length ? last3.reduce((a, b) => a + b, 0) / last3.length : null;
     const avgP = prev3.length ? prev3.reduce((a, b) => a + b, 0) / prev3.length : null;
     const delta = avgL != null && avgP != null ? avgL - avgP : null;
     return { ...d, avg, delta, spark: series.slice(-8) };
-  }), [completed]);
+  }), [completed, summary]);
 
   // Weakest & strongest dim
   const scoredDims = dimStats.filter(d => d.avg != null);
@@ -251,12 +240,11 @@ const Dashboard = () => {
 
   // Improvement (first 3 vs last 3)
   const improvement = useMemo(() => {
-    const s = completed.filter(s => s.average_score > 0);
-    if (s.length < 6) return null;
-    const f = s.slice(0, 3).reduce((a, x) => a + x.average_score, 0) / 3;
-    const l = s.slice(-3).reduce((a, x) => a + x.average_score, 0) / 3;
+    const f = summary.baseline_score;
+    if (scoredCount < 6 || !f) return null;
+    const l = completed.slice(-3).reduce((a, x) => a + x.average_score, 0) / 3;
     return ((l - f) / f) * 100;
-  }, [completed]);
+  }, [completed, scoredCount, summary]);
 
   // Consistency score (1 - coeff of variation of last 5)
   const consistency = useMemo(() => {
@@ -280,15 +268,16 @@ const Dashboard = () => {
       out.push({ type: 'warn', text: `Your last few sessions are below your early average. Take time to review feedback.` });
     if (consistency != null && consistency >= 80)
       out.push({ type: 'good', text: `You're consistent — ${consistency}% score stability across your last 5 sessions.` });
-    if (completed.length >= 1 && completed.length < 5)
-      out.push({ type: 'info', text: `${5 - completed.length} more sessions unlock your full KPI trend analysis.` });
+    if (scoredCount >= 1 && scoredCount < 5)
+      out.push({ type: 'info', text: `${5 - scoredCount} more sessions unlock your full KPI trend analysis.` });
     return out.slice(0, 3);
-  }, [weakest, strongest, improvement, consistency, completed.length]);
+  }, [weakest, strongest, improvement, consistency, scoredCount]);
 
   const stats = {
-    total:     analytics.total_interviews || sessions.length,
-    avg:       analytics.average_score || 0,
-    best:      analytics.best_score || 0,
+    total:     summary.total_sessions || 0,
+    completed: summary.completed_sessions || 0,
+    avg:       summary.average_score || 0,
+    best:      summary.best_score || 0,
   };
 
   if (loading) return <Skeleton />;
@@ -302,7 +291,7 @@ const Dashboard = () => {
           <div>
             <h1 className="text-2xl font-extrabold text-slate-900 dark:text-white">Performance Dashboard</h1>
             <p className="text-sm text-slate-500 dark:text-slate-400 mt-0.5">
-              {completed.length} completed sessions · last updated {new Date().toLocaleDateString()}
+              {scoredCount} completed sessions · last updated {new Date().toLocaleDateString()}
             </p>
           </div>
           <button onClick={() => fetchAll(false)}
@@ -335,7 +324,7 @@ const Dashboard = () => {
         {/* Stat cards */}
         <div className="grid grid-cols-2 md:grid-cols-4 gap-4">
           {[
-            { icon: BarChart3, label: 'Total Sessions', value: stats.total, sub: `${sessions.filter(s=>s.status==='completed').length} completed`, color: 'text-blue-600 dark:text-blue-400', bg: 'bg-blue-100 dark:bg-blue-900/30' },
+            { icon: BarChart3, label: 'Total Sessions', value: stats.total, sub: `${stats.completed} completed`, color: 'text-blue-600 dark:text-blue-400', bg: 'bg-blue-100 dark:bg-blue-900/30' },
             { icon: Target,    label: 'Average Score',  value: `${stats.avg.toFixed(1)}/10`, sub: improvement != null ? `${improvement>=0?'+':''}${improvement.toFixed(1)}% vs start` : 'Keep going', color: 'text-purple-600 dark:text-purple-400', bg: 'bg-purple-100 dark:bg-purple-900/30' },
             { icon: Award,     label: 'Best Score',     value: `${stats.best.toFixed(1)}/10`, sub: strongest ? `↑ ${strongest.label}` : '–', color: 'text-emerald-600 dark:text-emerald-400', bg: 'bg-emerald-100 dark:bg-emerald-900/30' },
             { icon: Flame,     label: 'Consistency',    value: consistency != null ? `${consistency}%` : '–', sub: consistency == null ? 'Need 3+ sessions' : consistency >= 80 ? 'Very consistent' : consistency >= 60 ? 'Getting there' : 'Needs work', color: 'text-amber-600 dark:text-amber-400', bg: 'bg-amber-100 dark:bg-amber-900/30' },
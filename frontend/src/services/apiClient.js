@@ -1,6 +1,105 @@
 // API interceptor for handling token expiration and automatic logout
 const API_URL = process.env.REACT_APP_API_URL || 'http://localhost:8000';
 
+// Endpoints that must never trigger a refresh-and-retry themselves
+const NO_REFRESH_PATHS = ['/auth/refresh', '/auth/login', '/auth/logout', '/auth/signup', '/auth/google', '/auth/github'];
+
+let refreshInFlight = null;
+
+// Save the tokens a sign-in or refresh returned
+export const storeTokens = ({ access_token, refresh_token }) => {
+  if (access_token) localStorage.setItem('token', access_token);
+  if (refresh_token) localStorage.setItem('refresh_token', refresh_token);
+};
+
+export const clearTokens = () => {
+  localStorage.removeItem('token');
+  localStorage.removeItem('refresh_token');
+};
+
+// Trade the stored refresh token for a new access token (and refresh token).
+// Concurrent callers share one request, so a burst of 401s rotates the token
+// once. Resolves to the new access token, or null if the session is over.
+export const refreshAccessToken = () => {
+  if (refreshInFlight) return refreshInFlight;
+  const refreshToken = localStorage.getItem('refresh_token');
+  if (!refreshToken) return Promise.resolve(null);
+
+  refreshInFlight = (async () => {
+    try {
+      const response = await nativeFetch(`${API_URL}/auth/refresh`, {
+        method: 'POST',
+        headers: { 'Content-Type': 'application/json' },
+        body: JSON.stringify({ refresh_token: refreshToken }),
+      });
+      if (!response.ok) {
+        if (response.status === 401) clearTokens();
+        return null;
+      }
+      const data = await response.json();
+      storeTokens(data);
+      localStorage.setItem('loginTime', Date.now().toString());
+      if (data.user) localStorage.setItem('cached_user', JSON.stringify(data.user));
+      return data.access_token;
+    } catch (error) {
+      console.error('Token refresh failed:', error);
+      return null;
+    } finally {
+      refreshInFlight = null;
+    }
+  })();
+  return refreshInFlight;
+};
+
+// Revoke the refresh token server-side; sign-out goes ahead even if this fails
+export const revokeRefreshToken = async () => {
+  const refreshToken = localStorage.getItem('refresh_token');
+  if (!refreshToken) return;
+  try {
+    await nativeFetch(`${API_URL}/auth/logout`, {
+      method: 'POST',
+      headers: { 'Content-Type': 'application/json' },
+      body: JSON.stringify({ refresh_token: refreshToken }),
+    });
+  } catch (error) {
+    console.error('Logout request failed:', error);
+  }
+};
+
+const nativeFetch = (...args) => window.fetch.__native
+  ? window.fetch.__native(...args)
+  : window.fetch(...args);
+
+const isRefreshable = (url, headers) => {
+  if (typeof url !== 'string' || !url.startsWith(API_URL)) return false;
+  const path = url.slice(API_URL.length).split('?')[0];
+  if (NO_REFRESH_PATHS.includes(path)) return false;
+  return new Headers(headers).has('Authorization');
+};
+
+// Every page calls fetch() with the stored bearer token, so the retry lives in
+// one wrapper around window.fetch: a 401 from our API is retried once with a
+// refreshed access token instead of ending the session every time the short-
+// lived access token runs out.
+export const installAuthRefresh = () => {
+  if (window.fetch.__native) return;
+  const original = window.fetch.bind(window);
+
+  const fetchWithRefresh = async (url, options = {}) => {
+    const response = await original(url, options);
+    if (response.status !== 401 || !isRefreshable(url, options.headers)) {
+      return response;
+    }
+    const token = await refreshAccessToken();
+    if (!token) return response;
+    const headers = new Headers(options.headers);
+    headers.set('Authorization', `Bearer ${token}`);
+    return original(url, { ...options, headers });
+  };
+  fetchWithRefresh.__native = original;
+  window.fetch = fetchWithRefresh;
+};
+
 class ApiClient {
   constructor() {
     this.onUnauthorized = null;
@@ -12,17 +111,18 @@ class ApiClient {
 
   async fetch(url, options = {}) {
     const token = localStorage.getItem('token');
-    
+
     // Add authorization header if token exists
     const headers = {
       ...options.headers,
     };
-    
+
     if (token && !options.skipAuth) {
       headers['Authorization'] = `Bearer ${token}`;
     }
 
     try {
+      // A 401 here means the refresh-and-retry in fetch() failed too
       const response = await fetch(url, {
         ...options,
         headers,
@@ -31,15 +131,15 @@ class ApiClient {
       // Handle 401 Unauthorized
       if (response.status === 401 && !options.skipAuth) {
         console.warn('Token expired or invalid, logging out...');
-        
-        // Clear token
-        localStorage.removeItem('token');
-        
+
+        // Clear tokens
+        clearTokens();
+
         // Call unauthorized handler (logout)
         if (this.onUnauthorized) {
           this.onUnauthorized();
         }
-        
+
         throw new Error('Session expired. Please login again.');
       }
 
@@ -36,9 +36,10 @@ export const login = async (email, password) => {
       throw new Error(data.detail || data.message || 'Login failed');
     }
 
-    // The backend returns {access_token, token_type, user: {email, full_name}}
+    // The backend returns {access_token, refresh_token, token_type, user: {email, full_name}}
     return {
       token: data.access_token,
+      refreshToken: data.refresh_token,
       user: data.user || { email },
     };
   } catch (error) {
@@ -127,6 +128,7 @@ export const googleAuth = async (credential) => {
 
     return {
       token: data.access_token,
+      refreshToken: data.refresh_token,
       user: data.user,
     };
   } catch (error) {
@@ -170,6 +172,7 @@ export const githubAuth = async (code) => {
 
     return {
       token: data.access_token,
+      refreshToken: data.refresh_token,
       user: data.user,
     };
   } catch (error) {
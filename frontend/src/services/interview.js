@@ -25,6 +25,7 @@ function cacheSet(key, data) {
 export function invalidateDashboardCache() {
   localStorage.removeItem('cache_sessions');
   localStorage.removeItem('cache_analytics');
+  localStorage.removeItem('cache_summary');
 }
 
 // Get auth headers
@@ -37,13 +38,28 @@ const getAuthHeaders = () => {
 };
 
 /**
- * Get all interview sessions for the current user
+ * One page of the current user's interview sessions, newest first.
+ * Pass the previous page's next_cursor to get the page after it; next_cursor
+ * is null on the last page. Dashboard totals come from /interview/summary.
  */
-const _fetchSessions = async () => {
-  const response = await fetch(`${API_URL}/interview/sessions`, { method: 'GET', headers: getAuthHeaders() });
-  if (!response.ok) throw new Error(`HTTP error! status: ${response.status}`);
+export const fetchSessionsPage = async (cursor = null, headers = getAuthHeaders()) => {
+  const params = new URLSearchParams();
+  if (cursor) params.set('cursor', cursor);
+  const response = await fetch(`${API_URL}/interview/sessions?${params}`, { method: 'GET', headers });
+  if (!response.ok) {
+    const error = new Error(`HTTP error! status: ${response.status}`);
+    error.status = response.status;
+    throw error;
+  }
   const data = await response.json();
-  const sessions = data.sessions || [];
+  return { sessions: data.sessions || [], nextCursor: data.next_cursor || null };
+};
+
+/**
+ * Get the most recent interview sessions for the current user
+ */
+const _fetchSessions = async () => {
+  const { sessions } = await fetchSessionsPage();
   cacheSet('cache_sessions', sessions);
   return sessions;
 };